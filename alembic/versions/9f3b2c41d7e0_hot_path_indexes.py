@@ -0,0 +1,37 @@
+"""hot path indexes
+
+Revision ID: 9f3b2c41d7e0
+Revises: 5c73eba989bd
+Create Date: 2025-11-03 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3b2c41d7e0'
+down_revision = '5c73eba989bd'
+branch_labels = None
+depends_on = None
+
+# users.telegram_id и paymentlogs.purchase_id уже покрыты уникальными индексами из initial
+# (users_telegram_id_key, paymentlogs_purchase_id_key) — второй индекс на те же колонки не нужен
+INDEXES = (
+    ('ix_user_logs_user_id_created_at', 'user_logs', ['user_id', 'created_at']),
+    ('ix_user_mood_user_id_created_at', 'user_mood', ['user_id', 'created_at']),
+    ('ix_user_characteristic_user_id_created_at', 'user_characteristic', ['user_id', 'created_at']),
+)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции.
+    # Если построение упадет, Postgres оставит INVALID индекс — его нужно удалить руками перед повтором
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
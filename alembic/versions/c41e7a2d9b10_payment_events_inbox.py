@@ -0,0 +1,49 @@
+"""payment events inbox
+
+Revision ID: c41e7a2d9b10
+Revises: 9f3b2c41d7e0
+Create Date: 2025-11-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a2d9b10'
+down_revision = '9f3b2c41d7e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'payment_events',
+        sa.Column('event_key', sa.String(), nullable=False, comment='ID платежа + тип события'),
+        sa.Column('purchase_id', sa.String(), nullable=False, comment='ID Заказа'),
+        sa.Column('event', sa.String(), nullable=False, comment='Тип события YooKassa'),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False, comment='Уведомление целиком'),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False, comment='pending / done / dead'),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False, comment='Неудачных попыток'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='Когда обрабатывать'),
+        sa.Column('last_error', sa.String(), nullable=True, comment='Последняя ошибка обработки'),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_key')
+    )
+    op.create_index(
+        'ix_payment_events_pending_next_attempt_at',
+        'payment_events',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_payment_events_pending_next_attempt_at', table_name='payment_events',
+                  postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('payment_events')
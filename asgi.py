@@ -6,18 +6,101 @@ from contextlib import asynccontextmanager
 from aiogram import Bot, Dispatcher
 from aiogram.exceptions import TelegramRetryAfter
 from dishka.integrations.fastapi import setup_dishka
+from environs import Env
 from fastapi import FastAPI
+from faststream.nats import NatsBroker
 
+from source.application.payment.payment_events import ProcessPaymentEvents
+from source.application.subscription.sync_message_counters import SyncMessageCounters
+from source.application.user.user_logs import FlushUserLogs
+from source.core.lexicon.rules import MESSAGE_COUNTERS_SYNC_INTERVAL, USER_LOG_FLUSH_INTERVAL, \
+    PAYMENT_EVENTS_POLL_INTERVAL
 from source.core.logging.logging_config import configure_logging
+from source.infrastructure.config import UpdateQueueConfig, get_logging_config
 from source.infrastructure.dishka import make_dishka_container
+from source.infrastructure.metrics import monitor_event_loop_lag
+from source.presentation.fastapi.metrics_router import metrics_router
 from source.presentation.fastapi.webhooks_router import webhooks_router
+from source.presentation.telegram.update_worker import UpdateWorkerPool
 
-configure_logging()
+env = Env()
+env.read_env()
+configure_logging(**get_logging_config(env).model_dump())
 logger = logging.getLogger(__name__)
 
 dishka_container = make_dishka_container()
 
 
+async def sync_message_counters():
+    async with dishka_container() as request_container:
+        sync: SyncMessageCounters = await request_container.get(SyncMessageCounters)
+        await sync()
+
+
+async def sync_message_counters_periodically(interval: float = MESSAGE_COUNTERS_SYNC_INTERVAL):
+    """Фоновая запись счетчиков сообщений из Redis в Postgres"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await sync_message_counters()
+        except Exception as e:
+            logger.error(f"❌ Failed to sync message counters: {e}")
+
+
+async def flush_user_logs(max_wait: float) -> int:
+    async with dishka_container() as request_container:
+        flush: FlushUserLogs = await request_container.get(FlushUserLogs)
+        return await flush(max_wait)
+
+
+async def flush_user_logs_continuously(interval: float = USER_LOG_FLUSH_INTERVAL):
+    """Фоновый перенос логов из Redis Stream в Postgres пачками"""
+    while True:
+        try:
+            await flush_user_logs(max_wait=interval)
+        except Exception as e:
+            logger.error(f"❌ Failed to flush user logs: {e}")
+            await asyncio.sleep(interval)
+
+
+async def drain_user_logs(timeout: float = 10):
+    """Дописывает в БД логи, уже лежащие в стриме; то, что не успели, подхватит следующий запуск"""
+    try:
+        # другие воркеры продолжают писать в стрим — не держим остановку дольше timeout
+        async with asyncio.timeout(timeout):
+            while await flush_user_logs(max_wait=0):
+                pass
+    except Exception as e:
+        logger.error(f"❌ Failed to drain user logs on shutdown: {e}")
+
+
+async def process_payment_events() -> int:
+    async with dishka_container() as request_container:
+        process: ProcessPaymentEvents = await request_container.get(ProcessPaymentEvents)
+        return await process()
+
+
+async def process_payment_events_continuously(interval: float = PAYMENT_EVENTS_POLL_INTERVAL):
+    """Фоновый разбор уведомлений YooKassa из payment_events; после непустой пачки — сразу следующая"""
+    while True:
+        try:
+            if await process_payment_events():
+                continue
+        except Exception as e:
+            logger.error(f"❌ Failed to process payment events: {e}")
+        await asyncio.sleep(interval)
+
+
+async def start_broker():
+    """NATS нужен только рассылкам: без него бот работает, а /mailing отвечает, что брокер недоступен"""
+    try:
+        broker: NatsBroker = await dishka_container.get(NatsBroker)
+        await broker.start()
+        logger.info("✅ NATS broker started")
+    except Exception as e:
+        logger.error(f"❌ Failed to start NATS broker, mailings are unavailable: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan manager for creating Dishka container and setting Telegram webhook"""
@@ -50,7 +133,14 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"❌ Failed to delete webhook: {e}")
 
+    counters_sync_task: asyncio.Task | None = None
+    user_logs_task: asyncio.Task | None = None
+    payment_events_task: asyncio.Task | None = None
+    update_worker_task: asyncio.Task | None = None
+    event_loop_lag_task: asyncio.Task | None = None
+
     try:
+        event_loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
         logger.info("🔄 Starting Dishka container...")
 
         # Получаем зависимости из контейнера
@@ -69,6 +159,15 @@ async def lifespan(app: FastAPI):
         success = await set_webhook_with_retry(bot, webhook_url)
         if not success:
             raise RuntimeError("Failed to set Telegram webhook")
+        update_queue_config: UpdateQueueConfig = await dishka_container.get(UpdateQueueConfig)
+        if update_queue_config.embedded_worker:
+            # без отдельного процесса update_worker апдейты из очереди обрабатывает этот же процесс
+            update_worker_pool: UpdateWorkerPool = await dishka_container.get(UpdateWorkerPool)
+            update_worker_task = asyncio.create_task(update_worker_pool.run())
+        await start_broker()
+        counters_sync_task = asyncio.create_task(sync_message_counters_periodically())
+        user_logs_task = asyncio.create_task(flush_user_logs_continuously())
+        payment_events_task = asyncio.create_task(process_payment_events_continuously())
         logger.info("✅ Application startup complete")
         yield
 
@@ -76,6 +175,27 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Failed to set webhook: {e}")
         raise
     finally:
+        if update_worker_task is not None:
+            # воркер дожидается начатых апдейтов, поэтому останавливаем его до сброса логов и счетчиков
+            update_worker_task.cancel()
+            await asyncio.gather(update_worker_task, return_exceptions=True)
+        if payment_events_task is not None:
+            # незавершенная пачка откатится, события останутся pending для следующего запуска
+            payment_events_task.cancel()
+            await asyncio.gather(payment_events_task, return_exceptions=True)
+        if user_logs_task is not None:
+            user_logs_task.cancel()
+            await asyncio.gather(user_logs_task, return_exceptions=True)
+            await drain_user_logs()
+        if counters_sync_task is not None:
+            counters_sync_task.cancel()
+            try:
+                # последняя синхронизация, чтобы после остановки в БД были актуальные счетчики
+                await sync_message_counters()
+            except Exception as e:
+                logger.error(f"❌ Failed to sync message counters on shutdown: {e}")
+        if event_loop_lag_task is not None:
+            event_loop_lag_task.cancel()
         logger.info("🔄 Closing Dishka container...")
         await dishka_container.close()
         logger.info("✅ Dishka container closed")
@@ -100,6 +220,7 @@ def create_app() -> FastAPI:
     setup_dishka(dishka_container, app)
 
     app.include_router(webhooks_router, prefix="", tags=["webhooks"])
+    app.include_router(metrics_router, tags=["metrics"])
 
     @app.get("/health", tags=["health"])
     async def health_check():
@@ -0,0 +1,21 @@
+"""
+Нагрузочный тест: синтетические апдейты Telegram в вебхук приложения на локальных Postgres и Redis,
+с заглушками Bot API и OpenAI-совместимого LLM в процессе теста.
+
+    # тест поднимает заглушки и ждет /health приложения
+    python -m loadtest --secret $TELEGRAM_WEBHOOK_SECRET --users 200 --duration 120
+
+    # приложение смотрит в заглушки теста (при старте оно вызывает setWebhook)
+    TELEGRAM_API_URL=http://127.0.0.1:8081 ASSISTANT_BASE_URL=http://127.0.0.1:8082 \\
+        TELEGRAM_WEBHOOK_URL=http://127.0.0.1:8000/v1/webhooks/telegram uvicorn asgi:app
+
+Задержка LLM задается распределением (--llm-latency lognormal:0.8:0.5), темп стрима — --llm-tokens-per-second,
+ошибки — --llm-429-rate, --llm-500-rate, --llm-timeout-rate; --llm-seed делает прогон воспроизводимым.
+Сам AssistantClient без приложения и сети — python -m loadtest.llm_bench.
+
+CPU и память процессов приложения меряются, если передать их pid в --app-pid.
+
+Отчет: p50/p95/p99 приема апдейта и времени до первого ответа бота по шагам сценариев, апдейтов/с,
+вызовы Bot API, CPU и пиковый RSS процессов приложения и средние по хэндлерам из /metrics (с --metrics-token).
+Профиль CPU по функциям — py-spy record -p <pid> на время прогона
+"""
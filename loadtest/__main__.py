@@ -0,0 +1,6 @@
+import asyncio
+
+from loadtest.runner import main, parse_args
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,124 @@
+import asyncio
+import typing
+
+import httpx
+
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx в ASGI-приложение этого же процесса.
+
+    В отличие от httpx.ASGITransport, который копит тело ответа целиком, отдает тело по мере отправки —
+    иначе в стриме не видно ни времени до первого токена, ни темпа. Таймауты чтения (и общий таймаут
+    клиента) соблюдаются и приходят как httpx.ReadTimeout. Закрытие ответа отменяет приложение
+    """
+
+    def __init__(self, app: typing.Callable):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": ("127.0.0.1", 123),
+            "root_path": "",
+        }
+
+        started: asyncio.Future = asyncio.get_running_loop().create_future()
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue()
+        disconnected = asyncio.Event()
+        request_sent = False
+
+        async def receive() -> dict:
+            nonlocal request_sent
+            if request_sent:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: dict):
+            if message["type"] == "http.response.start":
+                started.set_result(message)
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    chunks.put_nowait(message["body"])
+                if not message.get("more_body", False):
+                    chunks.put_nowait(None)
+
+        async def run_app():
+            try:
+                await self.app(scope, receive, send)
+            except Exception as e:
+                if not started.done():
+                    started.set_exception(e)
+            finally:
+                if not started.done():
+                    started.set_exception(RuntimeError("ASGI app finished without a response"))
+                chunks.put_nowait(None)
+
+        task = asyncio.create_task(run_app())
+        try:
+            async with asyncio.timeout(read_timeout):
+                start = await asyncio.shield(started)
+        except TimeoutError:
+            started.cancel()
+            await _cancel(task, disconnected)
+            raise httpx.ReadTimeout("Timed out waiting for the response", request=request)
+        except BaseException:
+            started.cancel()
+            await _cancel(task, disconnected)
+            raise
+
+        return httpx.Response(
+            status_code=start["status"],
+            headers=start.get("headers", []),
+            stream=_ResponseStream(chunks, task, disconnected, read_timeout, request),
+        )
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(
+            self,
+            chunks: asyncio.Queue,
+            task: asyncio.Task,
+            disconnected: asyncio.Event,
+            read_timeout: float | None,
+            request: httpx.Request,
+    ):
+        self._chunks = chunks
+        self._task = task
+        self._disconnected = disconnected
+        self._read_timeout = read_timeout
+        self._request = request
+
+    async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+        while True:
+            try:
+                async with asyncio.timeout(self._read_timeout):
+                    chunk = await self._chunks.get()
+            except TimeoutError:
+                raise httpx.ReadTimeout("Timed out reading the response", request=self._request)
+            if chunk is None:
+                return
+            yield chunk
+
+    async def aclose(self):
+        await _cancel(self._task, self._disconnected)
+
+
+async def _cancel(task: asyncio.Task, disconnected: asyncio.Event):
+    disconnected.set()
+    if not task.done():
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
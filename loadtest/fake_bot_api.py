@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+
+# методы без содержимого для юзера: ответом на шаг сценария не считаются
+SERVICE_METHODS = {"answerCallbackQuery", "sendChatAction", "setWebhook", "deleteWebhook", "getMe", "setMyCommands"}
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "TraumaBot", "username": "trauma_load_bot"}
+
+
+class FakeBotAPI:
+    """
+    Заглушка Bot API: отвечает на POST /bot{token}/{method} как Telegram, с задержкой latency ± jitter.
+    Нагрузочный тест ждет через expect_reply первый содержательный вызов бота в чат —
+    так меряется время от вебхука до ответа юзеру
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls: Counter[str] = Counter()
+        # далеко от message_id, которые генерирует сценарий для колбэков
+        self._message_ids = itertools.count(10 ** 9)
+        # message_id отправленного ботом -> когда отправлено
+        self._sent_at: dict[int, float] = {}
+        # chat_id -> (future, с какого момента ждем)
+        self._waiters: dict[int, tuple[asyncio.Future, float]] = {}
+        self.app = FastAPI()
+        self.app.add_api_route("/bot{token}/{method}", self.handle, methods=["POST"])
+
+    def expect_reply(self, chat_id: int) -> asyncio.Future:
+        """Future, который получит время первого содержательного вызова в chat_id; создавать до отправки апдейта"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id] = (future, time.monotonic())
+        return future
+
+    def _is_reply(self, method: str, chat_id: int, params: dict[str, str]) -> bool:
+        if method in SERVICE_METHODS or chat_id not in self._waiters:
+            return False
+        _, since = self._waiters[chat_id]
+        # правка сообщения, отправленного до шага, — хвост стрима прошлого ответа, а не ответ на этот шаг
+        sent_at = self._sent_at.get(int(params.get("message_id") or 0))
+        return sent_at is None or sent_at >= since
+
+    @staticmethod
+    async def _read_params(request: Request) -> dict[str, str]:
+        # aiogram шлет поля формой: urlencoded без файлов, multipart — с файлами (их не разбираем)
+        if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+            return {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        if request.headers.get("content-type", "").startswith("application/json"):
+            return {key: str(value) for key, value in (await request.json()).items()}
+        return {}
+
+    def _message(self, chat_id: int, params: dict[str, str]) -> dict:
+        message_id = int(params.get("message_id") or 0)
+        if not message_id:
+            message_id = next(self._message_ids)
+            self._sent_at[message_id] = time.monotonic()
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+    def _result(self, method: str, chat_id: int | None, params: dict[str, str]):
+        if method == "getMe":
+            return BOT_USER
+        if (method.startswith("send") and method != "sendChatAction") or method.startswith("editMessage"):
+            return self._message(chat_id or 0, params)
+        return True
+
+    async def handle(self, token: str, method: str, request: Request):
+        params = await self._read_params(request)
+        self.calls[method] += 1
+        await asyncio.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+
+        chat_id = int(params["chat_id"]) if params.get("chat_id", "").lstrip("-").isdigit() else None
+        if chat_id is None and "callback_query_id" in params:
+            # id колбэков генерирует сценарий в виде "<chat_id>:<n>"
+            chat_id = int(params["callback_query_id"].split(":")[0])
+
+        is_reply = chat_id is not None and self._is_reply(method, chat_id, params)
+        result = self._result(method, chat_id, params)
+        if is_reply:
+            waiter, _ = self._waiters.pop(chat_id)
+            if not waiter.done():
+                waiter.set_result(time.monotonic())
+        return {"ok": True, "result": result}
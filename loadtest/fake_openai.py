@@ -0,0 +1,235 @@
+"""
+OpenAI-совместимая заглушка DeepSeek: /chat/completions со стримом и без, response_format=json_object,
+задержкой до первого токена из заданного распределения, темпом выдачи токенов и инъекцией ошибок.
+
+Работает и как отдельный сервер (uvicorn, ASSISTANT_BASE_URL), и в процессе теста —
+через fake_openai_client, без сети.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from openai import AsyncOpenAI
+
+from loadtest.asgi_transport import StreamingASGITransport
+from source.core.lexicon.prompts import PROBLEMS_SOLVER_PROMPT
+
+FAKE_BASE_URL = "http://fake-llm"
+
+# грубая оценка токенов по символам — для usage и темпа стрима
+CHARS_PER_TOKEN = 4
+
+# исходы запроса для FaultInjection.script
+OK, RATE_LIMITED, SERVER_ERROR, TIMEOUT = "ok", "429", "500", "timeout"
+
+TEXT_REPLY = (
+    "Понимаю, как тебе сейчас непросто. Давай попробуем разобраться вместе: что из происходящего "
+    "беспокоит тебя сильнее всего? Иногда помогает просто назвать чувство и немного побыть с ним."
+)
+
+PROBLEM_OPTIONS_REPLY = json.dumps([
+    {"option": "Поговорить с близким человеком", "pros": "Поддержка и взгляд со стороны", "cons": "Страх осуждения"},
+    {"option": "Составить план на неделю", "pros": "Ясность и контроль", "cons": "Может не хватить сил"},
+    {"option": "Обратиться к специалисту", "pros": "Профессиональная помощь", "cons": "Время и деньги"},
+], ensure_ascii=False)
+
+CHARACTERISTIC_REPLY = json.dumps({
+    "current_mood": "Умеренно сниженное",
+    "mood_trend": "Стабильная",
+    "mood_stability": "Средняя",
+    "risk_group": "Низкая",
+    "stress_level": "Средний",
+    "anxiety_level": "Средний",
+    "strengths": ["Открытость", "Рефлексия"],
+    "weaknesses": ["Самокритика"],
+    "communication_style": "Сдержанный",
+    "personal_insights": ["Склонность брать ответственность на себя"],
+    "recommendations": ["Регулярный сон", "Дневник эмоций"],
+    "characteristic_accuracy": "70%",
+}, ensure_ascii=False)
+
+ERRORS = {
+    RATE_LIMITED: (429, "rate_limit_error", "Rate limit reached for requests"),
+    SERVER_ERROR: (500, "server_error", "The server had an error while processing your request"),
+}
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Задержка до первого токена, секунд:
+        "0.5"                   — фиксированная
+        "uniform:0.2:1.5"       — равномерная на отрезке
+        "lognormal:0.8:0.5"     — логнормальная с медианой 0.8 и sigma 0.5 (длинный хвост, как у живого API)
+    """
+    kind: str = "fixed"
+    params: tuple[float, ...] = (0.5,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, *raw = spec.split(":") if ":" in spec else ("fixed", spec)
+        arity = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in arity or len(raw) != arity[kind]:
+            raise ValueError(f"Unknown latency distribution {spec!r}")
+        return cls(kind=kind, params=tuple(float(value) for value in raw))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma)
+        return self.params[0]
+
+
+@dataclass
+class FaultInjection:
+    """
+    Ошибки вместо ответа: сначала по очереди исходы из script (OK, RATE_LIMITED, SERVER_ERROR, TIMEOUT),
+    затем случайно с заданными долями. TIMEOUT — сервер молчит hang_seconds, таймаут срабатывает у клиента
+    """
+    rate_limit: float = 0.0
+    server_error: float = 0.0
+    timeout: float = 0.0
+    hang_seconds: float = 300.0
+    script: list[str] = field(default_factory=list)
+
+    def next_outcome(self, rng: random.Random) -> str:
+        if self.script:
+            return self.script.pop(0)
+        roll = rng.random()
+        for outcome, rate in ((RATE_LIMITED, self.rate_limit), (SERVER_ERROR, self.server_error), (TIMEOUT, self.timeout)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return OK
+
+
+def pick_reply(body: dict) -> str:
+    """Ответ по запросу: JSON-характеристика, JSON вариантов решения проблемы или обычный текст"""
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return CHARACTERISTIC_REPLY
+    messages = body.get("messages") or [{}]
+    if messages[0].get("content") == PROBLEMS_SOLVER_PROMPT:
+        return PROBLEM_OPTIONS_REPLY
+    return TEXT_REPLY
+
+
+def create_fake_openai(
+        latency: LatencyDistribution | float = 0.5,
+        tokens_per_second: float = 100.0,
+        chunk_size: int = 8,
+        faults: FaultInjection | None = None,
+        seed: int | None = None,
+) -> FastAPI:
+    """
+    /chat/completions: задержка до первого токена из latency, дальше стрим кусками по chunk_size символов
+    с темпом tokens_per_second (0 — без пауз). Без стрима ответ отдается целиком после задержки и генерации.
+    При одном seed последовательность задержек и ошибок воспроизводится.
+    Исходы запросов считаются в app.state.outcomes
+    """
+    if not isinstance(latency, LatencyDistribution):
+        latency = LatencyDistribution(params=(float(latency),))
+    faults = faults or FaultInjection()
+    rng = random.Random(seed)
+    chunk_delay = chunk_size / CHARS_PER_TOKEN / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    app = FastAPI()
+    app.state.outcomes = Counter()
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        outcome = faults.next_outcome(rng)
+        delay = latency.sample(rng)
+        app.state.outcomes[outcome] += 1
+
+        if outcome == TIMEOUT:
+            await asyncio.sleep(faults.hang_seconds)
+        await asyncio.sleep(delay)
+        if outcome in ERRORS:
+            status, error_type, text = ERRORS[outcome]
+            return JSONResponse({"error": {"message": text, "type": error_type, "code": None}}, status_code=status)
+
+        reply = pick_reply(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "deepseek-chat")
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // CHARS_PER_TOKEN,
+            "completion_tokens": len(reply) // CHARS_PER_TOKEN,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(chunk_delay * math.ceil(len(reply) / chunk_size))
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def chunks():
+            for start in range(0, len(reply), chunk_size):
+                delta = {"content": reply[start:start + chunk_size]}
+                yield _sse(completion_id, created, model, [{"index": 0, "delta": delta, "finish_reason": None}])
+                await asyncio.sleep(chunk_delay)
+            yield _sse(completion_id, created, model, [{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield _sse(completion_id, created, model, [], usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
+
+
+def fake_openai_client(app: FastAPI, timeout: float = 60.0) -> AsyncOpenAI:
+    """
+    AsyncOpenAI, который ходит в заглушку в этом же процессе; как AssistantProvider — без повторов SDK.
+    Таймаут чтения соблюдается, так что TIMEOUT приходит в AssistantClient как APITimeoutError
+    """
+    return AsyncOpenAI(
+        api_key="fake",
+        base_url=FAKE_BASE_URL,
+        http_client=httpx.AsyncClient(transport=StreamingASGITransport(app), timeout=timeout),
+        max_retries=0,
+    )
+
+
+def add_llm_arguments(parser: argparse.ArgumentParser):
+    """Параметры заглушки LLM — общие для нагрузочного теста и бенчмарка AssistantClient"""
+    parser.add_argument("--llm-latency", default="lognormal:0.5:0.4",
+                        help="задержка до первого токена: 0.5 | uniform:MIN:MAX | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=100.0, help="темп стрима; 0 — без пауз")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--llm-500-rate", type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument("--llm-timeout-rate", type=float, default=0.0, help="доля запросов, на которые заглушка молчит")
+    parser.add_argument("--llm-seed", type=int, default=None, help="seed задержек и ошибок для воспроизводимых прогонов")
+
+
+def fake_openai_from_args(args: argparse.Namespace) -> FastAPI:
+    return create_fake_openai(
+        latency=LatencyDistribution.parse(args.llm_latency),
+        tokens_per_second=args.llm_tokens_per_second,
+        faults=FaultInjection(rate_limit=args.llm_429_rate, server_error=args.llm_500_rate, timeout=args.llm_timeout_rate),
+        seed=args.llm_seed,
+    )
+
+
+def _sse(completion_id: str, created: int, model: str, choices: list, usage: dict | None = None) -> str:
+    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+             "choices": choices, "usage": usage}
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
@@ -0,0 +1,101 @@
+"""
+Бенчмарк AssistantClient на заглушке LLM в этом же процессе — без сети, Redis и приложения:
+планировщик, повторы и дедлайн настоящие, breaker всегда закрыт.
+
+    python -m loadtest.llm_bench --requests 1000 --concurrency 50 --mode stream \\
+        --llm-latency lognormal:0.8:0.5 --llm-tokens-per-second 40 --llm-429-rate 0.05 --llm-seed 1
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from loadtest.fake_openai import add_llm_arguments, fake_openai_from_args, fake_openai_client
+from loadtest.stats import LatencyRecorder
+from source.core.schemas.assistant_schemas import UserCharacteristicAssistantResponse
+from source.infrastructure.ai_assistant.ai_assistant import AssistantClient
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
+
+
+class ClosedBreaker:
+    """Breaker без Redis: бенчмарк меряет клиент, а не отказ от запросов"""
+
+    async def is_open(self) -> bool:
+        return False
+
+    async def record(self, success: bool, duration: float):
+        pass
+
+
+async def _request(assistant: AssistantClient, mode: str, user_id: str, recorder: LatencyRecorder) -> str:
+    started = time.monotonic()
+    if mode == "stream":
+        first_token = None
+        async for _ in assistant.stream_response("Ты — бот поддержки", "Мне тревожно", user_id=user_id):
+            if first_token is None:
+                first_token = time.monotonic() - started
+        recorder.observe("first token", first_token)
+    elif mode == "json":
+        await assistant.get_response(
+            "Составь характеристику", "логи", response_schema=UserCharacteristicAssistantResponse,
+            need_json=True, user_id=user_id
+        )
+    else:
+        await assistant.get_response("Ты — бот поддержки", "Мне тревожно", user_id=user_id)
+    recorder.observe("total", time.monotonic() - started)
+    return "ok"
+
+
+async def run(args: argparse.Namespace) -> tuple[LatencyRecorder, Counter, float, Counter]:
+    fake_llm = fake_openai_from_args(args)
+    client = fake_openai_client(fake_llm, timeout=args.read_timeout)
+    assistant = AssistantClient(
+        client=client,
+        scheduler=LLMRequestScheduler(max_in_flight=args.max_in_flight),
+        breaker=ClosedBreaker(),
+        request_deadline=args.request_deadline,
+        max_retries=args.max_retries,
+    )
+    recorder = LatencyRecorder()
+    results = Counter()
+    remaining = iter(range(args.requests))
+
+    async def worker(index: int):
+        for _ in remaining:
+            try:
+                results[await _request(assistant, args.mode, f"bench-{index}", recorder)] += 1
+            except Exception as e:
+                results[type(e).__name__] += 1
+
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(worker(index) for index in range(args.concurrency)))
+    finally:
+        await client.close()
+    return recorder, results, time.monotonic() - started, fake_llm.state.outcomes
+
+
+async def main(args: argparse.Namespace):
+    recorder, results, elapsed, outcomes = await run(args)
+    print(f"Запросов: {args.requests}, режим: {args.mode}, за {elapsed:.1f}s — {args.requests / elapsed:.1f} запросов/с")
+    print(f"Результаты: {dict(results)}; ответы заглушки: {dict(outcomes)}")
+    print(f"{'':<12} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, count, _, p50, p95, p99 in recorder.rows():
+        print(f"{name:<12} {count:>6} {p50:>9.0f} {p95:>9.0f} {p99:>9.0f}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.llm_bench", description="Бенчмарк AssistantClient")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50, help="одновременных юзеров")
+    parser.add_argument("--mode", choices=("stream", "complete", "json"), default="stream")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="ASSISTANT_MAX_IN_FLIGHT")
+    parser.add_argument("--max-retries", type=int, default=2, help="ASSISTANT_MAX_RETRIES")
+    parser.add_argument("--request-deadline", type=float, default=90.0, help="ASSISTANT_REQUEST_DEADLINE")
+    parser.add_argument("--read-timeout", type=float, default=60.0, help="ASSISTANT_READ_TIMEOUT")
+    add_llm_arguments(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import httpx
+import uvicorn
+
+from loadtest.fake_bot_api import FakeBotAPI
+from loadtest.fake_openai import add_llm_arguments, fake_openai_from_args
+from loadtest.scenarios import ONBOARDING, Step, UpdateFactory, next_session
+from loadtest.stats import LatencyRecorder, ProcessSampler, parse_histogram_means, percentile
+
+
+class LoadTest:
+    """
+    Прогон: users юзеров стартуют равномерно за ramp_up секунд и до конца duration проходят сессии сценариев.
+    Юзер ждет ответа бота (или reply_timeout) и паузу think_time перед следующим шагом, как живой человек
+    """
+
+    def __init__(self, args: argparse.Namespace, fake_bot: FakeBotAPI):
+        self.args = args
+        self.fake_bot = fake_bot
+        self.webhook = LatencyRecorder()
+        self.replies = LatencyRecorder()
+        self.statuses: Counter[int] = Counter()
+        self.sent = 0
+        self._deadline = 0.0
+
+    async def _send(self, client: httpx.AsyncClient, factory: UpdateFactory, step: Step):
+        reply = self.fake_bot.expect_reply(factory.telegram_id)
+        started = time.monotonic()
+        try:
+            response = await client.post(f"/v1/webhooks/telegram/{self.args.secret}", json=step.build(factory))
+            self.statuses[response.status_code] += 1
+        except httpx.HTTPError:
+            self.statuses[0] += 1
+            return
+        self.webhook.observe(step.name, time.monotonic() - started)
+        self.sent += 1
+
+        try:
+            replied_at = await asyncio.wait_for(reply, self.args.reply_timeout)
+            self.replies.observe(step.name, replied_at - started)
+        except asyncio.TimeoutError:
+            self.replies.timeout(step.name)
+
+    async def _user(self, client: httpx.AsyncClient, telegram_id: int, start_delay: float):
+        await asyncio.sleep(start_delay)
+        rng = random.Random(telegram_id)
+        factory = UpdateFactory(telegram_id)
+        session = ONBOARDING
+        while time.monotonic() < self._deadline:
+            for step in session:
+                if time.monotonic() >= self._deadline:
+                    return
+                await self._send(client, factory, step)
+                await asyncio.sleep(rng.uniform(*self.args.think_time))
+            session = next_session(rng)
+
+    async def run(self) -> float:
+        self._deadline = time.monotonic() + self.args.duration
+        limits = httpx.Limits(max_connections=self.args.connections)
+        async with httpx.AsyncClient(base_url=self.args.url, limits=limits, timeout=30) as client:
+            started = time.monotonic()
+            await asyncio.gather(*(
+                self._user(client, self.args.user_id_base + index, self.args.ramp_up * index / self.args.users)
+                for index in range(self.args.users)
+            ))
+            return time.monotonic() - started
+
+
+def _print_table(title: str, recorder: LatencyRecorder):
+    print(f"\n{title}")
+    print(f"{'шаг':<26}{'ответов':>9}{'таймаутов':>11}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}")
+    for name, count, timeouts, p50, p95, p99 in recorder.rows():
+        print(f"{name:<26}{count:>9}{timeouts:>11}{p50:>10.0f}{p95:>10.0f}{p99:>10.0f}")
+    values = recorder.all_samples()
+    print(f"{'всего':<26}{len(values):>9}{sum(recorder.timeouts.values()):>11}"
+          f"{percentile(values, 50) * 1000:>10.0f}{percentile(values, 95) * 1000:>10.0f}"
+          f"{percentile(values, 99) * 1000:>10.0f}")
+
+
+async def _print_app_metrics(url: str, token: str | None):
+    """Средние по хэндлерам и middleware из /metrics приложения, если он есть и токен подходит"""
+    if not token:
+        return
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+            response = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    except httpx.HTTPError:
+        return
+    if response.status_code != 200:
+        return
+    metrics = response.text
+    for name, label in (("telegram_handler_seconds", "handler"), ("telegram_middleware_seconds", "middleware")):
+        means = parse_histogram_means(metrics, name, label)
+        if not means:
+            continue
+        print(f"\n{name} (среднее за время жизни процесса)")
+        for value, (count, mean) in sorted(means.items(), key=lambda item: -item[1][1]):
+            print(f"{value:<40}{count:>9}{mean * 1000:>10.1f} мс")
+
+
+async def _serve(app, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def _wait_for_app(url: str, timeout: float):
+    """Приложение при старте ходит в Bot API (setWebhook), поэтому его запускают, когда заглушки уже подняты"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Приложение {url} не ответило на /health за {timeout}s")
+            await asyncio.sleep(1)
+
+
+async def main(args: argparse.Namespace):
+    fake_bot = FakeBotAPI(latency=args.bot_latency, jitter=args.bot_latency / 2)
+    fake_llm = fake_openai_from_args(args)
+    servers = [await _serve(fake_bot.app, args.bot_api_port), await _serve(fake_llm, args.llm_port)]
+
+    sampler = ProcessSampler(args.app_pid) if args.app_pid else None
+    load_test = LoadTest(args, fake_bot)
+    try:
+        print(f"Заглушки подняты, жду приложение {args.url}")
+        await _wait_for_app(args.url, args.app_start_timeout)
+        if sampler:
+            sampler.start()
+
+        async def sample_periodically():
+            while True:
+                await asyncio.sleep(1)
+                sampler.sample()
+
+        sampling = asyncio.create_task(sample_periodically()) if sampler else None
+        elapsed = await load_test.run()
+        if sampling:
+            sampling.cancel()
+    finally:
+        for server, task in servers:
+            server.should_exit = True
+            await task
+
+    print(f"\nЮзеров: {args.users}, длительность: {elapsed:.1f}s, апдейтов: {load_test.sent}, "
+          f"{load_test.sent / elapsed:.1f} апдейтов/с")
+    print(f"Ответы вебхука: {dict(load_test.statuses)}")
+    _print_table("Вебхук: прием апдейта", load_test.webhook)
+    _print_table("От апдейта до первого ответа бота", load_test.replies)
+    print(f"\nВызовы Bot API: {json.dumps(dict(fake_bot.calls.most_common()), ensure_ascii=False)}")
+    print(f"Запросы к LLM: {dict(fake_llm.state.outcomes)}")
+    if sampler:
+        for pid, (cores, rss) in sampler.report().items():
+            print(f"pid {pid}: CPU {cores:.2f} ядра в среднем, пиковый RSS {rss / 2 ** 20:.0f} MiB")
+    await _print_app_metrics(args.url, args.metrics_token)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Нагрузочный тест вебхука TraumaBot")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="адрес приложения (uvicorn asgi:app)")
+    parser.add_argument("--secret", required=True, help="TELEGRAM_WEBHOOK_SECRET приложения")
+    parser.add_argument("--metrics-token", help="METRICS_TOKEN приложения — чтобы вывести средние из /metrics")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60.0, help="секунд")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="за сколько секунд стартуют все юзеры")
+    parser.add_argument("--think-time", type=float, nargs=2, default=(1.0, 3.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--reply-timeout", type=float, default=30.0)
+    parser.add_argument("--connections", type=int, default=100, help="HTTP-соединений к приложению")
+    parser.add_argument("--user-id-base", type=int, default=int(time.time()) * 1000,
+                        help="telegram_id первого юзера; по умолчанию новые юзеры в каждом прогоне")
+    parser.add_argument("--bot-api-port", type=int, default=8081, help="заглушка Bot API (TELEGRAM_API_URL)")
+    parser.add_argument("--bot-latency", type=float, default=0.05, help="задержка ответа Bot API, секунд")
+    parser.add_argument("--llm-port", type=int, default=8082, help="заглушка LLM (ASSISTANT_BASE_URL)")
+    add_llm_arguments(parser)
+    parser.add_argument("--app-start-timeout", type=float, default=120.0, help="сколько ждать /health приложения")
+    parser.add_argument("--app-pid", type=int, nargs="*", help="pid процессов приложения для замера CPU и памяти")
+    return parser.parse_args(argv)
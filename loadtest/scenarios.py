@@ -0,0 +1,128 @@
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from source.core.lexicon.ButtonText import ButtonText
+
+VENTING_TEXTS = (
+    "Мне очень тяжело последние дни, ничего не хочется",
+    "На работе постоянно давят, я не справляюсь",
+    "Поссорилась с мамой и не знаю, как помириться",
+    "Не могу уснуть, всё время прокручиваю мысли",
+    "Кажется, что я всех подвожу",
+)
+PROBLEM_TEXTS = ("Я откладываю важный разговор с начальником", "Не могу начать готовиться к экзаменам")
+GOAL_TEXTS = ("Хочу спокойно обсудить нагрузку", "Хочу заниматься хотя бы час в день")
+
+
+class UpdateFactory:
+    """Апдейты Telegram от имени одного юзера: сквозные update_id и message_id, id колбэков "<chat_id>:<n>" """
+
+    _update_ids = itertools.count(int(time.time()) * 1000)
+
+    def __init__(self, telegram_id: int):
+        self.telegram_id = telegram_id
+        self._message_ids = itertools.count(1)
+        self._callback_ids = itertools.count(1)
+
+    @property
+    def _user(self) -> dict:
+        return {"id": self.telegram_id, "is_bot": False, "first_name": "Load", "username": f"load_{self.telegram_id}",
+                "language_code": "ru"}
+
+    @property
+    def _chat(self) -> dict:
+        return {"id": self.telegram_id, "type": "private", "first_name": "Load"}
+
+    def message(self, text: str) -> dict:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": self._chat,
+            "from": self._user,
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return {"update_id": next(self._update_ids), "message": message}
+
+    def callback(self, data: str) -> dict:
+        return {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": f"{self.telegram_id}:{next(self._callback_ids)}",
+                "from": self._user,
+                "chat_instance": str(self.telegram_id),
+                "data": data,
+                # сообщение бота с клавиатурой, на которую нажал юзер
+                "message": {
+                    "message_id": next(self._message_ids),
+                    "date": int(time.time()),
+                    "chat": self._chat,
+                    "from": {"id": 1, "is_bot": True, "first_name": "TraumaBot"},
+                    "text": "...",
+                },
+            },
+        }
+
+
+@dataclass(frozen=True)
+class Step:
+    # название шага в отчете
+    name: str
+    build: Callable[[UpdateFactory], dict]
+
+
+def text(name: str, value: str | tuple[str, ...]) -> Step:
+    return Step(name, lambda factory: factory.message(random.choice(value) if isinstance(value, tuple) else value))
+
+
+def callback(name: str, data: str) -> Step:
+    return Step(name, lambda factory: factory.callback(data))
+
+
+# первое за день "Начать диалог" спрашивает настроение, поэтому каждый юзер начинает с onboarding
+ONBOARDING = [
+    text("start", "/start"),
+    text("start_dialog", ButtonText.START_DIALOG),
+    text("mood_check_in", ("3", "5", "6", "8")),
+]
+
+VENTING = [
+    callback("choose_venting", "method:vent"),
+    text("venting_turn", VENTING_TEXTS),
+    text("venting_turn", VENTING_TEXTS),
+    text("venting_turn", VENTING_TEXTS),
+    text("venting_stop", "/stop"),
+    text("start_dialog", ButtonText.START_DIALOG),
+]
+
+PROBLEM_SOLVING = [
+    callback("choose_problem_solving", "method:problem"),
+    text("ps_define", PROBLEM_TEXTS),
+    text("ps_goal", GOAL_TEXTS),
+    callback("ps_choose_option", "problem_solving:choose_option:0"),
+    text("ps_stop", "/stop"),
+    text("start_dialog", ButtonText.START_DIALOG),
+]
+
+PROFILE = [
+    text("profile", ButtonText.PROFILE),
+    callback("generate_characteristic", "generate_characts"),
+    callback("characteristic_page", "user_characts:0"),
+    text("start_dialog", ButtonText.START_DIALOG),
+]
+
+# сессии после onboarding: вес — как часто юзер выбирает сценарий
+SESSIONS: list[tuple[list[Step], int]] = [
+    (VENTING, 6),
+    (PROBLEM_SOLVING, 3),
+    (PROFILE, 1),
+]
+
+
+def next_session(rng: random.Random) -> list[Step]:
+    sessions, weights = zip(*SESSIONS)
+    return rng.choices(sessions, weights=weights)[0]
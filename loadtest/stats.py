@@ -0,0 +1,104 @@
+import math
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу; пустой список — nan"""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+@dataclass
+class LatencyRecorder:
+    """Задержки по названию шага сценария и число шагов без ответа"""
+    samples: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    timeouts: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def observe(self, name: str, seconds: float):
+        self.samples[name].append(seconds)
+
+    def timeout(self, name: str):
+        self.timeouts[name] += 1
+
+    def all_samples(self) -> list[float]:
+        return [value for values in self.samples.values() for value in values]
+
+    def rows(self) -> list[tuple[str, int, int, float, float, float]]:
+        """(шаг, ответов, таймаутов, p50, p95, p99) в миллисекундах"""
+        rows = []
+        for name in sorted(set(self.samples) | set(self.timeouts)):
+            values = self.samples.get(name, [])
+            rows.append((
+                name,
+                len(values),
+                self.timeouts.get(name, 0),
+                percentile(values, 50) * 1000,
+                percentile(values, 95) * 1000,
+                percentile(values, 99) * 1000,
+            ))
+        return rows
+
+
+class ProcessSampler:
+    """
+    CPU и RSS процесса приложения по /proc/<pid> (Linux): средняя загрузка в ядрах
+    за прогон и пиковая память. Процессы воркеров передаются отдельными pid
+    """
+
+    def __init__(self, pids: list[int]):
+        self.pids = pids
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._started_at = 0.0
+        self._cpu_at_start: dict[int, float] = {}
+        self.peak_rss: dict[int, int] = defaultdict(int)
+
+    def _cpu_seconds(self, pid: int) -> float:
+        with open(f"/proc/{pid}/stat") as stat:
+            # имя процесса в скобках может содержать пробелы — считаем поля после него
+            fields = stat.read().rsplit(")", 1)[1].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        return (utime + stime) / self._ticks
+
+    def _rss_bytes(self, pid: int) -> int:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * self._page_size
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._cpu_at_start = {pid: self._cpu_seconds(pid) for pid in self.pids}
+
+    def sample(self):
+        for pid in self.pids:
+            self.peak_rss[pid] = max(self.peak_rss[pid], self._rss_bytes(pid))
+
+    def report(self) -> dict[int, tuple[float, int]]:
+        """pid -> (средняя загрузка CPU в ядрах, пиковый RSS в байтах)"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        self.sample()
+        return {
+            pid: ((self._cpu_seconds(pid) - self._cpu_at_start[pid]) / elapsed, self.peak_rss[pid])
+            for pid in self.pids
+        }
+
+
+def parse_histogram_means(metrics_text: str, name: str, label: str) -> dict[str, tuple[int, float]]:
+    """Из ответа /metrics: значение метки -> (количество, среднее в секундах) для гистограммы name"""
+    sums: dict[str, float] = {}
+    counts: dict[str, int] = {}
+    for line in metrics_text.splitlines():
+        for suffix, target in (("_sum", sums), ("_count", counts)):
+            prefix = f"{name}{suffix}{{{label}=\""
+            if line.startswith(prefix):
+                value_label, _, rest = line[len(prefix):].partition('"')
+                target[value_label] = float(rest.rsplit(" ", 1)[1])
+    return {
+        value_label: (int(counts[value_label]), sums[value_label] / counts[value_label])
+        for value_label in counts if counts[value_label] and value_label in sums
+    }
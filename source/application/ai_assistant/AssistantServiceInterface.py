@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 from source.core.schemas.assistant_schemas import AssistantResponse, ContextMessage
 from source.core.lexicon.prompts import *
@@ -58,3 +59,52 @@ class AssistantServiceInterface(ABC):
     ):
         """Получает JSON формат для таблицы user_characteristic"""
         pass
+
+    @abstractmethod
+    def stream_speaking_response(
+            self,
+            message: str,
+            prompt: str = SPEAKING_PROMPT,
+            context_messages: list[ContextMessage] = None,
+    ) -> AsyncIterator[str]:
+        """Поговорить. Ответ отдается по кусочкам по мере генерации."""
+        pass
+
+    @abstractmethod
+    def stream_calm_response(
+            self,
+            message: str,
+            context_messages: list[ContextMessage] = None,
+            prompt: str = GET_CALM_PROMPT,
+    ) -> AsyncIterator[str]:
+        """Режим успокоения, стрим."""
+        pass
+
+    @abstractmethod
+    def stream_relationships_response(
+            self,
+            message: str,
+            prompt: str = RELATIONSHIPS_PROMPT,
+            context_messages: list[ContextMessage] = None,
+    ) -> AsyncIterator[str]:
+        """Отношения, стрим."""
+        pass
+
+    @abstractmethod
+    def stream_pathways_to_solve_problem_response(
+            self,
+            prompt: str,
+            context_messages: list[ContextMessage] = None,
+    ) -> AsyncIterator[str]:
+        """Шаги решения проблемы, стрим."""
+        pass
+
+    @abstractmethod
+    async def get_history_summary(
+            self,
+            messages: list[ContextMessage],
+            previous_summary: str | None = None,
+            prompt: str = SUMMARIZE_HISTORY_PROMPT,
+    ) -> AssistantResponse:
+        """Краткое содержание старой части диалога (для контекста)."""
+        pass
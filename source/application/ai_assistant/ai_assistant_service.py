@@ -1,8 +1,11 @@
+from typing import AsyncIterator
+
 from source.application.ai_assistant.AssistantServiceInterface import AssistantServiceInterface
+from source.core.enum import LLMPriority
 from source.core.lexicon.prompts import GET_CALM_PROMPT, KPT_DIARY_PROMPT, PROBLEMS_SOLVER_PROMPT, SPEAKING_PROMPT, \
-    RELATIONSHIPS_PROMPT, GET_USER_CHARACTERISTIC
+    RELATIONSHIPS_PROMPT, GET_USER_CHARACTERISTIC, SUMMARIZE_HISTORY_PROMPT
 from source.core.schemas import UserLogSchema
-from source.core.schemas.assistant_schemas import AssistantResponse, UserCharacteristicAssistantResponse
+from source.core.schemas.assistant_schemas import AssistantResponse, UserCharacteristicAssistantResponse, ContextMessage
 from source.core.schemas.user_schema import UserMoodSchema
 from source.infrastructure.ai_assistant.ai_assistant import AssistantClient
 from source.infrastructure.database.models.base_model import S
@@ -17,7 +20,10 @@ class AssistantService(AssistantServiceInterface):
             message: str,
             context_messages=None,
             prompt: str = GET_CALM_PROMPT,
-            temperature=0.75
+            temperature=0.75,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.CRISIS,
+            context_scope: str = "calming"
     ) -> AssistantResponse:
         if context_messages is None:
             context_messages = []
@@ -25,7 +31,10 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=message,
             context_messages=context_messages,
-            temperature=temperature
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_pathways_to_solve_problem_response(
@@ -33,6 +42,9 @@ class AssistantService(AssistantServiceInterface):
             prompt: str,
             context_messages=None,
             temperature: float = 0.4,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "problem_solving"
     ) -> AssistantResponse:
         if context_messages is None:
             context_messages = []
@@ -40,14 +52,20 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message="",  # The prompt contains all info, no new message needed
             context_messages=context_messages,
-            temperature=temperature
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_kpt_diary_response(
             self,
             message: str,
             context_messages=None,
-            prompt: str = KPT_DIARY_PROMPT
+            prompt: str = KPT_DIARY_PROMPT,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "cbt"
     ) -> AssistantResponse:
         if context_messages is None:
             context_messages = []
@@ -55,6 +73,9 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=message,
             context_messages=context_messages,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_problems_solver_response(
@@ -62,7 +83,10 @@ class AssistantService(AssistantServiceInterface):
             message: str,
             context_messages=None,
             temperature: float = 0.3,
-            prompt: str = PROBLEMS_SOLVER_PROMPT
+            prompt: str = PROBLEMS_SOLVER_PROMPT,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "problem_solving"
     ) -> AssistantResponse:
         if context_messages is None:
             context_messages = []
@@ -70,7 +94,10 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=message,
             context_messages=context_messages,
-            temperature=temperature
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_speaking_response(
@@ -78,7 +105,10 @@ class AssistantService(AssistantServiceInterface):
             message: str,
             prompt: str = SPEAKING_PROMPT,
             context_messages=None,
-            temperature=0.7
+            temperature=0.7,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "venting"
     ) -> AssistantResponse:
         if context_messages is None:
             context_messages = []
@@ -86,7 +116,10 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=message,
             context_messages=context_messages,
-            temperature=temperature
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_relationships_response(
@@ -94,7 +127,10 @@ class AssistantService(AssistantServiceInterface):
             message: str,
             prompt: str = RELATIONSHIPS_PROMPT,
             context_messages=None,
-            temperature=0.6
+            temperature=0.6,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "relationships"
     ) -> AssistantResponse:
         """Возвращает ответ ассистента в режиме Отношения"""
         if context_messages is None:
@@ -103,7 +139,103 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=message,
             context_messages=context_messages,
-            temperature=temperature
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
+        )
+
+    # [ streaming ]
+
+    def stream_calm_response(
+            self,
+            message: str,
+            context_messages=None,
+            prompt: str = GET_CALM_PROMPT,
+            temperature=0.75,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.CRISIS,
+            context_scope: str = "calming"
+    ) -> AsyncIterator[str]:
+        """Стрим ответа в режиме Успокоиться"""
+        if context_messages is None:
+            context_messages = []
+        return self.client.stream_response(
+            system_prompt=prompt,
+            message=message,
+            context_messages=context_messages,
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
+        )
+
+    def stream_pathways_to_solve_problem_response(
+            self,
+            prompt: str,
+            context_messages=None,
+            temperature: float = 0.4,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "problem_solving"
+    ) -> AsyncIterator[str]:
+        """Стрим шагов решения выбранного варианта"""
+        if context_messages is None:
+            context_messages = []
+        return self.client.stream_response(
+            system_prompt=prompt,
+            message="",
+            context_messages=context_messages,
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
+        )
+
+    def stream_speaking_response(
+            self,
+            message: str,
+            prompt: str = SPEAKING_PROMPT,
+            context_messages=None,
+            temperature=0.7,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "venting"
+    ) -> AsyncIterator[str]:
+        """Стрим ответа в режиме Поговорить"""
+        if context_messages is None:
+            context_messages = []
+        return self.client.stream_response(
+            system_prompt=prompt,
+            message=message,
+            context_messages=context_messages,
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
+        )
+
+    def stream_relationships_response(
+            self,
+            message: str,
+            prompt: str = RELATIONSHIPS_PROMPT,
+            context_messages=None,
+            temperature=0.6,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "relationships"
+    ) -> AsyncIterator[str]:
+        """Стрим ответа в режиме Отношения"""
+        if context_messages is None:
+            context_messages = []
+        return self.client.stream_response(
+            system_prompt=prompt,
+            message=message,
+            context_messages=context_messages,
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
 
     async def get_user_characteristic(
@@ -112,6 +244,9 @@ class AssistantService(AssistantServiceInterface):
             user_mood_history: list[UserMoodSchema],
             prompt: str = GET_USER_CHARACTERISTIC,
             response_schema: S = UserCharacteristicAssistantResponse,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.BACKGROUND,
+            context_scope: str = "user_characteristic"
     ) -> UserCharacteristicAssistantResponse:
         """Генерация хар-ки в формате UserCharacteristicSchema"""
 
@@ -126,5 +261,31 @@ class AssistantService(AssistantServiceInterface):
             system_prompt=prompt,
             message=query,
             response_schema=response_schema,
-            need_json=True
+            need_json=True,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
+        )
+
+    async def get_history_summary(
+            self,
+            messages: list[ContextMessage],
+            previous_summary: str | None = None,
+            prompt: str = SUMMARIZE_HISTORY_PROMPT,
+            temperature: float = 0.3,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.BACKGROUND,
+            context_scope: str = "history_summary"
+    ) -> AssistantResponse:
+        """Сворачивает старые реплики (и прошлое краткое содержание) в новое краткое содержание"""
+        transcript: str = "\n".join(f"{message.role}: {message.message}" for message in messages)
+        query: str = f"previous_summary: {previous_summary or ''}\n\n dialogue: {transcript}"
+
+        return await self.client.get_response(
+            system_prompt=prompt,
+            message=query,
+            temperature=temperature,
+            user_id=user_id,
+            priority=priority,
+            context_scope=context_scope
         )
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+
+from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.base import Interactor
+from source.application.redis_services.message_history.message_history_service import MessageHistoryService
+from source.core.lexicon.prompts import HISTORY_SUMMARY_CONTEXT
+from source.core.schemas.assistant_schemas import ContextMessage
+
+logger = logging.getLogger(__name__)
+
+# оценка без токенайзера: для смеси кириллицы и латиницы у DeepSeek выходит ~3 символа на токен
+CHARS_PER_TOKEN = 3
+# служебные токены на роль и разметку одного сообщения
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# фоновые пересчеты краткого содержания; держим ссылки, чтобы задачи не собрал GC
+_summary_tasks: set[asyncio.Task] = set()
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_TOKEN_OVERHEAD
+
+
+class BuildDialogContext(Interactor[tuple[str, str], list[ContextMessage]]):
+    """
+    Собирает контекст диалога для ассистента по бюджету токенов, а не по числу сообщений.
+
+    В контекст идут краткое содержание старой части разговора и самые свежие сообщения, которые
+    влезают в token_budget. Сообщения, не влезшие в бюджет, в фоне сворачиваются в новое краткое
+    содержание (под локом в Redis) и убираются из истории — ответ юзеру этого не ждет.
+    """
+
+    def __init__(
+            self,
+            message_history_service: MessageHistoryService,
+            assistant_service: AssistantService,
+            token_budget: int,
+            summary_lock_ttl: int,
+    ):
+        self.message_history_service = message_history_service
+        self.assistant_service = assistant_service
+        self.token_budget = token_budget
+        self.summary_lock_ttl = summary_lock_ttl
+
+    async def __call__(
+            self,
+            user_telegram_id: str,
+            context_scope: str,
+            new_message: ContextMessage | None = None
+    ) -> list[ContextMessage]:
+        """new_message, если передано, сначала добавляется в историю — в том же запросе к Redis"""
+        if new_message is not None:
+            history, summary = await self.message_history_service.append_and_fetch(
+                user_telegram_id, context_scope, new_message
+            )
+        else:
+            history, summary = await self.message_history_service.get_history_and_summary(
+                user_telegram_id, context_scope
+            )
+
+        kept, overflow = self._split(history, summary)
+        if overflow:
+            self._schedule_summary_refresh(user_telegram_id, context_scope)
+
+        context: list[ContextMessage] = []
+        if summary:
+            context.append(ContextMessage(role="system", message=HISTORY_SUMMARY_CONTEXT.format(summary=summary)))
+        context.extend(kept)
+
+        logger.debug(
+            f"Context for user {user_telegram_id} in scope {context_scope}: "
+            f"{len(kept)} messages, summary={bool(summary)}, overflow={len(overflow)}"
+        )
+        return context
+
+    def _split(
+            self,
+            history: list[ContextMessage],
+            summary: str | None
+    ) -> tuple[list[ContextMessage], list[ContextMessage]]:
+        """Делит историю (от старых к новым) на влезающий в бюджет хвост и не влезшее начало"""
+        budget = self.token_budget - (estimate_tokens(summary) if summary else 0)
+
+        kept: list[ContextMessage] = []
+        for message in reversed(history):
+            cost = estimate_tokens(message.message)
+            if cost > budget:
+                if not kept:
+                    # самое свежее сообщение нужно всегда, даже если оно одно больше бюджета
+                    max_tokens = max(budget, self.token_budget // 2) - MESSAGE_TOKEN_OVERHEAD
+                    max_chars = max_tokens * CHARS_PER_TOKEN
+                    kept.append(ContextMessage(role=message.role, message=message.message[:max_chars]))
+                break
+            kept.append(message)
+            budget -= cost
+
+        kept.reverse()
+        return kept, history[:len(history) - len(kept)]
+
+    def _schedule_summary_refresh(self, user_telegram_id: str, context_scope: str):
+        task = asyncio.create_task(self._refresh_summary(user_telegram_id, context_scope))
+        _summary_tasks.add(task)
+        task.add_done_callback(_summary_tasks.discard)
+
+    async def _refresh_summary(self, user_telegram_id: str, context_scope: str):
+        if not await self.message_history_service.acquire_summary_lock(
+                user_telegram_id, context_scope, self.summary_lock_ttl
+        ):
+            return
+
+        try:
+            # перечитываем под локом: другой воркер мог уже свернуть часть истории
+            history, summary = await self.message_history_service.get_history_and_summary(
+                user_telegram_id, context_scope
+            )
+            _, overflow = self._split(history, summary)
+            if not overflow:
+                return
+
+            # без user_id: фоновый запрос не должен занимать единственный слот юзера в планировщике
+            response = await self.assistant_service.get_history_summary(
+                messages=overflow,
+                previous_summary=summary
+            )
+            await self.message_history_service.replace_oldest_with_summary(
+                user_telegram_id, context_scope, response.message, len(overflow)
+            )
+            logger.info(f"Summarized {len(overflow)} messages for user {user_telegram_id} in scope {context_scope}")
+        except Exception as e:
+            logger.error(f"Failed to summarize history for user {user_telegram_id} in scope {context_scope}: {e}")
+        finally:
+            await self.message_history_service.release_summary_lock(user_telegram_id, context_scope)
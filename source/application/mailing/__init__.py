@@ -0,0 +1,10 @@
+from .deliver_message import DeliverMailingMessage
+from .get_report import GetMailingReport
+from .load_audience import LoadMailingAudience
+from .start_mailing import StartMailing
+
+
+__all__ = ['DeliverMailingMessage',
+           'GetMailingReport',
+           'LoadMailingAudience',
+           'StartMailing']
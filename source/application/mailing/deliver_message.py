@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime, timezone
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest
+from faststream.nats import NatsBroker
+
+from source.application.base import Interactor
+from source.application.mailing.subjects import MAILING_STREAM, MSG_ID_HEADER, logs_subject, publish_mailing_over
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.core.enum import MailingDeliveryStatus, SendPriority
+from source.core.schemas.mailing_schema import MailingJobSchema, MailingDeliveryLogSchema
+from source.infrastructure.telegram.rate_limiter import send_priority
+
+logger = logging.getLogger(__name__)
+
+
+class DeliverMailingMessage(Interactor[MailingJobSchema, MailingDeliveryStatus | None]):
+    """
+    Отправляет сообщение рассылки одному юзеру и записывает итог.
+
+    Отправка идет с приоритетом BULK: лимитер Telegram пропускает ответы юзерам вперед рассылки,
+    так что бот во время рассылки отвечает как обычно. Заблокировавший бота юзер и отказ Telegram
+    (TelegramBadRequest) — окончательный итог; сетевая ошибка пробрасывается, чтобы NATS
+    доставил задание еще раз, а на последней попытке (final_attempt) тоже считается failed.
+    Возвращает None, если задание уже обработано или рассылки больше нет.
+    """
+
+    def __init__(self, progress: MailingProgressService, broker: NatsBroker, bot: Bot):
+        self.progress = progress
+        self.broker = broker
+        self.bot = bot
+
+    async def __call__(self, job: MailingJobSchema, final_attempt: bool = False) -> MailingDeliveryStatus | None:
+        if await self.progress.is_recorded(job.mailing_id, job.telegram_id):
+            return None
+        text = await self.progress.get_text(job.mailing_id)
+        if text is None:
+            logger.warning(f"Mailing {job.mailing_id} not found, dropping job for {job.telegram_id}")
+            return None
+
+        error: str | None = None
+        try:
+            with send_priority(SendPriority.BULK):
+                await self.bot.send_message(chat_id=int(job.telegram_id), text=text)
+            status = MailingDeliveryStatus.SENT
+        except TelegramForbiddenError as e:
+            status, error = MailingDeliveryStatus.BLOCKED, e.message
+        except TelegramBadRequest as e:
+            status, error = MailingDeliveryStatus.FAILED, e.message
+        except Exception as e:
+            if not final_attempt:
+                raise
+            status, error = MailingDeliveryStatus.FAILED, str(e)
+
+        finished = await self.progress.record(job.mailing_id, job.telegram_id, status)
+        await self._publish_log(job, status, error)
+        if finished:
+            await publish_mailing_over(self.broker, self.progress, job.mailing_id)
+        return status
+
+    async def _publish_log(self, job: MailingJobSchema, status: MailingDeliveryStatus, error: str | None):
+        try:
+            await self.broker.publish(
+                MailingDeliveryLogSchema(
+                    mailing_id=job.mailing_id,
+                    telegram_id=job.telegram_id,
+                    status=status,
+                    error=error,
+                    timestamp=datetime.now(timezone.utc)
+                ),
+                subject=logs_subject(job.mailing_id, job.telegram_id),
+                stream=MAILING_STREAM,
+                headers={MSG_ID_HEADER: f"{job.mailing_id}:{job.telegram_id}:logs"}
+            )
+        except Exception as e:
+            # итог уже учтен в Redis, журнал в стриме — только для разбора
+            logger.error(f"Failed to publish delivery log of mailing {job.mailing_id} for {job.telegram_id}: {e}")
@@ -0,0 +1,15 @@
+from uuid import UUID
+
+from source.application.base import Interactor
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.core.schemas.mailing_schema import MailingReportSchema
+
+
+class GetMailingReport(Interactor[UUID, MailingReportSchema | None]):
+    """Текущий прогресс рассылки"""
+
+    def __init__(self, progress: MailingProgressService):
+        self.progress = progress
+
+    async def __call__(self, mailing_id: UUID) -> MailingReportSchema | None:
+        return await self.progress.get_report(mailing_id)
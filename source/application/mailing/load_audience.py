@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from faststream.nats import NatsBroker
+
+from source.application.base import Interactor
+from source.application.mailing.subjects import MAILING_STREAM, MSG_ID_HEADER, send_subject, publish_mailing_over
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.core.schemas.mailing_schema import MailingJobSchema
+from source.infrastructure.database.repository import UserRepository
+from source.infrastructure.database.uow import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+class LoadMailingAudience(Interactor[UUID, int]):
+    """
+    Выгружает получателей рассылки из Postgres пачками по chunk_size (keyset по telegram_id)
+    и публикует на каждого задание mailing.{id}.send.{telegram_id}; возвращает число опубликованных.
+
+    Каждая пачка читается в своей короткой транзакции, так что выгрузка 100k юзеров не держит
+    соединение с БД. После публикации пачки курсор сохраняется в Redis: упавшая выгрузка
+    продолжается с него, а задания недосохраненной пачки JetStream отбросит по Nats-Msg-Id.
+    """
+
+    def __init__(
+            self,
+            progress: MailingProgressService,
+            repository: UserRepository,
+            uow: UnitOfWork,
+            broker: NatsBroker,
+            chunk_size: int,
+    ):
+        self.progress = progress
+        self.repository = repository
+        self.uow = uow
+        self.broker = broker
+        self.chunk_size = chunk_size
+
+    async def __call__(self, mailing_id: UUID, heartbeat: Callable[[], Awaitable[None]] | None = None) -> int:
+        if await self.progress.get_text(mailing_id) is None:
+            logger.warning(f"Mailing {mailing_id} not found, skipping audience load")
+            return 0
+
+        cursor = await self.progress.get_cursor(mailing_id)
+        if cursor is not None:
+            logger.info(f"Resuming audience load of mailing {mailing_id} after {cursor}")
+
+        published = 0
+        while True:
+            async with self.uow:
+                telegram_ids = await self.repository.get_telegram_ids_after(cursor, self.chunk_size)
+            if not telegram_ids:
+                break
+
+            await asyncio.gather(*(self._publish_job(mailing_id, telegram_id) for telegram_id in telegram_ids))
+            cursor = telegram_ids[-1]
+            await self.progress.save_chunk(mailing_id, cursor, len(telegram_ids))
+            published += len(telegram_ids)
+            if heartbeat is not None:
+                await heartbeat()
+
+        logger.info(f"Mailing {mailing_id}: published {published} send jobs")
+        if await self.progress.mark_loaded(mailing_id):
+            # все задания успели обработаться раньше, чем выгрузка отметилась (или аудитория пуста)
+            await publish_mailing_over(self.broker, self.progress, mailing_id)
+        return published
+
+    async def _publish_job(self, mailing_id: UUID, telegram_id: str):
+        await self.broker.publish(
+            MailingJobSchema(mailing_id=mailing_id, telegram_id=telegram_id),
+            subject=send_subject(mailing_id, telegram_id),
+            stream=MAILING_STREAM,
+            headers={MSG_ID_HEADER: f"{mailing_id}:{telegram_id}"}
+        )
@@ -0,0 +1,35 @@
+import logging
+import uuid
+from uuid import UUID
+
+from faststream.nats import NatsBroker
+
+from source.application.base import Interactor
+from source.application.mailing.subjects import MAILING_STREAM, MSG_ID_HEADER, load_subject
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.core.schemas.mailing_schema import MailingLoadSchema
+
+logger = logging.getLogger(__name__)
+
+
+class StartMailing(Interactor[tuple[str, str | None], UUID]):
+    """
+    Запускает рассылку: сохраняет текст и прогресс в Redis и публикует команду выгрузки аудитории.
+    Сама выгрузка и отправка идут в консьюмерах NATS, хэндлер админа сразу получает id рассылки
+    """
+
+    def __init__(self, progress: MailingProgressService, broker: NatsBroker):
+        self.progress = progress
+        self.broker = broker
+
+    async def __call__(self, text: str, admin_telegram_id: str | None = None) -> UUID:
+        mailing_id = uuid.uuid4()
+        await self.progress.create(mailing_id, text, admin_telegram_id)
+        await self.broker.publish(
+            MailingLoadSchema(mailing_id=mailing_id),
+            subject=load_subject(mailing_id),
+            stream=MAILING_STREAM,
+            headers={MSG_ID_HEADER: f"{mailing_id}:load"}
+        )
+        logger.info(f"Mailing {mailing_id} started by {admin_telegram_id}")
+        return mailing_id
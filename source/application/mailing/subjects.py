@@ -0,0 +1,48 @@
+import logging
+from uuid import UUID
+
+from faststream.nats import NatsBroker
+
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+
+logger = logging.getLogger(__name__)
+
+# стрим создается nats/migrations.py
+MAILING_STREAM = "mailing"
+
+# заголовок дедупликации JetStream: повторная публикация с тем же id в пределах duplicate_window отбрасывается
+MSG_ID_HEADER = "Nats-Msg-Id"
+
+
+def load_subject(mailing_id: UUID) -> str:
+    return f"mailing.{mailing_id}.load"
+
+
+def send_subject(mailing_id: UUID, telegram_id: str) -> str:
+    return f"mailing.{mailing_id}.send.{telegram_id}"
+
+
+def logs_subject(mailing_id: UUID, telegram_id: str) -> str:
+    return f"{send_subject(mailing_id, telegram_id)}.logs"
+
+
+def over_subject(mailing_id: UUID) -> str:
+    return f"mailing.{mailing_id}.over"
+
+
+async def publish_mailing_over(broker: NatsBroker, progress: MailingProgressService, mailing_id: UUID):
+    """Публикует итоговый отчет; вызывается тем, кто обработал последнее задание рассылки"""
+    report = await progress.get_report(mailing_id)
+    if report is None:
+        return
+    logger.info(
+        f"Mailing {mailing_id} finished: {report.processed}/{report.published} processed "
+        f"(sent={report.sent}, blocked={report.blocked}, failed={report.failed}), "
+        f"{report.messages_per_second:.1f} msg/s"
+    )
+    await broker.publish(
+        report,
+        subject=over_subject(mailing_id),
+        stream=MAILING_STREAM,
+        headers={MSG_ID_HEADER: f"{mailing_id}:over"}
+    )
@@ -0,0 +1,174 @@
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any
+
+from aiogram import Bot
+from dateutil.relativedelta import relativedelta
+
+from source.application.base import Interactor
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
+from source.core.exceptions import PaymentNotFoundException
+from source.core.schemas.payment_schema import PaymentSchema, PaymentEventSchema
+from source.infrastructure.database.repository import PaymentEventRepository, PaymentRepository, UserRepository
+from source.infrastructure.database.uow import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+SUCCEEDED = "succeeded"
+
+
+def get_payment_event_key(event_json: dict[str, Any]) -> str | None:
+    """Одно и то же уведомление YooKassa: id платежа + тип события (succeeded и canceled — разные)"""
+    purchase_id = event_json.get('object', {}).get('id')
+    if not purchase_id:
+        return None
+    return f"{purchase_id}:{event_json.get('event')}"
+
+
+class RecordPaymentEvent(Interactor[dict[str, Any], bool]):
+    """
+    Сохраняет уведомление YooKassa во входящую очередь payment_events и сразу коммитит.
+    Повторная доставка того же уведомления отбрасывается уникальным event_key; False — повтор
+    """
+
+    def __init__(self, repository: PaymentEventRepository, uow: UnitOfWork):
+        self.repository = repository
+        self.uow = uow
+
+    async def __call__(self, event_json: dict[str, Any]) -> bool:
+        event_key = get_payment_event_key(event_json)
+        if event_key is None:
+            raise ValueError("YooKassa event without payment id")
+
+        async with self.uow:
+            added = await self.repository.add(
+                event_key=event_key,
+                purchase_id=event_json['object']['id'],
+                event=str(event_json.get('event')),
+                payload=event_json
+            )
+            await self.uow.commit()
+        return added
+
+
+class ProcessPaymentEvents(Interactor[None, int]):
+    """
+    Разбирает пачку уведомлений из payment_events; возвращает число обработанных.
+
+    Пачка берется FOR UPDATE SKIP LOCKED в одной транзакции, каждое событие применяется в своем
+    SAVEPOINT: подписка юзера и статус платежа меняются вместе или не меняются вовсе. Упавшее событие
+    откладывается с экспоненциальной паузой, после max_attempts попыток остается в таблице
+    со status = 'dead'. Платеж блокируется по purchase_id и активируется только из статуса,
+    отличного от succeeded, поэтому ни повтор события, ни параллельный воркер подписку не продлят дважды.
+    После коммита профили юзеров выкидываются из UserCacheService и юзерам уходят уведомления.
+    """
+
+    def __init__(
+            self,
+            event_repository: PaymentEventRepository,
+            payment_repository: PaymentRepository,
+            user_repository: UserRepository,
+            uow: UnitOfWork,
+            user_cache: UserCacheService,
+            bot: Bot,
+            batch_size: int,
+            max_attempts: int,
+            retry_base_delay: float,
+            retry_max_delay: float,
+    ):
+        self.event_repository = event_repository
+        self.payment_repository = payment_repository
+        self.user_repository = user_repository
+        self.uow = uow
+        self.user_cache = user_cache
+        self.bot = bot
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1)))
+
+    async def __call__(self) -> int:
+        activated: list[PaymentSchema] = []
+
+        async with self.uow:
+            events = await self.event_repository.lock_due(self.batch_size)
+            if not events:
+                return 0
+
+            for event in events:
+                try:
+                    async with self.uow.savepoint():
+                        payment = await self._apply(event)
+                except Exception as e:
+                    await self._postpone(event, e)
+                    continue
+
+                await self.event_repository.mark_done(event.id)
+                if payment is not None:
+                    activated.append(payment)
+
+            await self.uow.commit()
+
+        for payment in activated:
+            await self.user_cache.invalidate(payment.telegram_id)
+            await self._notify(payment)
+        return len(events)
+
+    async def _apply(self, event: PaymentEventSchema) -> PaymentSchema | None:
+        """Активирует подписку по событию; None — событие не требует действий"""
+        status = event.payload.get('object', {}).get('status')
+        if status != SUCCEEDED:
+            logger.info(f"Payment {event.purchase_id} not succeeded: {status}")
+            return None
+
+        payment = await self.payment_repository.lock_by_purchase_id(event.purchase_id)
+        if payment is None:
+            # платеж мог еще не закоммититься в PaymentService — повторим позже
+            raise PaymentNotFoundException(f"PaymentLog not found for {event.purchase_id}")
+
+        if payment.status == SUCCEEDED:
+            logger.info(f"Payment {event.purchase_id} already succeeded")
+            return None
+
+        now = datetime.now(timezone.utc)
+        activated = await self.user_repository.activate_subscription(
+            telegram_id=payment.telegram_id,
+            subscription=payment.subscription,
+            start=now,
+            date_end=now + relativedelta(months=payment.month_sub)
+        )
+        if not activated:
+            logger.error(f"User {payment.telegram_id} not found for payment {event.purchase_id}")
+
+        await self.payment_repository.update_payment(event.purchase_id, status=SUCCEEDED)
+        payment.status = SUCCEEDED
+        return payment
+
+    async def _postpone(self, event: PaymentEventSchema, error: Exception):
+        attempts = event.attempts + 1
+        dead = attempts >= self.max_attempts
+        await self.event_repository.mark_failed(
+            event_id=event.id,
+            attempts=attempts,
+            next_attempt_at=datetime.now(timezone.utc) + self._retry_delay(attempts),
+            error=repr(error),
+            dead=dead
+        )
+        if dead:
+            logger.error(f"Payment event {event.event_key} moved to dead letter after {attempts} attempts: {error!r}")
+        else:
+            logger.warning(f"Payment event {event.event_key} failed (attempt {attempts}/{self.max_attempts}): {error!r}")
+
+    async def _notify(self, payment: PaymentSchema):
+        try:
+            await self.bot.send_message(
+                chat_id=int(payment.telegram_id),
+                text="Ваша подписка успешно оформлена!"
+            )
+            logger.info(f"Payment {payment.purchase_id} succeeded and notification sent to {payment.telegram_id}")
+        except Exception as e:
+            # подписка уже активирована — повторять ради уведомления не нужно
+            logger.error(f"Failed to notify {payment.telegram_id} about payment {payment.purchase_id}: {e}")
@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timezone
 
 from source.application.payment.PaymentServiceInterface import PaymentServiceInterface
@@ -9,6 +10,15 @@ from source.core.enum import SubscriptionType
 
 
 
+def get_idempotence_key(checkout_id: str, amount: int, customer_contact: dict) -> str:
+    """
+    Idempotence-Key для YooKassa из сессии оформления: повтор той же покупки (ретрай, двойное нажатие)
+    получает тот же платеж. Сумма и контакт входят в ключ — YooKassa отклоняет тот же ключ с другим телом
+    """
+    contact = ",".join(f"{name}={value}" for name, value in sorted(customer_contact.items()))
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"trauma-checkout:{checkout_id}:{amount}:{contact}"))
+
+
 class PaymentService(PaymentServiceInterface):
 
     def __init__(self, yookassa_client: YooKassaClient, repository: PaymentRepository, uow: UnitOfWork):
@@ -22,12 +32,21 @@ class PaymentService(PaymentServiceInterface):
                                   telegram_id: str,
                                     username: str,
                                     customer_contact: dict,
-                                    subscription: SubscriptionType) -> PaymentSchema:
+                                    subscription: SubscriptionType,
+                                    checkout_id: str) -> PaymentSchema:
         
-        payment_url, purchase_id = await self.yokassa_client.create_payment(amount=amount,
-                                                            description=description, customer_contact=customer_contact)
+        payment_url, purchase_id = await self.yokassa_client.create_payment(
+            amount=amount,
+            description=description,
+            customer_contact=customer_contact,
+            idempotence_key=get_idempotence_key(checkout_id, amount, customer_contact)
+        )
       
         async with self.uow:
+            existing: PaymentSchema | None = await self.repository.get_by_purchase_id(purchase_id)
+            if existing is not None:
+                # повтор той же покупки: YooKassa вернула уже созданный платеж
+                return existing
             payment: PaymentSchema = await self.repository.create(
                 PaymentSchema(
                     purchase_id=purchase_id,
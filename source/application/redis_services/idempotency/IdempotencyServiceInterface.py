@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+
+class IdempotencyServiceInterface(ABC):
+    @abstractmethod
+    async def claim(self, scope: str, key: str, takeover: bool = False) -> bool:
+        """
+        Отмечает событие как взятое в обработку. False — его уже обрабатывают или обработали.
+        takeover — прежняя обработка заведомо прервалась: False только для уже обработанного события
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete(self, scope: str, key: str):
+        """Событие обработано: повторы отбрасываются еще done_ttl секунд"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, scope: str, key: str):
+        """Обработка не удалась — повторная доставка события обработает его заново"""
+        raise NotImplementedError
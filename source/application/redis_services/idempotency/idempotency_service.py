@@ -0,0 +1,63 @@
+import logging
+
+from redis.asyncio import Redis
+
+from source.application.redis_services.idempotency.IdempotencyServiceInterface import IdempotencyServiceInterface
+
+logger = logging.getLogger(__name__)
+
+PROCESSING = "processing"
+DONE = "done"
+
+
+class IdempotencyService(IdempotencyServiceInterface):
+    """
+    Дедупликация повторно доставленных событий (апдейты Telegram, вебхуки YooKassa) через SET NX.
+
+    claim ставит ключ idempotency:{scope}:{key} со сроком processing_ttl — пока он жив, повтор
+    события отбрасывается, даже если первая обработка еще идет. После complete ключ живет done_ttl.
+    Если процесс упал посреди обработки, ключ истечет через processing_ttl, и событие можно будет
+    обработать снова; release снимает его сразу. Тот, кто точно знает, что прежняя обработка
+    прервалась (воркер очереди перечитывает свои неподтвержденные апдейты), забирает событие
+    через claim(..., takeover=True) не дожидаясь processing_ttl.
+
+    Без Redis claim пропускает событие: лучше изредка обработать повтор, чем потерять событие.
+    """
+
+    def __init__(self, redis_client: Redis, processing_ttl: int, done_ttl: int, prefix: str = "idempotency"):
+        self._redis = redis_client
+        self.processing_ttl = processing_ttl
+        self.done_ttl = done_ttl
+        self._prefix = prefix
+
+    def _get_key(self, scope: str, key: str) -> str:
+        return f"{self._prefix}:{scope}:{key}"
+
+    async def claim(self, scope: str, key: str, takeover: bool = False) -> bool:
+        try:
+            redis_key = self._get_key(scope, key)
+            if await self._redis.set(redis_key, PROCESSING, ex=self.processing_ttl, nx=True):
+                return True
+            if not takeover:
+                return False
+            # обработка прервалась вместе с процессом, а ключ еще не истек — забираем событие себе
+            current = await self._redis.get(redis_key)
+            if current is not None and (current.decode() if isinstance(current, bytes) else current) == DONE:
+                return False
+            await self._redis.set(redis_key, PROCESSING, ex=self.processing_ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Error claiming {scope} {key}, processing without deduplication: {e}")
+            return True
+
+    async def complete(self, scope: str, key: str):
+        try:
+            await self._redis.set(self._get_key(scope, key), DONE, ex=self.done_ttl)
+        except Exception as e:
+            logger.error(f"Error completing {scope} {key}: {e}")
+
+    async def release(self, scope: str, key: str):
+        try:
+            await self._redis.delete(self._get_key(scope, key))
+        except Exception as e:
+            logger.error(f"Error releasing {scope} {key}: {e}")
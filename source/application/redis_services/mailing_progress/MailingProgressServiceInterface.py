@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+
+from source.core.enum import MailingDeliveryStatus
+from source.core.schemas.mailing_schema import MailingReportSchema
+
+
+class MailingProgressServiceInterface(ABC):
+    @abstractmethod
+    async def create(self, mailing_id: UUID, text: str, admin_telegram_id: str | None = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_text(self, mailing_id: UUID) -> str | None:
+        """Текст рассылки; None — рассылки нет или ее прогресс истек"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_cursor(self, mailing_id: UUID) -> str | None:
+        """telegram_id, на котором остановилась выгрузка аудитории"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_chunk(self, mailing_id: UUID, cursor: str, published: int):
+        """Пачка заданий опубликована: сдвигает курсор и счетчик published"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def mark_loaded(self, mailing_id: UUID) -> bool:
+        """Аудитория выгружена целиком. True — все задания уже обработаны и рассылка завершилась"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_recorded(self, mailing_id: UUID, telegram_id: str) -> bool:
+        """Итог доставки этому юзеру уже записан"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def record(self, mailing_id: UUID, telegram_id: str, status: MailingDeliveryStatus) -> bool:
+        """Записывает итог доставки. True — это было последнее задание и рассылка завершилась"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_report(self, mailing_id: UUID) -> MailingReportSchema | None:
+        raise NotImplementedError
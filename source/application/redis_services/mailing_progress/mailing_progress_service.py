@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from source.application.redis_services.mailing_progress.MailingProgressServiceInterface import \
+    MailingProgressServiceInterface
+from source.core.enum import MailingDeliveryStatus
+from source.core.schemas.mailing_schema import MailingReportSchema
+
+logger = logging.getLogger(__name__)
+
+LOADED = "loaded"
+
+# KEYS[1] — хэш рассылки, KEYS[2] — множество юзеров с записанным итогом
+# ARGV[1] — поле-счетчик или 'loaded', ARGV[2] — telegram_id, ARGV[3] — текущее время, ARGV[4] — TTL
+# возвращает 1, если этим вызовом рассылка завершилась, 0 — если нет, -1 — рассылки нет
+# счетчик и проверка завершения одной операцией: последнее задание замечает ровно один отправитель
+RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+if ARGV[1] == 'loaded' then
+    redis.call('HSET', KEYS[1], 'loaded', 1)
+else
+    if redis.call('SADD', KEYS[2], ARGV[2]) == 0 then
+        return 0
+    end
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+    redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+end
+local fields = redis.call('HMGET', KEYS[1], 'loaded', 'published', 'sent', 'blocked', 'failed')
+if fields[1] ~= '1' then
+    return 0
+end
+local processed = (tonumber(fields[3]) or 0) + (tonumber(fields[4]) or 0) + (tonumber(fields[5]) or 0)
+if processed < (tonumber(fields[2]) or 0) then
+    return 0
+end
+return redis.call('HSETNX', KEYS[1], 'finished_at', ARGV[3])
+"""
+
+
+def _decode(value) -> str | None:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class MailingProgressService(MailingProgressServiceInterface):
+    """
+    Прогресс рассылки в хэше mailing:{id}: текст, курсор выгрузки аудитории и счетчики итогов.
+
+    Курсор и published сдвигаются одним MULTI после публикации пачки заданий, поэтому после падения
+    выгрузка продолжается с последней сохраненной пачки. Итог каждого юзера учитывается один раз
+    (множество mailing:{id}:recorded), так что повторная доставка задания не портит счетчики.
+    Рассылка завершена, когда аудитория выгружена целиком и итогов столько же, сколько заданий.
+
+    Ошибки Redis не глотаются: задание рассылки при ошибке должно вернуться в NATS на повтор.
+    """
+
+    def __init__(self, redis_client: Redis, progress_ttl: int, prefix: str = "mailing"):
+        self._redis = redis_client
+        self.progress_ttl = progress_ttl
+        self._prefix = prefix
+        self._record = self._redis.register_script(RECORD_SCRIPT)
+
+    def _get_key(self, mailing_id: UUID) -> str:
+        return f"{self._prefix}:{mailing_id}"
+
+    def _get_recorded_key(self, mailing_id: UUID) -> str:
+        return f"{self._get_key(mailing_id)}:recorded"
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    async def create(self, mailing_id: UUID, text: str, admin_telegram_id: str | None = None):
+        key = self._get_key(mailing_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={
+            "text": text,
+            "admin_telegram_id": admin_telegram_id or "",
+            "started_at": self._now(),
+            "cursor": "",
+            "published": 0,
+            "sent": 0,
+            "blocked": 0,
+            "failed": 0,
+            LOADED: 0,
+        })
+        pipe.expire(key, self.progress_ttl)
+        await pipe.execute()
+
+    async def get_text(self, mailing_id: UUID) -> str | None:
+        return _decode(await self._redis.hget(self._get_key(mailing_id), "text"))
+
+    async def get_cursor(self, mailing_id: UUID) -> str | None:
+        return _decode(await self._redis.hget(self._get_key(mailing_id), "cursor")) or None
+
+    async def save_chunk(self, mailing_id: UUID, cursor: str, published: int):
+        key = self._get_key(mailing_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, "cursor", cursor)
+        pipe.hincrby(key, "published", published)
+        await pipe.execute()
+
+    async def _run_record(self, mailing_id: UUID, field: str, telegram_id: str = "") -> bool:
+        result = await self._record(
+            keys=[self._get_key(mailing_id), self._get_recorded_key(mailing_id)],
+            args=[field, telegram_id, self._now(), self.progress_ttl]
+        )
+        if result == -1:
+            logger.warning(f"Progress of mailing {mailing_id} not found, {field} is not recorded")
+        return result == 1
+
+    async def mark_loaded(self, mailing_id: UUID) -> bool:
+        return await self._run_record(mailing_id, LOADED)
+
+    async def is_recorded(self, mailing_id: UUID, telegram_id: str) -> bool:
+        return bool(await self._redis.sismember(self._get_recorded_key(mailing_id), telegram_id))
+
+    async def record(self, mailing_id: UUID, telegram_id: str, status: MailingDeliveryStatus) -> bool:
+        return await self._run_record(mailing_id, status.value, telegram_id)
+
+    async def get_report(self, mailing_id: UUID) -> MailingReportSchema | None:
+        raw = await self._redis.hgetall(self._get_key(mailing_id))
+        if not raw:
+            return None
+        fields = {_decode(name): _decode(value) for name, value in raw.items()}
+        return MailingReportSchema(
+            mailing_id=mailing_id,
+            admin_telegram_id=fields.get("admin_telegram_id") or None,
+            published=int(fields.get("published") or 0),
+            sent=int(fields.get("sent") or 0),
+            blocked=int(fields.get("blocked") or 0),
+            failed=int(fields.get("failed") or 0),
+            loaded=fields.get(LOADED) == "1",
+            started_at=fields["started_at"],
+            finished_at=fields.get("finished_at") or None,
+        )
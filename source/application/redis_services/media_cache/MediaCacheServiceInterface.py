@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+
+class MediaCacheServiceInterface(ABC):
+    @abstractmethod
+    async def get_file_id(self, bot_id: int, content_hash: str) -> str | None:
+        """file_id, под которым Telegram уже хранит файл с таким содержимым"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_file_id(self, bot_id: int, content_hash: str, file_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def forget_file_id(self, bot_id: int, content_hash: str):
+        """Telegram отклонил file_id — при следующей отправке файл загрузится заново"""
+        raise NotImplementedError
@@ -0,0 +1,43 @@
+import logging
+
+from redis.asyncio import Redis
+
+from source.application.redis_services.media_cache.MediaCacheServiceInterface import MediaCacheServiceInterface
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCacheService(MediaCacheServiceInterface):
+    """
+    file_id загруженных в Telegram файлов по sha256 содержимого.
+
+    file_id привязан к боту, поэтому в ключе есть bot_id. Ключи без TTL: файл в source/materials
+    меняется только вместе с хэшем, а устаревший file_id убирается forget_file_id.
+    """
+
+    def __init__(self, redis_client: Redis, prefix: str = "media_file_id"):
+        self._redis = redis_client
+        self._prefix = prefix
+
+    def _get_key(self, bot_id: int, content_hash: str) -> str:
+        return f"{self._prefix}:{bot_id}:{content_hash}"
+
+    async def get_file_id(self, bot_id: int, content_hash: str) -> str | None:
+        try:
+            file_id = await self._redis.get(self._get_key(bot_id, content_hash))
+            return file_id.decode() if isinstance(file_id, bytes) else file_id
+        except Exception as e:
+            logger.error(f"Error retrieving file_id for {content_hash}: {e}")
+            return None
+
+    async def save_file_id(self, bot_id: int, content_hash: str, file_id: str):
+        try:
+            await self._redis.set(self._get_key(bot_id, content_hash), file_id)
+        except Exception as e:
+            logger.error(f"Error saving file_id for {content_hash}: {e}")
+
+    async def forget_file_id(self, bot_id: int, content_hash: str):
+        try:
+            await self._redis.delete(self._get_key(bot_id, content_hash))
+        except Exception as e:
+            logger.error(f"Error deleting file_id for {content_hash}: {e}")
@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+
+
+class MessageCoalescerServiceInterface(ABC):
+    @abstractmethod
+    async def push(self, user_telegram_id: str, context_scope: str, text: str, message_id: int) -> int:
+        """
+        Добавляет сообщение юзера в буфер скопа и возвращает новое поколение буфера.
+        Каждое новое сообщение вытесняет (supersede) ответы, запущенные по предыдущим поколениям.
+        Сообщение с уже буферизованным message_id повторно не добавляется
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_current(self, user_telegram_id: str, context_scope: str, generation: int) -> bool:
+        """Проверяет, что после generation не пришло новых сообщений"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_pending(self, user_telegram_id: str, context_scope: str) -> list[str]:
+        """Возвращает сообщения, на которые еще нет ответа"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ack(self, user_telegram_id: str, context_scope: str, count: int):
+        """Убирает из буфера первые count сообщений (на них ответили)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self, user_telegram_id: str, context_scope: str):
+        """Очищает буфер и отменяет ожидающие ответы"""
+        raise NotImplementedError
@@ -0,0 +1,87 @@
+import logging
+
+from redis.asyncio import Redis
+
+from source.application.redis_services.message_coalescer.MessageCoalescerServiceInterface import \
+    MessageCoalescerServiceInterface
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] — буфер, KEYS[2] — поколение, KEYS[3] — message_id уже буферизованных сообщений
+# ARGV[1] — текст, ARGV[2] — TTL, ARGV[3] — message_id.
+# Повторно доставленное сообщение в буфер не добавляется, но поколение растет: ответить должна
+# задача, запущенная последней
+PUSH_SCRIPT = """
+if redis.call('SADD', KEYS[3], ARGV[3]) == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+local generation = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return generation
+"""
+
+
+class MessageCoalescerService(MessageCoalescerServiceInterface):
+    """
+    Буфер сообщений юзера, на которые ассистент еще не ответил.
+
+    Сообщения, пришедшие подряд в пределах window_seconds, уходят в ассистента одним запросом.
+    Состояние лежит в Redis, поэтому работает и при нескольких воркерах:
+    — список message_buffer:{scope}:{user} — тексты без ответа;
+    — счетчик message_buffer:{scope}:{user}:generation — растет с каждым сообщением,
+      ответ отправляется только если за время ожидания/генерации счетчик не изменился;
+    — множество message_buffer:{scope}:{user}:ids — message_id буферизованных сообщений,
+      чтобы апдейт, повторно доставленный после падения воркера, не задвоил текст.
+    """
+
+    def __init__(self, redis_client: Redis, window_seconds: float, buffer_ttl: int = 3600):
+        self._redis = redis_client
+        self._prefix = "message_buffer"
+        self.window_seconds = window_seconds
+        self.buffer_ttl = buffer_ttl
+
+        self._push_script = redis_client.register_script(PUSH_SCRIPT)
+
+    def _get_buffer_key(self, user_telegram_id: str, context_scope: str) -> str:
+        return f"{self._prefix}:{context_scope}:{user_telegram_id}"
+
+    def _get_generation_key(self, user_telegram_id: str, context_scope: str) -> str:
+        return f"{self._get_buffer_key(user_telegram_id, context_scope)}:generation"
+
+    def _get_ids_key(self, user_telegram_id: str, context_scope: str) -> str:
+        return f"{self._get_buffer_key(user_telegram_id, context_scope)}:ids"
+
+    async def push(self, user_telegram_id: str, context_scope: str, text: str, message_id: int) -> int:
+        generation = int(await self._push_script(
+            keys=[
+                self._get_buffer_key(user_telegram_id, context_scope),
+                self._get_generation_key(user_telegram_id, context_scope),
+                self._get_ids_key(user_telegram_id, context_scope),
+            ],
+            args=[text, self.buffer_ttl, message_id],
+        ))
+
+        logger.debug(f"Buffered message for user {user_telegram_id} in scope {context_scope}, generation {generation}")
+        return generation
+
+    async def is_current(self, user_telegram_id: str, context_scope: str, generation: int) -> bool:
+        current = await self._redis.get(self._get_generation_key(user_telegram_id, context_scope))
+        return current is not None and int(current) == generation
+
+    async def get_pending(self, user_telegram_id: str, context_scope: str) -> list[str]:
+        pending = await self._redis.lrange(self._get_buffer_key(user_telegram_id, context_scope), 0, -1)
+        return [text.decode() if isinstance(text, bytes) else text for text in pending]
+
+    async def ack(self, user_telegram_id: str, context_scope: str, count: int):
+        # сообщения, пришедшие после чтения буфера, остаются в хвосте списка
+        await self._redis.ltrim(self._get_buffer_key(user_telegram_id, context_scope), count, -1)
+
+    async def clear(self, user_telegram_id: str, context_scope: str):
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(self._get_buffer_key(user_telegram_id, context_scope))
+        pipe.delete(self._get_ids_key(user_telegram_id, context_scope))
+        pipe.incr(self._get_generation_key(user_telegram_id, context_scope))
+        await pipe.execute()
+        logger.info(f"Cleared message buffer for user {user_telegram_id} in scope {context_scope}")
@@ -12,6 +12,35 @@ class MessageHistoryServiceInterface(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def append_pair(
+            self,
+            user_id: int,
+            context_scope: str,
+            user_message: ContextMessage,
+            assistant_message: ContextMessage
+    ):
+        """Добавляет реплику юзера и ответ ассистента за один запрос к Redis (MULTI) с продлением TTL"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def append_and_fetch(
+            self,
+            user_id: int,
+            context_scope: str,
+            message: ContextMessage
+    ) -> tuple[list[ContextMessage], str | None]:
+        """
+        Добавляет сообщение и возвращает историю и краткое содержание за один запрос к Redis (MULTI)
+        с продлением TTL
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_history_and_summary(self, user_id: int, context_scope: str) -> tuple[list[ContextMessage], str | None]:
+        """История и краткое содержание за один запрос к Redis"""
+        raise NotImplementedError
+
     @abstractmethod
     async def get_history(self, user_id: int, context_scope: str) -> list[ContextMessage]:
         """
@@ -24,3 +53,22 @@ class MessageHistoryServiceInterface(ABC):
     async def clear_history(self, user_id: int, context_scope: str):
         """Очищает историю юзера по айди и его скопу"""
         raise NotImplementedError
+
+    @abstractmethod
+    async def get_summary(self, user_id: int, context_scope: str) -> str | None:
+        """Краткое содержание старой части диалога, уже убранной из истории"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def replace_oldest_with_summary(self, user_id: int, context_scope: str, summary: str, count: int):
+        """Сохраняет новое краткое содержание и убирает из истории count самых старых сообщений"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acquire_summary_lock(self, user_id: int, context_scope: str, ttl: int) -> bool:
+        """Лок на пересчет краткого содержания (один пересчет на юзера и скоп на все воркеры)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_summary_lock(self, user_id: int, context_scope: str):
+        raise NotImplementedError
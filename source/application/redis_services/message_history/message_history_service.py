@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import List
 
@@ -7,42 +6,132 @@ from redis.asyncio import Redis
 from source.application.redis_services.message_history.MessageHistoryServiceInterface import \
     MessageHistoryServiceInterface
 from source.core.schemas.assistant_schemas import ContextMessage
+from source.infrastructure.serialization import RedisSerializer
 
 logger = logging.getLogger(__name__)
 
+# короткие ключи и коды ролей в Redis: {"r": "u", "m": "..."} вместо {"role": "user", "message": "..."}
+ROLE_CODES = {"user": "u", "assistant": "a", "system": "s"}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
 
 class MessageHistoryService(MessageHistoryServiceInterface):
-    def __init__(self, redis_client: Redis, history_max_len: int):
+    def __init__(self, redis_client: Redis, serializer: RedisSerializer, history_max_len: int, history_ttl: int):
         self._redis = redis_client
+        self._serializer = serializer
         self._prefix = "message_history"
         self.HISTORY_MAX_LEN = history_max_len
+        self.HISTORY_TTL = history_ttl
 
     def _get_user_key(self, user_telegram_id: str, context_scope: str) -> str:
         return f"{self._prefix}:{context_scope}:{user_telegram_id}"
 
+    def _get_summary_key(self, user_telegram_id: str, context_scope: str) -> str:
+        return f"{self._get_user_key(user_telegram_id, context_scope)}:summary"
+
+    def _get_summary_lock_key(self, user_telegram_id: str, context_scope: str) -> str:
+        return f"{self._get_user_key(user_telegram_id, context_scope)}:summary_lock"
+
+    def _encode_message(self, message: ContextMessage) -> str | bytes:
+        return self._serializer.dumps({"r": ROLE_CODES.get(message.role, message.role), "m": message.message})
+
+    def _decode_message(self, raw: str | bytes) -> ContextMessage:
+        data = self._serializer.loads(raw)
+        if "m" in data:
+            return ContextMessage(role=ROLE_NAMES.get(data["r"], data["r"]), message=data["m"])
+        # записи старого формата (model_dump_json) читаются как есть и вытесняются новыми по LTRIM/TTL
+        return ContextMessage.model_validate(data)
+
+    def _decode_history(self, history_raw: list) -> List[ContextMessage]:
+        """LRANGE отдает от новых к старым, наружу история идет от старых к новым"""
+        return [self._decode_message(raw) for raw in reversed(history_raw)]
+
+    def _queue_append(self, pipe, user_telegram_id: str, context_scope: str, *messages: ContextMessage):
+        """LPUSH + LTRIM + продление TTL истории и краткого содержания — в общий MULTI"""
+        key = self._get_user_key(user_telegram_id, context_scope)
+        pipe.lpush(key, *(self._encode_message(message) for message in messages))
+        pipe.ltrim(key, 0, self.HISTORY_MAX_LEN - 1)
+        pipe.expire(key, self.HISTORY_TTL)
+        pipe.expire(self._get_summary_key(user_telegram_id, context_scope), self.HISTORY_TTL)
+
+    def _queue_fetch(self, pipe, user_telegram_id: str, context_scope: str):
+        pipe.lrange(self._get_user_key(user_telegram_id, context_scope), 0, -1)
+        pipe.get(self._get_summary_key(user_telegram_id, context_scope))
+
+    def _parse_fetch(self, history_raw: list, summary) -> tuple[List[ContextMessage], str | None]:
+        return self._decode_history(history_raw), summary.decode() if isinstance(summary, bytes) else summary
+
     async def add_message_to_history(self, user_telegram_id: str, context_scope: str, message: ContextMessage):
         """
         Добавляет сообщение пользователя в историю для специально "скопа" (e.g, 'cbt', 'venting')
         и сохраняет историю до n сообщения
         """
-        key = self._get_user_key(user_telegram_id, context_scope)
         try:
-            message_json = message.model_dump_json()
-            await self._redis.lpush(key, message_json)
-            await self._redis.ltrim(key, 0, self.HISTORY_MAX_LEN - 1)
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_append(pipe, user_telegram_id, context_scope, message)
+            await pipe.execute()
             logger.debug(f"Saved message to history for user {user_telegram_id} in scope {context_scope}")
         except Exception as e:
             logger.error(f"Error saving message to history for user {user_telegram_id} in scope {context_scope}: {e}")
 
+    async def append_pair(
+            self,
+            user_telegram_id: str,
+            context_scope: str,
+            user_message: ContextMessage,
+            assistant_message: ContextMessage
+    ):
+        """Добавляет реплику юзера и ответ ассистента одним запросом"""
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_append(pipe, user_telegram_id, context_scope, user_message, assistant_message)
+            await pipe.execute()
+            logger.debug(f"Saved message pair to history for user {user_telegram_id} in scope {context_scope}")
+        except Exception as e:
+            logger.error(f"Error saving message pair for user {user_telegram_id} in scope {context_scope}: {e}")
+
+    async def append_and_fetch(
+            self,
+            user_telegram_id: str,
+            context_scope: str,
+            message: ContextMessage
+    ) -> tuple[List[ContextMessage], str | None]:
+        """
+        Добавляет сообщение и сразу возвращает историю (от старых к новым) и краткое содержание —
+        один MULTI вместо отдельных add_message_to_history и get_history
+        """
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_append(pipe, user_telegram_id, context_scope, message)
+            self._queue_fetch(pipe, user_telegram_id, context_scope)
+            *_, history_raw, summary = await pipe.execute()
+            return self._parse_fetch(history_raw, summary)
+        except Exception as e:
+            logger.error(f"Error appending to history for user {user_telegram_id} in scope {context_scope}: {e}")
+            return [], None
+
+    async def get_history_and_summary(
+            self,
+            user_telegram_id: str,
+            context_scope: str
+    ) -> tuple[List[ContextMessage], str | None]:
+        """История (от старых к новым) и краткое содержание за один запрос"""
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_fetch(pipe, user_telegram_id, context_scope)
+            history_raw, summary = await pipe.execute()
+            return self._parse_fetch(history_raw, summary)
+        except Exception as e:
+            logger.error(f"Error retrieving history for user {user_telegram_id} in scope {context_scope}: {e}")
+            return [], None
+
     async def get_history(self, user_telegram_id: str, context_scope: str) -> List[ContextMessage]:
         """
         Получает историю по сообщении по юзеру и его скопу
         """
         key = self._get_user_key(user_telegram_id, context_scope)
         try:
-            history_json = await self._redis.lrange(key, 0, -1)
-            history = [ContextMessage.model_validate(json.loads(msg)) for msg in history_json]
-            history.reverse()
+            history = self._decode_history(await self._redis.lrange(key, 0, -1))
             logger.debug(f"Retrieved {len(history)} messages from history for user {user_telegram_id} in scope {context_scope}")
             return history
         except Exception as e:
@@ -53,7 +142,44 @@ class MessageHistoryService(MessageHistoryServiceInterface):
         """Очищает историю юзера по telegram айди пользователя и его скопу"""
         key = self._get_user_key(user_telegram_id, context_scope)
         try:
-            await self._redis.delete(key)
+            await self._redis.delete(key, self._get_summary_key(user_telegram_id, context_scope))
             logger.info(f"Cleared history for user {user_telegram_id} in scope {context_scope}")
         except Exception as e:
             logger.error(f"Error clearing history for user {user_telegram_id} in scope {context_scope}: {e}")
+
+    async def get_summary(self, user_telegram_id: str, context_scope: str) -> str | None:
+        """Краткое содержание старой части диалога, уже убранной из истории"""
+        try:
+            summary = await self._redis.get(self._get_summary_key(user_telegram_id, context_scope))
+            return summary.decode() if isinstance(summary, bytes) else summary
+        except Exception as e:
+            logger.error(f"Error retrieving summary for user {user_telegram_id} in scope {context_scope}: {e}")
+            return None
+
+    async def replace_oldest_with_summary(self, user_telegram_id: str, context_scope: str, summary: str, count: int):
+        """Сохраняет новое краткое содержание и убирает из истории count самых старых сообщений"""
+        key = self._get_user_key(user_telegram_id, context_scope)
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.set(self._get_summary_key(user_telegram_id, context_scope), summary, ex=self.HISTORY_TTL)
+            # новые сообщения добавляются в голову списка, самые старые лежат в хвосте
+            pipe.ltrim(key, 0, -(count + 1))
+            await pipe.execute()
+            logger.debug(f"Folded {count} messages into summary for user {user_telegram_id} in scope {context_scope}")
+        except Exception as e:
+            logger.error(f"Error saving summary for user {user_telegram_id} in scope {context_scope}: {e}")
+
+    async def acquire_summary_lock(self, user_telegram_id: str, context_scope: str, ttl: int) -> bool:
+        try:
+            return bool(await self._redis.set(
+                self._get_summary_lock_key(user_telegram_id, context_scope), 1, ex=ttl, nx=True
+            ))
+        except Exception as e:
+            logger.error(f"Error acquiring summary lock for user {user_telegram_id} in scope {context_scope}: {e}")
+            return False
+
+    async def release_summary_lock(self, user_telegram_id: str, context_scope: str):
+        try:
+            await self._redis.delete(self._get_summary_lock_key(user_telegram_id, context_scope))
+        except Exception as e:
+            logger.error(f"Error releasing summary lock for user {user_telegram_id} in scope {context_scope}: {e}")
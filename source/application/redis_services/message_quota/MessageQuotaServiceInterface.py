@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+
+from source.core.schemas.user_schema import UserSchema
+
+
+class MessageQuotaServiceInterface(ABC):
+    @abstractmethod
+    async def try_consume(self, user: UserSchema) -> bool:
+        """Засчитывает одно сообщение, если лимит по тарифу юзера не исчерпан; False — лимит исчерпан"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def refund(self, user: UserSchema, count: int = 1):
+        """Возвращает сообщения, засчитанные try_consume, если ответить на них не удалось"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def pop_changed_counters(self) -> dict[tuple[str, str], int]:
+        """
+        Забирает счетчики, изменившиеся с прошлой синхронизации: (telegram_id, колонка) -> значение.
+        Для last_daily_reset значение — unix-время начала окна FREE
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def restore_changed_counters(self, counters: dict[tuple[str, str], int]):
+        """Возвращает счетчики в очередь синхронизации, если запись в БД не удалась"""
+        raise NotImplementedError
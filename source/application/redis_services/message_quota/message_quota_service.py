@@ -0,0 +1,187 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from dateutil.relativedelta import relativedelta
+from redis.asyncio import Redis
+
+from source.application.redis_services.message_quota.MessageQuotaServiceInterface import \
+    MessageQuotaServiceInterface
+from source.core.enum import SubscriptionType
+from source.core.schemas.user_schema import UserSchema
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] — счетчик, KEYS[2] — хэш счетчиков, ожидающих синхронизации с Postgres
+# ARGV[1] — TTL окна, ARGV[2] — значение из Postgres, если счетчика в Redis еще нет,
+# ARGV[3] — поле в хэше синхронизации, ARGV[4] — лимит,
+# ARGV[5] — полная длина окна (0 — окно не скользящее), ARGV[6] — поле начала окна в хэше синхронизации.
+# Проверка и списание — одна операция: параллельные сообщения не проскочат лимит. -1 — лимит исчерпан.
+# Начало окна (unix-время) считается по оставшемуся TTL и синхронизируется вместе со счетчиком:
+# без него счетчик, заведенный из Postgres посреди окна, начал бы окно заново
+QUOTA_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]))
+if not used then
+    used = tonumber(ARGV[2])
+    redis.call('SET', KEYS[1], used, 'EX', ARGV[1])
+end
+if used >= tonumber(ARGV[4]) then
+    return -1
+end
+used = redis.call('INCR', KEYS[1])
+redis.call('HSET', KEYS[2], ARGV[3], used)
+local window = tonumber(ARGV[5])
+if window > 0 then
+    local now = tonumber(redis.call('TIME')[1])
+    redis.call('HSET', KEYS[2], ARGV[6], now - (window - redis.call('TTL', KEYS[1])))
+end
+return used
+"""
+
+# KEYS — как у QUOTA_SCRIPT, ARGV[1] — поле в хэше синхронизации, ARGV[2] — сколько вернуть.
+# Если окно уже истекло, возвращать некуда
+REFUND_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]))
+if not used then
+    return -1
+end
+used = math.max(used - tonumber(ARGV[2]), 0)
+redis.call('SET', KEYS[1], used, 'KEEPTTL')
+redis.call('HSET', KEYS[2], ARGV[1], used)
+return used
+"""
+
+# забрать и очистить хэш одной операцией, чтобы воркеры не синхронизировали одно и то же дважды
+POP_HASH_SCRIPT = """
+local counters = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return counters
+"""
+
+
+@dataclass(frozen=True)
+class Quota:
+    key: str
+    column: str
+    limit: int
+    ttl: int
+    seed: int
+    # полная длина скользящего окна и колонка его начала в users; 0 — окно до конца подписки
+    window: int = 0
+    window_column: str = ""
+
+
+class MessageQuotaService(MessageQuotaServiceInterface):
+    """
+    Лимиты сообщений на атомарных счетчиках в Redis.
+
+    — FREE: message_quota:{user}:daily, окно в free_window_seconds начинается с первого сообщения
+      и заканчивается вместе с TTL ключа;
+    — DEFAULT: message_quota:{user}:period:{начало подписки}, живет до конца подписки —
+      новая подписка сразу получает новый счетчик;
+    — PRO: без лимита и без счетчика.
+
+    Сообщение списывается до ответа одним скриптом вместе с проверкой лимита (try_consume)
+    и возвращается через refund, если ответить на него не удалось.
+
+    Если счетчика в Redis нет (первый запуск, потеря данных), он заводится из значения в Postgres;
+    для FREE — только если last_daily_reset (начало окна, его пишет синк) попадает в текущее окно.
+    Измененные счетчики копятся в хэше message_quota:changed и пачками пишутся в БД
+    (см. SyncMessageCounters), на сам запрос юзера БД не нужна.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            free_daily_limit: int,
+            standard_monthly_limit: int,
+            free_window_seconds: int,
+    ):
+        self._redis = redis_client
+        self._prefix = "message_quota"
+        self.free_daily_limit = free_daily_limit
+        self.standard_monthly_limit = standard_monthly_limit
+        self.free_window_seconds = free_window_seconds
+
+        self._quota_script = redis_client.register_script(QUOTA_SCRIPT)
+        self._refund_script = redis_client.register_script(REFUND_SCRIPT)
+        self._pop_hash_script = redis_client.register_script(POP_HASH_SCRIPT)
+
+    def _get_changed_key(self) -> str:
+        return f"{self._prefix}:changed"
+
+    def _get_quota(self, user: UserSchema) -> Quota | None:
+        now = datetime.now(timezone.utc)
+
+        if user.subscription == SubscriptionType.FREE:
+            seed, ttl = 0, self.free_window_seconds
+            # окно, начатое до появления счетчика в Redis, досчитываем по данным из БД
+            if user.last_daily_reset is not None:
+                elapsed = int((now - user.last_daily_reset).total_seconds())
+                if 0 <= elapsed < self.free_window_seconds:
+                    seed, ttl = user.daily_messages_used, self.free_window_seconds - elapsed
+            return Quota(
+                key=f"{self._prefix}:{user.telegram_id}:daily",
+                column="daily_messages_used",
+                limit=self.free_daily_limit,
+                ttl=ttl,
+                seed=seed,
+                window=self.free_window_seconds,
+                window_column="last_daily_reset",
+            )
+
+        if user.subscription == SubscriptionType.DEFAULT:
+            if not user.subscription_start or not user.subscription_date_end:
+                return None
+            delta = relativedelta(user.subscription_date_end, user.subscription_start)
+            months = delta.months + (delta.years * 12) + (1 if delta.days > 0 else 0)
+            return Quota(
+                key=f"{self._prefix}:{user.telegram_id}:period:{int(user.subscription_start.timestamp())}",
+                column="messages_used",
+                limit=self.standard_monthly_limit * max(months, 1),
+                ttl=max(int((user.subscription_date_end - now).total_seconds()), 1),
+                seed=user.messages_used,
+            )
+
+        return None  # PRO — безлимит
+
+    def _get_field(self, user: UserSchema, quota: Quota) -> str:
+        return f"{user.telegram_id}:{quota.column}"
+
+    async def try_consume(self, user: UserSchema) -> bool:
+        quota = self._get_quota(user)
+        if quota is None:
+            return True
+        used = int(await self._quota_script(
+            keys=[quota.key, self._get_changed_key()],
+            args=[
+                quota.ttl, quota.seed, self._get_field(user, quota), quota.limit,
+                quota.window, f"{user.telegram_id}:{quota.window_column}",
+            ],
+        ))
+        logger.info(f"Quota for {user.telegram_id}: {user.subscription} {used}/{quota.limit}")
+        return used >= 0
+
+    async def refund(self, user: UserSchema, count: int = 1):
+        quota = self._get_quota(user)
+        if quota is None or count <= 0:
+            return
+        await self._refund_script(
+            keys=[quota.key, self._get_changed_key()],
+            args=[self._get_field(user, quota), count],
+        )
+
+    async def pop_changed_counters(self) -> dict[tuple[str, str], int]:
+        raw = await self._pop_hash_script(keys=[self._get_changed_key()])
+        counters = {}
+        for field, value in zip(raw[::2], raw[1::2]):
+            telegram_id, column = (field.decode() if isinstance(field, bytes) else field).rsplit(":", 1)
+            counters[(telegram_id, column)] = int(value)
+        return counters
+
+    async def restore_changed_counters(self, counters: dict[tuple[str, str], int]):
+        pipe = self._redis.pipeline(transaction=False)
+        for (telegram_id, column), value in counters.items():
+            # более свежее значение, записанное за время синка, не затираем
+            pipe.hsetnx(self._get_changed_key(), f"{telegram_id}:{column}", value)
+        await pipe.execute()
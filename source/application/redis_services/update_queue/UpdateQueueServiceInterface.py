@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QueuedUpdate:
+    partition: int
+    entry_id: str
+    # None — запись удалена из стрима, пока ждала подтверждения
+    payload: bytes | None
+
+
+class UpdateQueueServiceInterface(ABC):
+    @abstractmethod
+    def partition_for(self, ordering_key: int) -> int:
+        """Партиция чата: все апдейты одного ordering_key лежат в одном стриме"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def enqueue(self, ordering_key: int, payload: bytes) -> bool:
+        """Кладет сырой апдейт в стрим партиции. False — партиция переполнена, апдейт не принят"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read(self, consumer: str, cursors: dict[int, str], count: int, block: float) -> list[QueuedUpdate]:
+        """
+        Читает апдейты партиций из cursors: ">" — новые, иначе — неподтвержденные этим consumer'ом
+        после указанного id. block — сколько секунд ждать новых, если их нет
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ack(self, update: QueuedUpdate):
+        """Подтверждает обработку апдейта и удаляет его из стрима"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def backlog(self) -> int:
+        """Апдейты во всех партициях, еще не подтвержденные воркерами (ack удаляет запись из стрима)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acquire_lease(self, worker_index: int, token: str, ttl: int) -> bool:
+        """Захватывает партиции воркера worker_index, чтобы их не читали два процесса сразу"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def renew_lease(self, worker_index: int, token: str, ttl: int) -> bool:
+        """Продлевает захват; False — захват потерян и партиции читает кто-то другой"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_lease(self, worker_index: int, token: str):
+        raise NotImplementedError
@@ -0,0 +1,134 @@
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from source.application.redis_services.update_queue.UpdateQueueServiceInterface import \
+    UpdateQueueServiceInterface, QueuedUpdate
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] — стрим партиции, ARGV[1] — предел длины, ARGV[2] — апдейт
+# проверка длины и XADD одной операцией, чтобы параллельные вебхуки не переполнили партицию
+ENQUEUE_SCRIPT = """
+if redis.call('XLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return false
+end
+return redis.call('XADD', KEYS[1], '*', 'data', ARGV[2])
+"""
+
+# KEYS[1] — ключ захвата, ARGV[1] — токен владельца, ARGV[2] — TTL в миллисекундах
+RENEW_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class UpdateQueueService(UpdateQueueServiceInterface):
+    """
+    Очередь входящих апдейтов Telegram на Redis Streams.
+
+    Вебхук только кладет сырой апдейт в стрим telegram_updates:{partition} и сразу отвечает 200,
+    обрабатывают апдейты воркеры (см. UpdateWorkerPool). Партиция выбирается по чату, поэтому
+    порядок апдейтов одного чата сохраняется, а разные чаты обрабатываются параллельно.
+    Длина каждой партиции ограничена max_backlog: когда воркеры не успевают, вебхук получает False
+    и отвечает Telegram ошибкой — тот придержит апдейты и повторит доставку позже.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            partitions: int,
+            max_backlog: int,
+            prefix: str = "telegram_updates",
+            group: str = "update_workers",
+    ):
+        self._redis = redis_client
+        self.partitions = partitions
+        self.max_backlog = max_backlog
+        self._prefix = prefix
+        self.group = group
+        self._enqueue = self._redis.register_script(ENQUEUE_SCRIPT)
+        self._renew_lease = self._redis.register_script(RENEW_LEASE_SCRIPT)
+        self._release_lease = self._redis.register_script(RELEASE_LEASE_SCRIPT)
+        self._ready_partitions: set[int] = set()
+
+    def _get_stream_key(self, partition: int) -> str:
+        return f"{self._prefix}:{partition}"
+
+    def _get_lease_key(self, worker_index: int) -> str:
+        return f"{self._prefix}:lease:{worker_index}"
+
+    def partition_for(self, ordering_key: int) -> int:
+        return ordering_key % self.partitions
+
+    async def _ensure_groups(self, partitions):
+        for partition in partitions:
+            if partition in self._ready_partitions:
+                continue
+            try:
+                await self._redis.xgroup_create(self._get_stream_key(partition), self.group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            self._ready_partitions.add(partition)
+
+    async def enqueue(self, ordering_key: int, payload: bytes) -> bool:
+        entry_id = await self._enqueue(
+            keys=[self._get_stream_key(self.partition_for(ordering_key))],
+            args=[self.max_backlog, payload],
+        )
+        return entry_id is not None
+
+    async def read(self, consumer: str, cursors: dict[int, str], count: int, block: float) -> list[QueuedUpdate]:
+        await self._ensure_groups(cursors)
+
+        response = await self._redis.xreadgroup(
+            self.group,
+            consumer,
+            streams={self._get_stream_key(partition): cursor for partition, cursor in cursors.items()},
+            count=count,
+            block=int(block * 1000) if block > 0 else None,
+        )
+
+        partitions = {self._get_stream_key(partition): partition for partition in cursors}
+        updates = []
+        for stream_key, entries in response or []:
+            stream_key = stream_key.decode() if isinstance(stream_key, bytes) else stream_key
+            for entry_id, fields in entries:
+                entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                # у записи, удаленной из стрима, пока она висела в pending, полей нет — payload None
+                payload = fields.get(b"data", fields.get("data")) if fields else None
+                updates.append(QueuedUpdate(partition=partitions[stream_key], entry_id=entry_id, payload=payload))
+        return updates
+
+    async def ack(self, update: QueuedUpdate):
+        stream_key = self._get_stream_key(update.partition)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.xack(stream_key, self.group, update.entry_id)
+        pipe.xdel(stream_key, update.entry_id)
+        await pipe.execute()
+
+    async def backlog(self) -> int:
+        pipe = self._redis.pipeline(transaction=False)
+        for partition in range(self.partitions):
+            pipe.xlen(self._get_stream_key(partition))
+        return sum(await pipe.execute())
+
+    async def acquire_lease(self, worker_index: int, token: str, ttl: int) -> bool:
+        return bool(await self._redis.set(self._get_lease_key(worker_index), token, ex=ttl, nx=True))
+
+    async def renew_lease(self, worker_index: int, token: str, ttl: int) -> bool:
+        return bool(await self._renew_lease(keys=[self._get_lease_key(worker_index)], args=[token, ttl * 1000]))
+
+    async def release_lease(self, worker_index: int, token: str):
+        await self._release_lease(keys=[self._get_lease_key(worker_index)], args=[token])
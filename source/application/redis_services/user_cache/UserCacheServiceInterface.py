@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+from source.core.schemas.user_schema import UserSchema
+
+
+class UserCacheServiceInterface(ABC):
+    @abstractmethod
+    async def get(self, telegram_id: str) -> UserSchema | None:
+        """Профиль юзера из кэша; None — промах"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, user: UserSchema):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate(self, telegram_id: str):
+        """Вызывается после коммита любой записи в users: следующее чтение пойдет в Postgres"""
+        raise NotImplementedError
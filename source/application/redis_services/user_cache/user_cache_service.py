@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+
+from source.application.redis_services.user_cache.UserCacheServiceInterface import UserCacheServiceInterface
+from source.core.schemas.user_schema import UserSchema
+from source.infrastructure.metrics.metrics import user_cache_lookups_total
+from source.infrastructure.serialization import RedisSerializer
+
+logger = logging.getLogger(__name__)
+
+# связи (логи, настроения, характеристики) в кэш не попадают — их грузят отдельными запросами
+CACHED_FIELDS = frozenset(UserSchema.model_fields) - {"logging_requests", "user_moods", "user_characteristics"}
+
+# пауза перед переподпиской на канал инвалидаций, если Redis недоступен
+RESUBSCRIBE_DELAY = 1.0
+
+
+class UserCacheService(UserCacheServiceInterface):
+    """
+    Read-through кэш профиля юзера (подписка, счетчики, user_type, id) в два уровня:
+    LRU в памяти процесса на local_ttl секунд и Redis на ttl секунд.
+
+    invalidate удаляет ключ в Redis и публикует telegram_id в канал user_cache:invalidate —
+    каждый процесс, подписанный через start(), выкидывает юзера из своего LRU. Пока подписки нет
+    (не запущена или Redis отвалился), локальный уровень не используется: без инвалидаций он мог бы
+    отдать устаревшую подписку. Гонку чтения из БД до коммита с записью в кэш после инвалидации
+    ограничивает ttl.
+
+    Счетчики сообщений в кэше — только затравка для MessageQuotaService: живые значения в Redis,
+    в Postgres их пачками пишет SyncMessageCounters, кэш при этом не сбрасывается.
+    Каждый get отдает новый объект — вызывающий код может его менять.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            serializer: RedisSerializer,
+            ttl: int,
+            local_ttl: float,
+            local_max_size: int,
+    ):
+        self._redis = redis_client
+        self._serializer = serializer
+        self._prefix = "user_cache"
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_max_size = local_max_size
+
+        # telegram_id -> (monotonic-время истечения, поля профиля в JSON-виде, как в Redis)
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._subscribed = False
+        self._listener: asyncio.Task | None = None
+
+    def _get_key(self, telegram_id: str) -> str:
+        return f"{self._prefix}:{telegram_id}"
+
+    def _get_channel(self) -> str:
+        return f"{self._prefix}:invalidate"
+
+    def _get_local(self, telegram_id: str) -> dict | None:
+        if not self._subscribed:
+            return None
+        entry = self._local.get(telegram_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if time.monotonic() >= expires_at:
+            del self._local[telegram_id]
+            return None
+        self._local.move_to_end(telegram_id)
+        return data
+
+    def _set_local(self, telegram_id: str, data: dict):
+        if not self._subscribed:
+            return
+        self._local[telegram_id] = (time.monotonic() + self.local_ttl, data)
+        self._local.move_to_end(telegram_id)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, telegram_id: str) -> UserSchema | None:
+        data = self._get_local(telegram_id)
+        if data is not None:
+            user_cache_lookups_total.inc("local")
+            return UserSchema.model_validate(data)
+
+        try:
+            raw = await self._redis.get(self._get_key(telegram_id))
+        except Exception as e:
+            logger.error(f"Error retrieving cached user {telegram_id}: {e}")
+            raw = None
+        if raw is None:
+            user_cache_lookups_total.inc("miss")
+            return None
+
+        user_cache_lookups_total.inc("redis")
+        data = self._serializer.loads(raw)
+        self._set_local(telegram_id, data)
+        return UserSchema.model_validate(data)
+
+    async def set(self, user: UserSchema):
+        data = user.model_dump(mode="json", include=CACHED_FIELDS)
+        try:
+            await self._redis.set(self._get_key(user.telegram_id), self._serializer.dumps(data), ex=self.ttl)
+        except Exception as e:
+            logger.error(f"Error caching user {user.telegram_id}: {e}")
+            return
+        self._set_local(user.telegram_id, data)
+
+    async def invalidate(self, telegram_id: str):
+        self._local.pop(telegram_id, None)
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.delete(self._get_key(telegram_id))
+            pipe.publish(self._get_channel(), telegram_id)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error invalidating cached user {telegram_id}: {e}")
+
+    async def start(self):
+        """Подписка на инвалидации других процессов; без нее работает только уровень Redis"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._subscribed = False
+        self._local.clear()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._get_channel())
+                    # инвалидации до подписки не придут — начинаем с пустого LRU
+                    self._local.clear()
+                    self._subscribed = True
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        telegram_id = message["data"]
+                        self._local.pop(telegram_id.decode() if isinstance(telegram_id, bytes) else telegram_id, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User cache invalidation listener failed: {e}")
+            finally:
+                self._subscribed = False
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
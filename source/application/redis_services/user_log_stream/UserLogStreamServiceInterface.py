@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+
+from source.core.schemas.user_schema import UserLogSchema
+
+
+class UserLogStreamServiceInterface(ABC):
+    @abstractmethod
+    async def append(self, user_log: UserLogSchema):
+        """Кладет лог в стрим — единственная запись на пути сообщения юзера"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read_batch(self, batch_size: int, max_wait: float) -> list[tuple[str, UserLogSchema]]:
+        """
+        Набирает до batch_size логов, ожидая не дольше max_wait секунд (0 — только то, что уже есть).
+        Сначала забирает логи, зависшие у упавших воркеров
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ack(self, entry_ids: list[str]):
+        """Подтверждает запись логов в БД и удаляет их из стрима"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delivery_counts(self, entry_ids: list[str]) -> dict[str, int]:
+        """Сколько раз каждый из еще не подтвержденных логов выдавался воркерам"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def dead_letter(self, failed: list[tuple[str, UserLogSchema, str]]):
+        """Переносит логи (entry_id, лог, ошибка), которые не удается записать, в dead letter стрим"""
+        raise NotImplementedError
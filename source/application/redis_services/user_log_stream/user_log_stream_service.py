@@ -0,0 +1,145 @@
+import logging
+import os
+import socket
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from source.application.redis_services.user_log_stream.UserLogStreamServiceInterface import \
+    UserLogStreamServiceInterface
+from source.core.schemas.user_schema import UserLogSchema
+from source.infrastructure.serialization import RedisSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class UserLogStreamService(UserLogStreamServiceInterface):
+    """
+    Буфер write-behind для UserLog на Redis Stream.
+
+    Хэндлер делает только XADD, в Postgres логи пачками пишет FlushUserLogs. Стрим читается через
+    consumer group: лог удаляется из стрима (XACK + XDEL) только после коммита в БД, а логи воркера,
+    умершего между чтением и коммитом, через claim_idle секунд забирает другой воркер (XAUTOCLAIM).
+
+    Записи, которые не разбираются или не вставляются в БД (FlushUserLogs по счетчику доставок),
+    переносятся в dead_stream_key вместе с ошибкой и снимаются с основного стрима, чтобы не
+    блокировать свою пачку при каждом перечитывании.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            serializer: RedisSerializer,
+            claim_idle: float,
+            stream_key: str = "user_logs:stream",
+            group: str = "user_logs_writer",
+            dead_stream_key: str = "user_logs:dead",
+    ):
+        self._redis = redis_client
+        self._serializer = serializer
+        self.claim_idle = claim_idle
+        self.stream_key = stream_key
+        self.group = group
+        self.dead_stream_key = dead_stream_key
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._group_ready = False
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self._redis.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _decode(self, entries) -> tuple[list[tuple[str, UserLogSchema]], list[tuple[str, bytes | str, str]]]:
+        """Логи и записи, которые не разобрать: (entry_id, сырые данные, ошибка)"""
+        logs, broken = [], []
+        for entry_id, fields in entries:
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            if not fields:  # запись удалена из стрима, пока висела в pending
+                continue
+            data = fields.get(b"data", fields.get("data"))
+            try:
+                logs.append((entry_id, UserLogSchema.model_validate(self._serializer.loads(data))))
+            except Exception as e:
+                broken.append((entry_id, data or "", repr(e)))
+        return logs, broken
+
+    async def _move_to_dead(self, failed: list[tuple[str, bytes | str, str]]):
+        if not failed:
+            return
+        pipe = self._redis.pipeline(transaction=True)
+        for entry_id, data, error in failed:
+            pipe.xadd(self.dead_stream_key, {"data": data, "entry_id": entry_id, "error": error})
+        entry_ids = [entry_id for entry_id, _, _ in failed]
+        pipe.xack(self.stream_key, self.group, *entry_ids)
+        pipe.xdel(self.stream_key, *entry_ids)
+        await pipe.execute()
+        logger.error(f"Moved {len(failed)} user logs to {self.dead_stream_key}: {[error for _, _, error in failed]}")
+
+    async def append(self, user_log: UserLogSchema):
+        await self._redis.xadd(self.stream_key, {"data": self._serializer.dumps(user_log.model_dump(mode="json"))})
+
+    async def read_batch(self, batch_size: int, max_wait: float) -> list[tuple[str, UserLogSchema]]:
+        await self._ensure_group()
+
+        _, claimed, *_ = await self._redis.xautoclaim(
+            self.stream_key,
+            self.group,
+            self.consumer,
+            min_idle_time=int(self.claim_idle * 1000),
+            count=batch_size,
+        )
+        batch, broken = self._decode(claimed)
+        if claimed:
+            logger.warning(f"Claimed {len(claimed)} user logs left unacknowledged by another writer")
+
+        deadline = time.monotonic() + max_wait
+        while len(batch) < batch_size:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            response = await self._redis.xreadgroup(
+                self.group,
+                self.consumer,
+                streams={self.stream_key: ">"},
+                count=batch_size - len(batch),
+                block=remaining_ms if remaining_ms > 0 else None,
+            )
+            entries = response[0][1] if response else []
+            logs, broken_entries = self._decode(entries)
+            batch.extend(logs)
+            broken.extend(broken_entries)
+            if not entries or remaining_ms <= 0:
+                break
+
+        await self._move_to_dead(broken)
+        return batch
+
+    async def ack(self, entry_ids: list[str]):
+        if not entry_ids:
+            return
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.xack(self.stream_key, self.group, *entry_ids)
+        pipe.xdel(self.stream_key, *entry_ids)
+        await pipe.execute()
+
+    async def delivery_counts(self, entry_ids: list[str]) -> dict[str, int]:
+        # вызывается только когда пачка не записалась — по команде на запись не страшно
+        pipe = self._redis.pipeline(transaction=False)
+        for entry_id in entry_ids:
+            pipe.xpending_range(self.stream_key, self.group, min=entry_id, max=entry_id, count=1)
+        counts = {}
+        for entry_id, pending in zip(entry_ids, await pipe.execute()):
+            if pending:
+                counts[entry_id] = pending[0]["times_delivered"]
+        return counts
+
+    async def dead_letter(self, failed: list[tuple[str, UserLogSchema, str]]):
+        await self._move_to_dead([
+            (entry_id, self._serializer.dumps(user_log.model_dump(mode="json")), error)
+            for entry_id, user_log, error in failed
+        ])
+
@@ -1,13 +1,14 @@
 from abc import ABC, abstractmethod
 
+from source.core.schemas.user_schema import UserSchema
 
 
 class SubscriptionServiceInterface(ABC):
 
     @abstractmethod
-    async def check_message_limit(self, telegram_id: str):
+    async def try_consume_message(self, telegram_id: str, user: UserSchema | None = None) -> bool:
         ...
 
     @abstractmethod
-    async def increment_message_count(self, telegram_id: str):
+    async def refund_message(self, telegram_id: str, user: UserSchema | None = None, count: int = 1):
         ...
\ No newline at end of file
@@ -1,77 +1,65 @@
 import logging
 from datetime import datetime, timezone
 
-from dateutil.relativedelta import relativedelta
-
+from source.application.redis_services.message_quota.message_quota_service import MessageQuotaService
 from source.application.user import MergeUser, GetUserSchemaById
 from source.core.enum import SubscriptionType
-from source.core.lexicon.rules import LIMIT_MESSAGE_FREE, LIMIT_MESSAGE_STANDARD
 from source.core.schemas.user_schema import UserSchema
 
 logger = logging.getLogger(__name__)
 
 
 class SubscriptionService:
-    def __init__(self, get_by_id: GetUserSchemaById, merge: MergeUser):
+    """
+    Лимиты сообщений по подписке. Счетчики живут в MessageQuotaService (Redis),
+    в БД пишется только истечение подписки, сами счетчики синхронизирует SyncMessageCounters
+    """
+
+    def __init__(self, get_by_id: GetUserSchemaById, merge: MergeUser, quota: MessageQuotaService):
         self.get_by_id = get_by_id
         self.merge = merge
+        self.quota = quota
 
-    async def check_message_limit(self, telegram_id: str) -> bool:
-        user: UserSchema = await self.get_by_id(telegram_id)
-        if not user:
-            return False
+    async def _resolve_user(self, telegram_id: str, user: UserSchema | None) -> UserSchema | None:
+        """Юзер, уже загруженный в этом апдейте (data["user"]), или поход в БД, если его нет"""
+        if user is not None:
+            return user
+        return await self.get_by_id(telegram_id)
 
+    async def _expire_subscription(self, user: UserSchema):
+        """Истекшая подписка переводится в FREE — это редкая запись в БД, не на каждое сообщение"""
         now = datetime.now(timezone.utc)
+        if user.subscription == SubscriptionType.FREE or not user.subscription_date_end:
+            return
+        if now <= user.subscription_date_end:
+            return
 
-        modified = False
-
-        logger.info(f"check limit for {telegram_id}: {user.subscription} "
-                    f"\ndaily messages used: {user.daily_messages_used}")
-
-        # Смотрит истекла ли подписка и тогда обнуляем ее
-        if user.subscription != SubscriptionType.FREE and user.subscription_date_end and now > user.subscription_date_end:
-            user.subscription = SubscriptionType.FREE
-            user.subscription_start = None
-            user.subscription_date_end = None
-            user.messages_used = 0
-            user.daily_messages_used = 0
-            user.last_daily_reset = now
-            modified = True
-
-        # Pro подписка
-        if user.subscription == SubscriptionType.PRO:
-            if modified:
-                await self.merge(user)
-            return False  # Безлимит
+        logger.info(f"Subscription {user.subscription} of user {user.telegram_id} expired")
+        user.subscription = SubscriptionType.FREE
+        user.subscription_start = None
+        user.subscription_date_end = None
+        user.messages_used = 0
+        user.daily_messages_used = 0
+        user.last_daily_reset = None
+        # MergeUser после коммита сбрасывает профиль в UserCacheService
+        await self.merge(user)
 
-        elif user.subscription == SubscriptionType.DEFAULT:
-            if not user.subscription_start or not user.subscription_date_end:
-                return False
-            delta = relativedelta(user.subscription_date_end, user.subscription_start)
-            months = delta.months + (delta.years * 12) + (1 if delta.days > 0 else 0)
-            limit = LIMIT_MESSAGE_STANDARD * max(months, 1)  # 1000 сообщений лимит в месяц для стандарта
-            if modified:
-                await self.merge(user)
-            return user.messages_used > limit
+    async def try_consume_message(self, telegram_id: str, user: UserSchema | None = None) -> bool:
+        """
+        Списывает сообщение, если лимит не исчерпан; False — лимит исчерпан, отвечать нельзя.
+        user — уже загруженный LoadUserMiddleware юзер; проверка со списанием — один вызов скрипта в Redis
+        """
+        user = await self._resolve_user(telegram_id, user)
+        if not user:
+            return True
 
-        else:  # Бесплатная подписка
-            # Дневной сброс
-            if user.last_daily_reset is None or (now - user.last_daily_reset).days >= 1:
-                user.daily_messages_used = 0
-                user.last_daily_reset = now
-                modified = True
-            limit = LIMIT_MESSAGE_FREE
-            if modified:
-                await self.merge(user)
-            return user.daily_messages_used >= limit
+        await self._expire_subscription(user)
+        return await self.quota.try_consume(user)
 
-    async def increment_message_count(self, telegram_id: str):
-        user: UserSchema = await self.get_by_id(telegram_id)
+    async def refund_message(self, telegram_id: str, user: UserSchema | None = None, count: int = 1):
+        """Возвращает списанные сообщения, на которые не удалось ответить"""
+        user = await self._resolve_user(telegram_id, user)
         if not user:
             return
 
-        if user.subscription == SubscriptionType.FREE:
-            user.daily_messages_used += 1
-        elif user.subscription == SubscriptionType.DEFAULT:
-            user.messages_used += 1
-        await self.merge(user)
+        await self.quota.refund(user, count)
@@ -0,0 +1,34 @@
+import logging
+
+from source.application.base import Interactor
+from source.application.redis_services.message_quota.message_quota_service import MessageQuotaService
+from source.infrastructure.database.repository import UserRepository
+from source.infrastructure.database.uow import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+class SyncMessageCounters(Interactor[None, int]):
+    """Пишет изменившиеся в Redis счетчики сообщений в Postgres пачками; возвращает число записанных"""
+
+    def __init__(self, quota: MessageQuotaService, repository: UserRepository, uow: UnitOfWork, batch_size: int):
+        self.quota = quota
+        self.repository = repository
+        self.uow = uow
+        self.batch_size = batch_size
+
+    async def __call__(self) -> int:
+        counters = await self.quota.pop_changed_counters()
+        if not counters:
+            return 0
+
+        try:
+            async with self.uow:
+                await self.repository.update_message_counters(counters, batch_size=self.batch_size)
+                await self.uow.commit()
+        except Exception:
+            await self.quota.restore_changed_counters(counters)
+            raise
+
+        logger.info(f"Synced {len(counters)} message counters to database")
+        return len(counters)
@@ -9,6 +9,7 @@ from pydantic import BaseModel as BaseModelSchema
 
 
 from source.application.base import Interactor
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
 from source.infrastructure.database.repository import UserRepository
 from source.infrastructure.database.uow import UnitOfWork
 from source.core.schemas.user_schema import UserSchemaRequest
@@ -17,9 +18,10 @@ S = TypeVar("S", bound=BaseModelSchema)
 
 
 class CreateUser(Interactor[UserSchemaRequest, S]):
-    def __init__(self, repository: UserRepository, uow: UnitOfWork): 
+    def __init__(self, repository: UserRepository, uow: UnitOfWork, cache: UserCacheService):
         self.repository = repository
         self.uow = uow
+        self.cache = cache
 
     async def __call__(self, data: UserSchemaRequest) -> S:
         try:
@@ -28,8 +30,8 @@ class CreateUser(Interactor[UserSchemaRequest, S]):
                     data
                 )
                 await self.uow.commit() 
-                return user
-            return data
+            await self.cache.invalidate(data.telegram_id)
+            return user
         except IntegrityError:
             pass
     
\ No newline at end of file
@@ -4,6 +4,7 @@ from typing import TypeVar
 from pydantic import BaseModel as BaseModelSchema
 
 from source.application.base import Interactor
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
 from source.core.schemas.user_schema import UserSchema
 from source.infrastructure.database.models.user_model import User
 from source.infrastructure.database.repository import UserRepository
@@ -15,19 +16,30 @@ logger = logging.getLogger(__name__)
 
 
 class GetUserSchemaById(Interactor[str, UserSchema]):
-    def __init__(self, repository: UserRepository, uow: UnitOfWork):
+    """Профиль юзера без связей: сначала UserCacheService, при промахе — Postgres с записью в кэш"""
+
+    def __init__(self, repository: UserRepository, uow: UnitOfWork, cache: UserCacheService):
         self.repository = repository
         self.uow = uow
+        self.cache = cache
 
     async def __call__(self, telegram_id: str) -> UserSchema | None:
+        user = await self.cache.get(telegram_id)
+        if user is not None:
+            return user
+
         try:
             async with self.uow:
                 user: UserSchema = await self.repository.get_schema_by_telegram_id(
                     telegram_id
                 )
-                return user
         except Exception as exc:
             logger.error(f"Error get_by_id.py:\n{exc}")
+            return None
+
+        if user is not None:
+            await self.cache.set(user)
+        return user
 
 
 class GetUserById(Interactor[str, User]):
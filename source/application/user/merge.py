@@ -3,6 +3,7 @@ from typing import TypeVar
 from pydantic import BaseModel as BaseModelSchema
 
 from source.application.base import Interactor
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
 from source.core.schemas import UserSchema
 from source.infrastructure.database.repository import UserRepository
 from source.infrastructure.database.uow import UnitOfWork
@@ -11,17 +12,19 @@ S = TypeVar("S", bound=BaseModelSchema)
 
 
 class MergeUser(Interactor[UserSchema, S]):
-    def __init__(self, repository: UserRepository, uow: UnitOfWork):
+    def __init__(self, repository: UserRepository, uow: UnitOfWork, cache: UserCacheService):
         self.repository = repository
         self.uow = uow
+        self.cache = cache
 
     async def __call__(self, user: UserSchema) -> None:
         try:
             async with self.uow:
-                user = await self.repository.merge(
+                merged = await self.repository.merge(
                     user
                 )
                 await self.uow.commit()
-                return user
+            await self.cache.invalidate(user.telegram_id)
+            return merged
         except Exception as exc:
             pass
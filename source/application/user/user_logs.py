@@ -1,6 +1,9 @@
 import logging
+import uuid
+from datetime import datetime, timezone
 
 from source.application.base import Interactor
+from source.application.redis_services.user_log_stream.user_log_stream_service import UserLogStreamService
 from source.core.lexicon.rules import MIN_DAYS_AFTER_LAST_CHARACTERISTIC_GENERATION
 from source.core.schemas import UserLogCreateSchema
 from source.core.schemas.user_schema import UserLogSchema
@@ -11,25 +14,101 @@ logger = logging.getLogger(__name__)
 
 
 class CreateUserLog(Interactor[UserLogCreateSchema, UserLogSchema | None]):
-    """Записывает лог пользователя"""
+    """
+    Записывает лог пользователя через write-behind буфер: в хэндлере только XADD в Redis,
+    INSERT в Postgres делает FlushUserLogs пачкой. Если Redis недоступен — пишет в БД сразу
+    """
 
-    def __init__(self, repository: UserRepository, uow: UnitOfWork):
+    def __init__(self, log_stream: UserLogStreamService, repository: UserRepository, uow: UnitOfWork):
+        self.log_stream = log_stream
         self.repository = repository
         self.uow = uow
 
     async def __call__(self, user_log: UserLogCreateSchema) -> UserLogSchema | None:
+        # id и время создания присваиваются здесь: запись в БД позже, а порядок логов важен
+        created_log = UserLogSchema(id=uuid.uuid4(), created_at=datetime.now(timezone.utc), **user_log.model_dump())
+        try:
+            await self.log_stream.append(created_log)
+            logger.debug(f"User log queued: {created_log.id}")
+            return created_log
+        except Exception as exc:
+            logger.error(f"Failed to queue user log, writing it directly: {exc}")
+
         try:
             async with self.uow:
-                created_log: UserLogSchema | None = await self.repository.create_user_log(
-                    user_log=user_log
-                )
+                await self.repository.create_user_logs([created_log])
                 await self.uow.commit()
-                logger.info(f"User log created: {user_log}")
                 return created_log
         except Exception as exc:
             logger.error(exc)
 
 
+class FlushUserLogs(Interactor[float, int]):
+    """
+    Переносит пачку логов из стрима в Postgres одним многострочным INSERT; возвращает число записанных логов.
+
+    Если INSERT упал, а в пачке есть логи, выданные уже max_deliveries раз, пачка пишется по одному
+    логу в SAVEPOINT: записи, которые падают и сами по себе, уходят в dead letter стрим
+    (как payment_events со status = 'dead'), остальные — в БД. Иначе ошибка считается временной
+    и пачка перечитается целиком
+    """
+
+    def __init__(
+            self,
+            log_stream: UserLogStreamService,
+            repository: UserRepository,
+            uow: UnitOfWork,
+            batch_size: int,
+            max_deliveries: int,
+    ):
+        self.log_stream = log_stream
+        self.repository = repository
+        self.uow = uow
+        self.batch_size = batch_size
+        self.max_deliveries = max_deliveries
+
+    async def __call__(self, max_wait: float) -> int:
+        batch = await self.log_stream.read_batch(self.batch_size, max_wait)
+        if not batch:
+            return 0
+
+        try:
+            async with self.uow:
+                await self.repository.create_user_logs([user_log for _, user_log in batch])
+                await self.uow.commit()
+        except Exception as e:
+            counts = await self.log_stream.delivery_counts([entry_id for entry_id, _ in batch])
+            if max(counts.values(), default=0) < self.max_deliveries:
+                raise
+            logger.warning(f"Failed to flush {len(batch)} user logs as a batch, isolating bad entries: {e!r}")
+            return await self._flush_one_by_one(batch, counts)
+
+        # после коммита: при падении до ack логи перечитаются, а повторная вставка по id игнорируется
+        await self.log_stream.ack([entry_id for entry_id, _ in batch])
+
+        logger.info(f"Flushed {len(batch)} user logs to database")
+        return len(batch)
+
+    async def _flush_one_by_one(self, batch: list[tuple[str, UserLogSchema]], counts: dict[str, int]) -> int:
+        flushed, dead = [], []
+        async with self.uow:
+            for entry_id, user_log in batch:
+                try:
+                    async with self.uow.savepoint():
+                        await self.repository.create_user_logs([user_log])
+                    flushed.append(entry_id)
+                except Exception as e:
+                    # не исчерпавшие попытки остаются в pending и перечитаются
+                    if counts.get(entry_id, 0) >= self.max_deliveries:
+                        dead.append((entry_id, user_log, repr(e)))
+            await self.uow.commit()
+
+        await self.log_stream.ack(flushed)
+        await self.log_stream.dead_letter(dead)
+        logger.info(f"Flushed {len(flushed)} user logs to database one by one, {len(dead)} moved to dead letter")
+        return len(flushed)
+
+
 class GetAllUserLogs(Interactor[str, list[UserLogSchema] | None]):
     """Возвращает все логи пользователя"""
 
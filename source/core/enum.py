@@ -17,3 +17,38 @@ class UserType(str, Enum):
     USER = "user"
     ADMIN = "admin"
     ASSISTANT = "assistant"
+
+
+class LLMPriority(int, Enum):
+    """
+    Приоритет запроса к ассистенту в очереди планировщика (меньше — раньше).
+    """
+    CRISIS = 0  # риск-протокол, успокоение
+    DIALOG = 1  # обычный диалог
+    BACKGROUND = 2  # генерация характеристики и прочие фоновые задачи
+
+
+class SendPriority(int, Enum):
+    """
+    Приоритет исходящего запроса к Telegram в очереди глобального лимита (меньше — раньше).
+    """
+    INTERACTIVE = 0  # ответы юзеру на его действия
+    BULK = 1  # рассылки и прочие массовые отправки
+
+
+class MailingDeliveryStatus(str, Enum):
+    """
+    Итог доставки сообщения рассылки одному юзеру.
+    """
+    SENT = "sent"
+    BLOCKED = "blocked"  # юзер заблокировал бота или удалил аккаунт
+    FAILED = "failed"
+
+
+class PaymentEventStatus(str, Enum):
+    """
+    Состояние уведомления YooKassa во входящей очереди (payment_events).
+    """
+    PENDING = "pending"  # ждет обработки или повтора
+    DONE = "done"
+    DEAD = "dead"  # попытки исчерпаны, нужен разбор руками
@@ -1,8 +1,18 @@
-class AssistantException(BaseException):
+class AssistantException(Exception):
     """ОШИБКА ПОДКЛЮЧЕНИЯ К АССИСТЕНТУ"""
     pass
 
 
-class AssistantResponseException(BaseException):
+class AssistantResponseException(Exception):
     """ОШИБКА СТРУКТУРЫ ОТВЕТА АССИСТЕНТА"""
     pass
+
+
+class AssistantUnavailableException(AssistantException):
+    """АССИСТЕНТ ВРЕМЕННО НЕДОСТУПЕН (СРАБОТАЛ CIRCUIT BREAKER)"""
+    pass
+
+
+class PaymentNotFoundException(Exception):
+    """ПЛАТЕЖ ИЗ УВЕДОМЛЕНИЯ YOOKASSA НЕ НАЙДЕН В БД"""
+    pass
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from source.core.lexicon.message_templates import PROFILE_CHARACTERISTIC_TEXT
+from source.core.lexicon.message_templates import PROFILE_CHARACTERISTIC_TEXT, MAILING_REPORT_TEXT
+from source.core.schemas.mailing_schema import MailingReportSchema
 from source.core.schemas.user_schema import UserCharacteristicSchema
 
 
@@ -65,3 +66,24 @@ def format_profile_characteristic(characteristic: UserCharacteristicSchema) -> s
         days_pass=days_pass,
         passed_russian_word=format_passed_russian(days_passed)
     )
+
+
+def format_mailing_report(report: MailingReportSchema) -> str:
+    """Прогресс или итог рассылки для админа"""
+    if report.is_finished:
+        status = "завершена ✅"
+    elif report.loaded:
+        status = "отправляется"
+    else:
+        status = "выгружается аудитория"
+
+    return MAILING_REPORT_TEXT.format(
+        mailing_id=report.mailing_id,
+        status=status,
+        processed=report.processed,
+        published=report.published,
+        sent=report.sent,
+        blocked=report.blocked,
+        failed=report.failed,
+        messages_per_second=report.messages_per_second
+    )
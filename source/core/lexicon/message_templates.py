@@ -133,6 +133,11 @@ YOU_IN_MAIN_MENU = (
     "➡️ Выбери нужную кнопку, и начнем общаться!"
 )
 
+ASSISTANT_UNAVAILABLE = (
+    "Сейчас я отвечаю медленнее обычного и не могу ответить сразу. 🙏\n\n"
+    "Пожалуйста, напиши мне снова через минуту — я никуда не ухожу."
+)
+
 HELP_TEXT = (
     "<b>🤖 Чем я могу помочь?</b>\n\n"
 
@@ -176,3 +181,36 @@ NOT_ENOUGH_LOGS_RECORDS=(
 NEED_MORE_IN_TRAUMA = (
     f"Генерация невозможна. Нужно собрать больше информации о тебе!"
 )
+
+
+# [ Рассылки (админ) ]
+MAILING_USAGE = (
+    "Использование:\n"
+    "<code>/mailing текст рассылки</code> — разослать всем пользователям\n"
+    "<code>/mailing_status id</code> — прогресс рассылки"
+)
+
+MAILING_STARTED = (
+    "📨 Рассылка запущена.\n\n"
+    "ID: <code>{mailing_id}</code>\n"
+    "Прогресс: <code>/mailing_status {mailing_id}</code>\n"
+    "Когда рассылка закончится, придет отчет."
+)
+
+MAILING_START_FAILED = (
+    "Не удалось запустить рассылку: брокер сообщений недоступен. Попробуйте позже."
+)
+
+MAILING_NOT_FOUND = (
+    "Рассылка не найдена."
+)
+
+MAILING_REPORT_TEXT = (
+    "<b>📊 Рассылка {mailing_id}</b>\n\n"
+    "Статус: {status}\n"
+    "Обработано: {processed} из {published}\n"
+    "└── доставлено: {sent}\n"
+    "└── заблокировали бота: {blocked}\n"
+    "└── ошибки: {failed}\n\n"
+    "Скорость: {messages_per_second:.1f} сообщ./сек"
+)
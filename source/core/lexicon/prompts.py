@@ -255,3 +255,20 @@ GET_USER_CHARACTERISTIC: str = """
     - Избегай клинических диагнозов, формулируй в рамках психологических особенностей
     - Обязательно ответь на все поля, даже если не уверен в ответе
 """
+
+# сжатие старой части диалога в краткое содержание (фоновая задача)
+SUMMARIZE_HISTORY_PROMPT: str = """
+    Ты ведешь заметки психолога по ходу диалога с пользователем.
+    Тебе дано предыдущее краткое содержание разговора (может быть пустым) и следующие за ним реплики.
+
+    Составь новое краткое содержание всего разговора:
+    - что беспокоит пользователя, ключевые события, люди и обстоятельства;
+    - его чувства и их динамика;
+    - что уже обсуждали и советовали, о чем договорились.
+
+    Пиши от третьего лица, только факты из диалога, без оценок и без новых советов.
+    Не более 150 слов, исключительно на русском языке.
+"""
+
+# как краткое содержание подставляется в контекст диалога
+HISTORY_SUMMARY_CONTEXT: str = "Краткое содержание предыдущей части разговора: {summary}"
@@ -1,11 +1,70 @@
 #[ History service ]
 
-HISTORY_MAX_LEN=10
+# жесткий предел длины списка в Redis; в промпт попадает столько, сколько влезает в CONTEXT_TOKEN_BUDGET,
+# а более старые сообщения сворачиваются в краткое содержание
+HISTORY_MAX_LEN=50
+# история скопа живет неделю с последнего сообщения
+HISTORY_TTL = 60 * 60 * 24 * 7
+CONTEXT_TOKEN_BUDGET = 2000
+HISTORY_SUMMARY_LOCK_TTL = 120
+
+# [ Coalescing ]
+# сколько секунд ждать следующего сообщения, прежде чем отвечать на пачку
+MESSAGE_COALESCE_WINDOW = 2.0
+
+# [ Idempotency ]
+# повтор апдейта или вебхука отбрасывается, пока первая обработка идет (не дольше PROCESSING_TTL)
+# и еще DONE_TTL секунд после нее — Telegram хранит недоставленные апдейты сутки
+IDEMPOTENCY_PROCESSING_TTL = 60 * 5
+IDEMPOTENCY_DONE_TTL = 60 * 60 * 24
+
+# [ UserLog write-behind ]
+# логи пишутся в Postgres пачками до USER_LOG_FLUSH_BATCH_SIZE, но не реже раза в USER_LOG_FLUSH_INTERVAL секунд
+USER_LOG_FLUSH_BATCH_SIZE = 200
+USER_LOG_FLUSH_INTERVAL = 1.0
+# через сколько секунд непрочитанные логи упавшего воркера забирает другой
+USER_LOG_CLAIM_IDLE = 60
+# лог, который не удалось записать за столько доставок, уходит в стрим user_logs:dead
+USER_LOG_MAX_DELIVERIES = 5
+
+# [ Mailing ]
+# столько telegram_id читается из Postgres и публикуется в NATS за раз (keyset-пагинация)
+MAILING_CHUNK_SIZE = 500
+# сколько сообщений рассылки процесс отправляет одновременно; темп все равно задает лимитер Telegram
+MAILING_SENDER_CONCURRENCY = 32
+# попыток доставки одного сообщения; после последней юзер считается failed
+MAILING_MAX_DELIVER = 5
+# пауза перед повторной доставкой после сетевой ошибки
+MAILING_RETRY_DELAY = 10
+# сколько хранится прогресс рассылки в Redis
+MAILING_PROGRESS_TTL = 60 * 60 * 24 * 30
+
+# [ Payment events inbox ]
+# уведомления YooKassa разбираются пачками до PAYMENT_EVENTS_BATCH_SIZE, очередь проверяется раз в POLL_INTERVAL
+PAYMENT_EVENTS_BATCH_SIZE = 50
+PAYMENT_EVENTS_POLL_INTERVAL = 1.0
+# после стольких неудачных попыток событие уходит в dead letter (status = 'dead')
+PAYMENT_EVENT_MAX_ATTEMPTS = 8
+# повтор через 5, 10, 20, ... секунд, но не реже раза в час
+PAYMENT_EVENT_RETRY_BASE_DELAY = 5
+PAYMENT_EVENT_RETRY_MAX_DELAY = 60 * 60
 
 # [Subscription Limit ]
 
 LIMIT_MESSAGE_FREE=4
 LIMIT_MESSAGE_STANDARD=1000
+# дневное окно FREE считается от первого сообщения и заканчивается вместе с TTL счетчика в Redis
+FREE_MESSAGES_WINDOW = 60 * 60 * 24
+# как часто и какими пачками счетчики из Redis пишутся в Postgres
+MESSAGE_COUNTERS_SYNC_INTERVAL = 60
+MESSAGE_COUNTERS_SYNC_BATCH_SIZE = 500
+
+# [ User cache ]
+# профиль юзера в Redis; инвалидируется при записи, TTL ограничивает устаревание при гонках
+USER_CACHE_TTL = 60
+# LRU в памяти процесса: сколько секунд и сколько юзеров
+USER_CACHE_LOCAL_TTL = 5
+USER_CACHE_LOCAL_MAX_SIZE = 10000
 
 # [ User characteristics GENERATING RULES ]
 MIN_MOOD_RECORDS_COUNT = 3
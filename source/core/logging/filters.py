@@ -0,0 +1,60 @@
+import logging
+import threading
+import time
+
+# поля extra={...} с текстом юзера или ответом модели — в логи попадает только их длина
+REDACTED_FIELDS = ("content", "message_text", "prompt", "completion")
+
+
+class RedactFilter(logging.Filter):
+    """Заменяет тексты сообщений в полях extra на их длину: переписка юзеров не должна оседать в логах"""
+
+    def __init__(self, fields: tuple[str, ...] = REDACTED_FIELDS):
+        super().__init__()
+        self.fields = fields
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field in self.fields:
+            value = getattr(record, field, None)
+            if isinstance(value, str):
+                setattr(record, field, f"<redacted: {len(value)} chars>")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ограничивает частоту записей ниже min_level: token bucket на пару (логгер, уровень),
+    rate записей в секунду с запасом burst. WARNING и выше проходят всегда.
+    Первая запись после пропусков несет в поле sampled_out число отброшенных
+    """
+
+    def __init__(self, rate: float, burst: int, min_level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.min_level = min_level
+        # (логгер, уровень) -> [токены, время последнего пополнения, отброшено]
+        self._buckets: dict[tuple[str, int], list] = {}
+        # фильтр вызывается из любого потока, который пишет лог
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((record.name, record.levelno))
+            if bucket is None:
+                bucket = self._buckets[(record.name, record.levelno)] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.sampled_out = bucket[2]
+                bucket[2] = 0
+        return True
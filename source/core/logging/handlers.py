@@ -0,0 +1,20 @@
+import queue
+from logging.handlers import QueueHandler
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Кладет запись в ограниченную очередь и сразу возвращается — форматирование и запись
+    делает QueueListener в своем потоке. Если очередь полна, запись отбрасывается (счетчик dropped),
+    а не блокирует event loop
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
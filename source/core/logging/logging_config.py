@@ -1,37 +1,81 @@
-
+import atexit
 import logging
-import coloredlogs
-from pythonjsonlogger import jsonlogger 
+import queue
 from logging.config import dictConfig
+from logging.handlers import QueueListener
+
+import coloredlogs
+from pythonjsonlogger import jsonlogger
+
+from source.core.logging.filters import RedactFilter, SamplingFilter
+from source.core.logging.handlers import DroppingQueueHandler
+
+
+def parse_logger_levels(raw: str) -> dict[str, str]:
+    """'aiogram.event=WARNING,source.infrastructure=DEBUG' -> {'aiogram.event': 'WARNING', ...}"""
+    levels = {}
+    for item in raw.split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
 
-def configure_logging():
+def stop_listener(listener: QueueListener):
+    """Дописывает очередь и останавливает поток; повторный вызов ничего не делает"""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def configure_logging(
+        level: str = "INFO",
+        logger_levels: str = "",
+        console_format: str = "json",
+        file_path: str | None = "app.json.log",
+        queue_size: int = 10000,
+        sample_rate: float = 20.0,
+        sample_burst: int = 100,
+        redact: bool = True,
+) -> QueueListener:
+    """
+    Логгеры пишут только в DroppingQueueHandler: запись кладется в очередь, а форматирование
+    и блокирующий вывод в консоль и файл делает QueueListener в фоновом потоке.
+    На QueueHandler висят фильтры: редактирование текстов сообщений и sampling частых записей
+    """
     dictConfig({
         "version": 1,
         "disable_existing_loggers": False,
-        "formatters": {
-            "json": {
-                "()": jsonlogger.JsonFormatter,
-                "format": "%(asctime)s %(levelname)s %(name)s %(message)s",
-            },
-            "default": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            },
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "formatter": "json", 
-            },
-            "file": {
-                "class": "logging.FileHandler",
-                "formatter": "json",
-                "filename": "app.json.log",  
-            },
-        },
+        "handlers": {},
         "root": {
-            "level": "DEBUG",
-            "handlers": ["console", "file"],
+            "level": level.upper(),
+            "handlers": [],
+        },
+        "loggers": {
+            name: {"level": logger_level} for name, logger_level in parse_logger_levels(logger_levels).items()
         },
     })
 
-    coloredlogs.install(level="DEBUG", logger=logging.getLogger())  # Colored logs
\ No newline at end of file
+    json_formatter = jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    console = logging.StreamHandler()
+    if console_format == "color":
+        console.setFormatter(coloredlogs.ColoredFormatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    else:
+        console.setFormatter(json_formatter)
+    handlers: list[logging.Handler] = [console]
+    if file_path:
+        file = logging.FileHandler(file_path)
+        file.setFormatter(json_formatter)
+        handlers.append(file)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    if redact:
+        queue_handler.addFilter(RedactFilter())
+    if sample_rate > 0:
+        queue_handler.addFilter(SamplingFilter(rate=sample_rate, burst=sample_burst))
+    logging.getLogger().addHandler(queue_handler)
+
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # дописываем очередь при выходе из процесса
+    atexit.register(stop_listener, listener)
+    return listener
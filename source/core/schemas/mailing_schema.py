@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from source.core.enum import MailingDeliveryStatus
+
+
+class MailingLoadSchema(BaseModel):
+    """Команда загрузить аудиторию рассылки (subject mailing.{id}.load)"""
+    mailing_id: UUID = Field(..., description="ID рассылки")
+
+
+class MailingJobSchema(BaseModel):
+    """Отправка рассылки одному юзеру (subject mailing.{id}.send.{telegram_id})"""
+    mailing_id: UUID = Field(..., description="ID рассылки")
+    telegram_id: str = Field(..., description="Телеграм айди получателя")
+
+
+class MailingDeliveryLogSchema(BaseModel):
+    """Итог доставки (subject mailing.{id}.send.{telegram_id}.logs)"""
+    mailing_id: UUID = Field(..., description="ID рассылки")
+    telegram_id: str = Field(..., description="Телеграм айди получателя")
+    status: MailingDeliveryStatus = Field(..., description="Итог доставки")
+    error: Optional[str] = Field(None, description="Ошибка Telegram, если не доставлено")
+    timestamp: datetime = Field(..., description="Время доставки")
+
+
+class MailingReportSchema(BaseModel):
+    """Прогресс рассылки; после завершения уходит в subject mailing.{id}.over"""
+    mailing_id: UUID = Field(..., description="ID рассылки")
+    admin_telegram_id: Optional[str] = Field(None, description="Кто запустил рассылку")
+
+    published: int = Field(0, description="Опубликовано заданий на отправку")
+    sent: int = Field(0, description="Доставлено")
+    blocked: int = Field(0, description="Бот заблокирован")
+    failed: int = Field(0, description="Не доставлено по другим причинам")
+    loaded: bool = Field(False, description="Вся аудитория выгружена из БД")
+
+    started_at: datetime = Field(..., description="Время запуска")
+    finished_at: Optional[datetime] = Field(None, description="Время обработки последнего задания")
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.blocked + self.failed
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def messages_per_second(self) -> float:
+        end = self.finished_at or datetime.now(self.started_at.tzinfo)
+        elapsed = (end - self.started_at).total_seconds()
+        return self.processed / elapsed if elapsed > 0 else 0.0
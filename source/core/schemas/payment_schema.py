@@ -1,10 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
-from source.core.enum import SubscriptionType
+from source.core.enum import SubscriptionType, PaymentEventStatus
 
 class PaymentSchema(BaseModel):
     id: Optional[UUID] = Field(None, description="ID пользователя в формате UUID")
@@ -22,3 +22,19 @@ class PaymentSchema(BaseModel):
     link: str = Field(..., description="Ссылка для оплаты заказа")
 
     timestamp: datetime = Field(..., description="Время покупки")
+
+
+class PaymentEventSchema(BaseModel):
+    id: Optional[UUID] = Field(None, description="ID события")
+
+    event_key: str = Field(..., description="ID платежа + тип события, уникален")
+    purchase_id: str = Field(..., description="ID Заказа")
+    event: str = Field(..., description="Тип события YooKassa, e.g. payment.succeeded")
+    payload: dict[str, Any] = Field(..., description="Уведомление целиком")
+
+    status: PaymentEventStatus = Field(PaymentEventStatus.PENDING, description="Состояние обработки")
+    attempts: int = Field(0, description="Неудачных попыток обработки")
+    next_attempt_at: Optional[datetime] = Field(None, description="Когда обрабатывать")
+    last_error: Optional[str] = Field(None, description="Последняя ошибка обработки")
+
+    created_at: Optional[datetime] = Field(None, description="Время получения")
@@ -1,11 +1,19 @@
+import asyncio
 import logging
+import random
+import time
+from typing import AsyncIterator
 
-from openai import OpenAI
+from openai import AsyncOpenAI, APIConnectionError, RateLimitError, InternalServerError
 
-from source.core.exceptions import AssistantResponseException, AssistantException
+from source.core.enum import LLMPriority
+from source.core.exceptions import AssistantResponseException, AssistantException, AssistantUnavailableException
 from source.core.schemas.assistant_schemas import ContextMessage, AssistantResponse
 from source.core.schemas.user_schema import UserCharacteristicSchema
+from source.infrastructure.ai_assistant.circuit_breaker import CircuitBreaker
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
 from source.infrastructure.database.models.base_model import S
+from source.infrastructure.metrics.metrics import llm_request_seconds, llm_tokens_total
 
 logger = logging.getLogger(__name__)
 
@@ -14,23 +22,47 @@ ASSISTANT_RESPONSES = (
     UserCharacteristicSchema,
 )
 
+# ошибки, после которых есть смысл повторить запрос (APITimeoutError — наследник APIConnectionError)
+RETRYABLE_ERRORS = (
+    APIConnectionError,
+    RateLimitError,
+    InternalServerError,
+)
+
+
+def record_usage(context_scope: str, usage) -> None:
+    """Токены из usage ответа (у стрима — из последнего чанка при stream_options.include_usage)"""
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None)
+        if isinstance(tokens, int):
+            llm_tokens_total.inc(context_scope, kind.removesuffix("_tokens"), amount=tokens)
+
 
 class AssistantClient:
-    def __init__(self, client: OpenAI):
+    def __init__(
+            self,
+            client: AsyncOpenAI,
+            scheduler: LLMRequestScheduler,
+            breaker: CircuitBreaker,
+            request_deadline: float = 90.0,
+            max_retries: int = 2,
+            retry_base_delay: float = 0.5,
+            retry_max_delay: float = 5.0,
+    ):
         self.client = client
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self.request_deadline = request_deadline
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
 
-    async def get_response(
-            self,
+    @staticmethod
+    def _build_messages(
             system_prompt: str,
             message: str,
-            context_messages: list[ContextMessage] = None,
-            temperature: float = 0.7,
-            response_schema: S = None,  # схема для валидации ответа
-            need_json: bool = False
-    ) -> ASSISTANT_RESPONSES:
-        if context_messages is None:
-            context_messages = []
-
+            context_messages: list[ContextMessage] = None
+    ) -> list[dict]:
         messages = [
             {"role": "system", "content": f"{system_prompt}"}
         ]
@@ -38,26 +70,88 @@ class AssistantClient:
         # Добавление контекста
         if context_messages:
             for context_message in context_messages:
-                logger.info(context_message.get_message_to_deepseek())
                 messages.append(context_message.get_message_to_deepseek())
 
         # Добавление последнего сообщения 
         messages.append({"role": "user", "content": f"{message}"})
+        return messages
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Экспоненциальный backoff с full jitter"""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
 
+    async def _create(self, **kwargs):
+        """
+        chat.completions.create с дедлайном на весь вызов (включая повторы),
+        повтором только для RETRYABLE_ERRORS и учетом результата в circuit breaker.
+        Для стрима дедлайн и повторы покрывают только установку соединения — до первого токена.
+        """
+        attempt = 0
+        started = time.monotonic()
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=messages,
-                temperature=temperature,
-                response_format={"type": "json_object"} if need_json else None
-            )
+            async with asyncio.timeout(self.request_deadline):
+                while True:
+                    attempt_started = time.monotonic()
+                    try:
+                        response = await self.client.chat.completions.create(**kwargs)
+                    except RETRYABLE_ERRORS as e:
+                        await self.breaker.record(success=False, duration=time.monotonic() - attempt_started)
+                        if attempt >= self.max_retries:
+                            raise
+                        delay = self._retry_delay(attempt)
+                        attempt += 1
+                        logger.warning(f"DeepseekAPI: {e!r}, повтор {attempt}/{self.max_retries} через {delay:.2f}s")
+                        await asyncio.sleep(delay)
+                        continue
+
+                    await self.breaker.record(success=True, duration=time.monotonic() - attempt_started)
+                    return response
+        except TimeoutError:
+            await self.breaker.record(success=False, duration=time.monotonic() - started)
+            logger.error(f"DeepseekAPI не ответил за {self.request_deadline}s (попыток: {attempt + 1})")
+            raise
+
+    async def _ensure_available(self):
+        if await self.breaker.is_open():
+            logger.warning("DeepseekAPI недоступен (circuit breaker открыт), запрос не отправлен")
+            raise AssistantUnavailableException
+
+    async def get_response(
+            self,
+            system_prompt: str,
+            message: str,
+            context_messages: list[ContextMessage] = None,
+            temperature: float = 0.7,
+            response_schema: S = None,  # схема для валидации ответа
+            need_json: bool = False,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "other"
+    ) -> ASSISTANT_RESPONSES:
+        """context_scope — только метка метрик, из небольшого фиксированного набора"""
+        messages = self._build_messages(system_prompt, message, context_messages)
+        await self._ensure_available()
+
+        try:
+            async with self.scheduler.slot(user_id, priority):
+                started = time.monotonic()
+                response = await self._create(
+                    model="deepseek-chat",
+                    messages=messages,
+                    temperature=temperature,
+                    response_format={"type": "json_object"} if need_json else None
+                )
+                llm_request_seconds.observe(context_scope, "complete", value=time.monotonic() - started)
         except Exception as e:
             logger.error(f"Ошибка при обращении к DeepseekAPI: {e}")
             raise AssistantException
+        record_usage(context_scope, getattr(response, "usage", None))
 
+        response_content = None
         try:
             response_content = response.choices[0].message.content
-            logger.info(f"Получен ответ от Deepseek: {response_content}")
+            # текст ответа — в extra: RedactFilter оставит от него только длину
+            logger.debug("Получен ответ от Deepseek", extra={"completion": response_content})
 
             if response_schema:
                 validated_response = response_schema.model_validate_json(response_content)
@@ -66,6 +160,64 @@ class AssistantClient:
                 return AssistantResponse.model_validate({"message": response_content})
 
         except Exception as e:
-            logger.error(f"Ошибка валидации ответа от Deepseek: {e}")
-            logger.error(f"Содержимое ответа: {response.choices[0].message.content}")
+            # только тип ошибки: текст ошибки pydantic цитирует input_value, то есть сам ответ
+            logger.error(
+                f"Ошибка валидации ответа от Deepseek: {type(e).__name__}",
+                extra={"completion": response_content}
+            )
             raise AssistantResponseException
+
+    async def stream_response(
+            self,
+            system_prompt: str,
+            message: str,
+            context_messages: list[ContextMessage] = None,
+            temperature: float = 0.7,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG,
+            context_scope: str = "other"
+    ) -> AsyncIterator[str]:
+        """Отдает ответ ассистента по кусочкам (дельтам) по мере генерации"""
+        messages = self._build_messages(system_prompt, message, context_messages)
+        await self._ensure_available()
+
+        # слот планировщика держится до конца стрима
+        async with self.scheduler.slot(user_id, priority):
+            started = time.monotonic()
+            try:
+                stream = await self._create(
+                    model="deepseek-chat",
+                    messages=messages,
+                    temperature=temperature,
+                    stream=True,
+                    # последний чанк приходит без choices, зато с usage
+                    stream_options={"include_usage": True}
+                )
+            except Exception as e:
+                logger.error(f"Ошибка при обращении к DeepseekAPI: {e}")
+                raise AssistantException
+
+            received: list[str] = []
+            try:
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        record_usage(context_scope, chunk.usage)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        received.append(delta)
+                        yield delta
+            except Exception as e:
+                logger.error(f"Обрыв стрима от DeepseekAPI: {e}")
+                await self.breaker.record(success=False, duration=0.0)
+                raise AssistantException
+            finally:
+                await stream.close()
+            llm_request_seconds.observe(context_scope, "stream", value=time.monotonic() - started)
+
+        if not received:
+            logger.error("Deepseek вернул пустой стрим")
+            raise AssistantResponseException
+
+        logger.debug("Получен ответ от Deepseek (stream)", extra={"completion": "".join(received)})
@@ -0,0 +1,93 @@
+import logging
+import time
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker с общим для всех воркеров состоянием в Redis.
+
+    Вызовы считаются в окнах по window_seconds: всего, ошибок и медленных (дольше slow_call_seconds).
+    Если в окне набралось min_calls вызовов и доля ошибок или медленных вызовов превысила порог,
+    выставляется ключ open на open_seconds — пока он жив, запросы к провайдеру не отправляются.
+    После истечения ключа трафик снова идет, и счет начинается с нового окна.
+    Если Redis недоступен, breaker считается закрытым — он не должен сам ронять бота.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            name: str,
+            window_seconds: int = 30,
+            min_calls: int = 10,
+            error_rate: float = 0.5,
+            slow_call_seconds: float = 20.0,
+            slow_call_rate: float = 0.5,
+            open_seconds: int = 30,
+    ):
+        self._redis = redis
+        self._prefix = f"circuit_breaker:{name}"
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+
+        # локальная копия состояния, чтобы не ходить в Redis на каждый вызов, пока breaker открыт
+        self._open_until: float = 0.0
+
+    def _open_key(self) -> str:
+        return f"{self._prefix}:open"
+
+    def _window_key(self, counter: str) -> str:
+        window = int(time.time() // self.window_seconds)
+        return f"{self._prefix}:{window}:{counter}"
+
+    async def is_open(self) -> bool:
+        if time.monotonic() < self._open_until:
+            return True
+
+        try:
+            ttl_ms = await self._redis.pttl(self._open_key())
+        except Exception as e:
+            logger.warning(f"Circuit breaker {self._prefix}: не удалось прочитать состояние: {e}")
+            return False
+
+        if ttl_ms > 0:
+            self._open_until = time.monotonic() + ttl_ms / 1000
+            return True
+        return False
+
+    async def record(self, success: bool, duration: float):
+        """Учитывает результат вызова и открывает breaker при превышении порогов"""
+        keys = {counter: self._window_key(counter) for counter in ("calls", "errors", "slow")}
+        ttl = self.window_seconds * 2
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.incr(keys["calls"])
+            pipe.expire(keys["calls"], ttl)
+            pipe.incrby(keys["errors"], 0 if success else 1)
+            pipe.expire(keys["errors"], ttl)
+            pipe.incrby(keys["slow"], 1 if duration >= self.slow_call_seconds else 0)
+            pipe.expire(keys["slow"], ttl)
+            calls, _, errors, _, slow, _ = await pipe.execute()
+
+            if calls < self.min_calls:
+                return
+
+            if errors / calls >= self.error_rate or slow / calls >= self.slow_call_rate:
+                opened = await self._redis.set(self._open_key(), 1, ex=self.open_seconds, nx=True)
+                if opened:
+                    logger.error(
+                        f"Circuit breaker {self._prefix} открыт на {self.open_seconds}s: "
+                        f"calls={calls}, errors={errors}, slow={slow}"
+                    )
+                    # новое окно после открытия начинается с чистых счетчиков
+                    await self._redis.delete(*keys.values())
+        except Exception as e:
+            logger.warning(f"Circuit breaker {self._prefix}: не удалось записать результат вызова: {e}")
@@ -0,0 +1,135 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from source.core.enum import LLMPriority
+from source.infrastructure.metrics.metrics import llm_scheduler_wait_seconds, llm_scheduler_queue_depth, \
+    llm_scheduler_in_flight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMSchedulerStats:
+    """Метрики планировщика: глубина очереди и время ожидания слота по приоритетам"""
+    in_flight: int = 0
+    queue_depth: int = 0
+    requests_total: dict[LLMPriority, int] = field(default_factory=lambda: dict.fromkeys(LLMPriority, 0))
+    wait_seconds_total: dict[LLMPriority, float] = field(default_factory=lambda: dict.fromkeys(LLMPriority, 0.0))
+    wait_seconds_max: dict[LLMPriority, float] = field(default_factory=lambda: dict.fromkeys(LLMPriority, 0.0))
+
+    def observe_wait(self, priority: LLMPriority, wait: float):
+        self.requests_total[priority] += 1
+        self.wait_seconds_total[priority] += wait
+        self.wait_seconds_max[priority] = max(self.wait_seconds_max[priority], wait)
+        llm_scheduler_wait_seconds.observe(priority.name, value=wait)
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "requests_total": {p.name: v for p, v in self.requests_total.items()},
+            "wait_seconds_avg": {
+                p.name: (self.wait_seconds_total[p] / count if count else 0.0)
+                for p, count in self.requests_total.items()
+            },
+            "wait_seconds_max": {p.name: v for p, v in self.wait_seconds_max.items()},
+        }
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    user_id: str | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class LLMRequestScheduler:
+    """
+    Очередь запросов к ассистенту.
+
+    — не больше max_in_flight запросов одновременно на процесс;
+    — не больше одного запроса одновременно от одного юзера (следующий ждет в очереди);
+    — свободный слот получает ожидающий с наивысшим приоритетом, при равенстве — кто раньше пришел.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.stats = LLMSchedulerStats()
+
+        self._queue: list[_Waiter] = []  # отсортирована по (priority, seq)
+        self._active_users: set[str] = set()
+        self._in_flight = 0
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(
+            self,
+            user_id: str | None = None,
+            priority: LLMPriority = LLMPriority.DIALOG
+    ) -> AsyncIterator[None]:
+        """Ждет своей очереди и держит слот, пока выполняется запрос"""
+        enqueued_at = time.monotonic()
+        waiter = _Waiter(
+            priority=int(priority),
+            seq=next(self._seq),
+            user_id=user_id,
+            future=asyncio.get_running_loop().create_future()
+        )
+        bisect.insort(self._queue, waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # слот успели выдать — возвращаем
+                self._release(user_id)
+            else:
+                self._queue.remove(waiter)
+                self._update_gauges()
+            raise
+
+        wait = time.monotonic() - enqueued_at
+        self.stats.observe_wait(priority, wait)
+        logger.debug(f"LLM slot for user {user_id} ({priority.name}) after {wait:.3f}s")
+
+        try:
+            yield
+        finally:
+            self._release(user_id)
+
+    def _dispatch(self):
+        """Раздает свободные слоты ожидающим по приоритету, пропуская юзеров с активным запросом"""
+        index = 0
+        while self._in_flight < self.max_in_flight and index < len(self._queue):
+            waiter = self._queue[index]
+            if waiter.user_id is not None and waiter.user_id in self._active_users:
+                index += 1
+                continue
+
+            self._queue.pop(index)
+            self._in_flight += 1
+            if waiter.user_id is not None:
+                self._active_users.add(waiter.user_id)
+            waiter.future.set_result(None)
+
+        self._update_gauges()
+
+    def _release(self, user_id: str | None):
+        self._in_flight -= 1
+        if user_id is not None:
+            self._active_users.discard(user_id)
+        self._dispatch()
+
+    def _update_gauges(self):
+        self.stats.in_flight = self._in_flight
+        self.stats.queue_depth = len(self._queue)
+        llm_scheduler_in_flight.set(value=self._in_flight)
+        llm_scheduler_queue_depth.set(value=len(self._queue))
@@ -1,7 +1,9 @@
 
-from .models import DatabaseConfig, BotConfig, RedisConfig, AssistantConfig, PaymentConfig
+from .models import DatabaseConfig, BotConfig, RedisConfig, AssistantConfig, PaymentConfig, UpdateQueueConfig, \
+    BrokerConfig, LoggingConfig, MetricsConfig
 
-from .readers import get_database_config, get_bot_config, get_redis_config, get_assistant_config, get_payment_config
+from .readers import get_database_config, get_bot_config, get_redis_config, get_assistant_config, get_payment_config, \
+    get_update_queue_config, get_broker_config, get_logging_config, get_metrics_config
 
 
 
@@ -14,5 +16,13 @@ __all__=['DatabaseConfig',
         'AssistantConfig',
         'get_assistant_config',
         'PaymentConfig',
-        'get_payment_config'
+        'get_payment_config',
+        'UpdateQueueConfig',
+        'get_update_queue_config',
+        'BrokerConfig',
+        'get_broker_config',
+        'LoggingConfig',
+        'get_logging_config',
+        'MetricsConfig',
+        'get_metrics_config'
          ]
\ No newline at end of file
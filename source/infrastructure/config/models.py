@@ -1,3 +1,5 @@
+from urllib.parse import quote
+
 from pydantic import (
     BaseModel,
     SecretStr,
@@ -48,10 +50,94 @@ class DatabaseConfig(BaseModel):
 
 class BotConfig(BaseModel):
     token: SecretStr
+    # свой сервер Bot API (локальный telegram-bot-api или заглушка нагрузочного теста); None — api.telegram.org
+    api_url: str | None = None
+
+    # [ outbound rate limits, на процесс ]
+    global_rate: float = 30.0
+    chat_rate: float = 1.0
+    chat_burst: int = 3
+    group_rate: float = 20 / 60
+    retry_after_attempts: int = 3
 
 
 class AssistantConfig(BaseModel):
     api_key: SecretStr
+    # OpenAI-совместимый API: DeepSeek или заглушка для тестов производительности
+    base_url: str = "https://api.deepseek.com"
+
+    # [ http pool ]
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+
+    # [ scheduler ]
+    # лимит на процесс, не глобальный: у N процессов с воркерами апдейтов к LLM идет до N * max_in_flight
+    max_in_flight: int = 32
+
+    # [ retries ]
+    request_deadline: float = 90.0
+    max_retries: int = 2
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 5.0
+
+    # [ circuit breaker ]
+    breaker_window: int = 30
+    breaker_min_calls: int = 10
+    breaker_error_rate: float = 0.5
+    breaker_slow_call_seconds: float = 20.0
+    breaker_slow_call_rate: float = 0.5
+    breaker_open_seconds: int = 30
+
+
+class UpdateQueueConfig(BaseModel):
+    # число стримов-партиций: апдейты одного чата всегда попадают в одну партицию
+    partitions: int = 16
+    # сколько апдейтов может ждать в одной партиции, прежде чем вебхук начнет отвечать 503
+    max_backlog: int = 1000
+
+    # [ worker ]
+    # воркер с индексом i читает партиции p, где p % worker_count == i
+    worker_index: int = 0
+    worker_count: int = 1
+    max_in_flight: int = 64
+    lease_ttl: int = 30
+    shutdown_timeout: float = 20.0
+    # запускать воркер в процессе FastAPI, а не отдельным `python -m update_worker`
+    embedded_worker: bool = True
+
+
+class BrokerConfig(BaseModel):
+    host: str = "nats"
+    port: int = 4222
+    user: str | None = None
+    password: SecretStr | None = None
+
+    def build_connection_url(self) -> str:
+        credentials = ""
+        if self.user:
+            password = self.password.get_secret_value() if self.password else ""
+            credentials = f"{quote(self.user, safe='')}:{quote(password, safe='')}@"
+        return f"nats://{credentials}{self.host}:{self.port}"
+
+
+class LoggingConfig(BaseModel):
+    level: str = "INFO"
+    # уровни отдельных логгеров: "aiogram.event=WARNING,source.infrastructure=DEBUG"
+    logger_levels: str = ""
+    # json или color (coloredlogs, для локальной разработки)
+    console_format: str = "json"
+    # пустая строка — без файла
+    file_path: str | None = "app.json.log"
+    # записи сверх очереди отбрасываются, а не блокируют event loop
+    queue_size: int = 10000
+    # записей в секунду на логгер и уровень ниже WARNING; 0 — без sampling
+    sample_rate: float = 20.0
+    sample_burst: int = 100
+    # тексты сообщений юзеров и ответов модели пишутся в лог только длиной
+    redact: bool = True
 
 
 class PaymentConfig(BaseModel):
@@ -59,3 +145,22 @@ class PaymentConfig(BaseModel):
 
     store_id: SecretStr
     store_token: SecretStr
+
+    # [ http pool ]
+    # h2 (httpx[http2]) не входит в зависимости: HTTP/2 — только по явному флагу при установленном пакете
+    http2: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 15.0
+
+    # [ retries ]
+    max_retries: int = 2
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 5.0
+
+
+class MetricsConfig(BaseModel):
+    # Bearer-токен для /metrics; без токена эндпоинт не отдается (404)
+    token: SecretStr | None = None
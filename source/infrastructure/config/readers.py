@@ -1,6 +1,7 @@
 from environs import Env
 
-from .models import DatabaseConfig, BotConfig, RedisConfig, AssistantConfig, PaymentConfig
+from .models import DatabaseConfig, BotConfig, RedisConfig, AssistantConfig, PaymentConfig, UpdateQueueConfig, \
+    BrokerConfig, LoggingConfig, MetricsConfig
 
 
 def get_database_config(env: Env) -> DatabaseConfig:
@@ -17,7 +18,13 @@ def get_database_config(env: Env) -> DatabaseConfig:
 
 def get_bot_config(env: Env) -> BotConfig:
     return BotConfig(
-        token=env.str("TELEGRAM_TOKEN")
+        token=env.str("TELEGRAM_TOKEN"),
+        api_url=env.str("TELEGRAM_API_URL", None),
+        global_rate=env.float("TELEGRAM_GLOBAL_RATE", 30.0),
+        chat_rate=env.float("TELEGRAM_CHAT_RATE", 1.0),
+        chat_burst=env.int("TELEGRAM_CHAT_BURST", 3),
+        group_rate=env.float("TELEGRAM_GROUP_RATE", 20 / 60),
+        retry_after_attempts=env.int("TELEGRAM_RETRY_AFTER_ATTEMPTS", 3),
     )
 
 
@@ -32,12 +39,79 @@ def get_redis_config(env: Env) -> RedisConfig:
 
 def get_assistant_config(env: Env) -> AssistantConfig:
     return AssistantConfig(
-        api_key=env.str("ASSISTANT_API_KEY", "")
+        api_key=env.str("ASSISTANT_API_KEY", ""),
+        base_url=env.str("ASSISTANT_BASE_URL", "https://api.deepseek.com"),
+        max_connections=env.int("ASSISTANT_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=env.int("ASSISTANT_MAX_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=env.float("ASSISTANT_KEEPALIVE_EXPIRY", 30.0),
+        connect_timeout=env.float("ASSISTANT_CONNECT_TIMEOUT", 5.0),
+        read_timeout=env.float("ASSISTANT_READ_TIMEOUT", 60.0),
+        max_in_flight=env.int("ASSISTANT_MAX_IN_FLIGHT", 32),
+        request_deadline=env.float("ASSISTANT_REQUEST_DEADLINE", 90.0),
+        max_retries=env.int("ASSISTANT_MAX_RETRIES", 2),
+        retry_base_delay=env.float("ASSISTANT_RETRY_BASE_DELAY", 0.5),
+        retry_max_delay=env.float("ASSISTANT_RETRY_MAX_DELAY", 5.0),
+        breaker_window=env.int("ASSISTANT_BREAKER_WINDOW", 30),
+        breaker_min_calls=env.int("ASSISTANT_BREAKER_MIN_CALLS", 10),
+        breaker_error_rate=env.float("ASSISTANT_BREAKER_ERROR_RATE", 0.5),
+        breaker_slow_call_seconds=env.float("ASSISTANT_BREAKER_SLOW_CALL_SECONDS", 20.0),
+        breaker_slow_call_rate=env.float("ASSISTANT_BREAKER_SLOW_CALL_RATE", 0.5),
+        breaker_open_seconds=env.int("ASSISTANT_BREAKER_OPEN_SECONDS", 30),
     )
 
 
 def get_payment_config(env: Env) -> PaymentConfig:
     return PaymentConfig(
         store_id=env.str("STORE_ID", ""),
-        store_token=env.str("STORE_TOKEN", "")
+        store_token=env.str("STORE_TOKEN", ""),
+        http2=env.bool("YOOKASSA_HTTP2", False),
+        max_connections=env.int("YOOKASSA_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=env.int("YOOKASSA_MAX_KEEPALIVE_CONNECTIONS", 10),
+        keepalive_expiry=env.float("YOOKASSA_KEEPALIVE_EXPIRY", 60.0),
+        connect_timeout=env.float("YOOKASSA_CONNECT_TIMEOUT", 5.0),
+        read_timeout=env.float("YOOKASSA_READ_TIMEOUT", 15.0),
+        max_retries=env.int("YOOKASSA_MAX_RETRIES", 2),
+        retry_base_delay=env.float("YOOKASSA_RETRY_BASE_DELAY", 0.5),
+        retry_max_delay=env.float("YOOKASSA_RETRY_MAX_DELAY", 5.0),
+    )
+
+
+def get_update_queue_config(env: Env) -> UpdateQueueConfig:
+    return UpdateQueueConfig(
+        partitions=env.int("UPDATE_QUEUE_PARTITIONS", 16),
+        max_backlog=env.int("UPDATE_QUEUE_MAX_BACKLOG", 1000),
+        worker_index=env.int("UPDATE_WORKER_INDEX", 0),
+        worker_count=env.int("UPDATE_WORKER_COUNT", 1),
+        max_in_flight=env.int("UPDATE_WORKER_MAX_IN_FLIGHT", 64),
+        lease_ttl=env.int("UPDATE_WORKER_LEASE_TTL", 30),
+        shutdown_timeout=env.float("UPDATE_WORKER_SHUTDOWN_TIMEOUT", 20.0),
+        embedded_worker=env.bool("UPDATE_WORKER_EMBEDDED", True),
+    )
+
+
+def get_broker_config(env: Env) -> BrokerConfig:
+    return BrokerConfig(
+        host=env.str("NATS_HOST", "nats"),
+        port=env.int("NATS_PORT", 4222),
+        user=env.str("NATS_USER", None),
+        password=env.str("NATS_PASSWORD", None),
+    )
+
+
+def get_logging_config(env: Env) -> LoggingConfig:
+    return LoggingConfig(
+        level=env.str("LOG_LEVEL", "INFO"),
+        logger_levels=env.str("LOG_LOGGER_LEVELS", ""),
+        console_format=env.str("LOG_CONSOLE_FORMAT", "json"),
+        file_path=env.str("LOG_FILE", "app.json.log") or None,
+        queue_size=env.int("LOG_QUEUE_SIZE", 10000),
+        sample_rate=env.float("LOG_SAMPLE_RATE", 20.0),
+        sample_burst=env.int("LOG_SAMPLE_BURST", 100),
+        redact=env.bool("LOG_REDACT", True),
+    )
+
+
+def get_metrics_config(env: Env) -> MetricsConfig:
+    return MetricsConfig(
+        token=env.str("METRICS_TOKEN", None) or None,
     )
@@ -1,13 +1,13 @@
 from datetime import datetime
 from typing import Type
 
-from sqlalchemy import String, DateTime, Integer
+from sqlalchemy import String, DateTime, Integer, Index, func, text
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Mapped, mapped_column
 
-from source.core.enum import SubscriptionType
-from source.core.schemas.payment_schema import PaymentSchema
-from source.infrastructure.database.models.base_model import BaseModel, S
+from source.core.enum import SubscriptionType, PaymentEventStatus
+from source.core.schemas.payment_schema import PaymentSchema, PaymentEventSchema
+from source.infrastructure.database.models.base_model import BaseModel, S, TimestampCreatedAtMixin
 
 
 class Payment(BaseModel):
@@ -35,3 +35,39 @@ class Payment(BaseModel):
     @property
     def schema_class(cls) -> Type[S]:
         return PaymentSchema
+
+
+class PaymentEvent(BaseModel, TimestampCreatedAtMixin):
+    """Входящая очередь уведомлений YooKassa: вебхук только пишет сюда, обрабатывает ProcessPaymentEvents"""
+    __tablename__ = "payment_events"
+    __table_args__ = (
+        # воркер выбирает только ожидающие события — индекс по ним остается маленьким
+        Index(
+            "ix_payment_events_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
+
+    event_key: Mapped[str] = mapped_column(String, comment="ID платежа + тип события", unique=True)
+    purchase_id: Mapped[str] = mapped_column(String, comment="ID Заказа")
+    event: Mapped[str] = mapped_column(String, comment="Тип события YooKassa")
+    payload: Mapped[dict] = mapped_column(postgresql.JSONB, comment="Уведомление целиком")
+
+    status: Mapped[PaymentEventStatus] = mapped_column(
+        String,
+        default=PaymentEventStatus.PENDING.value,
+        server_default=PaymentEventStatus.PENDING.value,
+        comment="pending / done / dead"
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", comment="Неудачных попыток")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        comment="Когда обрабатывать"
+    )
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True, comment="Последняя ошибка обработки")
+
+    @property
+    def schema_class(cls) -> Type[S]:
+        return PaymentEventSchema
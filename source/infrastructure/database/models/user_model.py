@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, Type
 from uuid import UUID
 
-from sqlalchemy import String, DateTime, ForeignKey, Integer, UUID as PG_UUID
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Index, UUID as PG_UUID
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -51,23 +51,25 @@ class User(BaseModel):
     last_daily_reset: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True),
                                                                  comment="Дата последнего daily reset (для FREE)")
 
+    # отношения не грузятся неявно: юзер читается на каждом апдейте, а логов у активного юзера тысячи.
+    # логи, настроения и характеристики читаются своими запросами в репозиториях
     logging_requests: Mapped[list["UserLog"]] = relationship(
         "UserLog",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     user_moods: Mapped[list["UserMood"]] = relationship(
         "UserMood",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     user_characteristics: Mapped[list["UserCharacteristic"]] = relationship(
         "UserCharacteristic",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     @property
@@ -78,6 +80,9 @@ class User(BaseModel):
 class UserLog(BaseModel, TimestampCreatedAtMixin):
     """Таблица с прошлыми диалогами"""
     __tablename__ = "user_logs"
+    __table_args__ = (
+        Index("ix_user_logs_user_id_created_at", "user_id", "created_at"),
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id"),
@@ -88,7 +93,7 @@ class UserLog(BaseModel, TimestampCreatedAtMixin):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="logging_requests",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     dialog_id: Mapped[PG_UUID] = mapped_column(
@@ -109,6 +114,9 @@ class UserLog(BaseModel, TimestampCreatedAtMixin):
 class UserMood(BaseModel, TimestampCreatedAtMixin):
     """Таблица с настроением юзера"""
     __tablename__ = "user_mood"
+    __table_args__ = (
+        Index("ix_user_mood_user_id_created_at", "user_id", "created_at"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"),
@@ -119,7 +127,7 @@ class UserMood(BaseModel, TimestampCreatedAtMixin):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="user_moods",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     mood: Mapped[int] = mapped_column(Integer, comment="Настроение юзера от 0 до 10")
@@ -139,6 +147,9 @@ class UserCharacteristic(BaseModel, TimestampCreatedAtMixin, TimestampUpdatedAtM
     """
 
     __tablename__ = "user_characteristic"
+    __table_args__ = (
+        Index("ix_user_characteristic_user_id_created_at", "user_id", "created_at"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"),
@@ -149,7 +160,7 @@ class UserCharacteristic(BaseModel, TimestampCreatedAtMixin, TimestampUpdatedAtM
     user: Mapped["User"] = relationship(
         "User",
         back_populates="user_characteristics",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     # mood_analysis
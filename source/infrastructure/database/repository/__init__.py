@@ -1,9 +1,11 @@
 from .user_repo import UserRepository
 from .base_repo import BaseRepository
 from .payment_repo import PaymentRepository
+from .payment_event_repo import PaymentEventRepository
 
 __all__=[
     'UserRepository',
     'BaseRepository',
-    'PaymentRepository'
+    'PaymentRepository',
+    'PaymentEventRepository'
 ]
\ No newline at end of file
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from source.core.enum import PaymentEventStatus
+from source.core.schemas.payment_schema import PaymentEventSchema
+from source.infrastructure.database.models.payment_model import PaymentEvent
+from source.infrastructure.database.repository.base_repo import BaseRepository
+
+
+class PaymentEventRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__(model=PaymentEvent, session=session)
+
+    async def add(self, event_key: str, purchase_id: str, event: str, payload: dict[str, Any]) -> bool:
+        """Сохраняет уведомление; False — такое уже есть (повторная доставка вебхука)"""
+        stmt = (
+            postgresql_insert(self.model)
+            .values(event_key=event_key, purchase_id=purchase_id, event=event, payload=payload)
+            .on_conflict_do_nothing(index_elements=[self.model.event_key])
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def lock_due(self, limit: int) -> list[PaymentEventSchema]:
+        """
+        Ожидающие события, срок которых подошел, с блокировкой строк до конца транзакции.
+        SKIP LOCKED: несколько воркеров разбирают очередь параллельно, не мешая друг другу
+        """
+        stmt = (
+            select(self.model)
+            .where(self.model.status == PaymentEventStatus.PENDING.value, self.model.next_attempt_at <= func.now())
+            .order_by(self.model.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        events: Sequence[PaymentEvent] = result.scalars().all()
+        return [event.get_schema() for event in events]
+
+    async def mark_done(self, event_id: UUID) -> None:
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id == event_id)
+            .values(status=PaymentEventStatus.DONE.value, last_error=None)
+        )
+
+    async def mark_failed(
+            self,
+            event_id: UUID,
+            attempts: int,
+            next_attempt_at: datetime,
+            error: str,
+            dead: bool = False
+    ) -> None:
+        """Откладывает событие на повтор или, если dead, переводит в dead letter"""
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id == event_id)
+            .values(
+                status=(PaymentEventStatus.DEAD if dead else PaymentEventStatus.PENDING).value,
+                attempts=attempts,
+                next_attempt_at=next_attempt_at,
+                last_error=error
+            )
+        )
@@ -28,4 +28,11 @@ class PaymentRepository(BaseRepository):
         stmt: Select = select(self.model).where(self.model.purchase_id == purchase_id)
         result = await self.session.execute(stmt)
         model: M = result.scalar_one_or_none()
-        return model.get_schema()
+        return model.get_schema() if model is not None else None
+
+    async def lock_by_purchase_id(self, purchase_id: str) -> PaymentSchema | None:
+        """Платеж с блокировкой строки до конца транзакции: одно событие оплаты активирует подписку один раз"""
+        stmt: Select = select(self.model).where(self.model.purchase_id == purchase_id).with_for_update()
+        result = await self.session.execute(stmt)
+        model: M = result.scalar_one_or_none()
+        return model.get_schema() if model is not None else None
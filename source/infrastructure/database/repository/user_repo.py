@@ -1,12 +1,15 @@
 import logging
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 from typing import Sequence
 
-from sqlalchemy import Select, and_, insert
+from sqlalchemy import Select, and_, insert, update, bindparam
 from sqlalchemy import select, desc
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from source.core.enum import SubscriptionType
 from source.core.schemas.assistant_schemas import UserCharacteristicAssistantResponse
 from source.core.schemas.user_schema import UserSchema, UserCharacteristicSchema, UserLogCreateSchema, UserLogSchema, \
     UserMoodSchema
@@ -15,6 +18,10 @@ from source.infrastructure.database.repository.base_repo import BaseRepository
 
 logger = logging.getLogger(__name__)
 
+MESSAGE_COUNTER_COLUMNS = ("daily_messages_used", "messages_used", "last_daily_reset")
+# колонки-даты приходят из Redis как unix-время
+MESSAGE_COUNTER_TIMESTAMP_COLUMNS = ("last_daily_reset",)
+
 
 class UserRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
@@ -31,6 +38,64 @@ class UserRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_telegram_ids_after(self, last_telegram_id: str | None, limit: int) -> list[str]:
+        """
+        Следующая пачка telegram_id по возрастанию — keyset-пагинация по уникальному индексу,
+        без OFFSET: каждая пачка стоит одинаково, сколько бы юзеров ни было до нее
+        """
+        stmt = select(self.model.telegram_id).order_by(self.model.telegram_id).limit(limit)
+        if last_telegram_id is not None:
+            stmt = stmt.where(self.model.telegram_id > last_telegram_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def activate_subscription(
+            self,
+            telegram_id: str,
+            subscription: SubscriptionType,
+            start: datetime,
+            date_end: datetime
+    ) -> bool:
+        """Новая подписка с обнулением счетчиков одним UPDATE; False — юзера нет"""
+        stmt = (
+            update(self.model)
+            .where(self.model.telegram_id == telegram_id)
+            .values(
+                subscription=subscription,
+                subscription_start=start,
+                subscription_date_end=date_end,
+                messages_used=0,
+                daily_messages_used=0
+            )
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def update_message_counters(self, counters: dict[tuple[str, str], int], batch_size: int = 500) -> None:
+        """
+        Пакетно обновляет счетчики сообщений и начало окна FREE: (telegram_id, колонка) -> значение.
+        Один executemany UPDATE на колонку и пачку вместо merge каждого юзера
+        """
+        by_column: dict[str, list[dict]] = defaultdict(list)
+        for (telegram_id, column), value in counters.items():
+            if column not in MESSAGE_COUNTER_COLUMNS:
+                logger.warning(f"Skip unknown message counter column {column} for user {telegram_id}")
+                continue
+            if column in MESSAGE_COUNTER_TIMESTAMP_COLUMNS:
+                value = datetime.fromtimestamp(value, timezone.utc)
+            by_column[column].append({"counter_telegram_id": telegram_id, "counter_value": value})
+
+        table = self.model.__table__
+        for column, rows in by_column.items():
+            stmt = (
+                update(table)
+                .where(table.c.telegram_id == bindparam("counter_telegram_id"))
+                .values({column: bindparam("counter_value")})
+            )
+            for start in range(0, len(rows), batch_size):
+                await self.session.execute(stmt, rows[start:start + batch_size])
+
     async def is_mood_set_today(self, telegram_id: str) -> bool:
         """Возвращает булевое значение оценивал ли настроение юзер или нет"""
         # Получаем начало и конец текущего дня в UTC
@@ -167,6 +232,20 @@ class UserRepository(BaseRepository):
             await self.session.rollback()
             return None
 
+    async def create_user_logs(self, user_logs: list[UserLogSchema]) -> None:
+        """
+        Вставляет пачку логов одним INSERT ... VALUES (...), (...).
+        id задается заранее, поэтому повторная вставка той же пачки (после падения до ack) ничего не дублирует
+        """
+        if not user_logs:
+            return
+        stmt = (
+            postgresql_insert(UserLog)
+            .values([user_log.model_dump() for user_log in user_logs])
+            .on_conflict_do_nothing(index_elements=[UserLog.id])
+        )
+        await self.session.execute(stmt)
+
     async def get_user_logs(self, telegram_id: str, days: int | None = None) -> list[UserLogSchema] | None:
         """Получает логи пользователя по telegram_id
 
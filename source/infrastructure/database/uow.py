@@ -16,6 +16,10 @@ class UnitOfWork:
     async def commit(self):
         await self.session.commit()
     
+    def savepoint(self):
+        """SAVEPOINT внутри текущей транзакции: `async with uow.savepoint():` откатывает только свой блок"""
+        return self.session.begin_nested()
+
     async def rollback(self):
         await self.session.rollback()
     
@@ -3,6 +3,7 @@ from dishka.integrations.aiogram import AiogramProvider
 from dishka.integrations.fastapi import FastapiProvider
 
 from .bot import BotProvider, DispatcherProvider
+from .broker import BrokerProvider
 from .config import ConfigProvider
 from .db import DatabaseProvider
 from .interactors import InteractorsProvider
@@ -10,6 +11,7 @@ from .neuron import AssistantProvider
 from .payment import PaymentProvider
 from .repositories import RepositoryProvider
 from .storage_redis import RedisProvider
+from .update_queue import UpdateQueueProvider
 
 
 def make_dishka_container() -> AsyncContainer:
@@ -24,6 +26,8 @@ def make_dishka_container() -> AsyncContainer:
             PaymentProvider(),
             BotProvider(),
             DispatcherProvider(),
+            UpdateQueueProvider(),
+            BrokerProvider(),
             AiogramProvider(),
             FastapiProvider()
         ]
@@ -1,13 +1,20 @@
 from aiogram import Bot, Dispatcher
 from aiogram.client.bot import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.base import BaseStorage, BaseEventIsolation
 from dishka import Provider, Scope, provide, AsyncContainer
 from dishka.integrations.aiogram import setup_dishka
 
 from source.infrastructure.config import BotConfig
+from source.infrastructure.telegram.rate_limiter import OutboundRateLimiter
+from source.infrastructure.telegram.request_middleware import RateLimitMiddleware
 from source.presentation.telegram.handlers import handlers_router
-from source.presentation.telegram.middlewares import LoadUserMiddleware, LimitCheckMiddleware
+from source.presentation.telegram.media import MaterialSender
+from source.application.redis_services.idempotency.idempotency_service import IdempotencyService
+from source.presentation.telegram.middlewares import LoadUserMiddleware, LimitCheckMiddleware, DeduplicateUpdateMiddleware, \
+    HandlerMetricsMiddleware, TimedMiddleware
 from source.presentation.telegram.middlewares.load_user_mood import LoadUserMood
 
 
@@ -15,13 +22,29 @@ class BotProvider(Provider):
     scope = Scope.APP
 
     @provide
-    def get_bot(self, config: BotConfig) -> Bot:
-        return Bot(
+    def get_outbound_rate_limiter(self, config: BotConfig) -> OutboundRateLimiter:
+        return OutboundRateLimiter(
+            global_rate=config.global_rate,
+            chat_rate=config.chat_rate,
+            chat_burst=config.chat_burst,
+            group_rate=config.group_rate
+        )
+
+    @provide
+    def get_bot(self, config: BotConfig, limiter: OutboundRateLimiter) -> Bot:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(config.api_url)) if config.api_url else None
+        bot = Bot(
             token=config.token.get_secret_value(),
+            session=session,
             default=DefaultBotProperties(
                 parse_mode=ParseMode.HTML
             )
         )
+        # все исходящие запросы — через лимиты Telegram и повтор по retry_after
+        bot.session.middleware(RateLimitMiddleware(limiter, max_retries=config.retry_after_attempts))
+        return bot
+
+    material_sender = provide(MaterialSender)
 
 
 class DispatcherProvider(Provider):
@@ -32,19 +55,27 @@ class DispatcherProvider(Provider):
             self,
             dishka: AsyncContainer,
             storage: BaseStorage,
-            event_isolation: BaseEventIsolation
+            event_isolation: BaseEventIsolation,
+            idempotency: IdempotencyService
     ) -> Dispatcher:
         dp = Dispatcher(storage=storage, events_isolation=event_isolation)
         dp.include_router(handlers_router)
 
         # [ middlewares ]
-        dp.update.middleware(LoadUserMiddleware())
+        # outer и до setup_dishka: повтор отбрасывается раньше, чем откроется контейнер
+        # TimedMiddleware пишет собственное время middleware в telegram_middleware_seconds
+        dp.update.outer_middleware(TimedMiddleware(DeduplicateUpdateMiddleware(idempotency)))
+        dp.update.middleware(TimedMiddleware(LoadUserMiddleware()))
 
         # mood
-        dp.message.middleware(LoadUserMood())  # Для сообщений
-        dp.callback_query.middleware(LoadUserMood())  # Для callback_query
+        dp.message.middleware(TimedMiddleware(LoadUserMood()))  # Для сообщений
+        dp.callback_query.middleware(TimedMiddleware(LoadUserMood()))  # Для callback_query
+
+        dp.message.middleware(TimedMiddleware(LimitCheckMiddleware()))
 
-        dp.message.middleware(LimitCheckMiddleware())
+        # последними: время самих хэндлеров
+        dp.message.middleware(HandlerMetricsMiddleware())
+        dp.callback_query.middleware(HandlerMetricsMiddleware())
 
         setup_dishka(dishka, dp, auto_inject=True)
         return dp
@@ -1,17 +1,22 @@
-
 from typing import AsyncIterable
 
-from dishka import Provider, provide
-
+from dishka import Provider, provide, Scope, AsyncContainer
+from dishka.integrations.faststream import setup_dishka
 from faststream.nats import NatsBroker
 
+from source.infrastructure.config import BrokerConfig
+from source.presentation.stream.routes import mailing_router
+
 
-class Broker(Provider):
+class BrokerProvider(Provider):
+    scope = Scope.APP
 
     @provide
-    async def get_broker(self, config: BrokerConfig) -> AsyncIterable[NatsBroker]:
+    async def get_broker(self, dishka: AsyncContainer, config: BrokerConfig) -> AsyncIterable[NatsBroker]:
         broker = NatsBroker(config.build_connection_url())
-        broker.include_router(main_router)
-        await broker.connect()
+        broker.include_router(mailing_router)
+        # контейнер общий с FastAPI и aiogram — закрывает его lifespan, а не брокер
+        setup_dishka(dishka, broker=broker, finalize_container=False)
+        # подключается и запускает консьюмеры lifespan (broker.start), здесь только закрываем
         yield broker
-        await broker.close()
\ No newline at end of file
+        await broker.close()
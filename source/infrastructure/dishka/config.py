@@ -4,6 +4,9 @@ from source.infrastructure.config import BotConfig, get_bot_config
 from source.infrastructure.config import RedisConfig, get_redis_config
 from source.infrastructure.config import AssistantConfig, get_assistant_config
 from source.infrastructure.config import PaymentConfig, get_payment_config
+from source.infrastructure.config import UpdateQueueConfig, get_update_queue_config
+from source.infrastructure.config import BrokerConfig, get_broker_config
+from source.infrastructure.config import MetricsConfig, get_metrics_config
 
 from environs import Env
 
@@ -30,6 +33,18 @@ class ConfigProvider(Provider):
     @provide
     def get_payment_config(self, env: Env) -> PaymentConfig:
         return get_payment_config(env)
+
+    @provide
+    def get_update_queue_config(self, env: Env) -> UpdateQueueConfig:
+        return get_update_queue_config(env)
+
+    @provide
+    def get_broker_config(self, env: Env) -> BrokerConfig:
+        return get_broker_config(env)
+
+    @provide
+    def get_metrics_config(self, env: Env) -> MetricsConfig:
+        return get_metrics_config(env)
     
     @provide
     def get_env(self) -> Env:
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine, AsyncSession
 
 from source.infrastructure.config import DatabaseConfig
 from source.infrastructure.database.uow import UnitOfWork
+from source.infrastructure.metrics import TimedQueuePool
 
 
 class DatabaseProvider(Provider):
@@ -13,7 +14,7 @@ class DatabaseProvider(Provider):
 
     @provide
     async def get_engine(self, config: DatabaseConfig) -> AsyncIterable[AsyncEngine]:
-        engine = create_async_engine(config.build_connection_url())
+        engine = create_async_engine(config.build_connection_url(), poolclass=TimedQueuePool)
         try:
             yield engine
         finally:
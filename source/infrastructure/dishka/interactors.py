@@ -1,17 +1,40 @@
+from collections.abc import AsyncIterable
+
+from aiogram import Bot
 from dishka import Provider, provide, Scope
+from faststream.nats import NatsBroker
 from redis.asyncio import Redis
 
 from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
+from source.application.mailing import DeliverMailingMessage, GetMailingReport, LoadMailingAudience, StartMailing
+from source.application.payment.payment_events import RecordPaymentEvent, ProcessPaymentEvents
 from source.application.payment.payment_service import PaymentService
+from source.application.redis_services.idempotency.idempotency_service import IdempotencyService
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.application.redis_services.media_cache.media_cache_service import MediaCacheService
+from source.application.redis_services.message_coalescer.message_coalescer_service import MessageCoalescerService
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
+from source.application.redis_services.message_quota.message_quota_service import MessageQuotaService
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
+from source.application.redis_services.user_log_stream.user_log_stream_service import UserLogStreamService
 from source.application.subscription.subscription_service import SubscriptionService
+from source.application.subscription.sync_message_counters import SyncMessageCounters
 from source.application.user import CreateUser, GetUserById, GetUserSchemaById, MergeUser
 from source.application.user.user_characteristic import GetUserCharacteristics, PutGeneratedUserCharacteristic, \
     MayGenerateCharacteristic
-from source.application.user.user_logs import CreateUserLog, GetAllUserLogs, GetLastUserLogs
+from source.application.user.user_logs import CreateUserLog, GetAllUserLogs, GetLastUserLogs, FlushUserLogs
 from source.application.user.user_mood import IsMoodSetToday, GetUserMoods, SetMood
 from source.application.payment.merge import MergePayment
-from source.core.lexicon.rules import HISTORY_MAX_LEN
+from source.core.lexicon.rules import HISTORY_MAX_LEN, HISTORY_TTL, MESSAGE_COALESCE_WINDOW, CONTEXT_TOKEN_BUDGET, \
+    HISTORY_SUMMARY_LOCK_TTL, LIMIT_MESSAGE_FREE, LIMIT_MESSAGE_STANDARD, FREE_MESSAGES_WINDOW, \
+    MESSAGE_COUNTERS_SYNC_BATCH_SIZE, USER_LOG_FLUSH_BATCH_SIZE, USER_LOG_CLAIM_IDLE, USER_LOG_MAX_DELIVERIES, \
+    IDEMPOTENCY_PROCESSING_TTL, IDEMPOTENCY_DONE_TTL, MAILING_CHUNK_SIZE, MAILING_PROGRESS_TTL, PAYMENT_EVENTS_BATCH_SIZE, \
+    PAYMENT_EVENT_MAX_ATTEMPTS, PAYMENT_EVENT_RETRY_BASE_DELAY, PAYMENT_EVENT_RETRY_MAX_DELAY, USER_CACHE_TTL, \
+    USER_CACHE_LOCAL_TTL, USER_CACHE_LOCAL_MAX_SIZE
+from source.infrastructure.database.repository import UserRepository, PaymentRepository, PaymentEventRepository
+from source.infrastructure.database.uow import UnitOfWork
+from source.infrastructure.serialization import RedisSerializer
 
 
 class InteractorsProvider(Provider):
@@ -23,6 +46,7 @@ class InteractorsProvider(Provider):
 
     # [ payment ]
     merge_payment = provide(MergePayment)
+    record_payment_event = provide(RecordPaymentEvent)
     
     # [ user ]
     create_user = provide(CreateUser)
@@ -45,6 +69,150 @@ class InteractorsProvider(Provider):
     put_user_characteristics = provide(PutGeneratedUserCharacteristic)
     may_generate_characteristic = provide(MayGenerateCharacteristic)
 
+    # [ mailing ]
+    start_mailing = provide(StartMailing)
+    deliver_mailing_message = provide(DeliverMailingMessage)
+    get_mailing_report = provide(GetMailingReport)
+
+    @provide
+    def get_message_history(self, redis_client: Redis, serializer: RedisSerializer) -> MessageHistoryService:
+        return MessageHistoryService(
+            redis_client=redis_client,
+            serializer=serializer,
+            history_max_len=HISTORY_MAX_LEN,
+            history_ttl=HISTORY_TTL
+        )
+
+    @provide
+    def get_message_coalescer(self, redis_client: Redis) -> MessageCoalescerService:
+        return MessageCoalescerService(redis_client=redis_client, window_seconds=MESSAGE_COALESCE_WINDOW)
+
+    @provide(scope=Scope.APP)
+    def get_media_cache(self, redis_client: Redis) -> MediaCacheService:
+        return MediaCacheService(redis_client=redis_client)
+
+    @provide(scope=Scope.APP)
+    def get_idempotency(self, redis_client: Redis) -> IdempotencyService:
+        return IdempotencyService(
+            redis_client=redis_client,
+            processing_ttl=IDEMPOTENCY_PROCESSING_TTL,
+            done_ttl=IDEMPOTENCY_DONE_TTL
+        )
+
+    @provide(scope=Scope.APP)
+    def get_mailing_progress(self, redis_client: Redis) -> MailingProgressService:
+        return MailingProgressService(redis_client=redis_client, progress_ttl=MAILING_PROGRESS_TTL)
+
+    @provide
+    def get_load_mailing_audience(
+            self,
+            progress: MailingProgressService,
+            repository: UserRepository,
+            uow: UnitOfWork,
+            broker: NatsBroker
+    ) -> LoadMailingAudience:
+        return LoadMailingAudience(
+            progress=progress,
+            repository=repository,
+            uow=uow,
+            broker=broker,
+            chunk_size=MAILING_CHUNK_SIZE
+        )
+
+    @provide(scope=Scope.APP)
+    def get_user_log_stream(self, redis_client: Redis, serializer: RedisSerializer) -> UserLogStreamService:
+        return UserLogStreamService(
+            redis_client=redis_client,
+            serializer=serializer,
+            claim_idle=USER_LOG_CLAIM_IDLE
+        )
+
+    @provide
+    def get_flush_user_logs(
+            self,
+            log_stream: UserLogStreamService,
+            repository: UserRepository,
+            uow: UnitOfWork
+    ) -> FlushUserLogs:
+        return FlushUserLogs(
+            log_stream=log_stream,
+            repository=repository,
+            uow=uow,
+            batch_size=USER_LOG_FLUSH_BATCH_SIZE,
+            max_deliveries=USER_LOG_MAX_DELIVERIES
+        )
+
+    @provide
+    def get_process_payment_events(
+            self,
+            event_repository: PaymentEventRepository,
+            payment_repository: PaymentRepository,
+            user_repository: UserRepository,
+            uow: UnitOfWork,
+            user_cache: UserCacheService,
+            bot: Bot
+    ) -> ProcessPaymentEvents:
+        return ProcessPaymentEvents(
+            event_repository=event_repository,
+            payment_repository=payment_repository,
+            user_repository=user_repository,
+            uow=uow,
+            user_cache=user_cache,
+            bot=bot,
+            batch_size=PAYMENT_EVENTS_BATCH_SIZE,
+            max_attempts=PAYMENT_EVENT_MAX_ATTEMPTS,
+            retry_base_delay=PAYMENT_EVENT_RETRY_BASE_DELAY,
+            retry_max_delay=PAYMENT_EVENT_RETRY_MAX_DELAY
+        )
+
+    @provide(scope=Scope.APP)
+    async def get_user_cache(self, redis_client: Redis, serializer: RedisSerializer) -> AsyncIterable[UserCacheService]:
+        """Один кэш (и одна подписка на инвалидации) на процесс"""
+        cache = UserCacheService(
+            redis_client=redis_client,
+            serializer=serializer,
+            ttl=USER_CACHE_TTL,
+            local_ttl=USER_CACHE_LOCAL_TTL,
+            local_max_size=USER_CACHE_LOCAL_MAX_SIZE
+        )
+        await cache.start()
+        try:
+            yield cache
+        finally:
+            await cache.stop()
+
+    @provide(scope=Scope.APP)
+    def get_message_quota(self, redis_client: Redis) -> MessageQuotaService:
+        return MessageQuotaService(
+            redis_client=redis_client,
+            free_daily_limit=LIMIT_MESSAGE_FREE,
+            standard_monthly_limit=LIMIT_MESSAGE_STANDARD,
+            free_window_seconds=FREE_MESSAGES_WINDOW
+        )
+
+    @provide
+    def get_sync_message_counters(
+            self,
+            quota: MessageQuotaService,
+            repository: UserRepository,
+            uow: UnitOfWork
+    ) -> SyncMessageCounters:
+        return SyncMessageCounters(
+            quota=quota,
+            repository=repository,
+            uow=uow,
+            batch_size=MESSAGE_COUNTERS_SYNC_BATCH_SIZE
+        )
+
     @provide
-    def get_message_history(self, redis_client: Redis) -> MessageHistoryService:
-        return MessageHistoryService(redis_client=redis_client, history_max_len=HISTORY_MAX_LEN)
+    def get_dialog_context_builder(
+            self,
+            message_history_service: MessageHistoryService,
+            assistant_service: AssistantService
+    ) -> BuildDialogContext:
+        return BuildDialogContext(
+            message_history_service=message_history_service,
+            assistant_service=assistant_service,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            summary_lock_ttl=HISTORY_SUMMARY_LOCK_TTL
+        )
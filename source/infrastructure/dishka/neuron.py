@@ -1,17 +1,72 @@
+from typing import AsyncIterable
+
+import httpx
 from dishka import Provider, provide, Scope
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from redis.asyncio import Redis
 
 from source.infrastructure.config import AssistantConfig
 from source.infrastructure.ai_assistant.ai_assistant import AssistantClient
+from source.infrastructure.ai_assistant.circuit_breaker import CircuitBreaker
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
+
 
 class AssistantProvider(Provider):
-    scope = Scope.REQUEST
+    scope = Scope.APP
+
+    @provide
+    async def get_openai(self, config: AssistantConfig) -> AsyncIterable[AsyncOpenAI]:
+        """Один клиент (и один keep-alive пул соединений) на всё приложение"""
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        )
+        client = AsyncOpenAI(
+            api_key=config.api_key.get_secret_value(),
+            base_url=config.base_url,
+            http_client=http_client,
+            max_retries=0,  # повторы делает AssistantClient
+        )
+        try:
+            yield client
+        finally:
+            await client.close()
+
+    @provide
+    def get_scheduler(self, config: AssistantConfig) -> LLMRequestScheduler:
+        return LLMRequestScheduler(max_in_flight=config.max_in_flight)
 
     @provide
-    def get_openai(self, config: AssistantConfig) -> OpenAI:
-        return OpenAI(api_key=config.api_key.get_secret_value(), base_url="https://api.deepseek.com")
+    def get_circuit_breaker(self, redis: Redis, config: AssistantConfig) -> CircuitBreaker:
+        return CircuitBreaker(
+            redis=redis,
+            name="deepseek",
+            window_seconds=config.breaker_window,
+            min_calls=config.breaker_min_calls,
+            error_rate=config.breaker_error_rate,
+            slow_call_seconds=config.breaker_slow_call_seconds,
+            slow_call_rate=config.breaker_slow_call_rate,
+            open_seconds=config.breaker_open_seconds,
+        )
 
     @provide
-    def get_assistant(self, client: OpenAI) -> AssistantClient:
-        return AssistantClient(client=client)
-        
\ No newline at end of file
+    def get_assistant(
+            self,
+            client: AsyncOpenAI,
+            scheduler: LLMRequestScheduler,
+            breaker: CircuitBreaker,
+            config: AssistantConfig
+    ) -> AssistantClient:
+        return AssistantClient(
+            client=client,
+            scheduler=scheduler,
+            breaker=breaker,
+            request_deadline=config.request_deadline,
+            max_retries=config.max_retries,
+            retry_base_delay=config.retry_base_delay,
+            retry_max_delay=config.retry_max_delay,
+        )
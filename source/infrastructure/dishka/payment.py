@@ -1,14 +1,42 @@
+import logging
+from importlib.util import find_spec
+from typing import AsyncIterable
+
+import httpx
 from dishka import Provider, provide, Scope
+
 from source.infrastructure.yookassa import YooKassaClient
 from source.infrastructure.config import PaymentConfig
 
+logger = logging.getLogger(__name__)
+
 
 class PaymentProvider(Provider):
-    scope = Scope.REQUEST
+    scope = Scope.APP
 
     @provide
-    def get_payment_client(self, config: PaymentConfig) -> YooKassaClient:
-        return YooKassaClient(store_id=config.store_id.get_secret_value(),
-                       store_token=config.store_token.get_secret_value())
+    async def get_payment_client(self, config: PaymentConfig) -> AsyncIterable[YooKassaClient]:
+        """Один пул соединений с YooKassa на всё приложение; закрывается вместе с контейнером"""
+        http2 = config.http2 and find_spec("h2") is not None
+        if config.http2 and not http2:
+            logger.warning("YooKassa: пакет h2 не установлен, соединения будут по HTTP/1.1")
 
-    
\ No newline at end of file
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            auth=(config.store_id.get_secret_value(), config.store_token.get_secret_value()),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        )
+        try:
+            yield YooKassaClient(
+                http_client=http_client,
+                max_retries=config.max_retries,
+                retry_base_delay=config.retry_base_delay,
+                retry_max_delay=config.retry_max_delay,
+            )
+        finally:
+            await http_client.aclose()
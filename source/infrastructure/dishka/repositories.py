@@ -1,7 +1,7 @@
 
 from dishka import Provider, provide, Scope
 
-from source.infrastructure.database.repository import UserRepository, PaymentRepository
+from source.infrastructure.database.repository import UserRepository, PaymentRepository, PaymentEventRepository
 
 
 class RepositoryProvider(Provider):
@@ -9,3 +9,4 @@ class RepositoryProvider(Provider):
 
     user_repository = provide(UserRepository)
     payment_repository = provide(PaymentRepository)
+    payment_event_repository = provide(PaymentEventRepository)
@@ -10,7 +10,8 @@ from dishka import AnyOf, Provider, Scope, provide
 from redis.asyncio import Redis
 
 from source.infrastructure.config import RedisConfig
-from source.presentation.telegram.utils import custom_json_loads, custom_json_dumps
+from source.infrastructure.metrics import TimedConnectionPool
+from source.infrastructure.serialization import RedisSerializer, get_redis_serializer
 
 
 class RedisProvider(Provider):
@@ -18,18 +19,21 @@ class RedisProvider(Provider):
 
     @provide
     async def get_redis(self, config: RedisConfig) -> AsyncIterable[Redis]:
-        async with Redis.from_url(
-            config.build_url()
-        ) as redis:
+        # from_pool: пул закрывается вместе с клиентом, как у Redis.from_url
+        async with Redis.from_pool(TimedConnectionPool.from_url(config.build_url())) as redis:
             yield redis
 
     @provide
-    def get_redis_storage(self, redis: Redis) -> AnyOf[BaseStorage, RedisStorage]:
+    def get_serializer(self) -> RedisSerializer:
+        return get_redis_serializer()
+
+    @provide
+    def get_redis_storage(self, redis: Redis, serializer: RedisSerializer) -> AnyOf[BaseStorage, RedisStorage]:
         return RedisStorage(
             redis=redis,
             key_builder=DefaultKeyBuilder(with_destiny=True),
-            json_loads=custom_json_loads,
-            json_dumps=custom_json_dumps
+            json_loads=serializer.loads,
+            json_dumps=serializer.dumps
         )
     
     @provide
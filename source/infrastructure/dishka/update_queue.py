@@ -0,0 +1,40 @@
+from aiogram import Bot, Dispatcher
+from dishka import Provider, provide, Scope, AsyncContainer
+from redis.asyncio import Redis
+
+from source.application.redis_services.update_queue.update_queue_service import UpdateQueueService
+from source.infrastructure.config import UpdateQueueConfig
+from source.presentation.telegram.update_worker import UpdateWorkerPool, assigned_partitions
+
+
+class UpdateQueueProvider(Provider):
+    scope = Scope.APP
+
+    @provide
+    def get_update_queue(self, redis_client: Redis, config: UpdateQueueConfig) -> UpdateQueueService:
+        return UpdateQueueService(
+            redis_client=redis_client,
+            partitions=config.partitions,
+            max_backlog=config.max_backlog
+        )
+
+    @provide
+    def get_update_worker_pool(
+            self,
+            dishka: AsyncContainer,
+            queue: UpdateQueueService,
+            dispatcher: Dispatcher,
+            bot: Bot,
+            config: UpdateQueueConfig
+    ) -> UpdateWorkerPool:
+        return UpdateWorkerPool(
+            queue=queue,
+            dispatcher=dispatcher,
+            bot=bot,
+            container=dishka,
+            partitions=assigned_partitions(config.partitions, config.worker_index, config.worker_count),
+            worker_index=config.worker_index,
+            max_in_flight=config.max_in_flight,
+            lease_ttl=config.lease_ttl,
+            shutdown_timeout=config.shutdown_timeout
+        )
@@ -0,0 +1,16 @@
+from .event_loop import monitor_event_loop_lag
+from .metrics import registry
+from .pools import TimedQueuePool, TimedConnectionPool
+from .registry import CONTENT_TYPE, MetricsRegistry, Counter, Gauge, Histogram
+
+__all__ = [
+    "registry",
+    "monitor_event_loop_lag",
+    "TimedQueuePool",
+    "TimedConnectionPool",
+    "CONTENT_TYPE",
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+]
@@ -0,0 +1,15 @@
+import asyncio
+import time
+
+from source.infrastructure.metrics.metrics import event_loop_lag_seconds
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """
+    Засыпает на interval и меряет, насколько позже проснулся: опоздание — время,
+    которое event loop был занят чужим синхронным кодом
+    """
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.observe(value=max(0.0, time.monotonic() - started - interval))
@@ -0,0 +1,60 @@
+from source.infrastructure.metrics.registry import MetricsRegistry
+
+registry = MetricsRegistry()
+
+# [ telegram ]
+telegram_handler_seconds = registry.histogram(
+    "telegram_handler_seconds", "Время хэндлера aiogram (без middleware)", ("handler",)
+)
+telegram_middleware_seconds = registry.histogram(
+    "telegram_middleware_seconds", "Собственное время middleware, без вложенных middleware и хэндлера", ("middleware",)
+)
+telegram_handler_errors_total = registry.counter(
+    "telegram_handler_errors_total", "Исключения, вылетевшие из хэндлера", ("handler",)
+)
+telegram_outbound_queue_depth = registry.gauge(
+    "telegram_outbound_queue_depth", "Исходящие запросы к Telegram, ждущие токена лимитера"
+)
+telegram_outbound_throttled_total = registry.counter(
+    "telegram_outbound_throttled_total", "Исходящие запросы, которым пришлось ждать лимитера", ("priority",)
+)
+telegram_update_queue_depth = registry.gauge(
+    "telegram_update_queue_depth", "Апдейты во всех партициях очереди, еще не подтвержденные воркерами"
+)
+
+# [ llm ]
+llm_request_seconds = registry.histogram(
+    "llm_request_seconds", "Запрос к LLM: до полного ответа, для стрима — до конца стрима", ("context_scope", "mode"),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0)
+)
+llm_tokens_total = registry.counter(
+    "llm_tokens_total", "Токены LLM по usage ответа", ("context_scope", "kind")
+)
+llm_scheduler_wait_seconds = registry.histogram(
+    "llm_scheduler_wait_seconds", "Ожидание слота планировщика LLM", ("priority",)
+)
+llm_scheduler_queue_depth = registry.gauge("llm_scheduler_queue_depth", "Запросы, ждущие слота планировщика LLM")
+llm_scheduler_in_flight = registry.gauge("llm_scheduler_in_flight", "Запросы к LLM, занявшие слот")
+
+# [ pools ]
+redis_pool_acquire_seconds = registry.histogram(
+    "redis_pool_acquire_seconds", "Получение соединения из пула Redis (с установкой нового, если свободных нет)"
+)
+db_pool_acquire_seconds = registry.histogram(
+    "db_pool_acquire_seconds", "Ожидание соединения из пула SQLAlchemy"
+)
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Соединения SQLAlchemy, выданные сессиям")
+
+# [ caches ]
+user_cache_lookups_total = registry.counter(
+    "user_cache_lookups_total", "Чтения профиля юзера: local/redis — попадание в уровень кэша, miss — поход в Postgres",
+    ("result",)
+)
+
+# [ process ]
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "Опоздание пробуждения event loop относительно запланированного",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+log_queue_depth = registry.gauge("log_queue_depth", "Записи лога, ждущие фонового потока")
+log_records_dropped = registry.gauge("log_records_dropped", "Записи лога, отброшенные из-за полной очереди")
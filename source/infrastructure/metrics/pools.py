@@ -0,0 +1,28 @@
+import time
+
+from redis.asyncio import ConnectionPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from source.infrastructure.metrics.metrics import db_pool_acquire_seconds, redis_pool_acquire_seconds
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул create_async_engine по умолчанию, который пишет время ожидания соединения в db_pool_acquire_seconds"""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_acquire_seconds.observe(value=time.monotonic() - started)
+
+
+class TimedConnectionPool(ConnectionPool):
+    """Пул redis.asyncio, который пишет время получения соединения в redis_pool_acquire_seconds"""
+
+    async def get_connection(self, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            return await super().get_connection(*args, **kwargs)
+        finally:
+            redis_pool_acquire_seconds.observe(value=time.monotonic() - started)
@@ -0,0 +1,8 @@
+from .serializers import RedisSerializer, JsonSerializer, OrjsonSerializer, get_redis_serializer
+
+__all__ = [
+    'RedisSerializer',
+    'JsonSerializer',
+    'OrjsonSerializer',
+    'get_redis_serializer',
+]
@@ -0,0 +1,60 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # orjson — опциональная зависимость, без нее работает stdlib json
+    orjson = None
+
+
+class RedisSerializer(ABC):
+    """
+    Сериализация значений, которые лежат в Redis (история диалогов, данные FSM).
+
+    Все реализации пишут обычный UTF-8 JSON, поэтому читают данные друг друга:
+    смена сериализатора не требует миграции ключей. Бинарные форматы (msgpack) не подходят —
+    aiogram RedisStorage декодирует значение как UTF-8 перед json_loads.
+    """
+
+    @abstractmethod
+    def dumps(self, data: Any) -> str | bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, raw: str | bytes) -> Any:
+        raise NotImplementedError
+
+
+def _default(obj):
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
+
+
+class JsonSerializer(RedisSerializer):
+    """stdlib json без пробелов-разделителей"""
+
+    def dumps(self, data: Any) -> str:
+        return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(self, raw: str | bytes) -> Any:
+        return json.loads(raw)
+
+
+class OrjsonSerializer(RedisSerializer):
+    """orjson: быстрее stdlib в разы, UUID и datetime сериализует сам"""
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=_default)
+
+    def loads(self, raw: str | bytes) -> Any:
+        return orjson.loads(raw)
+
+
+def get_redis_serializer() -> RedisSerializer:
+    return OrjsonSerializer() if orjson is not None else JsonSerializer()
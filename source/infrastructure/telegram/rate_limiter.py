@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from source.core.enum import SendPriority
+from source.infrastructure.metrics.metrics import telegram_outbound_queue_depth, telegram_outbound_throttled_total
+
+logger = logging.getLogger(__name__)
+
+# как часто убирать бакеты чатов, в которые давно ничего не отправляли
+PRUNE_INTERVAL = 60.0
+
+_send_priority: ContextVar[SendPriority] = ContextVar("send_priority", default=SendPriority.INTERACTIVE)
+
+
+@contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """Все запросы к Telegram внутри блока (и в созданных в нем задачах) идут с этим приоритетом"""
+    token = _send_priority.set(priority)
+    try:
+        yield
+    finally:
+        _send_priority.reset(token)
+
+
+def get_send_priority() -> SendPriority:
+    return _send_priority.get()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Забирает токен (в долг, если их нет) и возвращает, сколько секунд ждать до отправки"""
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def delay(self) -> float:
+        """Сколько секунд до появления свободного токена"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Следующий токен появится не раньше чем через seconds"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class OutboundStats:
+    queue_depth: int = 0
+    throttled_total: dict[SendPriority, int] = field(default_factory=lambda: dict.fromkeys(SendPriority, 0))
+    retry_after_total: int = 0
+
+    def observe_throttled(self, priority: SendPriority):
+        self.throttled_total[priority] += 1
+        telegram_outbound_throttled_total.inc(priority.name)
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "throttled_total": {p.name: v for p, v in self.throttled_total.items()},
+            "retry_after_total": self.retry_after_total,
+        }
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+
+
+class OutboundRateLimiter:
+    """
+    Лимиты исходящих запросов к Telegram на процесс.
+
+    — на чат: chat_rate запросов в секунду с запасом chat_burst (в группах — group_rate),
+      запросы одного чата выходят в порядке вызова;
+    — на бота: global_rate запросов в секунду; когда токенов нет, следующий токен получает
+      ожидающий с наивысшим приоритетом (SendPriority), при равенстве — кто раньше пришел.
+    """
+
+    def __init__(self, global_rate: float, chat_rate: float, chat_burst: int, group_rate: float):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.stats = OutboundStats()
+
+        self._global = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chats: dict[int | str, TokenBucket] = {}
+        self._queue: list[_Waiter] = []  # отсортирована по (priority, seq)
+        self._seq = itertools.count()
+        self._granter: asyncio.Task | None = None
+        self._pruned_at = time.monotonic()
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # id групп и каналов отрицательные, у них лимит Telegram намного строже
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(
+                rate=self.group_rate if is_group else self.chat_rate,
+                capacity=1 if is_group else self.chat_burst
+            )
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self):
+        now = time.monotonic()
+        if now - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.is_full()]:
+            del self._chats[chat_id]
+
+    async def acquire(self, chat_id: int | str | None, priority: SendPriority = SendPriority.INTERACTIVE):
+        """Ждет, пока запрос в чат chat_id уложится в оба лимита"""
+        self._prune()
+        if chat_id is not None:
+            delay = self._chat_bucket(chat_id).reserve()
+            if delay > 0:
+                self.stats.observe_throttled(priority)
+                await asyncio.sleep(delay)
+
+        if not self._queue and self._global.delay() == 0:
+            self._global.take()
+            return
+
+        self.stats.observe_throttled(priority)
+        waiter = _Waiter(priority=int(priority), seq=next(self._seq), future=asyncio.get_running_loop().create_future())
+        bisect.insort(self._queue, waiter)
+        self._update_gauges()
+        if self._granter is None or self._granter.done():
+            self._granter = asyncio.create_task(self._grant())
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                self._update_gauges()
+            raise
+
+    async def _grant(self):
+        """Выдает токены глобального лимита ожидающим по приоритету, пока очередь не опустеет"""
+        while self._queue:
+            delay = self._global.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            waiter = self._queue.pop(0)
+            self._update_gauges()
+            if waiter.future.done():  # ожидающего отменили
+                continue
+            self._global.take()
+            waiter.future.set_result(None)
+
+    def pause(self, chat_id: int | str | None, seconds: float):
+        """Telegram ответил retry_after — не отправляем в чат (или вообще, если чата нет) seconds секунд"""
+        self.stats.retry_after_total += 1
+        if chat_id is not None:
+            self._chat_bucket(chat_id).pause(seconds)
+        else:
+            self._global.pause(seconds)
+
+    def _update_gauges(self):
+        self.stats.queue_depth = len(self._queue)
+        telegram_outbound_queue_depth.set(value=len(self._queue))
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod, Response
+from aiogram.methods.base import TelegramType
+
+from source.infrastructure.telegram.rate_limiter import OutboundRateLimiter, get_send_priority
+
+logger = logging.getLogger(__name__)
+
+# методы, создающие или меняющие сообщения в чате, — на них распространяются лимиты Telegram
+LIMITED_METHOD_PREFIXES = ("send", "copy", "forward", "edit")
+UNLIMITED_METHODS = {"sendChatAction"}
+
+
+def is_rate_limited(method: TelegramMethod) -> bool:
+    api_method = method.__api_method__
+    return api_method not in UNLIMITED_METHODS and api_method.startswith(LIMITED_METHOD_PREFIXES)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Session-middleware бота: все запросы к Telegram (message.answer, bot.send_message, edit_text...)
+    проходят через OutboundRateLimiter, а на TelegramRetryAfter запрос повторяется после паузы —
+    хэндлерам ничего делать не нужно. Приоритет берется из send_priority, по умолчанию INTERACTIVE.
+    """
+
+    def __init__(self, limiter: OutboundRateLimiter, max_retries: int):
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        limited = is_rate_limited(method)
+        # у правок inline-сообщений chat_id нет — они проходят только через глобальный лимит
+        chat_id = getattr(method, "chat_id", None)
+        priority = get_send_priority()
+
+        for attempt in range(self.max_retries + 1):
+            if limited:
+                await self.limiter.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    f"{method.__api_method__} to chat {chat_id} rate limited, retry after {e.retry_after}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                if limited:
+                    self.limiter.pause(chat_id, e.retry_after)
+                else:
+                    await asyncio.sleep(e.retry_after)
@@ -1,36 +1,88 @@
-import httpx
+import asyncio
 import logging
-import uuid
+import random
+
+import httpx
 
 logger = logging.getLogger(__name__)
 
+# YooKassa: 202 — платеж еще создается, 500 — результат неизвестен; оба повторяются с тем же Idempotence-Key
+RETRYABLE_STATUS_CODES = {202, 429, 500, 502, 503, 504}
 
 
 class YooKassaClient:
+    """
+    Клиент YooKassa поверх общего httpx.AsyncClient (APP-скоуп dishka): один пул keep-alive
+    соединений на приложение вместо TLS-рукопожатия на каждый платеж.
 
-    BASE_URL="https://api.yookassa.ru/v3/payments"
+    Повторы безопасны, потому что Idempotence-Key задает вызывающий: YooKassa на тот же ключ
+    (в течение суток) возвращает уже созданный платеж, а не создает новый.
+    """
 
-    def __init__(self, store_id, store_token):
-        self.store_id = str(store_id)
-        self.store_token = str(store_token)
+    BASE_URL = "https://api.yookassa.ru/v3/payments"
 
-    async def create_payment(self, amount: str, description: str, customer_contact: dict):
+    def __init__(
+            self,
+            http_client: httpx.AsyncClient,
+            max_retries: int = 2,
+            retry_base_delay: float = 0.5,
+            retry_max_delay: float = 5.0,
+    ):
+        self.http_client = http_client
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
 
-        idempotence_key = str(uuid.uuid4())
+    def _retry_delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """retry_after из ответа 202, иначе экспоненциальный backoff с full jitter"""
+        if response is not None and response.status_code == 202:
+            retry_after_ms = response.json().get("retry_after")
+            if retry_after_ms:
+                return min(self.retry_max_delay, retry_after_ms / 1000)
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    async def _post(self, json_data: dict, idempotence_key: str) -> httpx.Response:
+        headers = {
+            'Idempotence-Key': idempotence_key,
+            'Content-Type': 'application/json',
+        }
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await self.http_client.post(self.BASE_URL, headers=headers, json=json_data)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                error = f"status {response.status_code}"
+            except httpx.TransportError as e:
+                error = repr(e)
 
+            if attempt >= self.max_retries:
+                if response is not None:
+                    response.raise_for_status()
+                    # 202 после всех попыток: платеж так и не создался
+                    raise httpx.HTTPStatusError(
+                        f"Payment is still processing after {attempt + 1} attempts",
+                        request=response.request,
+                        response=response
+                    )
+                raise
+            delay = self._retry_delay(attempt, response)
+            attempt += 1
+            logger.warning(f"YooKassa: {error}, повтор {attempt}/{self.max_retries} через {delay:.2f}s")
+            await asyncio.sleep(delay)
 
+    async def create_payment(self, amount: str, description: str, customer_contact: dict, idempotence_key: str):
         """Create payment in yookassa service
             Args:
 
             amount: str
 
             description: str
-        """
 
-        headers = {
-            'Idempotence-Key': idempotence_key,
-            'Content-Type': 'application/json',
-        }
+            idempotence_key: str — один и тот же для повторов одной покупки
+        """
 
         json_data = {
             'amount': {
@@ -64,15 +116,14 @@ class YooKassaClient:
             }
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.BASE_URL,
-                                            headers=headers,
-                                            json=json_data,
-                                            auth=(self.store_id, self.store_token))
-                response.raise_for_status()
-                response_data = response.json()
-                return (response_data.get("confirmation", {}).get("confirmation_url"), response_data.get("id", ""))
-            except:
-                logger.error(f'Error when create payment {amount} {description} {response.text}')
-                raise
+        try:
+            response = await self._post(json_data, idempotence_key)
+        except httpx.HTTPStatusError as e:
+            logger.error(f'Error when create payment {amount} {description} {e.response.text}')
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f'Error when create payment {amount} {description} {e!r}')
+            raise
+
+        response_data = response.json()
+        return (response_data.get("confirmation", {}).get("confirmation_url"), response_data.get("id", ""))
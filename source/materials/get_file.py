@@ -1,4 +1,6 @@
+import hashlib
 import logging
+from functools import lru_cache
 from pathlib import Path
 
 from aiogram.types import FSInputFile
@@ -6,15 +8,26 @@ from aiogram.types import FSInputFile
 logger = logging.getLogger(__name__)
 
 
-def get_file_by_name(filename: str):
-    """
-    Универсальная функция для получения любого файла из папки materials
-    """
+def get_file_path(filename: str) -> Path:
     file_path = Path(__file__).parent / filename
 
     if file_path.exists() and file_path.is_file():
-        logger.info(f"Файл найден: {file_path}")
-        return FSInputFile(str(file_path))
+        return file_path
     else:
         logger.error(f"Файл не найден: {file_path}")
         raise FileNotFoundError(f"Файл {filename} не найден в {file_path.parent}")
+
+
+def get_file_by_name(filename: str):
+    """
+    Универсальная функция для получения любого файла из папки materials
+    """
+    file_path = get_file_path(filename)
+    logger.info(f"Файл найден: {file_path}")
+    return FSInputFile(str(file_path))
+
+
+@lru_cache
+def get_file_hash(filename: str) -> str:
+    """sha256 содержимого: считается один раз на процесс, материалы не меняются без перезапуска"""
+    return hashlib.sha256(get_file_path(filename).read_bytes()).hexdigest()
@@ -0,0 +1,58 @@
+import logging
+import secrets
+
+from dishka.integrations.fastapi import DishkaRoute, FromDishka
+from fastapi import APIRouter, Response, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from source.application.redis_services.update_queue.update_queue_service import UpdateQueueService
+from source.core.logging.handlers import DroppingQueueHandler
+from source.infrastructure.config import MetricsConfig
+from source.infrastructure.metrics import CONTENT_TYPE, registry
+from source.infrastructure.metrics.metrics import telegram_update_queue_depth, db_pool_checked_out, log_queue_depth, \
+    log_records_dropped
+
+logger = logging.getLogger(__name__)
+
+metrics_router = APIRouter(route_class=DishkaRoute)
+
+
+def collect_log_queue():
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            log_queue_depth.set(value=handler.queue.qsize())
+            log_records_dropped.set(value=handler.dropped)
+
+
+def check_metrics_token(config: MetricsConfig, authorization: str | None):
+    """Приложение торчит наружу ради вебхуков — метрики отдаются только с METRICS_TOKEN"""
+    if config.token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), config.token.get_secret_value().encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(
+        update_queue: FromDishka[UpdateQueueService],
+        engine: FromDishka[AsyncEngine],
+        config: FromDishka[MetricsConfig],
+        authorization: str | None = Header(None),
+) -> Response:
+    """
+    Гистограммы и счетчики копятся в процессе по мере работы; здесь же, на скрейпе,
+    снимаются только значения, которые дешевле прочитать, чем отслеживать: глубины очередей и пула
+    """
+    check_metrics_token(config, authorization)
+    try:
+        telegram_update_queue_depth.set(value=await update_queue.backlog())
+    except Exception as e:
+        logger.warning(f"Failed to read update queue backlog: {e}")
+    db_pool_checked_out.set(value=engine.pool.checkedout())
+    collect_log_queue()
+    return Response(registry.render(), media_type=CONTENT_TYPE)
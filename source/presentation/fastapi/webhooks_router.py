@@ -1,19 +1,14 @@
 import logging
 import os
-from datetime import datetime, UTC
-from typing import Dict, Any
 
-from aiogram import Bot, Dispatcher
 from aiogram.types import Update
-from dateutil.relativedelta import relativedelta
 from dishka.integrations.fastapi import DishkaRoute, FromDishka
-from fastapi import APIRouter, status, Request, HTTPException, BackgroundTasks, Depends, Path
+from fastapi import APIRouter, status, Request, HTTPException, Depends, Path
+from pydantic import ValidationError
 
-from source.application.payment.merge import MergePayment
-from source.application.user import MergeUser, GetUserSchemaById
-from source.core.schemas.payment_schema import PaymentSchema
-from source.core.schemas.user_schema import UserSchema
-from source.infrastructure.database.repository import PaymentRepository
+from source.application.payment.payment_events import RecordPaymentEvent, get_payment_event_key
+from source.application.redis_services.update_queue.update_queue_service import UpdateQueueService
+from source.presentation.telegram.update_worker import update_ordering_key
 
 logger = logging.getLogger(__name__)
 
@@ -28,84 +23,28 @@ def check_secret(secret: str = Path(..., include_in_schema=False)):
     return secret
 
 
-async def process_successful_payment(
-        event_json: Dict[str, Any],
-        payment_repo: PaymentRepository,
-        get_user_id: GetUserSchemaById,
-        merge_user: MergeUser,
-        merge_payment: MergePayment,
-        bot: Bot
-):
-    """Асинхронная обработка успешной оплаты (в background)."""
-    payment_object = event_json.get('object', {})
-    purchase_id = payment_object.get('id')  # ID платежа от Yookassa
-    status = payment_object.get('status')
-    try:
-        if status != 'succeeded':
-            logger.info(f"Payment {purchase_id} not succeeded: {status}")
-            return
-
-        # Найти PaymentLog по purchase_id
-        payment_log: PaymentSchema = await payment_repo.get_by_purchase_id(purchase_id)
-        if not payment_log:
-            logger.error(f"PaymentLog not found for {purchase_id}")
-            return
-
-        # если уже processed, skip
-        if payment_log.status == 'succeeded':
-            logger.info(f"Payment {purchase_id} already succeeded")
-            return
-
-        telegram_id = payment_log.telegram_id
-        now = datetime.now(UTC)
-        date_end = now + relativedelta(months=payment_log.month_sub)
-
-        user: UserSchema = await get_user_id(telegram_id)  # Получить User
-        if user:
-            user.subscription = payment_log.subscription
-            user.subscription_start = now
-            user.subscription_date_end = date_end
-            user.messages_used = 0
-            user.daily_messages_used = 0
-            await merge_user(user)  # Merge для сохранения
-
-        payment_log.status = 'succeeded'
-        await merge_payment(payment_log)
-
-        await bot.send_message(
-            chat_id=int(telegram_id),
-            text="Ваша подписка успешно оформлена!"
-        )
-        logger.info(f"Payment {purchase_id} succeeded and notification sent to {telegram_id}")
-
-    except Exception as e:
-        logger.error(f"Error processing payment {purchase_id}: {e}")
-        # Здесь можно добавить retry или лог в DLQ, но для простоты - log
-
-
 @webhooks_router.post("/yookassa_webhook", status_code=status.HTTP_200_OK)
 async def handle_yookassa_webhook(
         request: Request,
-        background_tasks: BackgroundTasks,
-        payment_repo: FromDishka[PaymentRepository],
-        get_by_id: FromDishka[GetUserSchemaById],
-        merge_payment: FromDishka[MergePayment],
-        merge_user: FromDishka[MergeUser],
-        bot: FromDishka[Bot]
+        record_payment_event: FromDishka[RecordPaymentEvent]
 ):
+    """
+    Только сохраняет уведомление в payment_events и отвечает 200; подписку активирует ProcessPaymentEvents.
+    Если записать не удалось — 500, и YooKassa доставит уведомление повторно
+    """
     event_json = await request.json()
     logger.info("Webhook received!")
 
-    # Быстро отвечаем 200 OK, обработку в background
-    background_tasks.add_task(
-        process_successful_payment,
-        event_json,
-        payment_repo,
-        get_by_id,
-        merge_user,
-        merge_payment,
-        bot
-    )
+    if not get_payment_event_key(event_json):
+        logger.warning("YooKassa event without payment id ignored")
+        return {"status": "ok"}
+
+    try:
+        if not await record_payment_event(event_json):
+            logger.info(f"Duplicate YooKassa event {get_payment_event_key(event_json)} skipped")
+    except Exception as e:
+        logger.error(f"Failed to record YooKassa event: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
 
     return {"status": "ok"}
 
@@ -113,22 +52,30 @@ async def handle_yookassa_webhook(
 @webhooks_router.post("/telegram/{secret}", include_in_schema=False)
 async def telegram_webhook(
         request: Request,
+        update_queue: FromDishka[UpdateQueueService],
         secret: str = Depends(check_secret)
 ):
+    """
+    Только принимает апдейт: проверяет и кладет сырой JSON в очередь, обрабатывает его UpdateWorkerPool.
+    Так ответ Telegram не ждет генерации ответа ассистентом и не вызывает повторных доставок.
+    """
+    body = await request.body()
     try:
-        # Get container from app state
-        container = request.app.state.dishka_container
-
-        # Get dependencies manually
-        bot: Bot = await container.get(Bot)
-        dp: Dispatcher = await container.get(Dispatcher)
-
-        update_data = await request.json()
-        update = Update(**update_data)
+        update = Update.model_validate_json(body)
+    except ValidationError as e:
+        # повтор не поможет — отвечаем 200, чтобы Telegram не присылал этот апдейт снова
+        logger.warning(f"Invalid Telegram update ignored: {e}")
+        return {"status": "ignored"}
 
-        await dp.feed_update(bot=bot, update=update, dishka_container=container)
-
-        return {"status": "ok"}
+    try:
+        accepted = await update_queue.enqueue(update_ordering_key(update), body)
     except Exception as e:
         logger.error(f"Telegram webhook error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
+
+    if not accepted:
+        # воркеры не успевают — Telegram придержит апдейты и повторит доставку
+        logger.warning(f"Update queue is full, update {update.update_id} rejected")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Update queue is full")
+
+    return {"status": "ok"}
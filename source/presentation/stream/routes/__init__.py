@@ -0,0 +1,3 @@
+from .mailing import mailing_router
+
+__all__ = ["mailing_router"]
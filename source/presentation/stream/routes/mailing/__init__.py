@@ -0,0 +1,14 @@
+from faststream.nats import NatsRouter
+
+from .load import router as load_router
+from .over import router as over_router
+from .send_msg import router as send_msg_router
+
+mailing_router = NatsRouter()
+mailing_router.include_routers(
+    load_router,  # выгрузка аудитории из БД в задания
+    send_msg_router,  # отправка заданий под лимитами Telegram
+    over_router,  # отчет админу по завершении
+)
+
+__all__ = ["mailing_router"]
@@ -0,0 +1,34 @@
+import logging
+
+from dishka.integrations.faststream import FromDishka, inject
+from faststream.nats import NatsMessage, NatsRouter
+from nats.js.api import ConsumerConfig
+
+from source.application.mailing import LoadMailingAudience
+from source.core.lexicon.rules import MAILING_RETRY_DELAY
+from source.core.schemas.mailing_schema import MailingLoadSchema
+from source.presentation.stream.routes.mailing.stream import mailing_stream
+
+router = NatsRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.subscriber(
+    "mailing.*.load",
+    stream=mailing_stream,
+    durable="mailing_loader",
+    config=ConsumerConfig(ack_wait=60),
+)
+@inject
+async def load_mailing_audience(
+        command: MailingLoadSchema,
+        msg: NatsMessage,
+        load_audience: FromDishka[LoadMailingAudience],
+):
+    try:
+        # продлеваем ack_wait после каждой пачки, иначе долгая выгрузка уйдет второму консьюмеру
+        await load_audience(command.mailing_id, heartbeat=msg.in_progress)
+    except Exception as e:
+        logger.error(f"Failed to load audience of mailing {command.mailing_id}: {e}")
+        # выгрузка продолжится с сохраненного курсора
+        await msg.nack(delay=MAILING_RETRY_DELAY)
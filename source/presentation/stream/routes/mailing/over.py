@@ -0,0 +1,23 @@
+import logging
+
+from aiogram import Bot
+from dishka.integrations.faststream import FromDishka, inject
+from faststream.nats import NatsRouter
+
+from source.core.lexicon.message_formatters import format_mailing_report
+from source.core.schemas.mailing_schema import MailingReportSchema
+from source.presentation.stream.routes.mailing.stream import mailing_stream
+
+router = NatsRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.subscriber("mailing.*.over", stream=mailing_stream, durable="mailing_over")
+@inject
+async def notify_mailing_over(report: MailingReportSchema, bot: FromDishka[Bot]):
+    if report.admin_telegram_id is None:
+        return
+    try:
+        await bot.send_message(chat_id=int(report.admin_telegram_id), text=format_mailing_report(report))
+    except Exception as e:
+        logger.error(f"Failed to send report of mailing {report.mailing_id} to {report.admin_telegram_id}: {e}")
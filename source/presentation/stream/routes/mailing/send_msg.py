@@ -0,0 +1,42 @@
+import logging
+
+from dishka.integrations.faststream import FromDishka, inject
+from faststream.nats import NatsMessage, NatsRouter, PullSub
+from nats.js.api import ConsumerConfig
+
+from source.application.mailing import DeliverMailingMessage
+from source.core.lexicon.rules import MAILING_MAX_DELIVER, MAILING_RETRY_DELAY, MAILING_SENDER_CONCURRENCY
+from source.core.schemas.mailing_schema import MailingJobSchema
+from source.presentation.stream.routes.mailing.stream import mailing_stream
+
+router = NatsRouter()
+logger = logging.getLogger(__name__)
+
+
+def delivery_attempt(msg: NatsMessage) -> int:
+    try:
+        return msg.raw_message.metadata.num_delivered
+    except Exception:
+        return 1
+
+
+@router.subscriber(
+    "mailing.*.send.*",
+    stream=mailing_stream,
+    durable="mailing_sender",
+    pull_sub=PullSub(batch_size=MAILING_SENDER_CONCURRENCY),
+    config=ConsumerConfig(max_deliver=MAILING_MAX_DELIVER, max_ack_pending=MAILING_SENDER_CONCURRENCY * 4),
+    max_workers=MAILING_SENDER_CONCURRENCY,
+)
+@inject
+async def send_mailing_message(
+        job: MailingJobSchema,
+        msg: NatsMessage,
+        deliver: FromDishka[DeliverMailingMessage],
+):
+    final_attempt = delivery_attempt(msg) >= MAILING_MAX_DELIVER
+    try:
+        await deliver(job, final_attempt=final_attempt)
+    except Exception as e:
+        logger.warning(f"Failed to deliver mailing {job.mailing_id} to {job.telegram_id}, will retry: {e}")
+        await msg.nack(delay=MAILING_RETRY_DELAY)
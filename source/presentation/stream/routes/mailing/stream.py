@@ -0,0 +1,6 @@
+from faststream.nats import JStream
+
+from source.application.mailing.subjects import MAILING_STREAM
+
+# стрим и его лимиты объявляет nats/migrations.py, консьюмеры его только используют
+mailing_stream = JStream(name=MAILING_STREAM, declare=False)
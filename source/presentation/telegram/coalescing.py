@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import AsyncIterator, Callable
+
+from aiogram.types import Message
+from dishka import AsyncContainer
+
+from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
+from source.application.redis_services.message_coalescer.message_coalescer_service import MessageCoalescerService
+from source.application.redis_services.message_history.message_history_service import MessageHistoryService
+from source.application.subscription.subscription_service import SubscriptionService
+from source.core.exceptions import AssistantUnavailableException
+from source.core.lexicon import message_templates
+from source.core.schemas.assistant_schemas import ContextMessage
+from source.core.schemas.user_schema import UserSchema
+from source.presentation.telegram.streaming import TelegramStreamRenderer, STREAM_EDIT_INTERVAL
+from source.presentation.telegram.update_tasks import track_update_task
+
+logger = logging.getLogger(__name__)
+
+# (assistant_service, объединенный текст, история) -> стрим дельт ответа
+StreamReplyFactory = Callable[[AssistantService, str, list[ContextMessage]], AsyncIterator[str]]
+
+# ответы, ожидающие окна или генерирующиеся в этом процессе, по (юзер, скоп) — чтобы отменять вытесненные
+_reply_tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+
+class MessageSupersededException(Exception):
+    """Пока генерировался ответ, юзер написал еще — ответ больше не актуален"""
+    pass
+
+
+def schedule_coalesced_reply(
+        message: Message,
+        user: UserSchema,
+        container: AsyncContainer,
+        coalescer: MessageCoalescerService,
+        context_scope: str,
+        generation: int,
+        stream_reply: StreamReplyFactory,
+        waiting_text: str,
+        error_text: str,
+        reply_markup=None,
+        footer: str = "",
+        quota_charged: bool = False,
+):
+    """
+    Запускает ответ на пачку сообщений юзера после окна ожидания.
+
+    Хэндлер только кладет сообщение в буфер coalescer'а и сразу отпускает чат (RedisEventIsolation
+    держит лок на время хэндлера, так что ждать следующее сообщение внутри него нельзя).
+    Ответ генерирует фоновая задача в собственном REQUEST-скоупе dishka: container — APP-контейнер.
+    Задача привязывается к апдейту (track_update_task): UpdateWorkerPool подтверждает апдейт только
+    после нее, считает ее в max_in_flight и дожидается при остановке.
+    Предыдущая задача того же юзера и скопа в этом процессе отменяется; задачи на других воркерах
+    замечают новое поколение буфера и останавливаются сами.
+
+    user — юзер, загруженный LoadUserMiddleware для этого апдейта; quota_charged — LimitCheckMiddleware
+    уже списал сообщения пачки, и если ответить не удалось, их нужно вернуть.
+    """
+    key = (str(message.from_user.id), context_scope)
+
+    previous = _reply_tasks.get(key)
+    if previous is not None and not previous.done():
+        previous.cancel()
+
+    task = asyncio.create_task(
+        _reply_after_window(
+            message=message,
+            user=user,
+            container=container,
+            coalescer=coalescer,
+            context_scope=context_scope,
+            generation=generation,
+            stream_reply=stream_reply,
+            waiting_text=waiting_text,
+            error_text=error_text,
+            reply_markup=reply_markup,
+            footer=footer,
+            quota_charged=quota_charged,
+        )
+    )
+    _reply_tasks[key] = task
+    task.add_done_callback(partial(_forget_task, key))
+    track_update_task(task)
+
+
+def _forget_task(key: tuple[str, str], task: asyncio.Task):
+    if _reply_tasks.get(key) is task:
+        del _reply_tasks[key]
+
+
+async def _until_superseded(
+        deltas: AsyncIterator[str],
+        coalescer: MessageCoalescerService,
+        user_telegram_id: str,
+        context_scope: str,
+        generation: int,
+        check_interval: float = STREAM_EDIT_INTERVAL,
+) -> AsyncIterator[str]:
+    """Пропускает дельты, пока буфер не получил новое сообщение (проверка не чаще check_interval)"""
+    next_check_at = time.monotonic() + check_interval
+    try:
+        async for delta in deltas:
+            if time.monotonic() >= next_check_at:
+                if not await coalescer.is_current(user_telegram_id, context_scope, generation):
+                    raise MessageSupersededException
+                next_check_at = time.monotonic() + check_interval
+            yield delta
+    finally:
+        # закрываем стрим сразу, чтобы отпустить соединение и слот планировщика
+        await deltas.aclose()
+
+
+async def _reply_after_window(
+        message: Message,
+        user: UserSchema,
+        container: AsyncContainer,
+        coalescer: MessageCoalescerService,
+        context_scope: str,
+        generation: int,
+        stream_reply: StreamReplyFactory,
+        waiting_text: str,
+        error_text: str,
+        reply_markup=None,
+        footer: str = "",
+        quota_charged: bool = False,
+):
+    user_telegram_id = str(message.from_user.id)
+
+    try:
+        await asyncio.sleep(coalescer.window_seconds)
+        if not await coalescer.is_current(user_telegram_id, context_scope, generation):
+            return
+
+        pending = await coalescer.get_pending(user_telegram_id, context_scope)
+        if not pending:
+            return
+        logger.info(f"Replying to {len(pending)} buffered messages of user {user_telegram_id} in scope {context_scope}")
+        # реплика юзера уходит в ассистента как message, а в историю — вместе с ответом (append_pair)
+        user_message = ContextMessage(role="user", message="\n".join(pending))
+
+        async with container() as request_container:
+            assistant_service = await request_container.get(AssistantService)
+            message_history_service = await request_container.get(MessageHistoryService)
+            subscription_service = await request_container.get(SubscriptionService)
+            build_dialog_context = await request_container.get(BuildDialogContext)
+
+            message_history = await build_dialog_context(user_telegram_id, context_scope)
+            placeholder = await message.answer(waiting_text, reply_markup=reply_markup)
+            renderer = TelegramStreamRenderer(
+                bot=message.bot,
+                chat_id=message.chat.id,
+                placeholder=placeholder,
+                footer=footer,
+            )
+
+            try:
+                response_text = await renderer.render(
+                    _until_superseded(
+                        stream_reply(assistant_service, user_message.message, message_history),
+                        coalescer,
+                        user_telegram_id,
+                        context_scope,
+                        generation,
+                    )
+                )
+            except (MessageSupersededException, asyncio.CancelledError):
+                # сообщения остаются в буфере — на них ответит следующая задача вместе с новыми
+                logger.info(f"Reply for user {user_telegram_id} in scope {context_scope} superseded by a newer message")
+                await renderer.discard()
+                raise
+            except AssistantUnavailableException:
+                await coalescer.ack(user_telegram_id, context_scope, len(pending))
+                await message_history_service.add_message_to_history(user_telegram_id, context_scope, user_message)
+                if quota_charged:
+                    await subscription_service.refund_message(user_telegram_id, user, len(pending))
+                await message.answer(message_templates.ASSISTANT_UNAVAILABLE, reply_markup=reply_markup)
+                return
+            except Exception as e:
+                logger.error(f"Failed to get AI response for user {user_telegram_id} in scope {context_scope}: {e}")
+                await coalescer.ack(user_telegram_id, context_scope, len(pending))
+                await message_history_service.add_message_to_history(user_telegram_id, context_scope, user_message)
+                if quota_charged:
+                    await subscription_service.refund_message(user_telegram_id, user, len(pending))
+                await message.answer(error_text, reply_markup=reply_markup)
+                return
+
+            await coalescer.ack(user_telegram_id, context_scope, len(pending))
+            await message_history_service.append_pair(
+                user_telegram_id,
+                context_scope,
+                user_message,
+                ContextMessage(role="assistant", message=response_text)
+            )
+
+    except MessageSupersededException:
+        return
+    except Exception as e:
+        logger.error(f"Coalesced reply failed for user {user_telegram_id} in scope {context_scope}: {e}")
@@ -1,5 +1,6 @@
 from aiogram import Router
 
+from .admin import router as admin_router
 from .profile import router as profile_router
 from .check_mood import router as check_in_router
 from .main_menu import router as main_menu_router
@@ -23,6 +24,7 @@ handlers_router = Router(name="main_handlers_router")
 handlers_router.include_routers(
     # [ приоритет ]
     start_router,
+    admin_router,  # команды админа (рассылки); остальным юзерам не мешает — фильтр по user_type
     profile_router,  # профиль юзера
     check_in_router,  # запись настроения
     main_menu_router,  # Навигация по главному меню (Reply-кнопки)
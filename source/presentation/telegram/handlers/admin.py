@@ -0,0 +1,59 @@
+import logging
+from uuid import UUID
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject, Filter
+from aiogram.types import Message
+from dishka.integrations.aiogram import inject, FromDishka
+
+from source.application.mailing import StartMailing, GetMailingReport
+from source.core.enum import UserType
+from source.core.lexicon import message_templates
+from source.core.lexicon.message_formatters import format_mailing_report
+from source.core.schemas.user_schema import UserSchema
+
+logger = logging.getLogger(__name__)
+router = Router(name=__name__)
+
+
+class IsAdmin(Filter):
+    """Юзер уже загружен LoadUserMiddleware — проверяем его тип без похода в БД"""
+
+    async def __call__(self, message: Message, user: UserSchema | None = None) -> bool:
+        return user is not None and user.user_type == UserType.ADMIN
+
+
+router.message.filter(IsAdmin())
+
+
+@router.message(Command("mailing"))
+@inject
+async def start_mailing(message: Message, command: CommandObject, start: FromDishka[StartMailing]):
+    if not command.args:
+        await message.answer(message_templates.MAILING_USAGE)
+        return
+
+    try:
+        mailing_id = await start(command.args, str(message.from_user.id))
+    except Exception as e:
+        logger.error(f"Failed to start mailing by {message.from_user.id}: {e}")
+        await message.answer(message_templates.MAILING_START_FAILED)
+        return
+
+    await message.answer(message_templates.MAILING_STARTED.format(mailing_id=mailing_id))
+
+
+@router.message(Command("mailing_status"))
+@inject
+async def mailing_status(message: Message, command: CommandObject, get_report: FromDishka[GetMailingReport]):
+    try:
+        mailing_id = UUID((command.args or "").strip())
+    except ValueError:
+        await message.answer(message_templates.MAILING_USAGE)
+        return
+
+    report = await get_report(mailing_id)
+    if report is None:
+        await message.answer(message_templates.MAILING_NOT_FOUND)
+        return
+    await message.answer(format_mailing_report(report))
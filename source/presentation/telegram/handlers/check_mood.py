@@ -85,7 +85,7 @@ async def handle_check_in(
     """
     Обрабатывает ответ пользователя на вопрос "Как ты?".
     """
-    logger.info(f"User {message.from_user.id} mood set. Msg: '{message.text[:30]}...'")
+    logger.info(f"User {message.from_user.id} mood set", extra={"message_text": message.text})
 
     user_telegram_id = str(message.from_user.id)
 
@@ -218,7 +218,8 @@ async def generate_user_characteristic(
     try:
         generated_characteristic: UserCharacteristicAssistantResponse = await assistant.get_user_characteristic(
             user_logs_history=user_logs,
-            user_mood_history=user_moods
+            user_mood_history=user_moods,
+            user_id=user_telegram_id
         )
 
         # СОХРАНЯЕМ характеристику в БД
@@ -17,7 +17,7 @@ async def handle_risk_protocol(message: Message, state: FSMContext):
     current_data = await state.get_data()
     step = current_data.get("risk_step", 1)
 
-    logger.warning(f"User {message.from_user.id} in RISK_PROTOCOL, step {step}. Msg: '{message.text[:30]}...'")
+    logger.warning(f"User {message.from_user.id} in RISK_PROTOCOL, step {step}", extra={"message_text": message.text})
 
     if step == 1:
         await state.update_data(risk_step=2)
@@ -1,3 +1,5 @@
+import uuid
+
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
@@ -69,7 +71,9 @@ async def handle_buy_subscription(query: CallbackQuery, callback_data: Subscript
         months=months,
         price=price,
         telegram_id=telegram_id,
-        username=username
+        username=username,
+        # одна сессия оформления — один платеж в YooKassa, сколько бы раз ни повторился запрос
+        checkout_id=uuid.uuid4().hex
     )
 
     await state.set_state(SupportStates.WAITING)
@@ -111,7 +115,8 @@ async def process_contact(message: Message, state: FSMContext, **data):
         telegram_id=state_data['telegram_id'],
         username=state_data['username'],
         customer_contact=customer_contact,
-        subscription=SubscriptionType.PRO if state_data['sub_type'] == "pro" else SubscriptionType.DEFAULT
+        subscription=SubscriptionType.PRO if state_data['sub_type'] == "pro" else SubscriptionType.DEFAULT,
+        checkout_id=state_data.get('checkout_id') or uuid.uuid4().hex
     )
 
     payment_url = payment.link
@@ -7,18 +7,20 @@ from aiogram.types import CallbackQuery, Message
 from dishka.integrations.aiogram import inject, FromDishka
 
 from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
 from source.application.subscription.subscription_service import SubscriptionService
-from source.application.user import GetUserSchemaById
 from source.application.user.user_logs import CreateUserLog
+from source.core.exceptions import AssistantUnavailableException
+from source.core.lexicon import message_templates
 from source.core.lexicon.message_templates import CALMING_EXERCISE_TEXT
 from source.core.schemas import UserLogCreateSchema, UserSchema
 from source.core.schemas.assistant_schemas import ContextMessage
 from source.presentation.telegram.callbacks.method_callbacks import MethodCallback, CalmingCallback
 from source.presentation.telegram.keyboards.keyboards import get_calming_keyboard, get_main_keyboard, \
     get_back_to_menu_keyboard
-from source.presentation.telegram.states.user_states import SupportStates
-from source.presentation.telegram.utils import send_long_message, convert_markdown_to_html
+from source.presentation.telegram.states.user_states import SupportStates, get_llm_priority
+from source.presentation.telegram.streaming import TelegramStreamRenderer
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
@@ -73,11 +75,12 @@ async def handle_calming_talk(
         create_user_log: FromDishka[CreateUserLog],
         assistant_service: FromDishka[AssistantService],
         message_history_service: FromDishka[MessageHistoryService],
+        build_dialog_context: FromDishka[BuildDialogContext],
         subscription_service: FromDishka[SubscriptionService],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
+        raw_state: str | None = None,
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "calming"
@@ -98,32 +101,36 @@ async def handle_calming_talk(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
+    message_history = await build_dialog_context(
         user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
     )
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
 
     try:
-        response = await assistant_service.get_calm_response(
-            message=message.text,
-            context_messages=message_history
+        renderer = TelegramStreamRenderer(
+            bot=bot,
+            chat_id=message.chat.id,
+            reply_markup=get_back_to_menu_keyboard()
+        )
+        ai_response_text = await renderer.render(
+            assistant_service.stream_calm_response(
+                message=message.text,
+                context_messages=message_history,
+                user_id=user_telegram_id,
+                priority=get_llm_priority(raw_state)
+            )
         )
-        ai_response_text = response.message
 
         await message_history_service.add_message_to_history(
             user_telegram_id, context_scope, ContextMessage(role="assistant", message=ai_response_text)
         )
 
-        await send_long_message(
-            message,
-            convert_markdown_to_html(ai_response_text),
-            bot,
-            keyboard=get_back_to_menu_keyboard()
-        )
-        await subscription_service.increment_message_count(user_telegram_id)
-
+    except AssistantUnavailableException:
+        # сообщение списано LimitCheckMiddleware до ответа — ответа не было, возвращаем
+        await subscription_service.refund_message(user_telegram_id, user)
+        await message.answer(message_templates.ASSISTANT_UNAVAILABLE, reply_markup=get_back_to_menu_keyboard())
     except Exception as e:
         logger.error(f"Failed to get AI response for user {user_telegram_id} in scope {context_scope}: {e}")
+        await subscription_service.refund_message(user_telegram_id, user)
         await message.answer(
             "Произошла ошибка. Пожалуйста, попробуй еще раз. Если проблема повторится, ты можешь вернуться в меню.",
             reply_markup=get_back_to_menu_keyboard()
@@ -6,14 +6,14 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
 from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
-from source.application.user import GetUserSchemaById
 from source.application.user.user_logs import CreateUserLog
 from source.core.lexicon.prompts import KPT_DIARY_PROMPT
 from source.core.schemas import UserLogCreateSchema, UserSchema
 from source.core.schemas.assistant_schemas import ContextMessage
 from source.presentation.telegram.callbacks.method_callbacks import MethodCallback
-from source.presentation.telegram.states.user_states import SupportStates
+from source.presentation.telegram.states.user_states import SupportStates, get_llm_priority
 from source.presentation.telegram.utils import send_long_message, convert_markdown_to_html
 from dishka.integrations.aiogram import inject, FromDishka
 
@@ -39,11 +39,10 @@ async def handle_cbt_s1_situation(
         message: Message,
         state: FSMContext,
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
         message_history_service: FromDishka[MessageHistoryService],
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "cbt"
@@ -73,11 +72,10 @@ async def handle_cbt_s2_emotions(
         message: Message,
         state: FSMContext,
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
         message_history_service: FromDishka[MessageHistoryService],
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "cbt"
@@ -109,12 +107,13 @@ async def handle_cbt_s3_thought(
         state: FSMContext,
         bot: Bot,
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
         assistant_service: FromDishka[AssistantService],
         message_history_service: FromDishka[MessageHistoryService],
+        build_dialog_context: FromDishka[BuildDialogContext],
+        raw_state: str | None = None,
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     context_scope = "cbt"
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
@@ -129,14 +128,12 @@ async def handle_cbt_s3_thought(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
-        user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
-    )
-
     await state.update_data(cbt_thought=message.text)
     await state.set_state(SupportStates.CBT_S4_DISTORTIONS)
 
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
+    message_history = await build_dialog_context(
+        user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
+    )
     cbt_prompt = KPT_DIARY_PROMPT.format(
         situation=state_data.get('cbt_situation', 'не указана'),
         emotions=state_data.get('cbt_emotions', 'не указаны'),
@@ -147,7 +144,9 @@ async def handle_cbt_s3_thought(
         response = await assistant_service.get_kpt_diary_response(
             message=message.text,
             context_messages=message_history,
-            prompt=cbt_prompt
+            prompt=cbt_prompt,
+            user_id=user_telegram_id,
+            priority=get_llm_priority(raw_state)
         )
         ai_response_text = response.message
 
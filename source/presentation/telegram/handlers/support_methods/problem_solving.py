@@ -11,19 +11,23 @@ from dishka import AsyncContainer
 from dishka.integrations.aiogram import inject, FromDishka
 
 from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
+from source.application.redis_services.message_coalescer.message_coalescer_service import MessageCoalescerService
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
 from source.application.subscription.subscription_service import SubscriptionService
-from source.application.user import GetUserSchemaById
 from source.application.user.user_logs import CreateUserLog
+from source.core.exceptions import AssistantUnavailableException
 from source.core.lexicon import message_templates
 from source.core.lexicon.message_templates import PROBLEM_SOLVING_START
 from source.core.lexicon.prompts import PATHWAYS_TO_SOLVE_PROBLEM_PROMPT
 from source.core.schemas import UserLogCreateSchema, UserSchema
 from source.core.schemas.assistant_schemas import ContextMessage
-from source.materials.get_file import get_file_by_name
 from source.presentation.telegram.callbacks.method_callbacks import MethodCallback, ProblemSolvingCallback
+from source.presentation.telegram.coalescing import schedule_coalesced_reply
 from source.presentation.telegram.keyboards.keyboards import get_main_keyboard, get_problem_solutions_keyboard
-from source.presentation.telegram.states.user_states import SupportStates
+from source.presentation.telegram.media import MaterialSender
+from source.presentation.telegram.states.user_states import SupportStates, get_llm_priority
+from source.presentation.telegram.streaming import TelegramStreamRenderer
 from source.presentation.telegram.utils import send_long_message, extract_json_from_markdown, convert_markdown_to_html
 
 logger = logging.getLogger(__name__)
@@ -31,9 +35,11 @@ router = Router(name=__name__)
 
 
 @router.callback_query(MethodCallback.filter(F.name == "problem"), SupportStates.METHOD_SELECT)
+@inject
 async def handle_problem_solving_method(
         query: CallbackQuery,
-        state: FSMContext
+        state: FSMContext,
+        material_sender: FromDishka[MaterialSender]
 ):
     logger.info(f"User {query.from_user.id} chose 'problem' method.")
 
@@ -43,13 +49,13 @@ async def handle_problem_solving_method(
     await state.set_state(SupportStates.PROBLEM_S1_DEFINE)
 
     text = PROBLEM_SOLVING_START
-    photo_logo = get_file_by_name("problem_solver.jpeg")
 
     await query.message.delete()
 
-    await query.message.answer_photo(
-        caption=text,
-        photo=photo_logo
+    await material_sender.send(
+        query.bot,
+        "problem_solver.jpeg",
+        lambda photo: query.message.answer_photo(caption=text, photo=photo)
     )
     await query.answer()
 
@@ -60,11 +66,10 @@ async def handle_ps_s1_define(
         message: Message,
         state: FSMContext,
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
         message_history_service: FromDishka[MessageHistoryService],
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "problem_solving"
@@ -96,13 +101,14 @@ async def handle_ps_s2_goal(
         state: FSMContext,
         bot: FromDishka[Bot],
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        user: UserSchema,
         assistant_service: FromDishka[AssistantService],
         message_history_service: FromDishka[MessageHistoryService],
+        build_dialog_context: FromDishka[BuildDialogContext],
         subscription_service: FromDishka[SubscriptionService],
+        raw_state: str | None = None,
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "problem_solving"
@@ -117,7 +123,7 @@ async def handle_ps_s2_goal(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
+    message_history = await build_dialog_context(
         user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
     )
 
@@ -128,17 +134,20 @@ async def handle_ps_s2_goal(
     )
     # TODO: utils.get_waiting_message(support_method: SUPPORT_METHODS) + lexicon
 
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
-
     await state.update_data(problem_goal=message.text)
     await state.set_state(SupportStates.PROBLEM_S3_OPTIONS)
 
     try:
         raw_response = await assistant_service.get_problems_solver_response(
             message=message.text,
-            context_messages=message_history
+            context_messages=message_history,
+            user_id=user_telegram_id,
+            priority=get_llm_priority(raw_state)
+        )
+        logger.debug(
+            f"Raw AI response for user {user_telegram_id} in scope {context_scope}",
+            extra={"completion": raw_response.message}
         )
-        logger.info(f"Raw AI response for user {user_telegram_id} in scope {context_scope}: {raw_response.message}")
 
         await message_history_service.add_message_to_history(
             user_telegram_id, context_scope, ContextMessage(role="assistant", message=raw_response.message)
@@ -158,10 +167,14 @@ async def handle_ps_s2_goal(
         await message_waiting_response.delete()
 
         await send_long_message(message, convert_markdown_to_html(response_text), bot, get_problem_solutions_keyboard())
-        await subscription_service.increment_message_count(user_telegram_id)
 
+    except AssistantUnavailableException:
+        # сообщение списано LimitCheckMiddleware до ответа — ответа не было, возвращаем
+        await subscription_service.refund_message(user_telegram_id, user)
+        await message.answer(message_templates.ASSISTANT_UNAVAILABLE)
     except Exception as e:
         logger.error(f"Error in handle_ps_s2_goal for user {user_telegram_id}: {e}")
+        await subscription_service.refund_message(user_telegram_id, user)
         await message.answer("Произошла ошибка при обработке ответа. Попробуйте сформулировать проблему немного иначе.")
         await state.set_state(SupportStates.METHOD_SELECT)
 
@@ -175,6 +188,8 @@ async def handle_ps_s3_choice(
         bot: FromDishka[Bot],
         assistant_service: FromDishka[AssistantService],
         message_history_service: FromDishka[MessageHistoryService],
+        build_dialog_context: FromDishka[BuildDialogContext],
+        raw_state: str | None = None,
 ):
     await query.message.edit_text("Отличный выбор. Генерирую первые шаги, минутку...")
 
@@ -188,7 +203,7 @@ async def handle_ps_s3_choice(
 
     choice_message = f"Выбран вариант: {chosen_option_text}"
 
-    await message_history_service.add_message_to_history(
+    message_history = await build_dialog_context(
         user_telegram_id, context_scope, ContextMessage(role="user", message=choice_message)
     )
 
@@ -199,19 +214,28 @@ async def handle_ps_s3_choice(
     )
 
     try:
-        response = await assistant_service.get_pathways_to_solve_problem_response(
-            prompt=prompt,
-            context_messages=await message_history_service.get_history(user_telegram_id, context_scope)
+        renderer = TelegramStreamRenderer(
+            bot=bot,
+            chat_id=query.message.chat.id,
+            footer="\n\nЧто думаешь об этих шагах? Какой из них кажется наиболее реальным для начала? (Чтобы закончить, отправь /stop)"
         )
-        logger.info(f"Generated steps for user {user_telegram_id}: {response.message}")
+        response_text = await renderer.render(
+            assistant_service.stream_pathways_to_solve_problem_response(
+                prompt=prompt,
+                context_messages=message_history,
+                user_id=user_telegram_id,
+                priority=get_llm_priority(raw_state)
+            )
+        )
+        logger.info(f"Generated steps for user {user_telegram_id}", extra={"completion": response_text})
 
         await message_history_service.add_message_to_history(
-            user_telegram_id, context_scope, ContextMessage(role="assistant", message=response.message)
+            user_telegram_id, context_scope, ContextMessage(role="assistant", message=response_text)
         )
 
-        response_text = f"{response.message}\n\nЧто думаешь об этих шагах? Какой из них кажется наиболее реальным для начала? (Чтобы закончить, отправь /stop)"
-        await send_long_message(query.message, convert_markdown_to_html(response_text), bot)
         await state.set_state(SupportStates.PROBLEM_S4_STEPS_DISPLAYED)
+    except AssistantUnavailableException:
+        await query.message.answer(message_templates.ASSISTANT_UNAVAILABLE)
     except Exception as e:
         logger.error(f"Error generating steps for user {user_telegram_id}: {e}")
         await query.message.answer(
@@ -233,8 +257,10 @@ async def handle_stop_problem_solving(
 
     container: AsyncContainer = data["dishka_container"]
     history: MessageHistoryService = await container.get(MessageHistoryService)
+    message_coalescer: MessageCoalescerService = await container.get(MessageCoalescerService)
     await state.clear()
     await history.clear_history(user_telegram_id, context_scope)
+    await message_coalescer.clear(user_telegram_id, context_scope)
     await message.answer("Хорошо, мы закончили. Возвращаю в главное меню.", reply_markup=get_main_keyboard())
 
 
@@ -243,15 +269,14 @@ async def handle_stop_problem_solving(
 async def handle_ps_s4_discussion(
         message: Message,
         state: FSMContext,
-        bot: Bot,
         create_user_log: FromDishka[CreateUserLog],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
-        assistant_service: FromDishka[AssistantService],
-        message_history_service: FromDishka[MessageHistoryService],
-        subscription_service: FromDishka[SubscriptionService],
+        user: UserSchema,
+        message_coalescer: FromDishka[MessageCoalescerService],
+        dishka_container: AsyncContainer,
+        raw_state: str | None = None,
+        quota_charged: bool = False,
 ):
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     context_scope = "problem_solving"
@@ -266,27 +291,26 @@ async def handle_ps_s4_discussion(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
-        user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
+    # [ ответ — один на несколько сообщений подряд; в историю реплика попадет вместе с ответом ]
+    generation = await message_coalescer.push(user_telegram_id, context_scope, message.text, message.message_id)
+    priority = get_llm_priority(raw_state)
+
+    schedule_coalesced_reply(
+        message=message,
+        user=user,
+        container=dishka_container.parent_container,
+        coalescer=message_coalescer,
+        context_scope=context_scope,
+        generation=generation,
+        stream_reply=lambda assistant_service, text, message_history: assistant_service.stream_speaking_response(
+            message=text,
+            context_messages=message_history,
+            user_id=user_telegram_id,
+            priority=priority,
+            context_scope=context_scope
+        ),
+        waiting_text="Хорошо, думаю над ответом...",
+        error_text="Произошла ошибка. Пожалуйста, попробуйте еще раз или завершите сессию командой /stop.",
+        footer="\n\n💢Когда захочешь закончить со мной общаться, отправь команду /stop.",
+        quota_charged=quota_charged,
     )
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
-
-    try:
-        await message.answer(
-            "Хорошо, думаю над ответом...\n\n💢Когда захочешь закончить со мной общаться, отправь команду /stop."
-        )
-        response = await assistant_service.get_speaking_response(
-            message=message.text,
-            context_messages=message_history
-        )
-        response_text = response.message
-
-        await message_history_service.add_message_to_history(
-            user_telegram_id, context_scope, ContextMessage(role="assistant", message=response_text)
-        )
-
-        await send_long_message(message, convert_markdown_to_html(response_text), bot)
-        await subscription_service.increment_message_count(user_telegram_id)
-    except Exception as e:
-        logger.error(f"Error during discussion in problem_solving for user {user_telegram_id}: {e}")
-        await message.answer("Произошла ошибка. Пожалуйста, попробуйте еще раз или завершите сессию командой /stop.")
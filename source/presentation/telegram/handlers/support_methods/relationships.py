@@ -2,36 +2,35 @@ import logging
 import random
 import uuid
 
-from aiogram import F, Router, Bot
+from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from dishka import AsyncContainer
 from dishka.integrations.aiogram import inject, FromDishka
 
-from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.redis_services.message_coalescer.message_coalescer_service import MessageCoalescerService
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
-from source.application.subscription.subscription_service import SubscriptionService
-from source.application.user import GetUserSchemaById
 from source.application.user.user_logs import CreateUserLog
 from source.core.lexicon import message_templates
 from source.core.schemas import UserLogCreateSchema, UserSchema
-from source.core.schemas.assistant_schemas import ContextMessage
-from source.materials.get_file import get_file_by_name
 from source.presentation.telegram.callbacks.method_callbacks import MethodCallback, BlackpillCallback
+from source.presentation.telegram.coalescing import schedule_coalesced_reply
 from source.presentation.telegram.keyboards.keyboards import get_main_keyboard, \
     get_back_to_menu_keyboard
-from source.presentation.telegram.states.user_states import SupportStates
-from source.presentation.telegram.utils import send_long_message, convert_markdown_to_html
+from source.presentation.telegram.media import MaterialSender
+from source.presentation.telegram.states.user_states import SupportStates, get_llm_priority
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
 @router.callback_query(MethodCallback.filter(F.name == "relationships"), SupportStates.METHOD_SELECT)
+@inject
 async def handle_relationships_method(
         callback_query: CallbackQuery,
-        state: FSMContext
+        state: FSMContext,
+        material_sender: FromDishka[MaterialSender]
 ):
     """
     Старт режима Отношения.
@@ -43,13 +42,13 @@ async def handle_relationships_method(
     await state.set_state(SupportStates.RELATIONSHIPS)
 
     text = message_templates.RELATIONSHIPS_START
-    photo_logo = get_file_by_name("relationships.jpeg")
 
     await callback_query.message.delete()
 
-    await callback_query.message.answer_photo(
-        caption=text,
-        photo=photo_logo
+    await material_sender.send(
+        callback_query.bot,
+        "relationships.jpeg",
+        lambda photo: callback_query.message.answer_photo(caption=text, photo=photo)
     )
     await callback_query.answer()
 
@@ -65,6 +64,7 @@ async def handle_stop_relationships(
     """
     container: AsyncContainer = data["dishka_container"]
     history: MessageHistoryService = await container.get(MessageHistoryService)
+    message_coalescer: MessageCoalescerService = await container.get(MessageCoalescerService)
 
     user_id = str(message.from_user.id)
     context_scope = "blackpill_exit"
@@ -72,6 +72,7 @@ async def handle_stop_relationships(
 
     await state.clear()
     await history.clear_history(user_id, context_scope)
+    await message_coalescer.clear(user_id, context_scope)
     await message.answer("Хорошо, возвращаю тебя в главное меню.", reply_markup=get_main_keyboard())
     return
 
@@ -81,12 +82,13 @@ async def handle_stop_relationships(
 async def handle_relationships_talking(
         message: Message,
         state: FSMContext,
-        bot: FromDishka[Bot],
         create_user_log: FromDishka[CreateUserLog],
-        assistant_service: FromDishka[AssistantService],
         message_history_service: FromDishka[MessageHistoryService],
-        subscription_service: FromDishka[SubscriptionService],
-        get_user_schema_interactor: FromDishka[GetUserSchemaById],
+        message_coalescer: FromDishka[MessageCoalescerService],
+        user: UserSchema,
+        dishka_container: AsyncContainer,
+        raw_state: str | None = None,
+        quota_charged: bool = False,
 ):
     """
     процесс разговора с ассистентом
@@ -95,13 +97,13 @@ async def handle_relationships_talking(
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)  # TODO: get from redis
 
     context_scope = "blackpill_exit"
 
     if message.text == "Вернуться в меню":
         await state.clear()
         await message_history_service.clear_history(user_telegram_id, context_scope)
+        await message_coalescer.clear(user_telegram_id, context_scope)
         await message.answer("Хорошо, возвращаю тебя в главное меню.", reply_markup=get_main_keyboard())
         return
 
@@ -115,32 +117,25 @@ async def handle_relationships_talking(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
-        user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
+    # [ ответ — один на несколько сообщений подряд; в историю реплика попадет вместе с ответом ]
+    generation = await message_coalescer.push(user_telegram_id, context_scope, message.text, message.message_id)
+    priority = get_llm_priority(raw_state)
+
+    schedule_coalesced_reply(
+        message=message,
+        user=user,
+        container=dishka_container.parent_container,
+        coalescer=message_coalescer,
+        context_scope=context_scope,
+        generation=generation,
+        stream_reply=lambda assistant_service, text, message_history: assistant_service.stream_relationships_response(
+            message=text,
+            context_messages=message_history,
+            user_id=user_telegram_id,
+            priority=priority
+        ),
+        waiting_text=random.choice(message_templates.RELATIONSHIPS_WAITING_RESPONSE),
+        error_text="Произошла ошибка. Пожалуйста, попробуй еще раз. Если проблема повторится, ты можешь вернуться в меню.",
+        reply_markup=get_back_to_menu_keyboard(),
+        quota_charged=quota_charged,
     )
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
-
-    try:
-        message_waiting_response: Message = await message.answer(random.choice(message_templates.RELATIONSHIPS_WAITING_RESPONSE))
-        # TODO: utils.get_waiting_message(support_method: SUPPORT_METHODS) + lexicon
-
-        response = await assistant_service.get_relationships_response(message=message.text,
-                                                                      context_messages=message_history)
-        ai_response_text = response.message
-
-        await message_waiting_response.delete()
-
-        await send_long_message(message, convert_markdown_to_html(ai_response_text), bot,
-                                keyboard=get_back_to_menu_keyboard())
-
-        ai_message_context = ContextMessage(role="assistant", message=ai_response_text)
-        await message_history_service.add_message_to_history(user_telegram_id, context_scope, ai_message_context)
-
-        await subscription_service.increment_message_count(user_telegram_id)
-
-    except Exception as e:
-        logger.error(f"Failed to get AI response for user {user_telegram_id} in scope {context_scope}: {e}")
-        await message.answer(
-            "Произошла ошибка. Пожалуйста, попробуй еще раз. Если проблема повторится, ты можешь вернуться в меню.",
-            reply_markup=get_back_to_menu_keyboard()
-        )
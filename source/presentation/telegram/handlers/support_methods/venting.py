@@ -3,48 +3,48 @@ import random
 import uuid
 
 from aiogram import F, Router
-from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from dishka import AsyncContainer
 from dishka.integrations.aiogram import inject, FromDishka
 
-from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.redis_services.message_coalescer.message_coalescer_service import MessageCoalescerService
 from source.application.redis_services.message_history.message_history_service import MessageHistoryService
-from source.application.subscription.subscription_service import SubscriptionService
-from source.application.user import GetUserSchemaById
 from source.application.user.user_logs import CreateUserLog
 from source.core.lexicon import message_templates
 from source.core.lexicon.message_templates import VENTING_START
 from source.core.schemas import UserLogCreateSchema, UserSchema
-from source.core.schemas.assistant_schemas import ContextMessage
-from source.materials.get_file import get_file_by_name
 from source.presentation.telegram.callbacks.method_callbacks import MethodCallback
+from source.presentation.telegram.coalescing import schedule_coalesced_reply
 from source.presentation.telegram.keyboards.keyboards import get_main_keyboard
-from source.presentation.telegram.states.user_states import SupportStates
-from source.presentation.telegram.utils import convert_markdown_to_html
+from source.presentation.telegram.media import MaterialSender
+from source.presentation.telegram.states.user_states import SupportStates, get_llm_priority
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
 @router.callback_query(MethodCallback.filter(F.name == "vent"), SupportStates.METHOD_SELECT)
-async def handle_vent_out_method(query: CallbackQuery, state: FSMContext):
+@inject
+async def handle_vent_out_method(
+    query: CallbackQuery,
+    state: FSMContext,
+    material_sender: FromDishka[MaterialSender],
+):
     logger.info(f"User {query.from_user.id} chose 'vent' method.")
     dialogue_id = uuid.uuid4()
     await state.update_data(dialogue_id=dialogue_id)
     await state.set_state(SupportStates.SPEAKING)
 
     text = VENTING_START
-    photo_logo = get_file_by_name("speaking.jpeg")
 
     await query.message.delete()
 
-    await query.message.answer_photo(
-        caption=text,
-        photo=photo_logo
+    await material_sender.send(
+        query.bot,
+        "speaking.jpeg",
+        lambda photo: query.message.answer_photo(caption=text, photo=photo)
     )
     await query.answer()
 
@@ -57,6 +57,7 @@ async def handle_stop_venting(
 ):
     container: AsyncContainer = data["dishka_container"]
     history: MessageHistoryService = await container.get(MessageHistoryService)
+    message_coalescer: MessageCoalescerService = await container.get(MessageCoalescerService)
 
     user_telegram_id = str(message.from_user.id)
     context_scope = "venting"
@@ -64,6 +65,7 @@ async def handle_stop_venting(
 
     await state.clear()
     await history.clear_history(user_telegram_id, context_scope)
+    await message_coalescer.clear(user_telegram_id, context_scope)
 
     await message.answer(
         "Хорошо, мы закончили. Возвращаю в главное меню.",
@@ -77,18 +79,18 @@ async def handle_venting_message(
     message: Message,
     state: FSMContext,
     create_user_log: FromDishka[CreateUserLog],
-    assistant_service: FromDishka[AssistantService],
-    message_history_service: FromDishka[MessageHistoryService],
-    subscription_service: FromDishka[SubscriptionService],
-    get_user_schema_interactor: FromDishka[GetUserSchemaById],
+    message_coalescer: FromDishka[MessageCoalescerService],
+    user: UserSchema,
+    dishka_container: AsyncContainer,
+    raw_state: str | None = None,
+    quota_charged: bool = False,
 ):
     state_data = await state.get_data()
     dialogue_id = state_data["dialogue_id"]
     user_telegram_id = str(message.from_user.id)
-    user: UserSchema = await get_user_schema_interactor(telegram_id=user_telegram_id)
 
     context_scope = "venting"
-    logger.info(f"User {user_telegram_id} is venting. Msg: '{message.text[:30]}...'")
+    logger.info(f"User {user_telegram_id} is venting", extra={"message_text": message.text})
 
     # [ сохраняем лог в БД]
     await create_user_log(
@@ -100,39 +102,24 @@ async def handle_venting_message(
     )
     logger.info(f"User log created: dialog_id = {dialogue_id}")
 
-    await message_history_service.add_message_to_history(
-        user_telegram_id, context_scope, ContextMessage(role="user", message=message.text)
+    # [ ответ — один на несколько сообщений подряд; в историю реплика попадет вместе с ответом ]
+    generation = await message_coalescer.push(user_telegram_id, context_scope, message.text, message.message_id)
+    priority = get_llm_priority(raw_state)
+
+    schedule_coalesced_reply(
+        message=message,
+        user=user,
+        container=dishka_container.parent_container,
+        coalescer=message_coalescer,
+        context_scope=context_scope,
+        generation=generation,
+        stream_reply=lambda assistant_service, text, message_history: assistant_service.stream_speaking_response(
+            message=text,
+            context_messages=message_history,
+            user_id=user_telegram_id,
+            priority=priority
+        ),
+        waiting_text=random.choice(message_templates.SPEAKING_WAITING_RESPONSE),
+        error_text="Произошла ошибка. Пожалуйста, попробуйте еще раз.",
+        quota_charged=quota_charged,
     )
-    message_history = await message_history_service.get_history(user_telegram_id, context_scope)
-
-    try:
-        message_waiting: Message = await message.answer(
-            random.choice(message_templates.SPEAKING_WAITING_RESPONSE)
-        )
-        # TODO: utils.get_waiting_message(support_method: SUPPORT_METHODS) + lexicon
-
-        response = await assistant_service.get_speaking_response(
-            message=message.text,
-            context_messages=message_history
-        )
-        response_text = response.message
-
-        await message_history_service.add_message_to_history(
-            user_telegram_id, context_scope, ContextMessage(role="assistant", message=response_text)
-        )
-
-        response_text_html = convert_markdown_to_html(response_text)
-
-        await message_waiting.delete()
-
-        try:
-            await message.answer(response_text_html, parse_mode=ParseMode.HTML)
-        except TelegramBadRequest:
-            logger.warning(f"Ошибка при парсинге HTML для юзера {user_telegram_id}. Отправляем обычный текст.")
-            await message.answer(response_text)
-
-        await subscription_service.increment_message_count(user_telegram_id)
-
-    except Exception as e:
-        logger.error(f"Ошибка при обработке информации юзера {user_telegram_id} в скопе {context_scope}: {e}")
-        await message.answer("Произошла ошибка. Пожалуйста, попробуйте еще раз.")
@@ -0,0 +1,63 @@
+import logging
+from typing import Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InputFile, Message
+
+from source.application.redis_services.media_cache.media_cache_service import MediaCacheService
+from source.materials.get_file import get_file_by_name, get_file_hash
+
+logger = logging.getLogger(__name__)
+
+# отправка медиа: принимает file_id или файл с диска и возвращает отправленное сообщение
+SendMedia = Callable[[InputFile | str], Awaitable[Message]]
+
+
+def extract_file_id(message: Message) -> str | None:
+    if message.photo:
+        return message.photo[-1].file_id
+    for media in (message.animation, message.video, message.document, message.audio, message.voice):
+        if media is not None:
+            return media.file_id
+    return None
+
+
+class MaterialSender:
+    """
+    Отправка файлов из source/materials по file_id вместо загрузки с диска.
+
+    Файл загружается в Telegram один раз, его file_id сохраняется в MediaCacheService по хэшу
+    содержимого и дальше отправляется только он. Если Telegram отклонил file_id, файл загружается
+    заново и сохраняется новый file_id.
+    """
+
+    def __init__(self, media_cache: MediaCacheService):
+        self.media_cache = media_cache
+        # file_id в памяти процесса, чтобы не ходить в Redis на каждый /start
+        self._file_ids: dict[tuple[int, str], str] = {}
+
+    async def send(self, bot: Bot, filename: str, send: SendMedia) -> Message:
+        content_hash = get_file_hash(filename)
+        key = (bot.id, content_hash)
+
+        file_id = self._file_ids.get(key) or await self.media_cache.get_file_id(bot.id, content_hash)
+        if file_id:
+            try:
+                message = await send(file_id)
+                self._file_ids[key] = file_id
+                return message
+            except TelegramBadRequest as e:
+                if "file" not in e.message.lower():
+                    raise
+                logger.warning(f"Telegram rejected cached file_id of {filename}, uploading again: {e.message}")
+                self._file_ids.pop(key, None)
+                await self.media_cache.forget_file_id(bot.id, content_hash)
+
+        message = await send(get_file_by_name(filename))
+        file_id = extract_file_id(message)
+        if file_id:
+            self._file_ids[key] = file_id
+            await self.media_cache.save_file_id(bot.id, content_hash, file_id)
+            logger.info(f"Uploaded {filename}, file_id cached")
+        return message
@@ -1,5 +1,10 @@
 from .load_user import LoadUserMiddleware
 from .limit_check_middleware import LimitCheckMiddleware
+from .deduplicate_update import DeduplicateUpdateMiddleware
+from .metrics import HandlerMetricsMiddleware, TimedMiddleware
 
 __all__=['LoadUserMiddleware',
-         'LimitCheckMiddleware']
\ No newline at end of file
+         'LimitCheckMiddleware',
+         'DeduplicateUpdateMiddleware',
+         'HandlerMetricsMiddleware',
+         'TimedMiddleware']
\ No newline at end of file
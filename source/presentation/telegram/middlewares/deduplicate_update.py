@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from source.application.redis_services.idempotency.idempotency_service import IdempotencyService
+from source.presentation.telegram.update_tasks import current_update_tasks, track_update_task
+
+logger = logging.getLogger(__name__)
+
+UPDATE_SCOPE = "telegram_update"
+
+
+class DeduplicateUpdateMiddleware(BaseMiddleware):
+    """
+    Outer-middleware апдейтов: апдейт с уже виденным update_id не доходит до хэндлеров.
+
+    Telegram и очередь апдейтов доставляют хотя бы один раз, так что повтор возможен — без этой
+    проверки он стоил бы второго запроса к ассистенту, второго UserLog и второго списания лимита.
+    Регистрируется до setup_dishka, чтобы на повтор не открывался даже REQUEST-контейнер.
+
+    Если хэндлер оставил фоновые задачи (ответ после окна coalescing), апдейт помечается обработанным
+    только после них. UpdateWorkerPool перечитывает неподтвержденный апдейт с redelivered=True —
+    тогда незавершенная обработка упавшего процесса не считается повтором.
+    """
+
+    def __init__(self, idempotency: IdempotencyService):
+        self.idempotency = idempotency
+
+    async def __call__(
+            self,
+            handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ) -> Any:
+        key = str(event.update_id)
+        if not await self.idempotency.claim(UPDATE_SCOPE, key, takeover=data.get("redelivered", False)):
+            logger.info(f"Duplicate update {key} skipped")
+            return None
+
+        try:
+            result = await handler(event, data)
+        except Exception:
+            await self.idempotency.release(UPDATE_SCOPE, key)
+            raise
+
+        background = current_update_tasks()
+        if background:
+            track_update_task(asyncio.create_task(self._complete_after(background, key)))
+        else:
+            await self.idempotency.complete(UPDATE_SCOPE, key)
+        return result
+
+    async def _complete_after(self, background: list[asyncio.Task], key: str):
+        # при отмене (остановка воркера) ключ остается processing — апдейт перечитают с redelivered
+        await asyncio.wait(background)
+        await self.idempotency.complete(UPDATE_SCOPE, key)
@@ -22,7 +22,8 @@ class LimitCheckMiddleware(BaseMiddleware):
         if not isinstance(event, Message):
             return await handler(event, data)
 
-        if event.text and event.text.startswith("/start"):
+        # команды (/start, /stop) и выход в меню не списывают сообщение и не упираются в лимит
+        if event.text and (event.text.startswith("/") or event.text == "Вернуться в меню"):
             return await handler(event, data)
 
         state = data.get("state")
@@ -35,7 +36,8 @@ class LimitCheckMiddleware(BaseMiddleware):
             SupportStates.SPEAKING.state,
             SupportStates.PROBLEM_S2_GOAL.state,
             SupportStates.CALMING_TALK.state,
-            SupportStates.BLACKPILL_TALK.state
+            SupportStates.BLACKPILL_TALK.state,
+            SupportStates.PROBLEM_S4_STEPS_DISPLAYED.state,
         ]
 
         if current_state not in limitable_states:
@@ -54,14 +56,23 @@ class LimitCheckMiddleware(BaseMiddleware):
 
         telegram_id = str(aiogram_user.id)
 
-        limit_reached = await subscription_service.check_message_limit(telegram_id)
-        logger.info(f'User {telegram_id} in state {current_state}. Limit reached: {limit_reached}')
+        # юзер уже загружен LoadUserMiddleware — не читаем его из БД повторно
+        user = data.get("user")
+        # проверка и списание атомарны: параллельные сообщения одного юзера не проскочат лимит
+        consumed = await subscription_service.try_consume_message(telegram_id, user)
+        logger.debug(f'User {telegram_id} in state {current_state}. Limit reached: {not consumed}')
 
-        if limit_reached:
+        if not consumed:
             await event.answer(
                 "<b>Вы достигли лимита сообщений за сутки. Дождитесь завтра или приобретите подписку:</b>",
                 reply_markup=get_subscriptions_menu_keyboard()
             )
             return
 
-        return await handler(event, data)
+        # хэндлеры, которые отвечают позже или ловят ошибки сами, возвращают сообщение через refund_message
+        data["quota_charged"] = True
+        try:
+            return await handler(event, data)
+        except Exception:
+            await subscription_service.refund_message(telegram_id, user)
+            raise
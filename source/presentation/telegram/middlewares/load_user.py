@@ -12,6 +12,14 @@ from source.application.user.get_by_id import GetUserSchemaById
 
 
 class LoadUserMiddleware(BaseMiddleware):
+    """
+    Загружает (или создает) юзера один раз на апдейт и кладет в data["user"].
+
+    Это и есть кэш юзера на время апдейта: LimitCheckMiddleware, хэндлеры и SubscriptionService
+    берут юзера отсюда, а не читают его из БД заново. Между апдейтами профиль живет в UserCacheService,
+    так что большинство апдейтов до Postgres не доходит.
+    """
+
     async def __call__(
             self,
             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
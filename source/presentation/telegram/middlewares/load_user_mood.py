@@ -22,7 +22,7 @@ class LoadUserMood(BaseMiddleware):
         """сохраняет is_mood_was_set_today в data если есть нужный флаг у роутера"""
         # [ check flag ]
         is_mood_flag: bool = get_flag(data, "user_mood")
-        logger.info(f"Need mood check: {is_mood_flag}")
+        logger.debug(f"Need mood check: {is_mood_flag}")
 
         if not is_mood_flag:
             return await handler(event, data)
@@ -42,5 +42,5 @@ class LoadUserMood(BaseMiddleware):
         is_mood_set: bool = await is_mood_set_interactor(telegram_id)
         data["is_mood_was_set_today"] = is_mood_set
 
-        logger.info(f"Is mood set for user {telegram_id}: {is_mood_set}")
+        logger.debug(f"Is mood set for user {telegram_id}: {is_mood_set}")
         return await handler(event, data)
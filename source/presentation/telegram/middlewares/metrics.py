@@ -0,0 +1,67 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from source.infrastructure.metrics.metrics import telegram_handler_seconds, telegram_handler_errors_total, \
+    telegram_middleware_seconds
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Время хэндлера по имени его функции (handle_venting_message, ...) — регистрируется последним
+    inner-middleware, поэтому меряет только сам хэндлер
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ):
+        handler_object: HandlerObject | None = data.get("handler")
+        name = getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown"
+        started = time.monotonic()
+        try:
+            return await handler(event, data)
+        except Exception:
+            telegram_handler_errors_total.inc(name)
+            raise
+        finally:
+            telegram_handler_seconds.observe(name, value=time.monotonic() - started)
+
+
+class TimedMiddleware(BaseMiddleware):
+    """
+    Обертка над middleware: пишет в telegram_middleware_seconds его собственное время —
+    из общего вычитается время всего, что оно вызвало дальше по цепочке
+    """
+
+    def __init__(self, middleware: BaseMiddleware):
+        self.middleware = middleware
+        self.name = type(middleware).__name__
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ):
+        downstream = 0.0
+
+        async def timed_handler(inner_event: TelegramObject, inner_data: dict[str, Any]):
+            nonlocal downstream
+            handler_started = time.monotonic()
+            try:
+                return await handler(inner_event, inner_data)
+            finally:
+                downstream += time.monotonic() - handler_started
+
+        started = time.monotonic()
+        try:
+            return await self.middleware(timed_handler, event, data)
+        finally:
+            telegram_middleware_seconds.observe(self.name, value=time.monotonic() - started - downstream)
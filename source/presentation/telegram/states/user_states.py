@@ -1,5 +1,7 @@
 from aiogram.fsm.state import State, StatesGroup
 
+from source.core.enum import LLMPriority
+
 
 class SupportStates(StatesGroup):
     # Основной поток
@@ -36,3 +38,17 @@ class SupportStates(StatesGroup):
 
     # Платежка
     WAITING = State()  # Ожидаем выбор: почта или телефон
+
+
+# Состояния, в которых запросы к ассистенту идут вне очереди
+CRISIS_STATES = (
+    SupportStates.RISK_PROTOCOL.state,
+    SupportStates.CALMING_TALK.state,
+)
+
+
+def get_llm_priority(raw_state: str | None) -> LLMPriority:
+    """Приоритет запроса к ассистенту по текущему состоянию юзера"""
+    if raw_state in CRISIS_STATES:
+        return LLMPriority.CRISIS
+    return LLMPriority.DIALOG
@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import AsyncIterable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message, InlineKeyboardMarkup
+
+from source.presentation.telegram.utils import (
+    TELEGRAM_MAX_MESSAGE_LENGTH,
+    convert_markdown_to_html,
+    find_split_position,
+)
+
+logger = logging.getLogger(__name__)
+
+# Telegram начинает отвечать 429 примерно при частоте больше одного edit'а в секунду на чат
+STREAM_EDIT_INTERVAL = 1.0
+
+
+class TelegramStreamRenderer:
+    """
+    Показывает ответ ассистента по мере генерации.
+
+    Дельты копятся в буфере и выводятся редкими edit_message_text (не чаще edit_interval),
+    при превышении TELEGRAM_MAX_MESSAGE_LENGTH текущее сообщение фиксируется и начинается новое —
+    так же, как режет текст send_long_message.
+    Промежуточные правки идут обычным текстом, финальная — в HTML с клавиатурой.
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            chat_id: int,
+            placeholder: Message | None = None,
+            reply_markup=None,
+            footer: str = "",
+            edit_interval: float = STREAM_EDIT_INTERVAL,
+    ):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.reply_markup = reply_markup
+        self.footer = footer
+        self.edit_interval = edit_interval
+
+        self._message: Message | None = placeholder  # сообщение, которое сейчас редактируется
+        self._messages: list[Message] = [placeholder] if placeholder is not None else []  # все сообщения ответа
+        self._buffer: str = ""  # текст текущего сообщения
+        self._visible: str | None = None  # что сейчас видит юзер в текущем сообщении
+        self._next_edit_at: float = 0.0
+
+    async def render(self, deltas: AsyncIterable[str]) -> str:
+        """Выводит стрим в чат и возвращает полный текст ответа (без footer)"""
+        full_text: list[str] = []
+
+        async for delta in deltas:
+            full_text.append(delta)
+            self._buffer += delta
+
+            while len(self._buffer) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                split_pos = find_split_position(self._buffer)
+                head, self._buffer = self._buffer[:split_pos], self._buffer[split_pos:]
+                await self._finalize(head, reply_markup=None)
+                self._message = None
+                self._visible = None
+
+            if time.monotonic() >= self._next_edit_at:
+                await self._show(self._buffer)
+
+        text = "".join(full_text)
+
+        tail = self._buffer + self.footer
+        if len(tail) > TELEGRAM_MAX_MESSAGE_LENGTH:
+            await self._finalize(self._buffer, reply_markup=None)
+            self._message = None
+            self._visible = None
+            tail = self.footer.lstrip()
+        await self._finalize(tail, reply_markup=self.reply_markup)
+
+        return text
+
+    async def _show(self, text: str):
+        """Промежуточный вывод обычным текстом (частичный markdown/html может быть невалидным)"""
+        if not text.strip() or text == self._visible:
+            return
+
+        try:
+            if self._message is None:
+                self._message = await self.bot.send_message(
+                    self.chat_id,
+                    text,
+                    parse_mode=None,
+                    reply_markup=self._reply_markup_on_send(),
+                )
+                self._messages.append(self._message)
+            else:
+                await self._message.edit_text(text, parse_mode=None)
+            self._visible = text
+        except TelegramRetryAfter as e:
+            logger.warning(f"Stream edit rate limited in chat {self.chat_id}, retry after {e.retry_after}s")
+            self._next_edit_at = time.monotonic() + e.retry_after
+            return
+        except TelegramBadRequest as e:
+            logger.warning(f"Stream edit failed in chat {self.chat_id}: {e}")
+
+        self._next_edit_at = time.monotonic() + self.edit_interval
+
+    async def _finalize(self, text: str, reply_markup=None):
+        """Финальная версия сообщения: HTML, при ошибке разметки — обычный текст"""
+        if not text.strip():
+            return
+
+        inline_markup = reply_markup if isinstance(reply_markup, InlineKeyboardMarkup) else None
+        html_text = convert_markdown_to_html(text)
+
+        try:
+            if self._message is None:
+                self._message = await self.bot.send_message(
+                    self.chat_id,
+                    html_text,
+                    reply_markup=reply_markup or self._reply_markup_on_send(),
+                )
+                self._messages.append(self._message)
+            elif html_text != self._visible or inline_markup is not None:
+                await self._message.edit_text(html_text, reply_markup=inline_markup)
+        except TelegramBadRequest:
+            logger.warning(f"Ошибка при парсинге HTML в чате {self.chat_id}. Отправляем обычный текст.")
+            if self._message is None:
+                self._message = await self.bot.send_message(self.chat_id, text, parse_mode=None)
+                self._messages.append(self._message)
+            elif text != self._visible:
+                await self._message.edit_text(text, parse_mode=None, reply_markup=inline_markup)
+        self._visible = html_text
+
+    async def discard(self):
+        """Удаляет из чата всё, что успел вывести рендерер (например, если ответ больше не нужен)"""
+        for message in self._messages:
+            try:
+                await message.delete()
+            except TelegramBadRequest as e:
+                logger.warning(f"Failed to delete stream message in chat {self.chat_id}: {e}")
+        self._messages.clear()
+        self._message = None
+        self._visible = None
+
+    def _reply_markup_on_send(self):
+        """Reply-клавиатуру можно прикрепить только при отправке, а не при редактировании"""
+        if self.reply_markup is not None and not isinstance(self.reply_markup, InlineKeyboardMarkup):
+            return self.reply_markup
+        return None
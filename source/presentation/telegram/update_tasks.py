@@ -0,0 +1,33 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# фоновые задачи, запущенные при обработке текущего апдейта (ответ после окна coalescing и т.п.)
+_update_tasks: ContextVar[list[asyncio.Task] | None] = ContextVar("update_tasks", default=None)
+
+
+@contextmanager
+def collect_update_tasks() -> Iterator[list[asyncio.Task]]:
+    """
+    Собирает задачи, которые хэндлеры апдейта запустили через track_update_task.
+    UpdateWorkerPool дожидается их перед ack: апдейт не подтверждается, пока на него не ответили
+    """
+    tasks: list[asyncio.Task] = []
+    token = _update_tasks.set(tasks)
+    try:
+        yield tasks
+    finally:
+        _update_tasks.reset(token)
+
+
+def track_update_task(task: asyncio.Task) -> asyncio.Task:
+    """Привязывает задачу к обрабатываемому апдейту; вне collect_update_tasks задача просто живет сама"""
+    tasks = _update_tasks.get()
+    if tasks is not None:
+        tasks.append(task)
+    return task
+
+
+def current_update_tasks() -> list[asyncio.Task]:
+    return list(_update_tasks.get() or ())
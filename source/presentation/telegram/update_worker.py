@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import uuid
+from functools import partial
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
+from dishka import AsyncContainer
+
+from source.application.redis_services.update_queue.UpdateQueueServiceInterface import QueuedUpdate
+from source.application.redis_services.update_queue.update_queue_service import UpdateQueueService
+from source.presentation.telegram.update_tasks import collect_update_tasks
+
+logger = logging.getLogger(__name__)
+
+# пауза перед повтором, если Redis недоступен или захват партиций занят другим процессом
+RETRY_DELAY = 1.0
+
+
+def update_ordering_key(update: Update) -> int:
+    """Чат (или юзер), в порядке которого должны обрабатываться апдейты"""
+    try:
+        event = update.event
+    except UpdateTypeLookupError:
+        return update.update_id
+
+    chat = getattr(event, "chat", None) or getattr(getattr(event, "message", None), "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None) or getattr(event, "user", None)
+    if user is not None:
+        return user.id
+    return update.update_id
+
+
+def assigned_partitions(partitions: int, worker_index: int, worker_count: int) -> list[int]:
+    return [partition for partition in range(partitions) if partition % worker_count == worker_index]
+
+
+class UpdateWorkerPool:
+    """
+    Обработка апдейтов из UpdateQueueService.
+
+    Воркер с индексом worker_index читает только свои партиции и держит на них захват в Redis,
+    так что партицию в каждый момент читает один процесс. Внутри процесса апдейты одного чата
+    выстраиваются в цепочку и обрабатываются строго по очереди, разные чаты — параллельно,
+    но не больше max_in_flight одновременно; пока все слоты заняты, новые апдейты не читаются
+    и копятся в стриме (а при переполнении — у Telegram).
+
+    Апдейт подтверждается после feed_update и фоновых задач, которые хэндлеры к нему привязали
+    (ответ после окна coalescing): они занимают место в max_in_flight, а следующий апдейт чата
+    ждет только feed_update. Если процесс упал раньше, апдейт остается в pending и при следующем
+    запуске воркера с тем же индексом обрабатывается первым — с redelivered=True в data хэндлеров.
+    """
+
+    def __init__(
+            self,
+            queue: UpdateQueueService,
+            dispatcher: Dispatcher,
+            bot: Bot,
+            container: AsyncContainer,
+            partitions: list[int],
+            worker_index: int,
+            max_in_flight: int,
+            lease_ttl: int,
+            shutdown_timeout: float,
+            read_block: float = 1.0,
+    ):
+        self.queue = queue
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.container = container
+        self.partitions = partitions
+        self.worker_index = worker_index
+        self.max_in_flight = max_in_flight
+        self.lease_ttl = lease_ttl
+        self.shutdown_timeout = shutdown_timeout
+        self.read_block = read_block
+
+        # consumer постоянный: после рестарта воркер дочитывает свои же неподтвержденные апдейты
+        self.consumer = f"worker-{worker_index}"
+        self._lease_token = uuid.uuid4().hex
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._slot_freed = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        # чат -> future "последний апдейт чата прошел feed_update"
+        self._chat_tails: dict[int, asyncio.Future] = {}
+
+    async def run(self):
+        """Работает до отмены; при отмене дожидается начатых апдейтов не дольше shutdown_timeout"""
+        logger.info(f"Update worker {self.worker_index} serves partitions {self.partitions}")
+        while True:
+            await self._acquire_lease()
+            consume = asyncio.create_task(self._consume())
+            try:
+                await self._keep_lease(consume)
+            finally:
+                consume.cancel()
+                await asyncio.gather(consume, return_exceptions=True)
+                await self._drain()
+                await self._release_lease()
+
+    async def _acquire_lease(self):
+        while True:
+            try:
+                if await self.queue.acquire_lease(self.worker_index, self._lease_token, self.lease_ttl):
+                    return
+            except Exception as e:
+                logger.error(f"Failed to acquire partitions of update worker {self.worker_index}: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+
+    async def _keep_lease(self, consume: asyncio.Task):
+        while not consume.done():
+            await asyncio.wait([consume], timeout=self.lease_ttl / 3)
+            if consume.done():
+                break
+            try:
+                renewed = await self.queue.renew_lease(self.worker_index, self._lease_token, self.lease_ttl)
+            except Exception as e:
+                logger.error(f"Failed to renew partitions of update worker {self.worker_index}: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Update worker {self.worker_index} lost its partitions, reacquiring")
+                return
+        consume.result()
+
+    async def _release_lease(self):
+        try:
+            await self.queue.release_lease(self.worker_index, self._lease_token)
+        except Exception as e:
+            logger.error(f"Failed to release partitions of update worker {self.worker_index}: {e}")
+
+    async def _consume(self):
+        # сначала — неподтвержденные апдейты прошлого запуска, потом новые
+        cursors = {partition: "0" for partition in self.partitions}
+        while True:
+            free = self.max_in_flight - len(self._tasks)
+            if free <= 0:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+
+            try:
+                updates = await self.queue.read(self.consumer, cursors, count=free, block=self.read_block)
+            except Exception as e:
+                logger.error(f"Failed to read updates: {e}")
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+
+            advanced = set()
+            for update in updates:
+                redelivered = cursors[update.partition] != ">"
+                if redelivered:
+                    cursors[update.partition] = update.entry_id
+                    advanced.add(update.partition)
+                self._dispatch(update, redelivered)
+            for partition, cursor in cursors.items():
+                if cursor != ">" and partition not in advanced:
+                    # неподтвержденных не осталось — переходим к новым апдейтам
+                    cursors[partition] = ">"
+
+    def _dispatch(self, queued: QueuedUpdate, redelivered: bool = False):
+        update = None
+        if queued.payload is None:
+            logger.warning(f"Update {queued.entry_id} was removed from the stream while pending")
+        else:
+            try:
+                update = Update.model_validate_json(queued.payload, context={"bot": self.bot})
+            except Exception as e:
+                logger.error(f"Dropping malformed update {queued.entry_id}: {e}")
+
+        key = update_ordering_key(update) if update is not None else None
+        previous = self._chat_tails.get(key)
+        handled = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._process(previous, handled, queued, update, redelivered))
+        self._tasks.add(task)
+        task.add_done_callback(self._forget_task)
+        if key is not None:
+            self._chat_tails[key] = handled
+            handled.add_done_callback(partial(self._forget_tail, key))
+
+    def _forget_task(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._slot_freed.set()
+
+    def _forget_tail(self, key: int, handled: asyncio.Future):
+        if self._chat_tails.get(key) is handled:
+            del self._chat_tails[key]
+
+    async def _process(
+            self,
+            previous: asyncio.Future | None,
+            handled: asyncio.Future,
+            queued: QueuedUpdate,
+            update: Update | None,
+            redelivered: bool,
+    ):
+        background: list[asyncio.Task] = []
+        try:
+            if previous is not None:
+                # asyncio.wait, а не gather: отмена этой задачи не должна отменять предыдущую
+                await asyncio.wait([previous])
+
+            if update is not None:
+                async with self._slots:
+                    with collect_update_tasks() as background:
+                        try:
+                            await self.dispatcher.feed_update(
+                                bot=self.bot,
+                                update=update,
+                                dishka_container=self.container,
+                                redelivered=redelivered,
+                            )
+                        except Exception as e:
+                            # подтверждаем и упавший апдейт, иначе он будет падать при каждом перезапуске
+                            logger.error(f"Failed to process update {update.update_id}: {e}", exc_info=True)
+        finally:
+            # следующий апдейт чата может начинаться, фоновые задачи этого ему не мешают
+            if not handled.done():
+                handled.set_result(None)
+
+        if background:
+            try:
+                await asyncio.wait(background)
+            except asyncio.CancelledError:
+                # остановка: апдейт не подтверждается, следующий запуск обработает его заново
+                for task in background:
+                    task.cancel()
+                await asyncio.gather(*background, return_exceptions=True)
+                raise
+
+        try:
+            await self.queue.ack(queued)
+        except Exception as e:
+            logger.error(f"Failed to ack update {queued.entry_id}: {e}")
+
+    async def _drain(self):
+        if not self._tasks:
+            return
+        logger.info(f"Waiting for {len(self._tasks)} updates in flight")
+        _, pending = await asyncio.wait(list(self._tasks), timeout=self.shutdown_timeout)
+        for task in pending:
+            # неподтвержденные апдейты обработает следующий запуск воркера
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -1,13 +1,17 @@
-import json
-from functools import partial
-from uuid import UUID
-
 from aiogram import Bot
 from aiogram.types import Message
 
 TELEGRAM_MAX_MESSAGE_LENGTH = 4096
 
 
+def find_split_position(text: str, max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> int:
+    """Позиция, по которой длинный текст режется на сообщения (по переносу строки, если он есть)"""
+    split_pos = text.rfind('\n', 0, max_length)
+    if split_pos <= 0:
+        split_pos = max_length
+    return split_pos
+
+
 async def send_long_message(message: Message, text: str, bot: Bot, keyboard=None):
     if len(text) <= TELEGRAM_MAX_MESSAGE_LENGTH:
         await bot.send_message(message.chat.id, text, reply_markup=keyboard, parse_mode="HTML")
@@ -16,9 +20,7 @@ async def send_long_message(message: Message, text: str, bot: Bot, keyboard=None
     parts = []
     while len(text) > 0:
         if len(text) > TELEGRAM_MAX_MESSAGE_LENGTH:
-            split_pos = text.rfind('\n', 0, TELEGRAM_MAX_MESSAGE_LENGTH)
-            if split_pos == -1:
-                split_pos = TELEGRAM_MAX_MESSAGE_LENGTH
+            split_pos = find_split_position(text)
             parts.append(text[:split_pos])
             text = text[split_pos:]
         else:
@@ -52,12 +54,3 @@ def convert_markdown_to_html(text: str) -> str:
     text = re.sub(r'_(.*?)_', r'<i>\1</i>', text)
     return text
 
-
-def json_default_serializer(obj):
-    if isinstance(obj, UUID):
-        return str(obj)
-    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
-
-
-custom_json_dumps = partial(json.dumps, default=json_default_serializer)
-custom_json_loads = json.loads
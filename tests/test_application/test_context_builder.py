@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.ai_assistant import context_builder
+from source.application.ai_assistant.context_builder import BuildDialogContext, estimate_tokens
+from source.core.schemas.assistant_schemas import AssistantResponse, ContextMessage
+
+
+@pytest.fixture
+def history_service():
+    service = MagicMock()
+    service.get_history_and_summary = AsyncMock(return_value=([], None))
+    service.append_and_fetch = AsyncMock(return_value=([], None))
+    service.replace_oldest_with_summary = AsyncMock()
+    service.acquire_summary_lock = AsyncMock(return_value=True)
+    service.release_summary_lock = AsyncMock()
+    return service
+
+
+@pytest.fixture
+def assistant_service():
+    service = MagicMock()
+    service.get_history_summary = AsyncMock(return_value=AssistantResponse(message="кратко"))
+    return service
+
+
+def _builder(history_service, assistant_service, token_budget: int) -> BuildDialogContext:
+    return BuildDialogContext(
+        message_history_service=history_service,
+        assistant_service=assistant_service,
+        token_budget=token_budget,
+        summary_lock_ttl=60
+    )
+
+
+async def _drain_summary_tasks():
+    await asyncio.gather(*context_builder._summary_tasks)
+
+
+@pytest.mark.asyncio
+async def test_short_history_fits_budget_without_summary(history_service, assistant_service):
+    history = [ContextMessage(role="user", message="привет"), ContextMessage(role="assistant", message="здравствуй")]
+    history_service.get_history_and_summary.return_value = (history, None)
+
+    context = await _builder(history_service, assistant_service, token_budget=1000)("1", "venting")
+
+    assert context == history
+    assert not context_builder._summary_tasks
+    assistant_service.get_history_summary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_summarized_in_background(history_service, assistant_service):
+    old = [ContextMessage(role="user", message="а" * 300), ContextMessage(role="assistant", message="б" * 300)]
+    recent = [ContextMessage(role="user", message="в" * 30)]
+    history_service.get_history_and_summary.return_value = (old + recent, "раньше говорили о работе")
+
+    budget = estimate_tokens("раньше говорили о работе") + estimate_tokens("в" * 30) + 10
+    context = await _builder(history_service, assistant_service, token_budget=budget)("1", "venting")
+
+    # в промпт: краткое содержание + только свежее сообщение
+    assert context[0].role == "system"
+    assert "раньше говорили о работе" in context[0].message
+    assert context[1:] == recent
+
+    await _drain_summary_tasks()
+    assistant_service.get_history_summary.assert_awaited_once_with(
+        messages=old, previous_summary="раньше говорили о работе"
+    )
+    history_service.replace_oldest_with_summary.assert_awaited_once_with("1", "venting", "кратко", 2)
+    history_service.release_summary_lock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_huge_latest_message_is_truncated(history_service, assistant_service):
+    huge_message = ContextMessage(role="user", message="г" * 10_000)
+    history_service.append_and_fetch.return_value = ([huge_message], None)
+
+    context = await _builder(history_service, assistant_service, token_budget=100)("1", "venting", huge_message)
+
+    history_service.append_and_fetch.assert_awaited_once_with("1", "venting", huge_message)
+    assert len(context) == 1
+    assert estimate_tokens(context[0].message) <= 100
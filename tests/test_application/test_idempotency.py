@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.idempotency.idempotency_service import IdempotencyService
+
+
+@pytest.fixture
+def redis():
+    return MagicMock(set=AsyncMock(), delete=AsyncMock())
+
+
+@pytest.fixture
+def idempotency(redis):
+    return IdempotencyService(redis_client=redis, processing_ttl=300, done_ttl=86400)
+
+
+@pytest.mark.asyncio
+async def test_claim_is_setnx_with_processing_ttl(idempotency, redis):
+    redis.set.return_value = True
+    assert await idempotency.claim("telegram_update", "1") is True
+    redis.set.assert_awaited_once_with("idempotency:telegram_update:1", "processing", ex=300, nx=True)
+
+    redis.set.return_value = None
+    assert await idempotency.claim("telegram_update", "1") is False
+
+
+@pytest.mark.asyncio
+async def test_complete_keeps_key_for_done_ttl(idempotency, redis):
+    await idempotency.complete("yookassa_event", "p1:payment.succeeded")
+
+    redis.set.assert_awaited_once_with("idempotency:yookassa_event:p1:payment.succeeded", "done", ex=86400)
+
+
+@pytest.mark.asyncio
+async def test_claim_lets_event_through_without_redis(idempotency, redis):
+    redis.set.side_effect = ConnectionError
+
+    assert await idempotency.claim("telegram_update", "1") is True
+
+
+@pytest.mark.asyncio
+async def test_takeover_claims_interrupted_processing_but_not_done(idempotency, redis):
+    redis.set.return_value = None
+    redis.get = AsyncMock(return_value=b"processing")
+
+    assert await idempotency.claim("telegram_update", "1", takeover=True) is True
+    redis.set.assert_awaited_with("idempotency:telegram_update:1", "processing", ex=300)
+
+    redis.get.return_value = b"done"
+    assert await idempotency.claim("telegram_update", "1", takeover=True) is False
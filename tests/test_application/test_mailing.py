@@ -0,0 +1,148 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError
+from aiogram.methods import SendMessage
+
+from source.application.mailing import DeliverMailingMessage, LoadMailingAudience
+from source.application.redis_services.mailing_progress.mailing_progress_service import MailingProgressService
+from source.core.enum import MailingDeliveryStatus, SendPriority
+from source.core.schemas.mailing_schema import MailingJobSchema
+from source.infrastructure.telegram.rate_limiter import get_send_priority
+
+
+@pytest.fixture
+def uow():
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    return uow
+
+
+@pytest.fixture
+def broker():
+    return MagicMock(publish=AsyncMock())
+
+
+@pytest.fixture
+def progress():
+    return MagicMock(
+        get_text=AsyncMock(return_value="новости"),
+        get_cursor=AsyncMock(return_value=None),
+        save_chunk=AsyncMock(),
+        mark_loaded=AsyncMock(return_value=False),
+        is_recorded=AsyncMock(return_value=False),
+        record=AsyncMock(return_value=False),
+        get_report=AsyncMock(return_value=None),
+    )
+
+
+def _published_subjects(broker) -> list[str]:
+    return [call.kwargs["subject"] for call in broker.publish.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_load_audience_publishes_chunks_and_moves_cursor(uow, broker, progress):
+    mailing_id = uuid4()
+    chunks = {None: ["1", "2"], "2": ["3"], "3": []}
+    repository = MagicMock(get_telegram_ids_after=AsyncMock(side_effect=lambda cursor, limit: chunks[cursor]))
+    heartbeat = AsyncMock()
+    load = LoadMailingAudience(progress=progress, repository=repository, uow=uow, broker=broker, chunk_size=2)
+
+    published = await load(mailing_id, heartbeat=heartbeat)
+
+    assert published == 3
+    assert _published_subjects(broker) == [f"mailing.{mailing_id}.send.{telegram_id}" for telegram_id in "123"]
+    assert [call.args for call in progress.save_chunk.await_args_list] == [(mailing_id, "2", 2), (mailing_id, "3", 1)]
+    assert heartbeat.await_count == 2
+    progress.mark_loaded.assert_awaited_once_with(mailing_id)
+
+
+@pytest.mark.asyncio
+async def test_load_audience_resumes_from_saved_cursor(uow, broker, progress):
+    progress.get_cursor.return_value = "2"
+    repository = MagicMock(get_telegram_ids_after=AsyncMock(side_effect=[["3"], []]))
+    load = LoadMailingAudience(progress=progress, repository=repository, uow=uow, broker=broker, chunk_size=2)
+
+    assert await load(uuid4()) == 1
+    assert repository.get_telegram_ids_after.await_args_list[0].args == ("2", 2)
+
+
+@pytest.mark.asyncio
+async def test_empty_audience_finishes_mailing(uow, broker, progress):
+    mailing_id = uuid4()
+    progress.mark_loaded.return_value = True
+    progress.get_report.return_value = MagicMock(processed=0, published=0, sent=0, blocked=0, failed=0,
+                                                 messages_per_second=0.0)
+    repository = MagicMock(get_telegram_ids_after=AsyncMock(return_value=[]))
+    load = LoadMailingAudience(progress=progress, repository=repository, uow=uow, broker=broker, chunk_size=2)
+
+    assert await load(mailing_id) == 0
+    assert _published_subjects(broker) == [f"mailing.{mailing_id}.over"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_sends_with_bulk_priority(broker, progress):
+    priorities = []
+    bot = MagicMock(send_message=AsyncMock(side_effect=lambda **kwargs: priorities.append(get_send_priority())))
+    job = MailingJobSchema(mailing_id=uuid4(), telegram_id="42")
+    deliver = DeliverMailingMessage(progress=progress, broker=broker, bot=bot)
+
+    assert await deliver(job) == MailingDeliveryStatus.SENT
+
+    bot.send_message.assert_awaited_once_with(chat_id=42, text="новости")
+    assert priorities == [SendPriority.BULK]
+    progress.record.assert_awaited_once_with(job.mailing_id, "42", MailingDeliveryStatus.SENT)
+    assert _published_subjects(broker) == [f"mailing.{job.mailing_id}.send.42.logs"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_counts_blocked_user(broker, progress):
+    error = TelegramForbiddenError(method=SendMessage(chat_id=42, text="новости"), message="bot was blocked by the user")
+    bot = MagicMock(send_message=AsyncMock(side_effect=error))
+    deliver = DeliverMailingMessage(progress=progress, broker=broker, bot=bot)
+
+    assert await deliver(MailingJobSchema(mailing_id=uuid4(), telegram_id="42")) == MailingDeliveryStatus.BLOCKED
+
+
+@pytest.mark.asyncio
+async def test_deliver_retries_network_error_until_last_attempt(broker, progress):
+    error = TelegramNetworkError(method=SendMessage(chat_id=42, text="новости"), message="timeout")
+    bot = MagicMock(send_message=AsyncMock(side_effect=error))
+    job = MailingJobSchema(mailing_id=uuid4(), telegram_id="42")
+    deliver = DeliverMailingMessage(progress=progress, broker=broker, bot=bot)
+
+    with pytest.raises(TelegramNetworkError):
+        await deliver(job)
+    progress.record.assert_not_awaited()
+
+    assert await deliver(job, final_attempt=True) == MailingDeliveryStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_redelivered_job_is_not_sent_twice(broker, progress):
+    progress.is_recorded.return_value = True
+    bot = MagicMock(send_message=AsyncMock())
+    deliver = DeliverMailingMessage(progress=progress, broker=broker, bot=bot)
+
+    assert await deliver(MailingJobSchema(mailing_id=uuid4(), telegram_id="42")) is None
+    bot.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_report_is_read_from_progress_hash():
+    redis = MagicMock(register_script=MagicMock(return_value=AsyncMock()))
+    redis.hgetall = AsyncMock(return_value={
+        b"text": "новости".encode(), b"admin_telegram_id": b"7", b"started_at": b"2026-01-01T00:00:00+00:00",
+        b"cursor": b"9", b"published": b"10", b"sent": b"6", b"blocked": b"2", b"failed": b"2", b"loaded": b"1",
+        b"finished_at": b"2026-01-01T00:00:05+00:00",
+    })
+    progress = MailingProgressService(redis_client=redis, progress_ttl=60)
+
+    report = await progress.get_report(uuid4())
+
+    assert report.admin_telegram_id == "7"
+    assert report.loaded and report.is_finished
+    assert report.processed == 10
+    assert report.messages_per_second == 2.0
@@ -0,0 +1,67 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.message_history.message_history_service import MessageHistoryService
+from source.core.schemas.assistant_schemas import ContextMessage
+from source.infrastructure.serialization import JsonSerializer
+
+
+@pytest.fixture
+def pipeline():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    return pipe
+
+
+@pytest.fixture
+def history_service(pipeline):
+    redis = MagicMock()
+    redis.pipeline = MagicMock(return_value=pipeline)
+    return MessageHistoryService(redis_client=redis, serializer=JsonSerializer(), history_max_len=50, history_ttl=600)
+
+
+@pytest.mark.asyncio
+async def test_append_and_fetch_is_single_transaction(history_service, pipeline):
+    stored = ['{"r":"u","m":"новое"}'.encode(), '{"r":"a","m":"старое"}'.encode()]
+    pipeline.execute.return_value = [2, True, True, False, stored, b"summary"]
+
+    history, summary = await history_service.append_and_fetch("1", "venting", ContextMessage(message="новое"))
+
+    pipeline.execute.assert_awaited_once()
+    key = "message_history:venting:1"
+    pipeline.lpush.assert_called_once()
+    pipeline.ltrim.assert_called_once_with(key, 0, 49)
+    pipeline.expire.assert_any_call(key, 600)
+    pipeline.expire.assert_any_call(f"{key}:summary", 600)
+    pipeline.lrange.assert_called_once_with(key, 0, -1)
+
+    assert [message.message for message in history] == ["старое", "новое"]
+    assert summary == "summary"
+
+
+@pytest.mark.asyncio
+async def test_append_pair_pushes_both_messages_in_order(history_service, pipeline):
+    user_message = ContextMessage(role="user", message="вопрос")
+    assistant_message = ContextMessage(role="assistant", message="ответ")
+
+    await history_service.append_pair("1", "venting", user_message, assistant_message)
+
+    pipeline.execute.assert_awaited_once()
+    _, *pushed = pipeline.lpush.call_args.args
+    # LPUSH кладет по очереди в голову: ответ ассистента окажется самым свежим
+    assert pushed == ['{"r":"u","m":"вопрос"}', '{"r":"a","m":"ответ"}']
+
+
+@pytest.mark.asyncio
+async def test_history_in_legacy_format_is_still_readable(history_service, pipeline):
+    stored = [
+        '{"r":"a","m":"новое"}'.encode(),
+        ContextMessage(role="user", message="старое").model_dump_json().encode(),
+    ]
+    pipeline.execute.return_value = [stored, None]
+
+    history, summary = await history_service.get_history_and_summary("1", "venting")
+
+    assert [(message.role, message.message) for message in history] == [("user", "старое"), ("assistant", "новое")]
+    assert summary is None
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.message_quota.message_quota_service import MessageQuotaService
+from source.core.enum import SubscriptionType, UserType
+from source.core.schemas.user_schema import UserSchema
+
+WINDOW = 60 * 60 * 24
+
+
+def _user(**kwargs) -> UserSchema:
+    return UserSchema(
+        telegram_id="1",
+        username="user",
+        dialogs_completed=0,
+        user_type=UserType.USER,
+        **{"subscription": SubscriptionType.FREE, **kwargs},
+    )
+
+
+@pytest.fixture
+def scripts():
+    return {"quota": AsyncMock(return_value=1), "refund": AsyncMock(return_value=0), "pop": AsyncMock(return_value=[])}
+
+
+@pytest.fixture
+def quota_service(scripts):
+    redis = MagicMock()
+    redis.register_script = MagicMock(side_effect=[scripts["quota"], scripts["refund"], scripts["pop"]])
+    return MessageQuotaService(redis_client=redis, free_daily_limit=4, standard_monthly_limit=1000,
+                               free_window_seconds=WINDOW)
+
+
+@pytest.mark.asyncio
+async def test_free_limit_check_and_charge_is_single_script_call(quota_service, scripts):
+    scripts["quota"].return_value = -1
+
+    assert await quota_service.try_consume(_user()) is False
+
+    scripts["quota"].assert_awaited_once_with(
+        keys=["message_quota:1:daily", "message_quota:changed"],
+        args=[WINDOW, 0, "1:daily_messages_used", 4, WINDOW, "1:last_daily_reset"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_free_counter_is_seeded_from_current_window_in_db(quota_service, scripts):
+    user = _user(daily_messages_used=3, last_daily_reset=datetime.now(timezone.utc) - timedelta(hours=1))
+
+    assert await quota_service.try_consume(user) is True
+
+    ttl, seed, field, limit, _, _ = scripts["quota"].await_args.kwargs["args"]
+    assert seed == 3 and limit == 4 and field == "1:daily_messages_used"
+    assert WINDOW - 3600 - 5 <= ttl <= WINDOW - 3600
+
+
+@pytest.mark.asyncio
+async def test_standard_counter_lives_until_subscription_end(quota_service, scripts):
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    user = _user(subscription=SubscriptionType.DEFAULT, subscription_start=start,
+                 subscription_date_end=start + timedelta(days=30), messages_used=10)
+    scripts["quota"].return_value = 999
+
+    assert await quota_service.try_consume(user) is True
+
+    key, _ = scripts["quota"].await_args.kwargs["keys"]
+    assert key == f"message_quota:1:period:{int(start.timestamp())}"
+    ttl, seed, field, limit, window, _ = scripts["quota"].await_args.kwargs["args"]
+    assert seed == 10 and field == "1:messages_used" and limit == 1000 and window == 0
+    assert timedelta(days=28) < timedelta(seconds=ttl) <= timedelta(days=29)
+
+
+@pytest.mark.asyncio
+async def test_pro_is_unlimited_without_redis(quota_service, scripts):
+    user = _user(subscription=SubscriptionType.PRO)
+
+    assert await quota_service.try_consume(user) is True
+    await quota_service.refund(user)
+    scripts["quota"].assert_not_awaited()
+    scripts["refund"].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refund_returns_charged_messages_to_same_counter(quota_service, scripts):
+    await quota_service.refund(_user(), 3)
+
+    scripts["refund"].assert_awaited_once_with(
+        keys=["message_quota:1:daily", "message_quota:changed"],
+        args=["1:daily_messages_used", 3],
+    )
+
+
+@pytest.mark.asyncio
+async def test_pop_changed_counters(quota_service, scripts):
+    scripts["pop"].return_value = [b"1:daily_messages_used", b"3", b"2:messages_used", b"17"]
+
+    assert await quota_service.pop_changed_counters() == {
+        ("1", "daily_messages_used"): 3,
+        ("2", "messages_used"): 17,
+    }
+
+
+@pytest.mark.asyncio
+async def test_counter_lost_mid_window_is_restored_from_synced_window_start(quota_service, scripts):
+    # синк забрал из Redis счетчик и начало окна, которое скрипт посчитал по TTL
+    window_start = datetime.now(timezone.utc) - timedelta(hours=1)
+    scripts["pop"].return_value = [b"1:daily_messages_used", b"3", b"1:last_daily_reset", str(int(window_start.timestamp()))]
+    counters = await quota_service.pop_changed_counters()
+
+    # ключ в Redis потерян — юзер читается из Postgres с тем, что записал синк
+    user = _user(daily_messages_used=counters[("1", "daily_messages_used")],
+                 last_daily_reset=datetime.fromtimestamp(counters[("1", "last_daily_reset")], timezone.utc))
+    await quota_service.try_consume(user)
+
+    ttl, seed, *_ = scripts["quota"].await_args.kwargs["args"]
+    assert seed == 3
+    assert WINDOW - 3600 - 5 <= ttl <= WINDOW - 3600
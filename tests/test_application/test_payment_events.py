@@ -0,0 +1,129 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from source.application.payment.payment_events import ProcessPaymentEvents, RecordPaymentEvent
+from source.core.enum import SubscriptionType
+from source.core.schemas.payment_schema import PaymentSchema, PaymentEventSchema
+
+
+def _event(status: str = "succeeded", attempts: int = 0) -> PaymentEventSchema:
+    return PaymentEventSchema(
+        id=uuid4(),
+        event_key=f"pay-1:payment.{status}",
+        purchase_id="pay-1",
+        event=f"payment.{status}",
+        payload={"event": f"payment.{status}", "object": {"id": "pay-1", "status": status}},
+        attempts=attempts,
+    )
+
+
+def _payment(status: str = "pending") -> PaymentSchema:
+    return PaymentSchema(purchase_id="pay-1", telegram_id="42", username="user", amount=390, month_sub=1,
+                         description="Подписка", status=status, subscription=SubscriptionType.DEFAULT,
+                         link="https://yoomoney.ru", timestamp=datetime.now())
+
+
+@pytest.fixture
+def uow():
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    uow.commit = AsyncMock()
+    uow.savepoints_rolled_back = 0
+
+    @asynccontextmanager
+    async def savepoint():
+        try:
+            yield
+        except Exception:
+            uow.savepoints_rolled_back += 1
+            raise
+
+    uow.savepoint = savepoint
+    return uow
+
+
+@pytest.fixture
+def repositories():
+    return {
+        "event_repository": MagicMock(lock_due=AsyncMock(), mark_done=AsyncMock(), mark_failed=AsyncMock()),
+        "payment_repository": MagicMock(lock_by_purchase_id=AsyncMock(), update_payment=AsyncMock()),
+        "user_repository": MagicMock(activate_subscription=AsyncMock(return_value=True)),
+    }
+
+
+@pytest.fixture
+def bot():
+    return MagicMock(send_message=AsyncMock())
+
+
+@pytest.fixture
+def user_cache():
+    return MagicMock(invalidate=AsyncMock())
+
+
+def _processor(uow, repositories, bot, user_cache=None) -> ProcessPaymentEvents:
+    return ProcessPaymentEvents(uow=uow, bot=bot, user_cache=user_cache or MagicMock(invalidate=AsyncMock()),
+                                batch_size=10, max_attempts=3, retry_base_delay=5, retry_max_delay=60, **repositories)
+
+
+@pytest.mark.asyncio
+async def test_succeeded_event_activates_subscription_in_one_transaction(uow, repositories, bot, user_cache):
+    event = _event()
+    repositories["event_repository"].lock_due.return_value = [event]
+    repositories["payment_repository"].lock_by_purchase_id.return_value = _payment()
+
+    assert await _processor(uow, repositories, bot, user_cache)() == 1
+
+    activation = repositories["user_repository"].activate_subscription.await_args.kwargs
+    assert activation["telegram_id"] == "42"
+    assert activation["subscription"] == SubscriptionType.DEFAULT
+    repositories["payment_repository"].update_payment.assert_awaited_once_with("pay-1", status="succeeded")
+    repositories["event_repository"].mark_done.assert_awaited_once_with(event.id)
+    uow.commit.assert_awaited_once()
+    user_cache.invalidate.assert_awaited_once_with("42")
+    bot.send_message.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_already_succeeded_payment_is_not_activated_twice(uow, repositories, bot):
+    repositories["event_repository"].lock_due.return_value = [_event()]
+    repositories["payment_repository"].lock_by_purchase_id.return_value = _payment(status="succeeded")
+
+    await _processor(uow, repositories, bot)()
+
+    repositories["user_repository"].activate_subscription.assert_not_awaited()
+    repositories["event_repository"].mark_done.assert_awaited_once()
+    bot.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_event_is_postponed_then_dead_lettered(uow, repositories, bot):
+    repositories["payment_repository"].lock_by_purchase_id.return_value = None
+
+    repositories["event_repository"].lock_due.return_value = [_event(attempts=0)]
+    await _processor(uow, repositories, bot)()
+    postponed = repositories["event_repository"].mark_failed.await_args.kwargs
+    assert postponed["attempts"] == 1 and postponed["dead"] is False
+
+    repositories["event_repository"].lock_due.return_value = [_event(attempts=2)]
+    await _processor(uow, repositories, bot)()
+    assert repositories["event_repository"].mark_failed.await_args.kwargs["dead"] is True
+
+    assert uow.savepoints_rolled_back == 2
+    repositories["event_repository"].mark_done.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_record_payment_event_commits_inbox_row(uow):
+    repository = MagicMock(add=AsyncMock(return_value=True))
+    record = RecordPaymentEvent(repository=repository, uow=uow)
+
+    assert await record({"event": "payment.succeeded", "object": {"id": "pay-1", "status": "succeeded"}})
+
+    assert repository.add.await_args.kwargs["event_key"] == "pay-1:payment.succeeded"
+    uow.commit.assert_awaited_once()
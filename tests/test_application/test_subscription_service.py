@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.subscription.subscription_service import SubscriptionService
+from source.core.enum import SubscriptionType, UserType
+from source.core.schemas.user_schema import UserSchema
+
+
+@pytest.fixture
+def user():
+    return UserSchema(
+        telegram_id="1",
+        username="user",
+        dialogs_completed=0,
+        user_type=UserType.USER,
+        subscription=SubscriptionType.FREE,
+    )
+
+
+@pytest.fixture
+def get_by_id(user):
+    return AsyncMock(return_value=user)
+
+
+@pytest.fixture
+def quota():
+    return MagicMock(try_consume=AsyncMock(return_value=True), refund=AsyncMock())
+
+
+@pytest.fixture
+def subscription_service(get_by_id, quota):
+    return SubscriptionService(get_by_id=get_by_id, merge=AsyncMock(), quota=quota)
+
+
+@pytest.mark.asyncio
+async def test_loaded_user_is_not_read_again(subscription_service, get_by_id, quota, user):
+    assert await subscription_service.try_consume_message("1", user) is True
+    await subscription_service.refund_message("1", user)
+
+    get_by_id.assert_not_awaited()
+    # счетчики живут в Redis — на сообщение в БД ничего не пишется
+    subscription_service.merge.assert_not_awaited()
+    quota.try_consume.assert_awaited_once_with(user)
+    quota.refund.assert_awaited_once_with(user, 1)
+
+
+@pytest.mark.asyncio
+async def test_user_is_loaded_when_not_passed(subscription_service, get_by_id, quota, user):
+    await subscription_service.refund_message("1", count=2)
+
+    get_by_id.assert_awaited_once_with("1")
+    quota.refund.assert_awaited_once_with(user, 2)
+
+
+@pytest.mark.asyncio
+async def test_expired_subscription_falls_back_to_free(subscription_service, quota, user):
+    now = datetime.now(timezone.utc)
+    user.subscription = SubscriptionType.DEFAULT
+    user.subscription_start = now - timedelta(days=40)
+    user.subscription_date_end = now - timedelta(days=10)
+
+    await subscription_service.try_consume_message("1", user)
+
+    assert user.subscription == SubscriptionType.FREE
+    subscription_service.merge.assert_awaited_once_with(user)
+    quota.try_consume.assert_awaited_once_with(user)
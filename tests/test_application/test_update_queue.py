@@ -0,0 +1,56 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.update_queue.update_queue_service import UpdateQueueService
+
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    redis.register_script = MagicMock(side_effect=lambda script: AsyncMock())
+    redis.xgroup_create = AsyncMock()
+    return redis
+
+
+def test_chat_always_maps_to_same_partition(redis):
+    queue = UpdateQueueService(redis_client=redis, partitions=16, max_backlog=100)
+
+    assert queue.partition_for(42) == queue.partition_for(42) == 42 % 16
+    # id групп и каналов отрицательные
+    assert 0 <= queue.partition_for(-1001234567890) < 16
+
+
+@pytest.mark.asyncio
+async def test_enqueue_reports_full_partition(redis):
+    queue = UpdateQueueService(redis_client=redis, partitions=4, max_backlog=100)
+
+    queue._enqueue.return_value = b"1-0"
+    assert await queue.enqueue(5, b"{}") is True
+    queue._enqueue.assert_awaited_once_with(keys=["telegram_updates:1"], args=[100, b"{}"])
+
+    queue._enqueue.return_value = None
+    assert await queue.enqueue(5, b"{}") is False
+
+
+@pytest.mark.asyncio
+async def test_read_maps_streams_to_partitions(redis):
+    redis.xreadgroup = AsyncMock(return_value=[
+        [b"telegram_updates:2", [(b"1-0", {b"data": b"{\"update_id\": 1}"}), (b"2-0", {})]],
+    ])
+    queue = UpdateQueueService(redis_client=redis, partitions=4, max_backlog=100)
+
+    updates = await queue.read("worker-0", {0: ">", 2: "0"}, count=10, block=1.0)
+
+    assert [(update.partition, update.entry_id, update.payload) for update in updates] == [
+        (2, "1-0", b"{\"update_id\": 1}"),
+        (2, "2-0", None),
+    ]
+    assert redis.xgroup_create.await_count == 2
+    redis.xreadgroup.assert_awaited_once_with(
+        "update_workers",
+        "worker-0",
+        streams={"telegram_updates:0": ">", "telegram_updates:2": "0"},
+        count=10,
+        block=1000,
+    )
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.user_cache.user_cache_service import UserCacheService
+from source.application.user import GetUserSchemaById, MergeUser
+from source.core.enum import SubscriptionType, UserType
+from source.core.schemas.user_schema import UserSchema
+from source.infrastructure.metrics.metrics import user_cache_lookups_total
+from source.infrastructure.serialization import JsonSerializer
+
+
+def _user(telegram_id: str = "1") -> UserSchema:
+    return UserSchema(
+        telegram_id=telegram_id,
+        username="user",
+        dialogs_completed=0,
+        user_type=UserType.USER,
+        subscription=SubscriptionType.DEFAULT,
+        subscription_date_end=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        messages_used=3,
+    )
+
+
+@pytest.fixture
+def redis():
+    store = {}
+    redis = MagicMock()
+    redis.store = store
+    redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+    redis.set = AsyncMock(side_effect=lambda key, value, ex: store.__setitem__(key, value))
+
+    pipe = MagicMock()
+    pipe.delete = MagicMock(side_effect=lambda key: store.pop(key, None))
+    pipe.execute = AsyncMock()
+    redis.pipeline = MagicMock(return_value=pipe)
+    return redis
+
+
+@pytest.fixture
+def cache(redis):
+    cache = UserCacheService(redis_client=redis, serializer=JsonSerializer(), ttl=60, local_ttl=5, local_max_size=2)
+    # как будто подписка на инвалидации уже работает
+    cache._subscribed = True
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_redis_and_returns_a_copy(cache, redis):
+    await cache.set(_user())
+
+    first = await cache.get("1")
+    first.subscription = SubscriptionType.FREE
+    second = await cache.get("1")
+
+    redis.get.assert_not_awaited()
+    assert second == _user()
+
+
+@pytest.mark.asyncio
+async def test_local_layer_is_bounded_and_off_without_subscription(cache, redis):
+    for telegram_id in ("1", "2", "3"):
+        await cache.set(_user(telegram_id))
+    assert list(cache._local) == ["2", "3"]
+
+    # юзер "1" вытеснен из LRU, но остался в Redis
+    assert (await cache.get("1")).telegram_id == "1"
+    assert redis.get.await_count == 1
+
+    cache._subscribed = False
+    await cache.get("3")
+    assert redis.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_both_levels_and_notifies_other_processes(cache, redis):
+    await cache.set(_user())
+    misses = user_cache_lookups_total.value("miss")
+
+    await cache.invalidate("1")
+
+    assert await cache.get("1") is None
+    redis.pipeline.return_value.publish.assert_called_once_with("user_cache:invalidate", "1")
+    assert user_cache_lookups_total.value("miss") == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_get_user_schema_reads_through(cache):
+    repository = MagicMock(get_schema_by_telegram_id=AsyncMock(return_value=_user()))
+    uow = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False))
+    get_user = GetUserSchemaById(repository=repository, uow=uow, cache=cache)
+
+    assert await get_user("1") == _user()
+    assert await get_user("1") == _user()
+
+    repository.get_schema_by_telegram_id.assert_awaited_once_with("1")
+
+
+@pytest.mark.asyncio
+async def test_merge_user_invalidates_after_commit(cache):
+    await cache.set(_user())
+    uow = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False), commit=AsyncMock())
+    merge = MergeUser(repository=MagicMock(merge=AsyncMock()), uow=uow, cache=cache)
+
+    await merge(_user())
+
+    uow.commit.assert_awaited_once()
+    assert "1" not in cache._local
+
+
+@pytest.mark.asyncio
+async def test_invalidation_from_another_process_evicts_local_entry(cache, redis):
+    subscribed, publish, received = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    async def listen():
+        yield {"type": "subscribe", "data": 1}
+        subscribed.set()
+        await publish.wait()
+        yield {"type": "message", "data": b"1"}
+        received.set()
+        await asyncio.Event().wait()
+
+    pubsub = MagicMock(subscribe=AsyncMock(), listen=listen)
+    pubsub.__aenter__ = AsyncMock(return_value=pubsub)
+    pubsub.__aexit__ = AsyncMock(return_value=False)
+    redis.pubsub = MagicMock(return_value=pubsub)
+    cache._subscribed = False
+
+    await cache.start()
+    await asyncio.wait_for(subscribed.wait(), timeout=1)
+    await cache.set(_user("1"))
+    await cache.set(_user("2"))
+    publish.set()
+    await asyncio.wait_for(received.wait(), timeout=1)
+
+    assert list(cache._local) == ["2"]
+    pubsub.subscribe.assert_awaited_once_with("user_cache:invalidate")
+    await cache.stop()
+    assert not cache._subscribed and not cache._local
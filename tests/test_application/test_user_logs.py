@@ -0,0 +1,138 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from source.application.redis_services.user_log_stream.user_log_stream_service import UserLogStreamService
+from source.application.user.user_logs import CreateUserLog, FlushUserLogs
+from source.core.schemas.user_schema import UserLogCreateSchema, UserLogSchema
+from source.infrastructure.serialization import JsonSerializer
+
+
+def _log() -> UserLogSchema:
+    return UserLogSchema(id=uuid4(), user_id=uuid4(), dialog_id=uuid4(), message_text="привет",
+                         created_at=datetime.now(timezone.utc))
+
+
+@pytest.fixture
+def uow():
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    uow.commit = AsyncMock()
+    uow.savepoint = MagicMock(return_value=MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False)))
+    return uow
+
+
+@pytest.fixture
+def repository():
+    return MagicMock(create_user_logs=AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_create_user_log_only_queues(uow, repository):
+    log_stream = MagicMock(append=AsyncMock())
+    create_user_log = CreateUserLog(log_stream=log_stream, repository=repository, uow=uow)
+
+    created = await create_user_log(UserLogCreateSchema(user_id=uuid4(), dialog_id=uuid4(), message_text="привет"))
+
+    log_stream.append.assert_awaited_once_with(created)
+    repository.create_user_logs.assert_not_awaited()
+    uow.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_user_log_writes_directly_without_redis(uow, repository):
+    log_stream = MagicMock(append=AsyncMock(side_effect=ConnectionError))
+    create_user_log = CreateUserLog(log_stream=log_stream, repository=repository, uow=uow)
+
+    created = await create_user_log(UserLogCreateSchema(user_id=uuid4(), dialog_id=uuid4(), message_text="привет"))
+
+    repository.create_user_logs.assert_awaited_once_with([created])
+    uow.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_flush_acks_only_after_commit(uow, repository):
+    batch = [("1-0", _log()), ("2-0", _log())]
+    log_stream = MagicMock(read_batch=AsyncMock(return_value=batch), ack=AsyncMock())
+    log_stream.delivery_counts = AsyncMock(return_value={"1-0": 1, "2-0": 1})
+    flush = FlushUserLogs(log_stream=log_stream, repository=repository, uow=uow, batch_size=100, max_deliveries=5)
+
+    assert await flush(max_wait=1.0) == 2
+
+    log_stream.read_batch.assert_awaited_once_with(100, 1.0)
+    repository.create_user_logs.assert_awaited_once_with([log for _, log in batch])
+    log_stream.ack.assert_awaited_once_with(["1-0", "2-0"])
+
+    repository.create_user_logs.side_effect = ConnectionError
+    log_stream.ack.reset_mock()
+    with pytest.raises(ConnectionError):
+        await flush(max_wait=1.0)
+    log_stream.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stream_read_batch_reclaims_then_reads_new():
+    serializer = JsonSerializer()
+    stale, fresh = _log(), _log()
+    redis = MagicMock()
+    redis.xgroup_create = AsyncMock()
+    redis.xautoclaim = AsyncMock(return_value=[
+        b"0-0", [(b"1-0", {b"data": serializer.dumps(stale.model_dump(mode="json"))}), (b"2-0", None)], []
+    ])
+    redis.xreadgroup = AsyncMock(side_effect=[
+        [[b"user_logs:stream", [(b"3-0", {b"data": serializer.dumps(fresh.model_dump(mode="json"))})]]],
+        [],
+    ])
+    log_stream = UserLogStreamService(redis_client=redis, serializer=serializer, claim_idle=60)
+
+    batch = await log_stream.read_batch(batch_size=10, max_wait=0.05)
+
+    assert batch == [("1-0", stale), ("3-0", fresh)]
+    redis.xgroup_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_flush_moves_poison_log_to_dead_letter_after_max_deliveries(uow, repository):
+    good, poison = _log(), _log()
+    batch = [("1-0", good), ("2-0", poison)]
+    log_stream = MagicMock(
+        read_batch=AsyncMock(return_value=batch),
+        delivery_counts=AsyncMock(return_value={"1-0": 2, "2-0": 5}),
+        ack=AsyncMock(),
+        dead_letter=AsyncMock(),
+    )
+
+    async def create_user_logs(user_logs):
+        if poison in user_logs:
+            raise ValueError("bad row")
+
+    repository.create_user_logs.side_effect = create_user_logs
+    flush = FlushUserLogs(log_stream=log_stream, repository=repository, uow=uow, batch_size=100, max_deliveries=5)
+
+    assert await flush(max_wait=1.0) == 1
+
+    log_stream.ack.assert_awaited_once_with(["1-0"])
+    log_stream.dead_letter.assert_awaited_once_with([("2-0", poison, "ValueError('bad row')")])
+
+
+@pytest.mark.asyncio
+async def test_stream_moves_undecodable_entry_to_dead_letter():
+    serializer = JsonSerializer()
+    redis = MagicMock()
+    redis.xgroup_create = AsyncMock()
+    redis.xautoclaim = AsyncMock(return_value=[b"0-0", [], []])
+    redis.xreadgroup = AsyncMock(side_effect=[[[b"user_logs:stream", [(b"1-0", {b"data": b"not json"})]]], []])
+    pipe = MagicMock(execute=AsyncMock())
+    redis.pipeline = MagicMock(return_value=pipe)
+    log_stream = UserLogStreamService(redis_client=redis, serializer=serializer, claim_idle=60)
+
+    assert await log_stream.read_batch(batch_size=10, max_wait=0.05) == []
+
+    dead_fields = pipe.xadd.call_args.args[1]
+    assert pipe.xadd.call_args.args[0] == "user_logs:dead"
+    assert dead_fields["data"] == b"not json" and dead_fields["entry_id"] == "1-0"
+    pipe.xack.assert_called_once_with("user_logs:stream", "user_logs_writer", "1-0")
+    pipe.xdel.assert_called_once_with("user_logs:stream", "1-0")
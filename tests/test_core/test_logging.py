@@ -0,0 +1,83 @@
+import json
+import logging
+import queue
+from unittest.mock import patch
+
+import pytest
+
+from source.core.logging.filters import RedactFilter, SamplingFilter
+from source.core.logging.handlers import DroppingQueueHandler
+from source.core.logging.logging_config import configure_logging, parse_logger_levels, stop_listener
+
+
+def _record(level: int = logging.INFO, name: str = "source.test", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, "message", None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_redact_filter_keeps_only_length():
+    record = _record(message_text="мне очень плохо", telegram_id="42")
+
+    assert RedactFilter().filter(record)
+    assert record.message_text == "<redacted: 15 chars>"
+    assert record.telegram_id == "42"
+
+
+def test_sampling_filter_limits_noisy_logger_but_not_warnings():
+    sampling = SamplingFilter(rate=1.0, burst=3)
+
+    with patch("source.core.logging.filters.time.monotonic", return_value=100.0):
+        passed = [sampling.filter(_record()) for _ in range(10)]
+        warnings = [sampling.filter(_record(logging.WARNING)) for _ in range(10)]
+        other_logger = sampling.filter(_record(name="source.other"))
+
+    assert passed == [True] * 3 + [False] * 7
+    assert all(warnings)
+    assert other_logger
+
+    # через 2 секунды накопилось 2 токена, первая пропущенная запись несет счетчик отброшенных
+    with patch("source.core.logging.filters.time.monotonic", return_value=102.0):
+        record = _record()
+        assert sampling.filter(record)
+        assert record.sampled_out == 7
+
+
+def test_dropping_queue_handler_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(2))
+
+    for _ in range(5):
+        handler.handle(_record())
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_parse_logger_levels():
+    assert parse_logger_levels(" aiogram.event=warning, source.infrastructure=DEBUG,broken") == {
+        "aiogram.event": "WARNING",
+        "source.infrastructure": "DEBUG",
+    }
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    logging.getLogger("source.quiet").setLevel(logging.NOTSET)
+
+
+def test_configure_logging_writes_file_from_background_thread(tmp_path, restore_logging):
+    log_file = tmp_path / "app.json.log"
+    listener = configure_logging(level="INFO", logger_levels="source.quiet=ERROR", file_path=str(log_file))
+
+    logging.getLogger("source.loud").info("reply sent", extra={"completion": "секрет"})
+    logging.getLogger("source.quiet").warning("muted")
+    stop_listener(listener)
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [record["message"] for record in records] == ["reply sent"]
+    assert records[0]["completion"] == "<redacted: 6 chars>"
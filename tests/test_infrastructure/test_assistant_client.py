@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError
+
+from source.core.exceptions import AssistantException, AssistantUnavailableException, AssistantResponseException
+from source.core.schemas.assistant_schemas import UserCharacteristicAssistantResponse
+from source.infrastructure.ai_assistant.ai_assistant import AssistantClient
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
+
+REQUEST = httpx.Request("POST", "https://api.deepseek.com/chat/completions")
+
+
+def _completion(content: str):
+    completion = MagicMock()
+    completion.choices = [MagicMock()]
+    completion.choices[0].message.content = content
+    return completion
+
+
+@pytest.fixture
+def breaker():
+    breaker = MagicMock()
+    breaker.is_open = AsyncMock(return_value=False)
+    breaker.record = AsyncMock()
+    return breaker
+
+
+@pytest.fixture
+def openai_client():
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def assistant(openai_client, breaker):
+    return AssistantClient(
+        client=openai_client,
+        scheduler=LLMRequestScheduler(max_in_flight=4),
+        breaker=breaker,
+        max_retries=2,
+        retry_base_delay=0,
+        retry_max_delay=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_response_retries_connection_errors(assistant, openai_client, breaker):
+    openai_client.chat.completions.create.side_effect = [
+        APIConnectionError(request=REQUEST),
+        _completion("ответ"),
+    ]
+
+    response = await assistant.get_response(system_prompt="system", message="привет")
+
+    assert response.message == "ответ"
+    assert openai_client.chat.completions.create.await_count == 2
+    assert [call.kwargs["success"] for call in breaker.record.await_args_list] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_get_response_does_not_retry_client_errors(assistant, openai_client):
+    openai_client.chat.completions.create.side_effect = BadRequestError(
+        "bad request", response=httpx.Response(400, request=REQUEST), body=None
+    )
+
+    with pytest.raises(AssistantException):
+        await assistant.get_response(system_prompt="system", message="привет")
+
+    assert openai_client.chat.completions.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast(assistant, openai_client, breaker):
+    breaker.is_open.return_value = True
+
+    with pytest.raises(AssistantUnavailableException):
+        await assistant.get_response(system_prompt="system", message="привет")
+
+    openai_client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalid_response_is_logged_without_its_text(assistant, openai_client, caplog):
+    openai_client.chat.completions.create.return_value = _completion('{"секрет": "личное"}')
+
+    with pytest.raises(AssistantResponseException):
+        await assistant.get_response(
+            system_prompt="system", message="привет", response_schema=UserCharacteristicAssistantResponse,
+            need_json=True
+        )
+
+    errors = [record for record in caplog.records if record.levelname == "ERROR"]
+    assert errors and all("личное" not in record.getMessage() for record in errors)
+    assert errors[-1].completion == '{"секрет": "личное"}'
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from source.core.enum import LLMPriority
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
+
+
+async def _hold_slot(scheduler: LLMRequestScheduler, user_id, priority, order: list, release: asyncio.Event):
+    async with scheduler.slot(user_id, priority):
+        order.append(user_id)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_slot_goes_to_highest_priority_waiter():
+    scheduler = LLMRequestScheduler(max_in_flight=1)
+    order, release = [], asyncio.Event()
+
+    first = asyncio.create_task(_hold_slot(scheduler, "busy", LLMPriority.DIALOG, order, release))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(_hold_slot(scheduler, "background", LLMPriority.BACKGROUND, order, release)),
+        asyncio.create_task(_hold_slot(scheduler, "dialog", LLMPriority.DIALOG, order, release)),
+        asyncio.create_task(_hold_slot(scheduler, "crisis", LLMPriority.CRISIS, order, release)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.stats.queue_depth == 3
+
+    release.set()
+    await asyncio.gather(first, *waiters)
+
+    assert order == ["busy", "crisis", "dialog", "background"]
+    assert scheduler.stats.in_flight == 0
+    assert scheduler.stats.requests_total[LLMPriority.CRISIS] == 1
+
+
+@pytest.mark.asyncio
+async def test_one_request_per_user_in_flight():
+    scheduler = LLMRequestScheduler(max_in_flight=10)
+    order, release = [], asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_hold_slot(scheduler, "user", LLMPriority.DIALOG, order, release)),
+        asyncio.create_task(_hold_slot(scheduler, "user", LLMPriority.DIALOG, order, release)),
+        asyncio.create_task(_hold_slot(scheduler, "other", LLMPriority.DIALOG, order, release)),
+    ]
+    await asyncio.sleep(0)
+
+    assert order == ["user", "other"]
+    assert scheduler.stats.in_flight == 2
+    assert scheduler.stats.queue_depth == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["user", "other", "user"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    scheduler = LLMRequestScheduler(max_in_flight=1)
+    order, release = [], asyncio.Event()
+
+    holder = asyncio.create_task(_hold_slot(scheduler, "a", LLMPriority.DIALOG, order, release))
+    waiter = asyncio.create_task(_hold_slot(scheduler, "b", LLMPriority.DIALOG, order, release))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.stats.queue_depth == 0
+
+    release.set()
+    await holder
+    assert scheduler.stats.in_flight == 0
@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from source.infrastructure.metrics.registry import MetricsRegistry
+from source.presentation.telegram.middlewares.metrics import HandlerMetricsMiddleware, TimedMiddleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("handler_seconds", "Время хэндлера", ("handler",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe("handle_venting_message", value=value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP handler_seconds Время хэндлера", "# TYPE handler_seconds histogram"]
+    assert 'handler_seconds_bucket{handler="handle_venting_message",le="0.1"} 2' in lines
+    assert 'handler_seconds_bucket{handler="handle_venting_message",le="1.0"} 3' in lines
+    assert 'handler_seconds_bucket{handler="handle_venting_message",le="+Inf"} 4' in lines
+    assert 'handler_seconds_sum{handler="handle_venting_message"} 3.65' in lines
+    assert 'handler_seconds_count{handler="handle_venting_message"} 4' in lines
+
+
+def test_counter_escapes_labels_and_checks_label_count():
+    registry = MetricsRegistry()
+    counter = registry.counter("tokens_total", "Токены", ("context_scope", "kind"))
+
+    counter.inc('say "hi"', "prompt", amount=5)
+
+    assert 'tokens_total{context_scope="say \\"hi\\"",kind="prompt"} 5.0' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc("venting")
+    with pytest.raises(ValueError):
+        registry.counter("tokens_total", "Дубль")
+
+
+class SlowMiddleware:
+    async def __call__(self, handler, event, data):
+        await asyncio.sleep(0.02)
+        return await handler(event, data)
+
+
+@pytest.mark.asyncio
+async def test_timed_middleware_excludes_downstream_time():
+    observed = {}
+
+    async def downstream(event, data):
+        await asyncio.sleep(0.1)
+        return "handled"
+
+    with patch("source.presentation.telegram.middlewares.metrics.telegram_middleware_seconds.observe",
+               side_effect=lambda name, value: observed.update({name: value})):
+        result = await TimedMiddleware(SlowMiddleware())(downstream, object(), {})
+
+    # 0.1s хэндлера дальше по цепочке в собственное время middleware не входят
+    assert result == "handled"
+    assert 0.015 <= observed["SlowMiddleware"] < 0.08
+
+
+@pytest.mark.asyncio
+async def test_handler_metrics_use_callback_name_and_count_errors():
+    async def handle_ps_s2_goal(event, data):
+        raise RuntimeError
+
+    data = {"handler": SimpleNamespace(callback=handle_ps_s2_goal)}
+    with patch("source.presentation.telegram.middlewares.metrics.telegram_handler_seconds.observe") as observe, \
+            patch("source.presentation.telegram.middlewares.metrics.telegram_handler_errors_total.inc") as errors:
+        with pytest.raises(RuntimeError):
+            await HandlerMetricsMiddleware()(handle_ps_s2_goal, object(), data)
+
+    assert observe.call_args.args == ("handle_ps_s2_goal",)
+    errors.assert_called_once_with("handle_ps_s2_goal")
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, GetMe
+
+from source.core.enum import SendPriority
+from source.infrastructure.telegram.rate_limiter import OutboundRateLimiter, send_priority
+from source.infrastructure.telegram.request_middleware import RateLimitMiddleware
+
+
+def _limiter(global_rate: float = 1000, chat_rate: float = 1000, chat_burst: int = 1000) -> OutboundRateLimiter:
+    return OutboundRateLimiter(global_rate=global_rate, chat_rate=chat_rate, chat_burst=chat_burst, group_rate=1)
+
+
+@pytest.mark.asyncio
+async def test_chat_bucket_spaces_out_requests_to_one_chat():
+    limiter = _limiter(chat_rate=20, chat_burst=1)
+
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire(42)
+    elapsed = time.monotonic() - started
+
+    # первый запрос — из запаса, два следующих — по 1/20 секунды
+    assert elapsed >= 0.09
+    # другой чат не ждет
+    started = time.monotonic()
+    await limiter.acquire(43)
+    assert time.monotonic() - started < 0.05
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_overtake_bulk_when_global_limit_is_hit():
+    limiter = _limiter(global_rate=20)
+    for _ in range(20):
+        await limiter.acquire(None)
+
+    granted = []
+
+    async def send(priority: SendPriority, name: str):
+        await limiter.acquire(None, priority)
+        granted.append(name)
+
+    bulk = [asyncio.create_task(send(SendPriority.BULK, f"bulk-{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(send(SendPriority.INTERACTIVE, "reply"))
+    await asyncio.gather(*bulk, interactive)
+
+    assert granted[0] == "reply"
+    assert limiter.stats.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_retries_after_retry_after():
+    limiter = _limiter()
+    middleware = RateLimitMiddleware(limiter, max_retries=2)
+    method = SendMessage(chat_id=42, text="привет")
+    make_request = AsyncMock(side_effect=[
+        TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0),
+        "sent",
+    ])
+
+    assert await middleware(make_request, MagicMock(), method) == "sent"
+    assert make_request.await_count == 2
+    assert limiter.stats.retry_after_total == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_skips_limits_for_service_methods():
+    limiter = _limiter()
+    limiter.acquire = AsyncMock()
+    middleware = RateLimitMiddleware(limiter, max_retries=2)
+
+    await middleware(AsyncMock(), MagicMock(), GetMe())
+    limiter.acquire.assert_not_awaited()
+
+    with send_priority(SendPriority.BULK):
+        await middleware(AsyncMock(), MagicMock(), SendMessage(chat_id=42, text="рассылка"))
+    limiter.acquire.assert_awaited_once_with(42, SendPriority.BULK)
@@ -0,0 +1,17 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from source.infrastructure.serialization import JsonSerializer, OrjsonSerializer
+from source.infrastructure.serialization import serializers
+
+
+@pytest.mark.skipif(serializers.orjson is None, reason="orjson не установлен")
+def test_serializers_read_each_other():
+    data = {"user_id": uuid4(), "created_at": datetime(2025, 1, 1, 12, 0), "text": "привет"}
+    json_serializer, orjson_serializer = JsonSerializer(), OrjsonSerializer()
+
+    assert orjson_serializer.loads(json_serializer.dumps(data)) == json_serializer.loads(orjson_serializer.dumps(data))
+    # RedisStorage декодирует значение как UTF-8 до json_loads
+    assert orjson_serializer.loads(orjson_serializer.dumps(data).decode())["text"] == "привет"
@@ -0,0 +1,61 @@
+import httpx
+import pytest
+
+from source.application.payment.payment_service import get_idempotence_key
+from source.infrastructure.yookassa import YooKassaClient
+
+PAYMENT = {"id": "pay-1", "confirmation": {"confirmation_url": "https://yoomoney.ru/checkout/pay-1"}}
+
+
+def _client(responses: list, requests: list) -> YooKassaClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return YooKassaClient(http_client=http_client, max_retries=2, retry_base_delay=0, retry_max_delay=0)
+
+
+@pytest.mark.asyncio
+async def test_retries_keep_idempotence_key():
+    requests = []
+    client = _client(
+        [httpx.ConnectError("reset"), httpx.Response(500), httpx.Response(200, json=PAYMENT)],
+        requests
+    )
+
+    result = await client.create_payment("390", "Подписка", {"email": "a@b.c"}, idempotence_key="key-1")
+
+    assert result == ("https://yoomoney.ru/checkout/pay-1", "pay-1")
+    assert [request.headers["Idempotence-Key"] for request in requests] == ["key-1"] * 3
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried():
+    requests = []
+    client = _client([httpx.Response(400, json={"type": "error"})], requests)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_payment("390", "Подписка", {"email": "a@b.c"}, idempotence_key="key-1")
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    requests = []
+    client = _client([httpx.Response(503)] * 3, requests)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_payment("390", "Подписка", {"email": "a@b.c"}, idempotence_key="key-1")
+    assert len(requests) == 3
+
+
+def test_idempotence_key_is_stable_per_checkout():
+    key = get_idempotence_key("checkout-1", 390, {"email": "a@b.c"})
+
+    assert key == get_idempotence_key("checkout-1", 390, {"email": "a@b.c"})
+    assert key != get_idempotence_key("checkout-2", 390, {"email": "a@b.c"})
+    assert key != get_idempotence_key("checkout-1", 390, {"phone": "+79990000000"})
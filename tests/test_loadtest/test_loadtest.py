@@ -0,0 +1,142 @@
+import json
+import random
+import time
+
+import httpx
+import pytest
+from aiogram.types import Update
+
+from loadtest.fake_bot_api import FakeBotAPI
+from loadtest.fake_openai import create_fake_openai, fake_openai_client, FaultInjection, LatencyDistribution, \
+    RATE_LIMITED, SERVER_ERROR, TIMEOUT
+from loadtest.llm_bench import ClosedBreaker
+from loadtest.scenarios import ONBOARDING, SESSIONS, UpdateFactory
+from loadtest.stats import percentile, parse_histogram_means
+from source.core.lexicon.prompts import PROBLEMS_SOLVER_PROMPT
+from source.core.schemas.assistant_schemas import UserCharacteristicAssistantResponse
+from source.infrastructure.ai_assistant.ai_assistant import AssistantClient
+from source.infrastructure.ai_assistant.scheduler import LLMRequestScheduler
+
+
+def test_scenario_updates_are_valid_telegram_updates():
+    factory = UpdateFactory(telegram_id=777)
+    steps = ONBOARDING + [step for session, _ in SESSIONS for step in session]
+
+    updates = [Update.model_validate(step.build(factory)) for step in steps]
+
+    assert len({update.update_id for update in updates}) == len(updates)
+    assert all((update.message or update.callback_query.message).chat.id == 777 for update in updates)
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+
+
+def test_parse_histogram_means():
+    text = 'h_sum{handler="a"} 3.0\nh_count{handler="a"} 2\nh_bucket{handler="a",le="+Inf"} 2\n'
+    assert parse_histogram_means(text, "h", "handler") == {"a": (2, 1.5)}
+
+
+@pytest.mark.asyncio
+async def test_fake_bot_api_resolves_reply_and_ignores_stale_edits():
+    fake = FakeBotAPI(latency=0, jitter=0)
+    transport = httpx.ASGITransport(app=fake.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+        reply = fake.expect_reply(42)
+        await client.post("/bot1:x/answerCallbackQuery", data={"callback_query_id": "42:1"})
+        assert not reply.done()
+
+        response = await client.post("/bot1:x/sendMessage", data={"chat_id": "42", "text": "..."})
+        assert reply.done()
+        placeholder_id = response.json()["result"]["message_id"]
+
+        # следующий шаг: правка старого плейсхолдера — это хвост прошлого ответа
+        next_reply = fake.expect_reply(42)
+        await client.post("/bot1:x/editMessageText", data={"chat_id": "42", "message_id": placeholder_id, "text": "a"})
+        assert not next_reply.done()
+
+    assert fake.calls == {"answerCallbackQuery": 1, "sendMessage": 1, "editMessageText": 1}
+
+
+@pytest.fixture
+def openai_client():
+    return fake_openai_client(create_fake_openai(latency=0, tokens_per_second=0))
+
+
+@pytest.mark.asyncio
+async def test_fake_openai_serves_canned_json(openai_client):
+    characteristic = await openai_client.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "user", "content": "logs"}], response_format={"type": "json_object"}
+    )
+    options = await openai_client.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "system", "content": PROBLEMS_SOLVER_PROMPT}]
+    )
+
+    UserCharacteristicAssistantResponse.model_validate_json(characteristic.choices[0].message.content)
+    assert [option["option"] for option in json.loads(options.choices[0].message.content)]
+    assert characteristic.usage.completion_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_openai_streams_with_usage(openai_client):
+    stream = await openai_client.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "user", "content": "привет"}], stream=True,
+        stream_options={"include_usage": True}
+    )
+    deltas, usage = [], None
+    async for chunk in stream:
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            deltas.append(chunk.choices[0].delta.content)
+
+    assert len(deltas) > 1
+    assert usage.completion_tokens == len("".join(deltas)) // 4
+
+
+def test_latency_distribution_parse():
+    rng = random.Random(1)
+    assert LatencyDistribution.parse("0.3").sample(rng) == 0.3
+    assert 0.2 <= LatencyDistribution.parse("uniform:0.2:0.4").sample(rng) <= 0.4
+    assert LatencyDistribution.parse("lognormal:0.8:0.5").sample(rng) > 0
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("normal:1")
+
+
+@pytest.mark.asyncio
+async def test_fake_openai_paces_stream_in_process():
+    # 8 символов = 2 токена, при 100 токенах/с — 20 мс между кусками
+    client = fake_openai_client(create_fake_openai(latency=0, tokens_per_second=100))
+    started = time.monotonic()
+    stream = await client.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "user", "content": "привет"}], stream=True
+    )
+    async for _ in stream:
+        first_chunk = time.monotonic() - started
+        break
+    await stream.close()
+
+    assert first_chunk < 0.1
+
+
+@pytest.mark.asyncio
+async def test_assistant_client_retries_injected_errors():
+    faults = FaultInjection(hang_seconds=5, script=[RATE_LIMITED, SERVER_ERROR, TIMEOUT])
+    app = create_fake_openai(latency=0, tokens_per_second=0, faults=faults)
+    breaker = ClosedBreaker()
+    assistant = AssistantClient(
+        client=fake_openai_client(app, timeout=0.2),
+        scheduler=LLMRequestScheduler(max_in_flight=4),
+        breaker=breaker,
+        max_retries=3,
+        retry_base_delay=0,
+        retry_max_delay=0,
+    )
+
+    characteristic = await assistant.get_response(
+        "system", "logs", response_schema=UserCharacteristicAssistantResponse, need_json=True
+    )
+
+    assert characteristic.characteristic_accuracy == "70%"
+    assert app.state.outcomes == {RATE_LIMITED: 1, SERVER_ERROR: 1, TIMEOUT: 1, "ok": 1}
@@ -0,0 +1,166 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.ai_assistant.ai_assistant_service import AssistantService
+from source.application.ai_assistant.context_builder import BuildDialogContext
+from source.application.redis_services.message_coalescer.MessageCoalescerServiceInterface import \
+    MessageCoalescerServiceInterface
+from source.application.redis_services.message_history.message_history_service import MessageHistoryService
+from source.application.subscription.subscription_service import SubscriptionService
+from source.presentation.telegram import coalescing
+from source.presentation.telegram.coalescing import schedule_coalesced_reply
+
+
+class InMemoryCoalescer(MessageCoalescerServiceInterface):
+    """Буфер без Redis с той же семантикой поколений"""
+
+    def __init__(self, window_seconds: float = 0.01):
+        self.window_seconds = window_seconds
+        self.buffers: dict[tuple[str, str], list[str]] = {}
+        self.generations: dict[tuple[str, str], int] = {}
+
+    async def push(self, user_telegram_id, context_scope, text, message_id):
+        key = (user_telegram_id, context_scope)
+        self.buffers.setdefault(key, []).append(text)
+        self.generations[key] = self.generations.get(key, 0) + 1
+        return self.generations[key]
+
+    async def is_current(self, user_telegram_id, context_scope, generation):
+        return self.generations.get((user_telegram_id, context_scope)) == generation
+
+    async def get_pending(self, user_telegram_id, context_scope):
+        return list(self.buffers.get((user_telegram_id, context_scope), []))
+
+    async def ack(self, user_telegram_id, context_scope, count):
+        key = (user_telegram_id, context_scope)
+        self.buffers[key] = self.buffers.get(key, [])[count:]
+
+    async def clear(self, user_telegram_id, context_scope):
+        key = (user_telegram_id, context_scope)
+        self.buffers.pop(key, None)
+        self.generations[key] = self.generations.get(key, 0) + 1
+
+
+@pytest.fixture
+def services():
+    return {
+        AssistantService: MagicMock(),
+        BuildDialogContext: AsyncMock(return_value=[]),
+        MessageHistoryService: MagicMock(add_message_to_history=AsyncMock(), append_pair=AsyncMock()),
+        SubscriptionService: MagicMock(refund_message=AsyncMock()),
+    }
+
+
+@pytest.fixture
+def container(services):
+    @asynccontextmanager
+    async def enter_scope():
+        request_container = MagicMock()
+        request_container.get = AsyncMock(side_effect=lambda dependency: services[dependency])
+        yield request_container
+
+    return MagicMock(side_effect=enter_scope)
+
+
+@pytest.fixture
+def message():
+    message = MagicMock()
+    message.from_user.id = 42
+    message.chat.id = 42
+
+    async def answer(text, **kwargs):
+        placeholder = MagicMock()
+        placeholder.edit_text = AsyncMock()
+        placeholder.delete = AsyncMock()
+        return placeholder
+
+    message.answer = AsyncMock(side_effect=answer)
+    return message
+
+
+async def _push_and_schedule(message, container, coalescer, text, stream_reply, user=None):
+    generation = await coalescer.push("42", "venting", text, len(coalescer.buffers.get(("42", "venting"), [])))
+    schedule_coalesced_reply(
+        message=message,
+        user=user,
+        container=container,
+        coalescer=coalescer,
+        context_scope="venting",
+        generation=generation,
+        stream_reply=stream_reply,
+        waiting_text="...",
+        error_text="error",
+        quota_charged=True,
+    )
+
+
+async def _wait_reply():
+    task = coalescing._reply_tasks.get(("42", "venting"))
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_rapid_messages_get_single_reply(message, container, services):
+    coalescer = InMemoryCoalescer()
+    prompts = []
+
+    async def stream_reply(assistant_service, text, message_history):
+        prompts.append(text)
+        yield "ответ"
+
+    for text in ("привет", "мне плохо", "не знаю что делать"):
+        await _push_and_schedule(message, container, coalescer, text, stream_reply)
+    await _wait_reply()
+
+    assert prompts == ["привет\nмне плохо\nне знаю что делать"]
+    assert coalescer.buffers[("42", "venting")] == []
+    # сообщения списаны LimitCheckMiddleware до ответа, ответ удался — возвращать нечего
+    services[SubscriptionService].refund_message.assert_not_awaited()
+    _, _, user_message, assistant_message = services[MessageHistoryService].append_pair.await_args.args
+    assert user_message.message == "привет\nмне плохо\nне знаю что делать"
+    assert assistant_message.message == "ответ"
+
+
+@pytest.mark.asyncio
+async def test_newer_message_supersedes_reply_in_flight(message, container):
+    coalescer = InMemoryCoalescer()
+    prompts = []
+    first_reply_started = asyncio.Event()
+
+    async def stream_reply(assistant_service, text, message_history):
+        prompts.append(text)
+        if len(prompts) == 1:
+            first_reply_started.set()
+            await asyncio.sleep(10)
+        yield "ответ"
+
+    await _push_and_schedule(message, container, coalescer, "первое", stream_reply)
+    await first_reply_started.wait()
+    await _push_and_schedule(message, container, coalescer, "второе", stream_reply)
+    await _wait_reply()
+
+    # недоотвеченное сообщение уходит в ассистента вместе с новым
+    assert prompts == ["первое", "первое\nвторое"]
+    assert coalescer.buffers[("42", "venting")] == []
+
+
+@pytest.mark.asyncio
+async def test_failed_reply_refunds_every_charged_message(message, container, services):
+    coalescer = InMemoryCoalescer()
+    user = MagicMock()
+
+    async def stream_reply(assistant_service, text, message_history):
+        raise RuntimeError("llm failed")
+        yield
+
+    for text in ("привет", "мне плохо"):
+        await _push_and_schedule(message, container, coalescer, text, stream_reply, user=user)
+    await _wait_reply()
+
+    # юзер из апдейта передается дальше — SubscriptionService не читает его повторно
+    services[SubscriptionService].refund_message.assert_awaited_once_with("42", user, 2)
+    message.answer.assert_awaited_with("error", reply_markup=None)
@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.presentation.telegram.middlewares.deduplicate_update import DeduplicateUpdateMiddleware, UPDATE_SCOPE
+from source.presentation.telegram.update_tasks import collect_update_tasks, track_update_task
+
+
+class InMemoryIdempotency:
+    def __init__(self):
+        self.keys: dict[tuple[str, str], str] = {}
+
+    async def claim(self, scope, key, takeover=False):
+        if self.keys.get((scope, key)) == "done" or ((scope, key) in self.keys and not takeover):
+            return False
+        self.keys[(scope, key)] = "processing"
+        return True
+
+    async def complete(self, scope, key):
+        self.keys[(scope, key)] = "done"
+
+    async def release(self, scope, key):
+        self.keys.pop((scope, key), None)
+
+
+@pytest.mark.asyncio
+async def test_redelivered_update_is_handled_once():
+    idempotency = InMemoryIdempotency()
+    middleware = DeduplicateUpdateMiddleware(idempotency)
+    handler = AsyncMock(return_value="handled")
+    update = MagicMock(update_id=7)
+
+    assert await middleware(handler, update, {}) == "handled"
+    assert await middleware(handler, update, {}) is None
+
+    handler.assert_awaited_once()
+    assert idempotency.keys[(UPDATE_SCOPE, "7")] == "done"
+
+
+@pytest.mark.asyncio
+async def test_failed_update_can_be_retried():
+    idempotency = InMemoryIdempotency()
+    middleware = DeduplicateUpdateMiddleware(idempotency)
+    handler = AsyncMock(side_effect=[RuntimeError("handler failed"), "handled"])
+    update = MagicMock(update_id=7)
+
+    with pytest.raises(RuntimeError):
+        await middleware(handler, update, {})
+    assert await middleware(handler, update, {}) == "handled"
+
+    assert handler.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_is_done_only_after_its_background_reply():
+    idempotency = InMemoryIdempotency()
+    middleware = DeduplicateUpdateMiddleware(idempotency)
+    reply_sent = asyncio.Event()
+
+    async def handler(event, data):
+        track_update_task(asyncio.create_task(reply_sent.wait()))
+
+    with collect_update_tasks() as background:
+        await middleware(handler, MagicMock(update_id=7), {})
+    assert idempotency.keys[(UPDATE_SCOPE, "7")] == "processing"
+
+    reply_sent.set()
+    await asyncio.wait(background)
+    assert idempotency.keys[(UPDATE_SCOPE, "7")] == "done"
+
+
+@pytest.mark.asyncio
+async def test_redelivered_update_takes_over_interrupted_processing():
+    idempotency = InMemoryIdempotency()
+    idempotency.keys[(UPDATE_SCOPE, "7")] = "processing"
+    middleware = DeduplicateUpdateMiddleware(idempotency)
+    handler = AsyncMock(return_value="handled")
+    update = MagicMock(update_id=7)
+
+    assert await middleware(handler, update, {}) is None
+    assert await middleware(handler, update, {"redelivered": True}) == "handled"
+    assert await middleware(handler, update, {"redelivered": True}) is None
+
+    handler.assert_awaited_once()
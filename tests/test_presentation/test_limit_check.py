@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.types import Message
+
+from source.presentation.telegram.middlewares import LimitCheckMiddleware
+from source.presentation.telegram.states.user_states import SupportStates
+
+
+def _message(text: str = "мне плохо") -> Message:
+    message = MagicMock(spec=Message)
+    message.text = text
+    message.answer = AsyncMock()
+    return message
+
+
+@pytest.fixture
+def subscription_service():
+    return MagicMock(try_consume_message=AsyncMock(return_value=True), refund_message=AsyncMock())
+
+
+@pytest.fixture
+def data(subscription_service):
+    container = MagicMock(get=AsyncMock(return_value=subscription_service))
+    return {
+        "state": MagicMock(get_state=AsyncMock(return_value=SupportStates.SPEAKING.state)),
+        "dishka_container": container,
+        "event_from_user": MagicMock(id=1),
+        "user": MagicMock(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_message_is_charged_before_handler(subscription_service, data):
+    handler = AsyncMock(return_value="ok")
+
+    assert await LimitCheckMiddleware()(handler, _message(), data) == "ok"
+
+    subscription_service.try_consume_message.assert_awaited_once_with("1", data["user"])
+    assert data["quota_charged"] is True
+    subscription_service.refund_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_limit_reached_skips_handler(subscription_service, data):
+    subscription_service.try_consume_message.return_value = False
+    handler, message = AsyncMock(), _message()
+
+    await LimitCheckMiddleware()(handler, message, data)
+
+    handler.assert_not_awaited()
+    message.answer.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_refunds_message(subscription_service, data):
+    handler = AsyncMock(side_effect=RuntimeError("handler failed"))
+
+    with pytest.raises(RuntimeError):
+        await LimitCheckMiddleware()(handler, _message(), data)
+
+    subscription_service.refund_message.assert_awaited_once_with("1", data["user"])
+
+
+@pytest.mark.asyncio
+async def test_commands_and_menu_exit_are_not_charged(subscription_service, data):
+    for text in ("/stop", "Вернуться в меню"):
+        await LimitCheckMiddleware()(AsyncMock(), _message(text), data)
+
+    subscription_service.try_consume_message.assert_not_awaited()
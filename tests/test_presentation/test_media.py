@@ -0,0 +1,56 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendPhoto
+from aiogram.types import FSInputFile
+
+from source.materials.get_file import get_file_hash
+from source.presentation.telegram.media import MaterialSender
+
+
+def _sent(file_id: str):
+    message = MagicMock()
+    message.photo = [MagicMock(file_id="thumb"), MagicMock(file_id=file_id)]
+    return message
+
+
+@pytest.fixture
+def media_cache():
+    return MagicMock(get_file_id=AsyncMock(return_value=None), save_file_id=AsyncMock(), forget_file_id=AsyncMock())
+
+
+@pytest.fixture
+def bot():
+    return MagicMock(id=1)
+
+
+@pytest.mark.asyncio
+async def test_uploads_once_then_sends_file_id(media_cache, bot):
+    sender = MaterialSender(media_cache)
+    send = AsyncMock(return_value=_sent("file-1"))
+
+    await sender.send(bot, "speaking.jpeg", send)
+    await sender.send(bot, "speaking.jpeg", send)
+
+    first, second = (call.args[0] for call in send.await_args_list)
+    assert isinstance(first, FSInputFile)
+    assert second == "file-1"
+    media_cache.save_file_id.assert_awaited_once_with(1, get_file_hash("speaking.jpeg"), "file-1")
+
+
+@pytest.mark.asyncio
+async def test_stale_file_id_is_uploaded_again(media_cache, bot):
+    media_cache.get_file_id.return_value = "stale"
+    sender = MaterialSender(media_cache)
+    rejected = TelegramBadRequest(
+        method=SendPhoto(chat_id=1, photo="stale"),
+        message="Bad Request: wrong file identifier/HTTP URL specified"
+    )
+    send = AsyncMock(side_effect=[rejected, _sent("file-2")])
+
+    await sender.send(bot, "speaking.jpeg", send)
+
+    assert isinstance(send.await_args_list[1].args[0], FSInputFile)
+    media_cache.forget_file_id.assert_awaited_once()
+    media_cache.save_file_id.assert_awaited_once_with(1, get_file_hash("speaking.jpeg"), "file-2")
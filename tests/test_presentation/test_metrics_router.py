@@ -0,0 +1,24 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import SecretStr
+
+from source.infrastructure.config import MetricsConfig
+from source.presentation.fastapi.metrics_router import check_metrics_token
+
+
+def test_metrics_are_hidden_without_configured_token():
+    with pytest.raises(HTTPException) as error:
+        check_metrics_token(MetricsConfig(), "Bearer anything")
+    assert error.value.status_code == 404
+
+
+@pytest.mark.parametrize("authorization", [None, "secret", "Basic secret", "Bearer wrong"])
+def test_metrics_require_bearer_token(authorization):
+    with pytest.raises(HTTPException) as error:
+        check_metrics_token(MetricsConfig(token=SecretStr("secret")), authorization)
+    assert error.value.status_code == 401
+    assert error.value.headers == {"WWW-Authenticate": "Bearer"}
+
+
+def test_metrics_accept_configured_token():
+    check_metrics_token(MetricsConfig(token=SecretStr("secret")), "Bearer secret")
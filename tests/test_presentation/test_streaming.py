@@ -0,0 +1,72 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from source.presentation.telegram.streaming import TelegramStreamRenderer
+from source.presentation.telegram.utils import TELEGRAM_MAX_MESSAGE_LENGTH
+
+
+async def _deltas(*parts: str):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def mock_bot():
+    """Мок бота: каждое send_message возвращает новое сообщение с edit_text"""
+    bot = MagicMock()
+    bot.sent = []
+
+    async def send_message(chat_id, text, **kwargs):
+        sent_message = MagicMock()
+        sent_message.edit_text = AsyncMock()
+        sent_message.first_text = text
+        bot.sent.append(sent_message)
+        return sent_message
+
+    bot.send_message = AsyncMock(side_effect=send_message)
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_render_edits_placeholder_and_returns_full_text(mock_bot):
+    placeholder = MagicMock()
+    placeholder.edit_text = AsyncMock()
+
+    renderer = TelegramStreamRenderer(bot=mock_bot, chat_id=1, placeholder=placeholder, edit_interval=100)
+    result = await renderer.render(_deltas("При", "вет", ", **друг**"))
+
+    assert result == "Привет, **друг**"
+    mock_bot.send_message.assert_not_called()
+
+    # первая дельта — сразу, остальные склеены в финальную HTML-правку
+    first_call, final_call = placeholder.edit_text.call_args_list
+    assert first_call.args[0] == "При"
+    assert final_call.args[0] == "Привет, <b>друг</b>"
+
+
+@pytest.mark.asyncio
+async def test_render_rolls_over_long_text(mock_bot):
+    first_line = "а" * (TELEGRAM_MAX_MESSAGE_LENGTH - 10)
+    renderer = TelegramStreamRenderer(bot=mock_bot, chat_id=1, edit_interval=0)
+
+    result = await renderer.render(_deltas(first_line, "\n", "б" * 50))
+
+    assert result == first_line + "\n" + "б" * 50
+    assert len(mock_bot.sent) == 2
+    assert mock_bot.sent[0].first_text == first_line
+    assert mock_bot.sent[1].first_text.strip() == "б" * 50
+
+
+@pytest.mark.asyncio
+async def test_render_attaches_inline_keyboard_on_final_edit(mock_bot):
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="ok", callback_data="ok")]])
+    renderer = TelegramStreamRenderer(bot=mock_bot, chat_id=1, reply_markup=keyboard, footer="\n\nконец")
+
+    await renderer.render(_deltas("ответ"))
+
+    message = mock_bot.sent[0]
+    assert mock_bot.send_message.call_args.kwargs["reply_markup"] is None
+    assert message.edit_text.call_args.kwargs["reply_markup"] is keyboard
+    assert message.edit_text.call_args.args[0] == "ответ\n\nконец"
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.application.redis_services.update_queue.UpdateQueueServiceInterface import QueuedUpdate
+from source.presentation.telegram.update_tasks import track_update_task
+from source.presentation.telegram.update_worker import UpdateWorkerPool, assigned_partitions
+
+
+def _queued(update_id: int, chat_id: int, partition: int = 0) -> QueuedUpdate:
+    payload = json.dumps({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "user"},
+            "text": str(update_id),
+        },
+    }).encode()
+    return QueuedUpdate(partition=partition, entry_id=f"{update_id}-0", payload=payload)
+
+
+def _pool(dispatcher, queue=None, max_in_flight: int = 8) -> UpdateWorkerPool:
+    return UpdateWorkerPool(
+        queue=queue or MagicMock(ack=AsyncMock()),
+        dispatcher=dispatcher,
+        bot=MagicMock(),
+        container=MagicMock(),
+        partitions=[0],
+        worker_index=0,
+        max_in_flight=max_in_flight,
+        lease_ttl=30,
+        shutdown_timeout=1,
+    )
+
+
+class RecordingDispatcher:
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.processed: list[tuple[int, int]] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def feed_update(self, bot, update, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.processed.append((update.message.chat.id, update.update_id))
+        self.running -= 1
+
+
+def test_assigned_partitions_split_between_workers():
+    assert assigned_partitions(6, 0, 2) == [0, 2, 4]
+    assert assigned_partitions(6, 1, 2) == [1, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_chat_keep_order_and_chats_run_in_parallel():
+    dispatcher = RecordingDispatcher()
+    pool = _pool(dispatcher)
+
+    for update_id, chat_id in [(1, 10), (2, 20), (3, 10), (4, 20), (5, 10)]:
+        pool._dispatch(_queued(update_id, chat_id))
+    await pool._drain()
+
+    assert [update_id for chat_id, update_id in dispatcher.processed if chat_id == 10] == [1, 3, 5]
+    assert [update_id for chat_id, update_id in dispatcher.processed if chat_id == 20] == [2, 4]
+    assert dispatcher.max_running == 2
+    assert pool.queue.ack.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_by_max_in_flight():
+    dispatcher = RecordingDispatcher()
+    pool = _pool(dispatcher, max_in_flight=3)
+
+    for chat_id in range(10):
+        pool._dispatch(_queued(chat_id + 1, chat_id))
+    await pool._drain()
+
+    assert len(dispatcher.processed) == 10
+    assert dispatcher.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_and_malformed_updates_are_acked():
+    dispatcher = MagicMock(feed_update=AsyncMock(side_effect=RuntimeError("handler failed")))
+    pool = _pool(dispatcher)
+
+    pool._dispatch(_queued(1, 10))
+    pool._dispatch(QueuedUpdate(partition=0, entry_id="2-0", payload=b"not json"))
+    pool._dispatch(QueuedUpdate(partition=0, entry_id="3-0", payload=None))
+    await pool._drain()
+
+    dispatcher.feed_update.assert_awaited_once()
+    assert sorted(call.args[0].entry_id for call in pool.queue.ack.await_args_list) == ["1-0", "2-0", "3-0"]
+
+
+@pytest.mark.asyncio
+async def test_consume_replays_pending_before_new_updates():
+    dispatcher = RecordingDispatcher(delay=0)
+    reads = []
+
+    async def read(consumer, cursors, count, block):
+        reads.append(dict(cursors))
+        if len(reads) == 1:
+            return [_queued(1, 10)]
+        if len(reads) == 3:
+            return [_queued(2, 10)]
+        if len(reads) > 3:
+            await asyncio.sleep(10)
+        return []
+
+    queue = MagicMock(read=AsyncMock(side_effect=read), ack=AsyncMock())
+    pool = _pool(dispatcher, queue=queue)
+
+    consume = asyncio.create_task(pool._consume())
+    while len(reads) < 4:
+        await asyncio.sleep(0)
+    consume.cancel()
+    await asyncio.gather(consume, return_exceptions=True)
+    await pool._drain()
+
+    assert pool.consumer == "worker-0"
+    # неподтвержденные читаются после последнего выданного id, пока не кончатся, потом — новые
+    assert reads[:4] == [{0: "0"}, {0: "1-0"}, {0: ">"}, {0: ">"}]
+    assert dispatcher.processed == [(10, 1), (10, 2)]
+
+
+class ReplyLaterDispatcher:
+    """Хэндлер сразу отпускает чат, а отвечает фоновой задачей — как ответ после окна coalescing"""
+
+    def __init__(self):
+        self.handled: list[int] = []
+        self.redelivered: list[bool] = []
+        self.replies: dict[int, asyncio.Event] = {}
+
+    async def feed_update(self, bot, update, redelivered=False, **kwargs):
+        self.handled.append(update.update_id)
+        self.redelivered.append(redelivered)
+        reply = self.replies[update.update_id] = asyncio.Event()
+        track_update_task(asyncio.create_task(reply.wait()))
+
+
+@pytest.mark.asyncio
+async def test_update_is_acked_after_background_reply_without_blocking_its_chat():
+    dispatcher = ReplyLaterDispatcher()
+    pool = _pool(dispatcher, max_in_flight=2)
+
+    pool._dispatch(_queued(1, 10), redelivered=True)
+    pool._dispatch(_queued(2, 10))
+    while len(dispatcher.handled) < 2:
+        await asyncio.sleep(0)
+
+    # оба апдейта чата прошли хэндлер, но ждут ответа: не подтверждены и занимают max_in_flight
+    assert dispatcher.redelivered == [True, False]
+    pool.queue.ack.assert_not_awaited()
+    assert pool.max_in_flight - len(pool._tasks) == 0
+
+    dispatcher.replies[1].set()
+    dispatcher.replies[2].set()
+    await pool._drain()
+    assert sorted(call.args[0].entry_id for call in pool.queue.ack.await_args_list) == ["1-0", "2-0"]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_pending_replies_and_leaves_update_unacked():
+    dispatcher = ReplyLaterDispatcher()
+    pool = _pool(dispatcher)
+    pool.shutdown_timeout = 0.01
+
+    pool._dispatch(_queued(1, 10))
+    while not dispatcher.handled:
+        await asyncio.sleep(0)
+    await pool._drain()
+
+    pool.queue.ack.assert_not_awaited()
+    assert not pool._tasks
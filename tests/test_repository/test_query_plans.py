@@ -0,0 +1,81 @@
+"""
+Проверка планов горячих запросов репозиториев на живом Postgres.
+
+Нужна база с накаченными миграциями: TEST_DATABASE_URL=postgresql+asyncpg://... (без нее тесты пропускаются).
+Все изменения делаются в транзакции и откатываются. Seq scan запрещается через enable_seqscan = off:
+если планировщик все равно выбирает Seq Scan, значит подходящего индекса нет.
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from source.infrastructure.database.repository import PaymentRepository, UserRepository
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+
+HOT_TABLES = {"users", "user_logs", "user_mood", "user_characteristic", "paymentlogs"}
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+@pytest.fixture
+async def connection():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    statements: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        await conn.execute(text(
+            "INSERT INTO users (id, telegram_id, username, user_type, subscription, messages_used, daily_messages_used) "
+            "VALUES (:id, 'plan-check', 'plan-check', 'USER', 'FREE', 0, 0)"
+        ), {"id": uuid.uuid4()})
+        statements.clear()
+        conn.info["captured_statements"] = statements
+        yield conn
+        await transaction.rollback()
+    await engine.dispose()
+
+
+async def _assert_no_seq_scan(conn, query):
+    statements = conn.info["captured_statements"]
+    statements.clear()
+
+    session = AsyncSession(bind=conn)
+    await query(session)
+
+    assert statements, "репозиторий не выполнил ни одного SELECT"
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()[0]["Plan"]
+        assert not _seq_scans(plan), f"Seq Scan в плане запроса:\n{statement}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", [
+    pytest.param(lambda s: UserRepository(s).get_schema_by_telegram_id("plan-check"), id="user_by_telegram_id"),
+    pytest.param(lambda s: UserRepository(s).is_mood_set_today("plan-check"), id="is_mood_set_today"),
+    pytest.param(lambda s: UserRepository(s).get_recent_user_moods("plan-check", limit=5), id="recent_moods"),
+    pytest.param(lambda s: UserRepository(s).get_user_characteristics("plan-check"), id="characteristics"),
+    pytest.param(lambda s: UserRepository(s).get_user_logs("plan-check", days=7), id="user_logs"),
+    pytest.param(lambda s: PaymentRepository(s).get_by_purchase_id("plan-check"), id="payment_by_purchase_id"),
+])
+async def test_hot_queries_use_indexes(connection, query):
+    await _assert_no_seq_scan(connection, query)
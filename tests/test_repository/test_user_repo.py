@@ -1,13 +1,15 @@
 # test_user_repo.py
 import unittest
 import uuid
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
 
 from source.core.schemas.user_schema import UserMoodSchema, UserCharacteristicSchema, UserLogSchema
-from source.infrastructure.database.models.user_model import UserLog
+from source.infrastructure.database.models.user_model import User, UserLog, UserMood, UserCharacteristic
 
 
 @pytest.mark.asyncio
@@ -388,3 +390,55 @@ async def test_create_unique_violation(user_repo, user_schema):
 
     # Проверяем, что был выполнен rollback
     user_repo.session.rollback.assert_called_once()
+
+
+def test_user_relationships_are_not_loaded_implicitly():
+    # юзер читается на каждом апдейте — его логи, настроения и характеристики не должны тянуться вместе с ним
+    for model in (User, UserLog, UserMood, UserCharacteristic):
+        assert {relationship.lazy for relationship in model.__mapper__.relationships} == {"raise_on_sql"}
+
+
+@pytest.mark.asyncio
+async def test_update_message_counters_batches_by_column(user_repo):
+    await user_repo.update_message_counters(
+        {("1", "daily_messages_used"): 3, ("2", "daily_messages_used"): 1, ("3", "messages_used"): 40},
+        batch_size=1
+    )
+
+    params = [call.args[1] for call in user_repo.session.execute.call_args_list]
+    assert params == [
+        [{"counter_telegram_id": "1", "counter_value": 3}],
+        [{"counter_telegram_id": "2", "counter_value": 1}],
+        [{"counter_telegram_id": "3", "counter_value": 40}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_message_counters_writes_window_start_as_datetime(user_repo):
+    await user_repo.update_message_counters({("1", "last_daily_reset"): 1700000000})
+
+    params = user_repo.session.execute.call_args.args[1]
+    assert params == [{"counter_telegram_id": "1", "counter_value": datetime.fromtimestamp(1700000000, timezone.utc)}]
+
+
+@pytest.mark.asyncio
+async def test_create_user_logs_is_single_idempotent_insert(user_repo, user_log_schema):
+    await user_repo.create_user_logs([user_log_schema, user_log_schema.model_copy(update={"id": uuid.uuid4()})])
+
+    user_repo.session.execute.assert_called_once()
+    sql = str(user_repo.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (id) DO NOTHING" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_telegram_ids_after_uses_keyset(user_repo):
+    user_repo.session.execute.return_value = MagicMock()
+    user_repo.session.execute.return_value.scalars.return_value.all.return_value = ["2", "3"]
+
+    result = await user_repo.get_telegram_ids_after("1", limit=2)
+
+    assert result == ["2", "3"]
+    sql = str(user_repo.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "users.telegram_id >" in sql
+    assert "ORDER BY users.telegram_id" in sql
+    assert "OFFSET" not in sql
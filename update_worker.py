@@ -0,0 +1,41 @@
+import asyncio
+import logging
+import signal
+
+from environs import Env
+
+from source.core.logging.logging_config import configure_logging
+from source.infrastructure.config import get_logging_config
+from source.infrastructure.dishka import make_dishka_container
+from source.presentation.telegram.update_worker import UpdateWorkerPool
+
+env = Env()
+env.read_env()
+configure_logging(**get_logging_config(env).model_dump())
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """
+    Отдельный процесс обработки апдейтов из очереди, без HTTP.
+    Партиции задаются UPDATE_WORKER_INDEX / UPDATE_WORKER_COUNT, у FastAPI при этом UPDATE_WORKER_EMBEDDED=false
+    """
+    dishka_container = make_dishka_container()
+    pool: UpdateWorkerPool = await dishka_container.get(UpdateWorkerPool)
+
+    worker_task = asyncio.create_task(pool.run())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker_task.cancel)
+
+    try:
+        await worker_task
+    except asyncio.CancelledError:
+        logger.info("🔄 Update worker stopped")
+    finally:
+        await dishka_container.close()
+        logger.info("✅ Dishka container closed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())